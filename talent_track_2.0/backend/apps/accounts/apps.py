@@ -4,3 +4,6 @@ class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.accounts"
     label = "accounts"
+
+    def ready(self):
+        from . import signals  # noqa: F401
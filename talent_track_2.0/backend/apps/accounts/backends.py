@@ -1,5 +1,40 @@
 from django.contrib.auth.backends import ModelBackend
-from apps.accounts.models import AuthUser
+from apps.accounts.hashing import get_pool, hash_ficticio, necesita_rehash
+from apps.accounts.models import AuthUser, normalizar_email
+from apps.usuarios.models import Usuario
+
+# AuthUser + Usuario (OneToOne) + nombres de rol en una sola consulta:
+# una fila por rol (o una con rol NULL). El email ya está normalizado en la
+# BD (ver AuthUser.save), así que el filtro exacto usa el índice único.
+_CAMPOS_AUTH = [f.attname for f in AuthUser._meta.concrete_fields]
+_CAMPOS_USUARIO = [f.attname for f in Usuario._meta.concrete_fields]
+_ROL = ("usuario__usuariorol__rol_id", "usuario__usuariorol__rol__nombre")
+
+
+def cargar_login(email):
+    """
+    -> AuthUser con .usuario ya cargado, .roles_login (nombres) y
+       .rol_ids_login, o None si no existe.
+    """
+    filas = list(
+        AuthUser.objects
+        .filter(email=normalizar_email(email))
+        .order_by("usuario__usuariorol__id")
+        .values_list(*_CAMPOS_AUTH, *[f"usuario__{c}" for c in _CAMPOS_USUARIO], *_ROL)
+    )
+    if not filas:
+        return None
+
+    primera = filas[0]
+    n = len(_CAMPOS_AUTH)
+    user = AuthUser.from_db(AuthUser.objects.db, _CAMPOS_AUTH, primera[:n])
+    valores_usuario = primera[n:n + len(_CAMPOS_USUARIO)]
+    roles = [fila[-2:] for fila in filas if fila[-2] is not None]
+    if user.usuario_id is not None:
+        user.usuario = Usuario.from_db(AuthUser.objects.db, _CAMPOS_USUARIO, valores_usuario)
+    user.rol_ids_login = [rol_id for rol_id, _ in roles]
+    user.roles_login = [nombre for _, nombre in roles]
+    return user
 
 
 class EmailBackend(ModelBackend):
@@ -14,12 +49,17 @@ class EmailBackend(ModelBackend):
         if not identifier or not password:
             return None
 
-        try:
-            user = AuthUser.objects.get(email__iexact=identifier.strip().lower())
-        except AuthUser.DoesNotExist:
+        user = cargar_login(identifier)
+        if user is None:
+            # mismo costo que un email existente (no delata qué emails hay)
+            get_pool().verificar(password, hash_ficticio())
             return None
 
-        if user.check_password(password) and self.user_can_authenticate(user):
-            return user
+        # LoginSaturado sube hasta el serializer (429)
+        if not get_pool().verificar(password, user.password) or not self.user_can_authenticate(user):
+            return None
 
-        return None
+        if necesita_rehash(user.password):
+            user.set_password(password)
+            user.save(update_fields=["password"])
+        return user
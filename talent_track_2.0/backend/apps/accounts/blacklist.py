@@ -0,0 +1,53 @@
+# apps/accounts/blacklist.py
+"""
+Compactación de las tablas de token_blacklist (SimpleJWT).
+
+Con ROTATE_REFRESH_TOKENS + BLACKLIST_AFTER_ROTATION cada refresh deja
+una fila en OutstandingToken y otra en BlacklistedToken, y nadie las
+borra. Una vez vencido el refresh (expires_at) ya no hace falta recordar
+que estaba en lista negra: la firma lo rechaza por exp.
+
+Por lotes de ids (como retencion.py): DELETE en SQL directo de las filas
+de lista negra y luego de las outstanding, sin cargar instancias ni
+armar la cascada en Python (flushexpiredtokens lo hace todo de una).
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+LOTE = getattr(settings, "BLACKLIST_COMPACTAR_LOTE", 5000)
+# margen sobre expires_at (relojes desfasados entre workers)
+GRACIA = getattr(settings, "BLACKLIST_COMPACTAR_GRACIA", 300)
+
+
+def _borrar(tabla, columna, ids):
+    q = connection.ops.quote_name
+    marcas = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {q(tabla)} WHERE {q(columna)} IN ({marcas})", ids)
+        return cursor.rowcount
+
+
+def compactar(lote=LOTE, max_lotes=None, pausa=0, ahora=None):
+    """
+    Borra los tokens vencidos y su fila de lista negra.
+    -> {"outstanding": n, "blacklisted": n, "lotes": n}
+    """
+    limite = (ahora or timezone.now()) - timedelta(seconds=GRACIA)
+    resultado = {"outstanding": 0, "blacklisted": 0, "lotes": 0}
+    qs = OutstandingToken.objects.filter(expires_at__lt=limite).order_by("id").values_list("id", flat=True)
+    while max_lotes is None or resultado["lotes"] < max_lotes:
+        ids = list(qs[:lote])
+        if not ids:
+            break
+        with transaction.atomic():
+            resultado["blacklisted"] += _borrar(BlacklistedToken._meta.db_table, "token_id", ids)
+            resultado["outstanding"] += _borrar(OutstandingToken._meta.db_table, "id", ids)
+        resultado["lotes"] += 1
+        if pausa:
+            time.sleep(pausa)
+    return resultado
@@ -0,0 +1,86 @@
+# apps/accounts/hashing.py
+"""
+Verificación de contraseñas en un pool acotado de hilos.
+
+PBKDF2 (cientos de miles de iteraciones) es CPU puro: en la ola de logins
+de las 8:00 cada worker del servidor queda ocupado hasheando y las demás
+peticiones de la API esperan. Con el pool, como mucho LOGIN_HASH_WORKERS
+verificaciones corren a la vez (hashlib.pbkdf2_hmac suelta el GIL, así que
+sí van en paralelo); hasta LOGIN_HASH_COLA más esperan turno y el resto
+recibe LoginSaturado (429) en lugar de encolarse sin límite.
+
+LOGIN_HASH_WORKERS = 0 verifica en el mismo hilo (sin pool).
+La verificación no toca la BD: el rehash (cambio de iteraciones) lo hace
+quien llama, en su hilo.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from django.utils.crypto import get_random_string
+
+WORKERS = getattr(settings, "LOGIN_HASH_WORKERS", 4)
+COLA = getattr(settings, "LOGIN_HASH_COLA", 32)
+ESPERA = getattr(settings, "LOGIN_HASH_ESPERA", 2.0)
+
+
+class LoginSaturado(Exception):
+    pass
+
+
+class PoolHash:
+    def __init__(self, workers=WORKERS, cola=COLA, espera=ESPERA):
+        self.workers = workers
+        self.espera = espera
+        self._cupos = threading.BoundedSemaphore(workers + cola) if workers else None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="login-hash") if workers else None
+
+    def verificar(self, password, encoded):
+        """
+        -> bool. LoginSaturado si no hay cupo en `espera` segundos.
+        """
+        if self._executor is None:
+            return check_password(password, encoded)
+        if not self._cupos.acquire(timeout=self.espera):
+            raise LoginSaturado()
+        try:
+            return self._executor.submit(check_password, password, encoded).result()
+        finally:
+            self._cupos.release()
+
+
+def necesita_rehash(encoded):
+    """
+    Igual criterio que check_password(setter=...): otro algoritmo u otras
+    iteraciones que las del hasher preferido.
+    """
+    preferido = get_hasher("default")
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferido.algorithm or preferido.must_update(encoded)
+
+
+@cache
+def hash_ficticio():
+    """
+    Hash con el costo del hasher preferido, para verificar contra él cuando
+    el email no existe.
+    """
+    return make_password(get_random_string(16))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PoolHash()
+    return _pool
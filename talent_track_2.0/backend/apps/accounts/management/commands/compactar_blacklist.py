@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.blacklist import LOTE, compactar
+
+
+class Command(BaseCommand):
+    help = "Borra por lotes los refresh tokens vencidos de token_blacklist (outstanding + blacklisted)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=LOTE, help="Tokens por lote")
+        parser.add_argument("--max-lotes", type=int, default=None, help="Corta después de N lotes (se retoma luego)")
+        parser.add_argument("--pausa", type=float, default=0, help="Segundos entre lotes")
+
+    def handle(self, *args, **options):
+        r = compactar(lote=options["lote"], max_lotes=options["max_lotes"], pausa=options["pausa"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Tokens vencidos borrados: {r['outstanding']} (en lista negra {r['blacklisted']}) en {r['lotes']} lotes"
+        ))
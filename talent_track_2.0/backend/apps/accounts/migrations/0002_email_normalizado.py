@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-18 16:10
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def normalizar(apps, schema_editor):
+    AuthUser = apps.get_model("accounts", "AuthUser")
+    vistos = {}
+    for user in AuthUser.objects.only("id", "email").order_by("id"):
+        email = (user.email or "").strip().lower()
+        if email in vistos:
+            raise RuntimeError(
+                f"AuthUser {vistos[email]} y {user.id} quedan con el mismo email normalizado ({email}): "
+                "unificarlos antes de migrar."
+            )
+        vistos[email] = user.id
+        if email != user.email:
+            AuthUser.objects.filter(pk=user.pk).update(email=email)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalizar, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='authuser',
+            constraint=models.CheckConstraint(condition=models.Q(('email', django.db.models.functions.text.Lower('email'))), name='auth_user_email_normalizado'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_email_normalizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authuser',
+            name='tokens_validos_desde',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_tokens_validos_desde'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevocacionBorrado',
+            fields=[
+                ('auth_user_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('tokens_validos_desde', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'db_table': 'auth_user_revocacion_borrado',
+            },
+        ),
+    ]
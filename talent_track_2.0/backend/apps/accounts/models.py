@@ -1,12 +1,18 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 
 
+def normalizar_email(email):
+    # el login busca por igualdad exacta sobre este valor (índice único de email)
+    return (email or "").strip().lower()
+
+
 class AuthUserManager(BaseUserManager):
     def create_user(self, email, password=None, usuario=None, **extra_fields):
         if not email:
             raise ValueError("El email es obligatorio")
-        email = self.normalize_email(email).lower()
+        email = normalizar_email(email)
 
         u = self.model(email=email, **extra_fields)
         if password:
@@ -40,6 +46,8 @@ class AuthUser(AbstractBaseUser, PermissionsMixin):
 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # JWT con iat anterior quedan revocados (apps/accounts/revocacion.py)
+    tokens_validos_desde = models.DateTimeField(null=True, blank=True, db_index=True)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -48,6 +56,25 @@ class AuthUser(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         db_table = "auth_user_tt"
+        constraints = [
+            models.CheckConstraint(condition=models.Q(email=Lower("email")), name="auth_user_email_normalizado"),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.email = normalizar_email(self.email)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.email
+
+
+class RevocacionBorrado(models.Model):
+    """
+    Época de revocación de un AuthUser ya borrado (sin fila donde guardar
+    tokens_validos_desde). Solo importan las de menos de ACCESS_TOKEN_LIFETIME.
+    """
+    auth_user_id = models.BigIntegerField(primary_key=True)
+    tokens_validos_desde = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "auth_user_revocacion_borrado"
@@ -0,0 +1,148 @@
+# apps/accounts/revocacion.py
+"""
+Revocación de JWT por usuario: "tokens válidos desde" (AuthUser.tokens_validos_desde).
+
+Un access token de un usuario con época E se rechaza si su iat < E. La
+época se fija al desactivar la cuenta (bloqueo desde
+UsuarioEmpresaToggleEstadoAPIView, edición o sync_auth_users), al cambiar
+sus roles o su empresa/empleado (los claims del token, ver
+apps/usuarios/signals.py) o al borrarla (RevocacionBorrado, porque ya no hay fila de AuthUser); luego el usuario vuelve a entrar con login y un token nuevo.
+
+Sin consulta por petición: cada proceso guarda en memoria TODAS las
+épocas recientes (las de menos de ACCESS_TOKEN_LIFETIME; las más viejas
+ya no pueden afectar a ningún access token vigente) y las relee con UNA
+consulta cada REVOCACION_CACHE_TTL segundos. Ese TTL es el retraso
+máximo del bloqueo en otros workers; en el proceso que revoca es
+inmediato.
+
+Con REVOCACION_CACHE_COMPARTIDA=1 (Redis/Memcached) cada petición
+compara además una versión en la caché compartida y se relee en cuanto
+cambia: el bloqueo llega a todos los workers sin esperar el TTL.
+
+Los refresh tokens se validan contra la BD al refrescar (ver
+RefreshConRevocacionSerializer): refrescar es poco frecuente.
+"""
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.accounts.models import AuthUser, RevocacionBorrado
+
+CACHE_TTL = getattr(settings, "REVOCACION_CACHE_TTL", 5)
+COMPARTIDA = getattr(settings, "REVOCACION_CACHE_COMPARTIDA", False)
+VIGENCIA = api_settings.ACCESS_TOKEN_LIFETIME
+
+_CLAVE_VERSION = "revocacion:v"
+
+
+def epoca_actual():
+    """
+    Época = siguiente segundo entero: el iat de los JWT es en segundos, así
+    un token emitido en el mismo segundo de la revocación también cae.
+    """
+    return datetime.fromtimestamp(math.floor(time.time()) + 1, tz=dt_timezone.utc)
+
+
+class EpocasRevocacion:
+    """
+    {auth_user_id: época en segundos} de las revocaciones recientes.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, compartida=COMPARTIDA):
+        self.ttl = ttl
+        self.compartida = compartida
+        self._epocas = {}
+        self._cargado = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _vencido(self):
+        if self._cargado is None or time.monotonic() - self._cargado >= self.ttl:
+            return True
+        return self.compartida and cache.get(_CLAVE_VERSION) != self._version
+
+    def recargar(self):
+        version = cache.get(_CLAVE_VERSION) if self.compartida else None
+        desde = timezone.now() - VIGENCIA
+        epocas = {
+            user_id: int(epoca.timestamp())
+            for user_id, epoca in AuthUser.objects.filter(tokens_validos_desde__gt=desde)
+            .values_list("id", "tokens_validos_desde")
+        }
+        for user_id, epoca in RevocacionBorrado.objects.filter(tokens_validos_desde__gt=desde).values_list(
+            "auth_user_id", "tokens_validos_desde"
+        ):
+            epocas[user_id] = max(int(epoca.timestamp()), epocas.get(user_id, 0))
+        with self._lock:
+            self._epocas, self._cargado, self._version = epocas, time.monotonic(), version
+
+    def epoca(self, user_id):
+        if self._vencido():
+            self.recargar()
+        return self._epocas.get(user_id)
+
+    def anotar(self, user_id, epoca):
+        # el proceso que revoca no espera a la próxima recarga
+        with self._lock:
+            self._epocas[user_id] = max(epoca, self._epocas.get(user_id, 0))
+
+    def olvidar(self):
+        with self._lock:
+            self._epocas, self._cargado, self._version = {}, None, None
+
+
+_epocas = EpocasRevocacion()
+
+
+def get_epocas():
+    return _epocas
+
+
+def _publicar(user_id, epoca):
+    _epocas.anotar(user_id, int(epoca.timestamp()))
+    try:
+        cache.incr(_CLAVE_VERSION)
+    except ValueError:
+        cache.set(_CLAVE_VERSION, time.time_ns(), None)
+
+
+def revocar(user_id):
+    """
+    Invalida todos los access tokens ya emitidos de ese AuthUser.
+    """
+    epoca = epoca_actual()
+    AuthUser.objects.filter(id=user_id).update(tokens_validos_desde=epoca)
+    _publicar(user_id, epoca)
+    return epoca
+
+
+def revocar_borrado(user_id):
+    """
+    Como revocar(), para un AuthUser que se está borrando: la época va a
+    RevocacionBorrado, que recargar() lee en todos los workers.
+    """
+    epoca = epoca_actual()
+    RevocacionBorrado.objects.update_or_create(auth_user_id=user_id, defaults={"tokens_validos_desde": epoca})
+    # las vencidas ya no afectan a ningún access token
+    RevocacionBorrado.objects.filter(tokens_validos_desde__lt=timezone.now() - VIGENCIA).delete()
+    _publicar(user_id, epoca)
+    return epoca
+
+
+def token_revocado(token):
+    """
+    True si el token (access o refresh validado) es anterior a la época
+    de su usuario.
+    """
+    try:
+        user_id = int(token[api_settings.USER_ID_CLAIM])
+    except (KeyError, TypeError, ValueError):
+        return False
+    epoca = _epocas.epoca(user_id)
+    return epoca is not None and int(token.get("iat") or 0) < epoca
@@ -0,0 +1,19 @@
+# apps/accounts/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.accounts import revocacion
+from apps.accounts.models import AuthUser
+
+
+@receiver(post_save, sender=AuthUser)
+def revocar_al_desactivar(sender, instance, **kwargs):
+    # bloqueo (UsuarioEmpresaToggleEstadoAPIView, edición, sync_auth_users):
+    # los access tokens ya emitidos dejan de valer en segundos, no en horas
+    if not instance.is_active:
+        revocacion.revocar(instance.pk)
+
+
+@receiver(post_delete, sender=AuthUser)
+def revocar_al_borrar(sender, instance, **kwargs):
+    revocacion.revocar_borrado(instance.pk)
@@ -0,0 +1,286 @@
+# apps/asistencia/geocercas.py
+"""
+Motor de geocercas: ¿la marcación GPS cae dentro de la geocerca?
+
+GeoCerca.coordenadas (JSON) según GeoCerca.tipo:
+    1 círculo   {"lat": -3.99, "lng": -79.20, "radio_m": 150}
+    2 polígono  {"puntos": [{"lat": .., "lng": ..}, ...]}   (o [[lat, lng], ...])
+
+Las geocercas activas de cada empresa se parsean UNA vez a estructuras
+precalculadas (bbox, vértices como tuplas) y se indexan en una grilla de
+celdas de GRILLA_GRADOS: una marcación solo se compara con las geocercas de
+su celda, y primero contra su bbox. El índice se cachea en memoria por
+empresa (TTL + invalidación por señales de GeoCerca / ReglaAsistencia).
+
+Regla: si la ReglaAsistencia de la empresa tiene geocerca (activa), la
+marcación DEBE traer GPS y caer dentro de ella; si no, dentro_geocerca
+indica si cae en cualquiera de las geocercas activas de la empresa.
+
+clasificar_lote() hace lo mismo vectorizado con numpy (backfill histórico,
+ver management command recalcular_geocercas).
+"""
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from django.conf import settings
+
+from apps.asistencia.models import GeoCerca, ReglaAsistencia
+
+CIRCULO = 1
+POLIGONO = 2
+
+TIPO_GEOCERCA = {
+    CIRCULO: "circulo",
+    POLIGONO: "poligono",
+}
+
+RADIO_TIERRA_M = 6371008.8
+METROS_POR_GRADO = math.pi * RADIO_TIERRA_M / 180
+
+# ~1.1 km de lado en latitud
+GRILLA_GRADOS = 0.01
+# geocercas enormes no se reparten en miles de celdas: se revisan siempre
+MAX_CELDAS_POR_GEOCERCA = 2500
+
+CACHE_TTL = getattr(settings, "GEOCERCAS_CACHE_TTL", 300)
+
+ERROR_SIN_GPS = "La regla de asistencia exige ubicación GPS para marcar."
+ERROR_FUERA = "La marcación está fuera de la geocerca permitida."
+
+
+# =========================
+# Geometría
+# =========================
+def _distancia_m(lat1, lng1, lat2, lng2):
+    """
+    Haversine en metros.
+    """
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * RADIO_TIERRA_M * math.asin(math.sqrt(a))
+
+
+def _punto_en_poligono(lat, lng, vertices):
+    """
+    Ray casting en el plano (lng, lat): suficiente para geocercas de
+    algunos km. vertices: ((lat, lng), ...) sin repetir el primero.
+    """
+    dentro = False
+    j = len(vertices) - 1
+    for i in range(len(vertices)):
+        yi, xi = vertices[i]
+        yj, xj = vertices[j]
+        if (yi > lat) != (yj > lat) and lng < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            dentro = not dentro
+        j = i
+    return dentro
+
+
+@dataclass(frozen=True, slots=True)
+class Geocerca:
+    id: int
+    tipo: int
+    bbox: tuple  # (min_lat, min_lng, max_lat, max_lng)
+    centro: tuple = ()  # círculo: (lat, lng)
+    radio_m: float = 0.0
+    vertices: tuple = ()  # polígono: ((lat, lng), ...)
+
+    def en_bbox(self, lat, lng):
+        return self.bbox[0] <= lat <= self.bbox[2] and self.bbox[1] <= lng <= self.bbox[3]
+
+    def contiene(self, lat, lng):
+        if not self.en_bbox(lat, lng):
+            return False
+        if self.tipo == CIRCULO:
+            return _distancia_m(self.centro[0], self.centro[1], lat, lng) <= self.radio_m
+        return _punto_en_poligono(lat, lng, self.vertices)
+
+    def contiene_lote(self, lats, lngs):
+        """
+        lats/lngs: arrays numpy (float, NaN = sin GPS) -> array bool
+        """
+        out = np.zeros(lats.shape, dtype=bool)
+        mask = (lats >= self.bbox[0]) & (lats <= self.bbox[2]) & (lngs >= self.bbox[1]) & (lngs <= self.bbox[3])
+        if not mask.any():
+            return out
+
+        la, ln = lats[mask], lngs[mask]
+        if self.tipo == CIRCULO:
+            p1, p2 = np.radians(self.centro[0]), np.radians(la)
+            a = (
+                np.sin((p2 - p1) / 2) ** 2
+                + np.cos(p1) * np.cos(p2) * np.sin(np.radians(ln - self.centro[1]) / 2) ** 2
+            )
+            out[mask] = 2 * RADIO_TIERRA_M * np.arcsin(np.sqrt(a)) <= self.radio_m
+            return out
+
+        dentro = np.zeros(la.shape, dtype=bool)
+        j = len(self.vertices) - 1
+        for i in range(len(self.vertices)):
+            yi, xi = self.vertices[i]
+            yj, xj = self.vertices[j]
+            if yi != yj:
+                cruza = ((yi > la) != (yj > la)) & (ln < (xj - xi) * (la - yi) / (yj - yi) + xi)
+                dentro ^= cruza
+            j = i
+        out[mask] = dentro
+        return out
+
+
+def _punto(p):
+    if isinstance(p, dict):
+        return float(p["lat"]), float(p["lng"])
+    return float(p[0]), float(p[1])
+
+
+def parsear_geocerca(geocerca_id, tipo, coordenadas):
+    """
+    -> Geocerca o None si coordenadas está vacío / mal formado.
+    """
+    try:
+        if tipo == CIRCULO:
+            lat, lng = _punto(coordenadas)
+            radio_m = float(coordenadas.get("radio_m", coordenadas.get("radio")))
+            if radio_m <= 0:
+                return None
+            dlat = radio_m / METROS_POR_GRADO
+            dlng = radio_m / (METROS_POR_GRADO * max(math.cos(math.radians(lat)), 1e-6))
+            return Geocerca(
+                id=geocerca_id, tipo=CIRCULO, centro=(lat, lng), radio_m=radio_m,
+                bbox=(lat - dlat, lng - dlng, lat + dlat, lng + dlng),
+            )
+
+        if tipo == POLIGONO:
+            puntos = coordenadas.get("puntos") if isinstance(coordenadas, dict) else coordenadas
+            vertices = tuple(_punto(p) for p in puntos)
+            if len(vertices) > 1 and vertices[0] == vertices[-1]:
+                vertices = vertices[:-1]
+            if len(vertices) < 3:
+                return None
+            lats = [v[0] for v in vertices]
+            lngs = [v[1] for v in vertices]
+            return Geocerca(
+                id=geocerca_id, tipo=POLIGONO, vertices=vertices,
+                bbox=(min(lats), min(lngs), max(lats), max(lngs)),
+            )
+    except (AttributeError, KeyError, IndexError, TypeError, ValueError):
+        return None
+    return None
+
+
+# =========================
+# Índice por empresa
+# =========================
+def _celda(lat, lng):
+    return math.floor(lat / GRILLA_GRADOS), math.floor(lng / GRILLA_GRADOS)
+
+
+class IndiceGeocercas:
+    """
+    Geocercas activas de una empresa + grilla {celda: (geocercas, ...)}.
+    """
+
+    def __init__(self, geocercas, geocerca_regla_id=None):
+        self.por_id = {g.id: g for g in geocercas}
+        # la regla solo se exige si su geocerca está activa y es válida
+        self.geocerca_regla = self.por_id.get(geocerca_regla_id)
+
+        grilla = {}
+        siempre = []
+        for g in geocercas:
+            c0, c1 = _celda(g.bbox[0], g.bbox[1]), _celda(g.bbox[2], g.bbox[3])
+            if (c1[0] - c0[0] + 1) * (c1[1] - c0[1] + 1) > MAX_CELDAS_POR_GEOCERCA:
+                siempre.append(g)
+                continue
+            for i in range(c0[0], c1[0] + 1):
+                for j in range(c0[1], c1[1] + 1):
+                    grilla.setdefault((i, j), []).append(g)
+
+        self.siempre = tuple(siempre)
+        self.grilla = {k: tuple(v) for k, v in grilla.items()}
+
+    def candidatas(self, lat, lng):
+        return self.grilla.get(_celda(lat, lng), ()) + self.siempre
+
+    def contienen(self, lat, lng):
+        """
+        ids de las geocercas que contienen el punto.
+        """
+        return [g.id for g in self.candidatas(lat, lng) if g.contiene(lat, lng)]
+
+    def evaluar(self, lat, lng):
+        """
+        -> (dentro_geocerca, error)   error=None si la marcación es aceptable
+        """
+        if lat is None or lng is None:
+            return False, (ERROR_SIN_GPS if self.geocerca_regla else None)
+
+        lat, lng = float(lat), float(lng)
+        if self.geocerca_regla:
+            dentro = self.geocerca_regla.contiene(lat, lng)
+            return dentro, (None if dentro else ERROR_FUERA)
+
+        return any(g.contiene(lat, lng) for g in self.candidatas(lat, lng)), None
+
+    def clasificar_lote(self, lats, lngs):
+        """
+        Versión vectorizada de evaluar()[0]: arrays numpy -> array bool.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lngs = np.asarray(lngs, dtype=float)
+        if self.geocerca_regla:
+            return self.geocerca_regla.contiene_lote(lats, lngs)
+
+        out = np.zeros(lats.shape, dtype=bool)
+        for g in self.por_id.values():
+            out |= g.contiene_lote(lats, lngs)
+        return out
+
+
+_CACHE = {}
+
+
+def _cargar_indice(empresa_id):
+    filas = GeoCerca.objects.filter(empresa_id=empresa_id, activo=True).values_list("id", "tipo", "coordenadas")
+    geocercas = [g for g in (parsear_geocerca(*f) for f in filas) if g]
+
+    geocerca_regla_id = (
+        ReglaAsistencia.objects
+        .filter(empresa_id=empresa_id, geocerca__isnull=False)
+        .order_by("id")
+        .values_list("geocerca_id", flat=True)
+        .first()
+    )
+    return IndiceGeocercas(geocercas, geocerca_regla_id)
+
+
+def indice_empresa(empresa_id):
+    """
+    Índice cacheado en memoria (por proceso) durante CACHE_TTL segundos.
+    """
+    ahora = time.monotonic()
+    cacheado = _CACHE.get(empresa_id)
+    if cacheado and ahora - cacheado[0] < CACHE_TTL:
+        return cacheado[1]
+
+    indice = _cargar_indice(empresa_id)
+    _CACHE[empresa_id] = (ahora, indice)
+    return indice
+
+
+def invalidar(empresa_id=None):
+    if empresa_id is None:
+        _CACHE.clear()
+    else:
+        _CACHE.pop(empresa_id, None)
+
+
+def evaluar_marcacion(empresa_id, lat, lng):
+    """
+    -> (dentro_geocerca, error) para una marcación de la empresa.
+    """
+    return indice_empresa(empresa_id).evaluar(lat, lng)
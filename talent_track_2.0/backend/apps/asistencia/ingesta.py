@@ -0,0 +1,188 @@
+# apps/asistencia/ingesta.py
+"""
+Ingesta por lotes de marcaciones (lectores de credencial y apps offline).
+
+En vez de un POST + .exists() + create() por marcación:
+- cada item se valida por separado (un item malo no tumba el lote),
+- dispositivos y marcaciones ya existentes se leen en UNA consulta cada uno,
+- se deduplica por (empleado, tipo, día local) contra la BD y dentro del
+  propio lote (gana la marcación más temprana, igual que la regla de
+  EmpleadoRegistrarAsistenciaAPIView),
+- se clasifica el GPS contra las geocercas de la empresa (geocercas.py);
+  la geocerca de la ReglaAsistencia se exige salvo a los lectores (fijos),
+- la lista blanca de IPs (ips.py) se exige a los lectores: la IP de subida
+  es la de su red; en la app offline es la de cuando recuperó conexión,
+- se inserta todo con bulk_create en una sola transacción.
+
+DispositivoEmpleado.tipo usa el mismo catálogo que EventoAsistencia.fuente
+(catalogos.FUENTE_EVENTO_MAP: 1 app, 2 web, 3 lector).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.asistencia.geocercas import indice_empresa
+from apps.asistencia.ips import ERROR_IP, ip_permitida
+from apps.asistencia.models import DispositivoEmpleado, EventoAsistencia
+from apps.asistencia.motor_jornadas import marcar_eventos
+from apps.asistencia.serializers import EventoLoteItemSerializer
+from apps.core.fechas import rango_fechas, zona_empresa
+from apps.empleados.models import Empleado
+
+LOTE_MAX = getattr(settings, "ASISTENCIA_LOTE_MAX", 1000)
+
+FUENTE_LECTOR = 3
+
+# reloj del lector adelantado: se tolera un poco, más allá se rechaza
+TOLERANCIA_FUTURO = timedelta(minutes=5)
+
+CREADO = "creado"
+DUPLICADO = "duplicado"
+RECHAZADO = "rechazado"
+
+
+def _rechazado(indice, errores):
+    return {"indice": indice, "estado": RECHAZADO, "errores": errores}
+
+
+def _validar_items(items, empleado_id, ahora):
+    """
+    -> (resultados con los rechazos ya puestos, [(indice, datos_validos)])
+    """
+    resultados = [None] * len(items)
+    validos = []
+
+    for i, item in enumerate(items):
+        ser = EventoLoteItemSerializer(data=item)
+        if not ser.is_valid():
+            resultados[i] = _rechazado(i, ser.errors)
+            continue
+        datos = dict(ser.validated_data)
+
+        if empleado_id:
+            # el empleado solo puede subir sus propias marcaciones
+            if datos.get("empleado_id") not in (None, empleado_id):
+                resultados[i] = _rechazado(i, {"empleado_id": ["No corresponde al usuario autenticado."]})
+                continue
+            datos["empleado_id"] = empleado_id
+        elif not datos.get("empleado_id"):
+            resultados[i] = _rechazado(i, {"empleado_id": ["Este campo es requerido."]})
+            continue
+
+        if datos["registrado_el"] > ahora + TOLERANCIA_FUTURO:
+            resultados[i] = _rechazado(i, {"registrado_el": ["La marcación está en el futuro."]})
+            continue
+
+        validos.append((i, datos))
+
+    return resultados, validos
+
+
+def ingestar_lote(empresa_id, items, empleado_id=None, ip=None):
+    """
+    empresa_id: empresa del token (todas las marcaciones quedan en ella)
+    items: lista de dicts (ver EventoLoteItemSerializer)
+    empleado_id: si lo sube un empleado, fuerza ese empleado en todos los items
+
+    Devuelve una lista alineada con `items`:
+        {"indice", "estado": creado|duplicado|rechazado, "id"?, "errores"?}
+    """
+    ahora = timezone.now()
+    tz = zona_empresa(empresa_id)
+    geo = indice_empresa(empresa_id)
+    red_ok = ip_permitida(empresa_id, ip)
+    resultados, validos = _validar_items(items, empleado_id, ahora)
+    if not validos:
+        return resultados
+
+    empleado_ids = {d["empleado_id"] for _, d in validos}
+    uids = {d["device_uid"] for _, d in validos}
+    for _, d in validos:
+        d["dia"] = timezone.localdate(d["registrado_el"], tz)
+
+    with transaction.atomic():
+        # "uno por tipo y día" no es un UNIQUE de la BD: se bloquean los
+        # empleados del lote para que dos lotes simultáneos no dupliquen
+        empleados_ok = set(
+            Empleado.objects
+            .select_for_update()
+            .filter(empresa_id=empresa_id, id__in=empleado_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+        dispositivos = {
+            (emp_id, uid): (disp_id, tipo)
+            for disp_id, emp_id, uid, tipo in (
+                DispositivoEmpleado.objects
+                .filter(empresa_id=empresa_id, activo=True, empleado_id__in=empleados_ok, device_uid__in=uids)
+                .values_list("id", "empleado_id", "device_uid", "tipo")
+            )
+        }
+
+        desde = min(d["dia"] for _, d in validos)
+        hasta = max(d["dia"] for _, d in validos)
+        vistos = {
+            (emp_id, tipo, timezone.localdate(reg, tz))
+            for emp_id, tipo, reg in (
+                EventoAsistencia.objects
+                .filter(rango_fechas("registrado_el", desde, hasta, tz), empresa_id=empresa_id, empleado_id__in=empleados_ok)
+                .values_list("empleado_id", "tipo", "registrado_el")
+            )
+        }
+
+        nuevos = []
+        usados = set()
+        for i, d in sorted(validos, key=lambda v: (v[1]["registrado_el"], v[0])):
+            if d["empleado_id"] not in empleados_ok:
+                resultados[i] = _rechazado(i, {"empleado_id": ["Empleado no pertenece a la empresa."]})
+                continue
+
+            dispositivo = dispositivos.get((d["empleado_id"], d["device_uid"]))
+            if not dispositivo:
+                resultados[i] = _rechazado(i, {"device_uid": ["Dispositivo no registrado o inactivo para el empleado."]})
+                continue
+
+            disp_id, fuente = dispositivo
+            if fuente == FUENTE_LECTOR and not red_ok:
+                resultados[i] = _rechazado(i, {"ip": [ERROR_IP]})
+                continue
+
+            dentro_geocerca, error_geocerca = geo.evaluar(d.get("gps_lat"), d.get("gps_lng"))
+            if error_geocerca and fuente != FUENTE_LECTOR:
+                resultados[i] = _rechazado(i, {"geocerca": [error_geocerca]})
+                continue
+
+            clave = (d["empleado_id"], d["tipo"], d["dia"])
+            if clave in vistos:
+                resultados[i] = {"indice": i, "estado": DUPLICADO}
+                continue
+            vistos.add(clave)
+
+            usados.add(disp_id)
+            nuevos.append((i, EventoAsistencia(
+                empresa_id=empresa_id,
+                empleado_id=d["empleado_id"],
+                tipo=d["tipo"],
+                registrado_el=d["registrado_el"],
+                fuente=fuente,
+                gps_lat=d.get("gps_lat"),
+                gps_lng=d.get("gps_lng"),
+                dentro_geocerca=dentro_geocerca,
+                foto_url=None,
+                ip=ip,
+                observaciones=d.get("observaciones") or None,
+            )))
+
+        creados = EventoAsistencia.objects.bulk_create([obj for _, obj in nuevos])
+        for (i, _), obj in zip(nuevos, creados):
+            resultados[i] = {"indice": i, "estado": CREADO, "id": obj.id}
+
+        if usados:
+            DispositivoEmpleado.objects.filter(id__in=usados).update(ultimo_uso_el=ahora)
+        # bulk_create no dispara señales: se encolan las jornadas a mano
+        marcar_eventos(creados)
+
+    return resultados
@@ -0,0 +1,139 @@
+# apps/asistencia/ips.py
+"""
+Lista blanca de IPs por empresa (ReglaAsistencia.ip_permitidas).
+
+ip_permitidas: lista de IPs o rangos CIDR, IPv4 o IPv6:
+    ["190.15.128.0/20", "181.39.12.7", "2800:370::/32"]
+
+Se compila una vez por empresa: cada red es un intervalo [inicio, fin] de
+enteros, se ordenan y fusionan (solapados / contiguos) y la consulta es un
+bisect sobre los inicios: O(log n) aunque la empresa tenga cientos de CIDR.
+Cache en memoria por empresa (TTL + invalidación por señal de
+ReglaAsistencia, p.ej. al guardar con ActualizarReglaAsistenciaAPIView).
+
+Sin lista (None / vacía) no hay restricción.
+"""
+import ipaddress
+import time
+from bisect import bisect_right
+
+from django.conf import settings
+
+from apps.asistencia.models import ReglaAsistencia
+
+CACHE_TTL = getattr(settings, "IPS_PERMITIDAS_CACHE_TTL", 300)
+
+ERROR_IP = "La marcación no se permite desde esta red (IP no autorizada)."
+
+
+def normalizar_entradas(valor):
+    """
+    ip_permitidas (lista o texto separado por comas/espacios) -> [str]
+    """
+    if not valor:
+        return []
+    if isinstance(valor, str):
+        valor = valor.replace(",", " ").split()
+    return [str(v).strip() for v in valor if str(v).strip()]
+
+
+def parsear_red(texto):
+    """
+    "10.0.0.0/8" | "10.1.2.3" -> ip_network (host bits se ignoran) o ValueError
+    """
+    return ipaddress.ip_network(texto, strict=False)
+
+
+class ListaIPs:
+    """
+    Intervalos fusionados por versión de IP: {4: (inicios, fines), 6: (...)}
+    """
+
+    def __init__(self, redes):
+        por_version = {4: [], 6: []}
+        for red in redes:
+            por_version[red.version].append((int(red.network_address), int(red.broadcast_address)))
+
+        self._rangos = {}
+        for version, intervalos in por_version.items():
+            intervalos.sort()
+            inicios, fines = [], []
+            for ini, fin in intervalos:
+                if fines and ini <= fines[-1] + 1:
+                    fines[-1] = max(fines[-1], fin)
+                else:
+                    inicios.append(ini)
+                    fines.append(fin)
+            self._rangos[version] = (inicios, fines)
+
+    @classmethod
+    def desde_entradas(cls, valor):
+        """
+        Entradas inválidas se ignoran (se validan al guardar la regla).
+        """
+        redes = []
+        for texto in normalizar_entradas(valor):
+            try:
+                redes.append(parsear_red(texto))
+            except ValueError:
+                continue
+        return cls(redes)
+
+    def __bool__(self):
+        return any(inicios for inicios, _ in self._rangos.values())
+
+    def __len__(self):
+        return sum(len(inicios) for inicios, _ in self._rangos.values())
+
+    def __contains__(self, ip):
+        try:
+            ip = ipaddress.ip_address(ip)
+        except (TypeError, ValueError):
+            return False
+        # IPv4 mapeada en IPv6 (::ffff:a.b.c.d) se compara como IPv4
+        if ip.version == 6 and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+
+        inicios, fines = self._rangos[ip.version]
+        i = bisect_right(inicios, int(ip)) - 1
+        return i >= 0 and int(ip) <= fines[i]
+
+
+_CACHE = {}
+
+
+def _cargar(empresa_id):
+    valor = (
+        ReglaAsistencia.objects
+        .filter(empresa_id=empresa_id)
+        .order_by("id")
+        .values_list("ip_permitidas", flat=True)
+        .first()
+    )
+    return ListaIPs.desde_entradas(valor)
+
+
+def lista_empresa(empresa_id):
+    ahora = time.monotonic()
+    cacheado = _CACHE.get(empresa_id)
+    if cacheado and ahora - cacheado[0] < CACHE_TTL:
+        return cacheado[1]
+
+    lista = _cargar(empresa_id)
+    _CACHE[empresa_id] = (ahora, lista)
+    return lista
+
+
+def invalidar(empresa_id=None):
+    if empresa_id is None:
+        _CACHE.clear()
+    else:
+        _CACHE.pop(empresa_id, None)
+
+
+def ip_permitida(empresa_id, ip):
+    """
+    True si la empresa no restringe IPs o si `ip` está en su lista.
+    """
+    lista = lista_empresa(empresa_id)
+    return not lista or ip in lista
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.asistencia.motor_jornadas import LOTE_DEFAULT, marcar_rango, procesar_pendientes
+
+
+class Command(BaseCommand):
+    help = "Recalcula JornadaCalculada solo para los (empleado, fecha) con marcaciones nuevas o modificadas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=LOTE_DEFAULT, help="Pares (empleado, fecha) por lote")
+        parser.add_argument("--max-lotes", type=int, default=None, help="Corta después de N lotes")
+        parser.add_argument("--desde", help="YYYY-MM-DD: encola todo el rango antes de procesar (carga inicial)")
+        parser.add_argument("--hasta", help="YYYY-MM-DD (por defecto = --desde)")
+        parser.add_argument("--empresa-id", type=int, default=None, help="Limita el encolado por rango a una empresa")
+
+    def handle(self, *args, **options):
+        if options["desde"]:
+            try:
+                desde = datetime.strptime(options["desde"], "%Y-%m-%d").date()
+                hasta = datetime.strptime(options["hasta"] or options["desde"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("Fechas inválidas. Usa YYYY-MM-DD.")
+            if hasta < desde:
+                raise CommandError("--hasta no puede ser menor que --desde.")
+
+            encolados = marcar_rango(desde, hasta, empresa_id=options["empresa_id"])
+            self.stdout.write(f"Pares encolados por rango: {encolados}")
+
+        r = procesar_pendientes(lote=options["lote"], max_lotes=options["max_lotes"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Lotes: {r['lotes']}, pares: {r['pares']}, "
+            f"jornadas actualizadas: {r['actualizadas']}, eliminadas: {r['eliminadas']}"
+        ))
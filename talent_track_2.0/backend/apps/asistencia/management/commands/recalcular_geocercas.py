@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.asistencia.geocercas import indice_empresa, invalidar
+from apps.asistencia.models import EventoAsistencia
+from apps.core.exportacion import filtro_rango
+from apps.core.fechas import zona_empresa
+
+LOTE_DEFAULT = 5000
+
+
+class Command(BaseCommand):
+    help = "Recalcula EventoAsistencia.dentro_geocerca (vectorizado) para marcaciones con GPS"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--desde", help="YYYY-MM-DD (día local de la empresa)")
+        parser.add_argument("--hasta", help="YYYY-MM-DD")
+        parser.add_argument("--empresa-id", type=int, default=None)
+        parser.add_argument("--lote", type=int, default=LOTE_DEFAULT, help="Marcaciones por lote")
+
+    def handle(self, *args, **options):
+        try:
+            desde = datetime.strptime(options["desde"], "%Y-%m-%d").date() if options["desde"] else None
+            hasta = datetime.strptime(options["hasta"], "%Y-%m-%d").date() if options["hasta"] else None
+        except ValueError:
+            raise CommandError("Fechas inválidas. Usa YYYY-MM-DD.")
+
+        if options["empresa_id"]:
+            empresa_ids = [options["empresa_id"]]
+        else:
+            empresa_ids = (
+                EventoAsistencia.objects
+                .filter(gps_lat__isnull=False, gps_lng__isnull=False)
+                .values_list("empresa_id", flat=True)
+                .distinct()
+                .order_by("empresa_id")
+            )
+
+        # índices frescos (no los del caché del proceso)
+        invalidar()
+        revisados = cambiados = 0
+        for empresa_id in empresa_ids:
+            indice = indice_empresa(empresa_id)
+            qs = (
+                EventoAsistencia.objects
+                .filter(
+                    filtro_rango("registrado_el", desde, hasta, zona_empresa(empresa_id)),
+                    empresa_id=empresa_id,
+                    gps_lat__isnull=False,
+                    gps_lng__isnull=False,
+                )
+                .order_by("id")
+                .values_list("id", "gps_lat", "gps_lng", "dentro_geocerca")
+            )
+
+            ultimo_id = 0
+            while True:
+                filas = list(qs.filter(id__gt=ultimo_id)[:options["lote"]])
+                if not filas:
+                    break
+                ultimo_id = filas[-1][0]
+
+                ids = np.array([f[0] for f in filas], dtype=np.int64)
+                actual = np.array([f[3] for f in filas], dtype=bool)
+                dentro = indice.clasificar_lote(
+                    np.array([float(f[1]) for f in filas]),
+                    np.array([float(f[2]) for f in filas]),
+                )
+
+                cambio = dentro != actual
+                a_true = ids[cambio & dentro].tolist()
+                a_false = ids[cambio & ~dentro].tolist()
+                if a_true:
+                    EventoAsistencia.objects.filter(id__in=a_true).update(dentro_geocerca=True)
+                if a_false:
+                    EventoAsistencia.objects.filter(id__in=a_false).update(dentro_geocerca=False)
+
+                revisados += len(filas)
+                cambiados += len(a_true) + len(a_false)
+
+        self.stdout.write(self.style.SUCCESS(f"Marcaciones revisadas: {revisados}, actualizadas: {cambiados}"))
@@ -0,0 +1,52 @@
+# Generated by Django 6.0 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def quitar_duplicados(apps, schema_editor):
+    # una jornada por (empleado, fecha): se queda la de id mayor (la última
+    # calculada) antes de crear el índice único
+    JornadaCalculada = apps.get_model("asistencia", "JornadaCalculada")
+    repetidas = (
+        JornadaCalculada.objects
+        .values("empleado_id", "fecha")
+        .annotate(n=Count("id"), ultima=Max("id"))
+        .filter(n__gt=1)
+    )
+    for par in repetidas.iterator():
+        JornadaCalculada.objects.filter(
+            empleado_id=par["empleado_id"], fecha=par["fecha"],
+        ).exclude(id=par["ultima"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0003_alter_asignacionturno_empleado_and_more'),
+        ('core', '0002_alter_puesto_empresa_alter_puesto_unidad_and_more'),
+        ('empleados', '0002_alter_contrato_empleado_alter_contrato_empresa_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(quitar_duplicados, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='jornadacalculada',
+            unique_together={('empleado', 'fecha')},
+        ),
+        migrations.CreateModel(
+            name='JornadaPendiente',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('fecha', models.DateField()),
+                ('marcado_el', models.DateTimeField()),
+                ('empleado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='empleados.empleado')),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.empresa')),
+            ],
+            options={
+                'db_table': 'jornadapendiente',
+                'unique_together': {('empleado', 'fecha')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0004_jornadapendiente'),
+        ('core', '0002_alter_puesto_empresa_alter_puesto_unidad_and_more'),
+        ('empleados', '0002_alter_contrato_empleado_alter_contrato_empresa_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventoasistencia',
+            index=models.Index(fields=['empresa', 'empleado', 'registrado_el'], name='evento_emp_empl_reg_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventoasistencia',
+            index=models.Index(fields=['empresa', 'registrado_el'], name='evento_emp_reg_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jornadacalculada',
+            index=models.Index(fields=['empresa', 'fecha'], name='jornada_emp_fecha_idx'),
+        ),
+    ]
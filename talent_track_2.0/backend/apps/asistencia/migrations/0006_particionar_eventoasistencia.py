@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 15:30
+
+from django.db import migrations
+
+
+def particionar(apps, schema_editor):
+    from apps.core.particiones import convertir
+    convertir(schema_editor, "eventoasistencia", "registrado_el")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0005_eventoasistencia_evento_emp_empl_reg_idx_and_more'),
+    ]
+
+    operations = [
+        # solo PostgreSQL (ver apps/core/particiones.py); el estado del modelo no cambia
+        migrations.RunPython(particionar, migrations.RunPython.noop),
+    ]
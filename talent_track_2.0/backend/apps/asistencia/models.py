@@ -84,6 +84,12 @@ class EventoAsistencia(models.Model):
 
     class Meta:
         db_table = 'eventoasistencia'
+        indexes = [
+            # marcaciones del empleado por día (hoy / registrar / motor de jornadas)
+            models.Index(fields=["empresa", "empleado", "registrado_el"], name="evento_emp_empl_reg_idx"),
+            # listados de empresa ordenados por fecha (auditor / manager)
+            models.Index(fields=["empresa", "registrado_el"], name="evento_emp_reg_idx"),
+        ]
 
 
 class JornadaCalculada(models.Model):
@@ -100,3 +106,24 @@ class JornadaCalculada(models.Model):
 
     class Meta:
         db_table = 'jornadacalculada'
+        unique_together = ("empleado", "fecha")  # una jornada por empleado y día (upsert del motor)
+        indexes = [
+            models.Index(fields=["empresa", "fecha"], name="jornada_emp_fecha_idx"),
+        ]
+
+
+class JornadaPendiente(models.Model):
+    """
+    Cola de (empleado, fecha) cuyas marcaciones cambiaron y cuya jornada
+    debe recalcularse. La alimentan las señales de EventoAsistencia y la
+    vacía el motor (python manage.py calcular_jornadas).
+    """
+    id = models.BigAutoField(primary_key=True)
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
+    empleado = models.ForeignKey(Empleado, on_delete=models.CASCADE)
+    fecha = models.DateField()
+    marcado_el = models.DateTimeField()
+
+    class Meta:
+        db_table = 'jornadapendiente'
+        unique_together = ("empleado", "fecha")
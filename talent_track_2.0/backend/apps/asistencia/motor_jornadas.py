@@ -0,0 +1,378 @@
+# apps/asistencia/motor_jornadas.py
+"""
+Motor incremental de JornadaCalculada.
+
+Flujo:
+- Cada marcación nueva/modificada/eliminada deja su (empleado, fecha) en la cola
+  JornadaPendiente (ver signals.py y marcar_eventos()).
+- procesar_pendientes() vacía la cola por lotes: carga SOLO los eventos de los
+  pares afectados, recalcula cada jornada y hace un upsert masivo.
+
+Así el costo depende de lo que cambió, no del tamaño del mes.
+"""
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.asistencia.models import (
+    AsignacionTurno,
+    EventoAsistencia,
+    JornadaCalculada,
+    JornadaPendiente,
+    ReglaAsistencia,
+)
+from apps.core.fechas import inicio_dia, rango_fechas, zona_empresa
+from apps.core.resumenes import marcar_resumenes
+from apps.empleados.models import Contrato
+
+TIPO_CHECK_IN = 1
+TIPO_CHECK_OUT = 2
+TIPO_PAUSA_IN = 3
+TIPO_PAUSA_OUT = 4
+
+ESTADO_COMPLETO = 1
+ESTADO_INCOMPLETO = 2
+
+LOTE_DEFAULT = 500
+
+CAMPOS_JORNADA = [
+    "empresa",
+    "hora_primera_entrada",
+    "hora_ultimo_salida",
+    "minutos_trabajados",
+    "minutos_tardanza",
+    "minutos_extra",
+    "estado",
+]
+
+
+# =========================
+# Cola de pendientes
+# =========================
+def marcar_pendientes(pares):
+    """
+    pares: iterable de (empresa_id, empleado_id, fecha)
+    Encola (o refresca marcado_el) en una sola sentencia.
+    """
+    ahora = timezone.now()
+    objs = [
+        JornadaPendiente(empresa_id=empresa_id, empleado_id=empleado_id, fecha=fecha, marcado_el=ahora)
+        for (empresa_id, empleado_id, fecha) in set(pares)
+    ]
+    if not objs:
+        return 0
+
+    JornadaPendiente.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=["empleado", "fecha"],
+        update_fields=["marcado_el"],
+    )
+    return len(objs)
+
+
+def marcar_eventos(eventos):
+    """
+    Encola los días afectados por una lista de EventoAsistencia.
+    Usar después de bulk_create (que no dispara señales).
+    El día se toma en la zona horaria de la empresa.
+    """
+    return marcar_pendientes(
+        (ev.empresa_id, ev.empleado_id, timezone.localdate(ev.registrado_el, zona_empresa(ev.empresa_id)))
+        for ev in eventos
+    )
+
+
+def marcar_rango(desde, hasta, empresa_id=None):
+    """
+    Encola todos los (empleado, fecha) con marcaciones en [desde, hasta].
+    Útil para la carga inicial o para recalcular tras cambiar turnos/reglas.
+    Se recorre empresa por empresa porque cada una tiene su zona horaria.
+    """
+    if empresa_id:
+        empresa_ids = [empresa_id]
+    else:
+        empresa_ids = EventoAsistencia.objects.values_list("empresa_id", flat=True).distinct()
+
+    total = 0
+    for emp_id in list(empresa_ids):
+        tz = zona_empresa(emp_id)
+        pares = (
+            EventoAsistencia.objects
+            .filter(rango_fechas("registrado_el", desde, hasta, tz), empresa_id=emp_id)
+            .annotate(dia=TruncDate("registrado_el", tzinfo=tz))
+            .values_list("empresa_id", "empleado_id", "dia")
+            .distinct()
+        )
+
+        buffer = []
+        for par in pares.iterator(chunk_size=2000):
+            buffer.append(par)
+            if len(buffer) >= 2000:
+                total += marcar_pendientes(buffer)
+                buffer = []
+        total += marcar_pendientes(buffer)
+    return total
+
+
+# =========================
+# Cálculo (puro, sin BD)
+# =========================
+def _minutos(delta):
+    return max(0, int(delta.total_seconds() // 60))
+
+
+def _dias_laborables(dias_semana):
+    """
+    [{"num":1,"nombre":"lunes"}, ...] -> {1, ...}  (1 = lunes ... 7 = domingo)
+    None si no hay configuración (se asume que todos los días son laborables).
+    """
+    if not isinstance(dias_semana, list):
+        return None
+    nums = set()
+    for d in dias_semana:
+        try:
+            nums.add(int(d.get("num")))
+        except (AttributeError, TypeError, ValueError):
+            continue
+    return nums or None
+
+
+def _minutos_pausa(eventos):
+    """
+    Suma los tramos pausa_in -> pausa_out (eventos ya ordenados).
+    """
+    total = 0
+    inicio = None
+    for tipo, dt in eventos:
+        if tipo == TIPO_PAUSA_IN:
+            inicio = dt
+        elif tipo == TIPO_PAUSA_OUT and inicio is not None:
+            total += _minutos(dt - inicio)
+            inicio = None
+    return total
+
+
+def calcular_jornada(fecha, eventos, horario=None, tardanza_desde_min=0):
+    """
+    fecha: date local de la jornada
+    eventos: lista de (tipo, registrado_el) en hora local, todos de esa fecha
+    horario: dict {"hora_inicio", "hora_fin", "tolerancia", "dias"} o None
+    tardanza_desde_min: ReglaAsistencia.considera_tardanza_desde_min
+
+    Devuelve dict con los campos de JornadaCalculada, o None si no hay eventos.
+    """
+    if not eventos:
+        return None
+
+    eventos = sorted(eventos, key=lambda x: x[1])
+    entradas = [dt for tipo, dt in eventos if tipo == TIPO_CHECK_IN]
+    salidas = [dt for tipo, dt in eventos if tipo == TIPO_CHECK_OUT]
+
+    primera = entradas[0] if entradas else eventos[0][1]
+    ultima = salidas[-1] if salidas else eventos[-1][1]
+    completo = bool(entradas and salidas and ultima > primera)
+
+    trabajados = 0
+    if completo:
+        trabajados = max(0, _minutos(ultima - primera) - _minutos_pausa(eventos))
+
+    tardanza = 0
+    extra = 0
+    if horario:
+        dias = horario.get("dias")
+        laborable = dias is None or fecha.isoweekday() in dias
+
+        if laborable:
+            if entradas:
+                inicio = datetime.combine(fecha, horario["hora_inicio"], tzinfo=primera.tzinfo)
+                retraso = _minutos(primera - inicio)
+                # tolerancia del turno + umbral de la regla de la empresa
+                if retraso > (horario.get("tolerancia") or 0) and retraso >= (tardanza_desde_min or 0):
+                    tardanza = retraso
+            if completo:
+                duracion = _minutos(
+                    datetime.combine(fecha, horario["hora_fin"]) - datetime.combine(fecha, horario["hora_inicio"])
+                )
+                extra = max(0, trabajados - duracion)
+        elif completo:
+            # día no laborable según dias_semana: todo es extra
+            extra = trabajados
+
+    return {
+        "hora_primera_entrada": primera,
+        "hora_ultimo_salida": ultima,
+        "minutos_trabajados": trabajados,
+        "minutos_tardanza": tardanza,
+        "minutos_extra": extra,
+        "estado": ESTADO_COMPLETO if completo else ESTADO_INCOMPLETO,
+    }
+
+
+# =========================
+# Carga de contexto (por lote)
+# =========================
+def _horarios_por_empleado(empleado_ids):
+    """
+    {empleado_id: horario}
+    Prioridad: última AsignacionTurno; si no tiene, turno_base del contrato activo.
+    """
+    out = {}
+
+    contratos = (
+        Contrato.objects
+        .select_related("turno_base")
+        .filter(empleado_id__in=empleado_ids, estado=1, turno_base__isnull=False)
+        .order_by("id")
+    )
+    for c in contratos:
+        t = c.turno_base
+        out[c.empleado_id] = {
+            "hora_inicio": t.hora_inicio,
+            "hora_fin": t.hora_fin,
+            "tolerancia": t.tolerancia_minutos,
+            "dias": _dias_laborables(t.dias_semana),
+        }
+
+    asignaciones = (
+        AsignacionTurno.objects
+        .select_related("turno")
+        .filter(empleado_id__in=empleado_ids)
+        .order_by("id")
+    )
+    for a in asignaciones:
+        t = a.turno
+        out[a.empleado_id] = {
+            "hora_inicio": a.hora_inicio or t.hora_inicio,
+            "hora_fin": a.hora_fin or t.hora_fin,
+            "tolerancia": t.tolerancia_minutos,
+            "dias": _dias_laborables(t.dias_semana),
+        }
+
+    return out
+
+
+def _tardanza_desde_por_empresa(empresa_ids):
+    reglas = (
+        ReglaAsistencia.objects
+        .filter(empresa_id__in=empresa_ids)
+        .order_by("id")
+        .values_list("empresa_id", "considera_tardanza_desde_min")
+    )
+    return {empresa_id: minutos for empresa_id, minutos in reglas}
+
+
+def _eventos_por_par(objetivos, zonas=None):
+    """
+    objetivos: set de (empleado_id, fecha)
+    zonas: {empleado_id: tzinfo} (zona de su empresa); por defecto TIME_ZONE
+    Una sola consulta acotada por empleados y rango de fechas del lote.
+    """
+    zonas = zonas or {}
+    empleado_ids = {emp for emp, _ in objetivos}
+    fechas = [f for _, f in objetivos]
+    # un día de margen a cada lado por la conversión a hora local
+    inicio = inicio_dia(min(fechas) - timedelta(days=1))
+    fin = inicio_dia(max(fechas) + timedelta(days=2))
+
+    qs = (
+        EventoAsistencia.objects
+        .filter(empleado_id__in=empleado_ids, registrado_el__gte=inicio, registrado_el__lt=fin)
+        .values_list("empleado_id", "tipo", "registrado_el")
+    )
+
+    out = {}
+    for empleado_id, tipo, registrado_el in qs.iterator(chunk_size=5000):
+        local = timezone.localtime(registrado_el, zonas.get(empleado_id))
+        key = (empleado_id, local.date())
+        if key in objetivos:
+            out.setdefault(key, []).append((tipo, local))
+    return out
+
+
+# =========================
+# Recalcular / procesar cola
+# =========================
+def recalcular(pares):
+    """
+    pares: lista de (empresa_id, empleado_id, fecha)
+    Recalcula exactamente esas jornadas y las guarda con un upsert masivo.
+    Las jornadas que se quedaron sin marcaciones se eliminan.
+    """
+    if not pares:
+        return {"actualizadas": 0, "eliminadas": 0}
+
+    empresa_por_par = {(emp, f): empresa_id for empresa_id, emp, f in pares}
+    objetivos = set(empresa_por_par.keys())
+
+    zonas = {emp: zona_empresa(empresa_id) for (emp, _), empresa_id in empresa_por_par.items()}
+    eventos = _eventos_por_par(objetivos, zonas)
+    horarios = _horarios_por_empleado({emp for emp, _ in objetivos})
+    tardanza_desde = _tardanza_desde_por_empresa(set(empresa_por_par.values()))
+
+    jornadas = []
+    vacias = {}
+    for (empleado_id, fecha), empresa_id in empresa_por_par.items():
+        datos = calcular_jornada(
+            fecha,
+            eventos.get((empleado_id, fecha), []),
+            horario=horarios.get(empleado_id),
+            tardanza_desde_min=tardanza_desde.get(empresa_id, 0),
+        )
+        if datos is None:
+            vacias.setdefault(fecha, []).append(empleado_id)
+            continue
+        jornadas.append(JornadaCalculada(empresa_id=empresa_id, empleado_id=empleado_id, fecha=fecha, **datos))
+
+    if jornadas:
+        JornadaCalculada.objects.bulk_create(
+            jornadas,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["empleado", "fecha"],
+            update_fields=CAMPOS_JORNADA,
+        )
+
+    eliminadas = 0
+    for fecha, empleado_ids in vacias.items():
+        eliminadas += JornadaCalculada.objects.filter(fecha=fecha, empleado_id__in=empleado_ids).delete()[0]
+
+    # bulk_create no dispara señales: encolar los resúmenes de dashboard a mano
+    marcar_resumenes((empresa_id, fecha) for (_, fecha), empresa_id in empresa_por_par.items())
+
+    return {"actualizadas": len(jornadas), "eliminadas": eliminadas}
+
+
+def procesar_pendientes(lote=LOTE_DEFAULT, max_lotes=None):
+    """
+    Vacía la cola JornadaPendiente por lotes (ordenados por fecha para
+    mantener acotado el rango de eventos que se lee en cada lote).
+    """
+    resumen = {"lotes": 0, "pares": 0, "actualizadas": 0, "eliminadas": 0}
+
+    while max_lotes is None or resumen["lotes"] < max_lotes:
+        corte = timezone.now()
+        pendientes = list(
+            JornadaPendiente.objects
+            .order_by("fecha", "empleado_id")
+            .values_list("id", "empresa_id", "empleado_id", "fecha")[:lote]
+        )
+        if not pendientes:
+            break
+
+        with transaction.atomic():
+            r = recalcular([(empresa_id, empleado_id, fecha) for _, empresa_id, empleado_id, fecha in pendientes])
+            # si alguien volvió a marcar el par mientras calculábamos, se queda en cola
+            JornadaPendiente.objects.filter(
+                id__in=[p[0] for p in pendientes],
+                marcado_el__lt=corte,
+            ).delete()
+
+        resumen["lotes"] += 1
+        resumen["pares"] += len(pendientes)
+        resumen["actualizadas"] += r["actualizadas"]
+        resumen["eliminadas"] += r["eliminadas"]
+
+    return resumen
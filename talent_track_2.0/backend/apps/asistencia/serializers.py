@@ -85,6 +85,7 @@ class TurnoUpdateSerializer(serializers.ModelSerializer):
 
 # apps/asistencia/serializers.py
 from rest_framework import serializers
+from .ips import normalizar_entradas, parsear_red
 from .models import ReglaAsistencia
 
 CALCULO_HORAS_EXTRA = {
@@ -105,6 +106,7 @@ class ReglaAsistenciaListSerializer(serializers.ModelSerializer):
             "considera_tardanza_desde_min",
             "calculo_horas_extra",
             "calculo_horas_extra_nombre",
+            "ip_permitidas",
         ]
 
     def get_calculo_horas_extra_nombre(self, obj):
@@ -133,7 +135,25 @@ class ReglaAsistenciaCreateSerializer(serializers.ModelSerializer):
 class ReglaAsistenciaUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReglaAsistencia
-        fields = ["considera_tardanza_desde_min", "calculo_horas_extra"]
+        fields = ["considera_tardanza_desde_min", "calculo_horas_extra", "ip_permitidas"]
+        extra_kwargs = {"ip_permitidas": {"required": False}}
+
+    def validate_ip_permitidas(self, value):
+        # lista de IPs / CIDR (IPv4 o IPv6); vacía o null = sin restricción
+        if value in (None, "", []):
+            return None
+        if not isinstance(value, (list, str)):
+            raise serializers.ValidationError("Debe ser una lista de IPs o rangos CIDR.")
+        entradas = normalizar_entradas(value)
+        invalidas = []
+        for texto in entradas:
+            try:
+                parsear_red(texto)
+            except ValueError:
+                invalidas.append(texto)
+        if invalidas:
+            raise serializers.ValidationError(f"IP/CIDR inválidos: {', '.join(invalidas)}")
+        return entradas or None
 
     def validate_considera_tardanza_desde_min(self, value):
         if value is None:
@@ -189,12 +209,33 @@ class RegistrarEventoAsistenciaSerializer(serializers.Serializer):
     # pero el backend NO los usa para decidir; solo los ignora/valida por seguridad.
     tipo = serializers.IntegerField()
     observaciones = serializers.CharField(required=False, allow_null=True, allow_blank=True, max_length=150)
+    gps_lat = serializers.DecimalField(max_digits=9, decimal_places=6, required=False, allow_null=True)
+    gps_lng = serializers.DecimalField(max_digits=9, decimal_places=6, required=False, allow_null=True)
 
     def validate_tipo(self, value):
         if value not in (1, 2, 3, 4):
             raise serializers.ValidationError("tipo inválido (1 check_in, 2 check_out, 3 pausa_in, 4 pausa_out).")
         return value
 
+
+class EventoLoteItemSerializer(serializers.Serializer):
+    """
+    Una marcación de un lote (lector / app offline).
+    empleado_id: obligatorio para RRHH; si lo sube el propio empleado se ignora.
+    """
+    empleado_id = serializers.IntegerField(required=False, allow_null=True)
+    device_uid = serializers.CharField(max_length=150)
+    tipo = serializers.IntegerField()
+    registrado_el = serializers.DateTimeField()
+    gps_lat = serializers.DecimalField(max_digits=9, decimal_places=6, required=False, allow_null=True)
+    gps_lng = serializers.DecimalField(max_digits=9, decimal_places=6, required=False, allow_null=True)
+    observaciones = serializers.CharField(required=False, allow_null=True, allow_blank=True, max_length=150)
+
+    def validate_tipo(self, value):
+        if value not in TIPO_EVENTO_LABEL:
+            raise serializers.ValidationError("tipo inválido (1 check_in, 2 check_out, 3 pausa_in, 4 pausa_out).")
+        return value
+
 from rest_framework import serializers
 from apps.asistencia.models import JornadaCalculada
 
@@ -0,0 +1,40 @@
+# apps/asistencia/signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.asistencia import geocercas, ips
+from apps.asistencia.models import EventoAsistencia, GeoCerca, ReglaAsistencia
+from apps.asistencia.motor_jornadas import marcar_eventos
+
+
+@receiver(pre_save, sender=EventoAsistencia)
+def recordar_evento_anterior(sender, instance, **kwargs):
+    # si la marcación cambia de día (o de empleado) hay que recalcular también el de antes
+    instance._evento_anterior = (
+        EventoAsistencia.objects.filter(id=instance.id)
+        .only("empresa_id", "empleado_id", "registrado_el").first()
+        if instance.id else None
+    )
+
+
+@receiver(post_save, sender=EventoAsistencia)
+@receiver(post_delete, sender=EventoAsistencia)
+def encolar_jornada_evento(sender, instance, **kwargs):
+    # solo se encola; el cálculo lo hace el motor (calcular_jornadas)
+    anterior = instance.__dict__.pop("_evento_anterior", None)
+    marcar_eventos([instance, anterior] if anterior else [instance])
+
+
+@receiver(post_save, sender=GeoCerca)
+@receiver(post_delete, sender=GeoCerca)
+@receiver(post_save, sender=ReglaAsistencia)
+@receiver(post_delete, sender=ReglaAsistencia)
+def invalidar_indice_geocercas(sender, instance, **kwargs):
+    # el índice en memoria de la empresa se vuelve a armar en la próxima marcación
+    geocercas.invalidar(instance.empresa_id)
+
+
+@receiver(post_save, sender=ReglaAsistencia)
+@receiver(post_delete, sender=ReglaAsistencia)
+def invalidar_lista_ips(sender, instance, **kwargs):
+    ips.invalidar(instance.empresa_id)
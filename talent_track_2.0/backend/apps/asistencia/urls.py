@@ -19,12 +19,14 @@ from apps.asistencia.views_rrhh_turnos import (
     RRHHTurnosDetailAPIView,
 )
 
-from apps.asistencia.views_rrhh_jornadas import RRHHJornadasCalculadasAPIView
+from apps.asistencia.views_rrhh_jornadas import RRHHJornadasCalculadasAPIView, RRHHJornadasCalculadasExportAPIView
 
 from apps.asistencia.views import EmpleadoAsistenciaHoyAPIView, EmpleadoRegistrarAsistenciaAPIView
 
 from apps.asistencia.views import EmpleadoJornadasMensualAPIView
 
+from apps.asistencia.views_lote import AsistenciaLoteAPIView
+
 urlpatterns = [
     path("turnos/", TurnoListAPIView.as_view(), name="turnos_list"),
     path("turnos/crear/", CrearTurnoAPIView.as_view(), name="turnos_crear"),
@@ -40,9 +42,12 @@ urlpatterns = [
     path("rrhh/turnos/<int:pk>/", RRHHTurnosDetailAPIView.as_view(), name="rrhh_turnos_detail"),
 
     path("rrhh/jornadas-calculadas/", RRHHJornadasCalculadasAPIView.as_view(), name="rrhh_jornadas_calculadas"),
+    path("rrhh/jornadas-calculadas/export/", RRHHJornadasCalculadasExportAPIView.as_view(), name="rrhh_jornadas_calculadas_export"),
 
     path("empleado/asistencia/hoy/", EmpleadoAsistenciaHoyAPIView.as_view(), name="empleado_asistencia_hoy"),
     path("empleado/asistencia/registrar/", EmpleadoRegistrarAsistenciaAPIView.as_view(), name="empleado_asistencia_registrar"),
 
     path("empleado/jornadas/", EmpleadoJornadasMensualAPIView.as_view(), name="empleado_jornadas_mensual"),
+
+    path("asistencia/eventos/lote/", AsistenciaLoteAPIView.as_view(), name="asistencia_eventos_lote"),
 ]
@@ -2,12 +2,16 @@
 from django.urls import path
 from apps.asistencia.views_auditor_asistencia import (
     AuditorEventosAsistenciaAPIView,
+    AuditorEventosAsistenciaExportAPIView,
     AuditorJornadasCalculadasAPIView,
+    AuditorJornadasCalculadasExportAPIView,
     AuditorTurnosEmpleadosAPIView,
 )
 
 urlpatterns = [
     path("auditor/asistencia/eventos/", AuditorEventosAsistenciaAPIView.as_view()),
+    path("auditor/asistencia/eventos/export/", AuditorEventosAsistenciaExportAPIView.as_view()),
     path("auditor/asistencia/jornadas/", AuditorJornadasCalculadasAPIView.as_view()),
+    path("auditor/asistencia/jornadas/export/", AuditorJornadasCalculadasExportAPIView.as_view()),
     path("auditor/asistencia/turnos-empleados/", AuditorTurnosEmpleadosAPIView.as_view()),
 ]
@@ -135,43 +135,37 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
+from apps.asistencia.geocercas import evaluar_marcacion
+from apps.asistencia.ips import ERROR_IP, ip_permitida
 from apps.asistencia.models import EventoAsistencia
-from apps.usuarios.models import UsuarioRol
+from apps.core.fechas import rango_dia, zona_empresa
+from apps.core.red import ip_cliente
+from apps.usuarios.contexto import get_contexto
 from .serializers import EventoAsistenciaHoySerializer, RegistrarEventoAsistenciaSerializer
 
 
 def _get_ctx_from_authuser(request):
     """
-    request.user = AuthUser (apps.accounts.models.AuthUser)
-    request.user.usuario = usuarios.Usuario (tabla negocio)
+    Contexto del token (usuarios.Usuario de negocio) sin ir a la BD.
+    Ver apps/usuarios/contexto.py
     """
-    auth_user = request.user
-    if not getattr(auth_user, "usuario", None):
+    c = get_contexto(request)
+    if not c or not c.usuario_id:
         return None
-    u = auth_user.usuario
     return {
-        "usuario_id": u.id,
-        "empresa_id": u.empresa_id,
-        "empleado_id": u.empleado_id,
+        "usuario_id": c.usuario_id,
+        "empresa_id": c.empresa_id,
+        "empleado_id": c.empleado_id,
     }
 
 
 def _require_role(request, allowed_roles):
     """
     allowed_roles: ["empleado"] etc.
-    Tu tabla Rol guarda nombre: superadmin/rrhh/manager/empleado/auditor
+    Roles del token: superadmin/rrhh/manager/empleado/auditor
     """
-    ctx = _get_ctx_from_authuser(request)
-    if not ctx:
-        return False
-
-    roles = (
-        UsuarioRol.objects
-        .select_related("rol")
-        .filter(usuario_id=ctx["usuario_id"])
-        .values_list("rol__nombre", flat=True)
-    )
-    return any(r in allowed_roles for r in roles)
+    c = get_contexto(request)
+    return bool(c and c.usuario_id and c.tiene_rol(*allowed_roles))
 
 
 class EmpleadoAsistenciaHoyAPIView(APIView):
@@ -185,14 +179,15 @@ class EmpleadoAsistenciaHoyAPIView(APIView):
         if not ctx or not ctx["empresa_id"] or not ctx["empleado_id"]:
             return Response({"detail": "Usuario sin empresa/empleado asociado."}, status=400)
 
-        hoy = timezone.localdate()
+        tz = zona_empresa(ctx["empresa_id"])
+        hoy = timezone.localdate(timezone.now(), tz)
 
         qs = (
             EventoAsistencia.objects
             .filter(
+                rango_dia("registrado_el", hoy, tz),
                 empresa_id=ctx["empresa_id"],
                 empleado_id=ctx["empleado_id"],
-                registrado_el__date=hoy,
             )
             .order_by("registrado_el")
         )
@@ -216,15 +211,18 @@ class EmpleadoRegistrarAsistenciaAPIView(APIView):
 
         tipo = ser.validated_data["tipo"]
         observaciones = ser.validated_data.get("observaciones") or None
+        gps_lat = ser.validated_data.get("gps_lat")
+        gps_lng = ser.validated_data.get("gps_lng")
         ahora = timezone.now()
-        hoy = timezone.localdate()
+        tz = zona_empresa(ctx["empresa_id"])
+        hoy = timezone.localdate(ahora, tz)
 
         # Regla: no duplicar mismo tipo en el mismo día
         ya_existe = EventoAsistencia.objects.filter(
+            rango_dia("registrado_el", hoy, tz),
             empresa_id=ctx["empresa_id"],
             empleado_id=ctx["empleado_id"],
             tipo=tipo,
-            registrado_el__date=hoy,
         ).exists()
 
         if ya_existe:
@@ -233,17 +231,27 @@ class EmpleadoRegistrarAsistenciaAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # lista blanca de IPs de la ReglaAsistencia (si la empresa la configuró)
+        ip = ip_cliente(request)
+        if not ip_permitida(ctx["empresa_id"], ip):
+            return Response({"detail": ERROR_IP}, status=status.HTTP_403_FORBIDDEN)
+
+        # geocerca de la ReglaAsistencia (si la empresa la configuró)
+        dentro_geocerca, error_geocerca = evaluar_marcacion(ctx["empresa_id"], gps_lat, gps_lng)
+        if error_geocerca:
+            return Response({"detail": error_geocerca}, status=status.HTTP_400_BAD_REQUEST)
+
         obj = EventoAsistencia.objects.create(
             empresa_id=ctx["empresa_id"],
             empleado_id=ctx["empleado_id"],
             tipo=tipo,
             registrado_el=ahora,
             fuente=2,  # web
-            gps_lat=None,
-            gps_lng=None,
-            dentro_geocerca=False,
+            gps_lat=gps_lat,
+            gps_lng=gps_lng,
+            dentro_geocerca=dentro_geocerca,
             foto_url=None,
-            ip=None,
+            ip=ip,
             observaciones=observaciones,
         )
 
@@ -257,29 +265,20 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
 from apps.asistencia.models import JornadaCalculada
-from apps.usuarios.models import UsuarioRol
+from apps.usuarios.contexto import get_contexto
 from .serializers import JornadaCalculadaEmpleadoSerializer
 
 
 def _get_ctx_from_authuser(request):
-    auth_user = request.user
-    if not getattr(auth_user, "usuario", None):
+    c = get_contexto(request)
+    if not c or not c.usuario_id:
         return None
-    u = auth_user.usuario
-    return {"usuario_id": u.id, "empresa_id": u.empresa_id, "empleado_id": u.empleado_id}
+    return {"usuario_id": c.usuario_id, "empresa_id": c.empresa_id, "empleado_id": c.empleado_id}
 
 
 def _require_role(request, allowed_roles):
-    ctx = _get_ctx_from_authuser(request)
-    if not ctx:
-        return False
-    roles = (
-        UsuarioRol.objects
-        .select_related("rol")
-        .filter(usuario_id=ctx["usuario_id"])
-        .values_list("rol__nombre", flat=True)
-    )
-    return any(r in allowed_roles for r in roles)
+    c = get_contexto(request)
+    return bool(c and c.usuario_id and c.tiene_rol(*allowed_roles))
 
 
 def _month_range(month_str):
@@ -3,28 +3,52 @@ from datetime import datetime
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from apps.usuarios.models import Usuario
+from apps.usuarios.contexto import get_contexto
+from apps.usuarios.permissions import con_rol
+from apps.core.paginacion import paginar_keyset, respuesta_paginada
+from apps.core.exportacion import filtro_rango, parse_rango, respuesta_csv
+from apps.core.fechas import rango_dia, zona_empresa
 from apps.asistencia.models import EventoAsistencia, JornadaCalculada, AsignacionTurno
 from apps.asistencia.serializers_auditor_asistencia import (
     AuditorEventoAsistenciaSerializer,
     AuditorJornadaCalculadaSerializer,
     AuditorAsignacionTurnoSerializer,
+    EVENTO_FUENTE,
+    EVENTO_TIPO,
+    JORNADA_ESTADO,
 )
 
+COLUMNAS_EVENTOS = [
+    ("id", "id"),
+    ("nombres", "empleado__nombres"),
+    ("apellidos", "empleado__apellidos"),
+    ("email", "empleado__email"),
+    ("tipo", "tipo", EVENTO_TIPO.get),
+    ("registrado_el", "registrado_el"),
+    ("fuente", "fuente", EVENTO_FUENTE.get),
+    ("ip", "ip"),
+    ("observaciones", "observaciones"),
+]
+
+COLUMNAS_JORNADAS = [
+    ("id", "id"),
+    ("nombres", "empleado__nombres"),
+    ("apellidos", "empleado__apellidos"),
+    ("email", "empleado__email"),
+    ("fecha", "fecha"),
+    ("hora_primera_entrada", "hora_primera_entrada"),
+    ("hora_ultimo_salida", "hora_ultimo_salida"),
+    ("minutos_trabajados", "minutos_trabajados"),
+    ("minutos_tardanza", "minutos_tardanza"),
+    ("minutos_extra", "minutos_extra"),
+    ("estado", "estado", JORNADA_ESTADO.get),
+]
+
 
 def _get_usuario_tt(request):
-    auth_user = getattr(request, "user", None)
-    if not auth_user or not getattr(auth_user, "is_authenticated", False):
-        return None
-    usuario_id = getattr(auth_user, "usuario_id", None)
-    if not usuario_id:
-        return None
-    return (
-        Usuario.objects
-        .select_related("empresa", "empleado")
-        .filter(id=usuario_id)
-        .first()
-    )
+    # contexto del token (apps/usuarios/contexto.py): sin consultar usuarios.Usuario
+    ctx = get_contexto(request)
+    return ctx if ctx and ctx.usuario_id else None
 
 
 class AuditorEventosAsistenciaAPIView(APIView):
@@ -45,14 +69,14 @@ class AuditorEventosAsistenciaAPIView(APIView):
         fecha = request.query_params.get("fecha")
         if fecha:
             try:
-                # filtrar por día (date) en registrado_el
+                # filtrar por día local de la empresa en registrado_el
                 dt = datetime.strptime(fecha, "%Y-%m-%d").date()
-                qs = qs.filter(registrado_el__date=dt)
+                qs = qs.filter(rango_dia("registrado_el", dt, zona_empresa(auditor.empresa_id)))
             except ValueError:
                 return Response({"detail": "Formato de fecha inválido. Use YYYY-MM-DD."}, status=400)
 
-        qs = qs.order_by("-registrado_el", "-id")
-        return Response(AuditorEventoAsistenciaSerializer(qs, many=True).data, status=200)
+        eventos, next_cursor = paginar_keyset(request, qs, ("-registrado_el", "-id"))
+        return respuesta_paginada(request, AuditorEventoAsistenciaSerializer(eventos, many=True).data, next_cursor)
 
 
 class AuditorJornadasCalculadasAPIView(APIView):
@@ -78,8 +102,8 @@ class AuditorJornadasCalculadasAPIView(APIView):
             except ValueError:
                 return Response({"detail": "Formato de fecha inválido. Use YYYY-MM-DD."}, status=400)
 
-        qs = qs.order_by("-fecha", "-id")
-        return Response(AuditorJornadaCalculadaSerializer(qs, many=True).data, status=200)
+        jornadas, next_cursor = paginar_keyset(request, qs, ("-fecha", "-id"))
+        return respuesta_paginada(request, AuditorJornadaCalculadaSerializer(jornadas, many=True).data, next_cursor)
 
 
 class AuditorTurnosEmpleadosAPIView(APIView):
@@ -99,3 +123,45 @@ class AuditorTurnosEmpleadosAPIView(APIView):
         )
         return Response(AuditorAsignacionTurnoSerializer(qs, many=True).data, status=200)
 
+
+
+class AuditorEventosAsistenciaExportAPIView(APIView):
+    """
+    GET /api/auditor/asistencia/eventos/export/?desde=YYYY-MM-DD&hasta=YYYY-MM-DD
+    CSV en streaming (sin límite de filas).
+    """
+    permission_classes = [con_rol("auditor")]
+
+    def get(self, request):
+        auditor = _get_usuario_tt(request)
+        if not auditor or not auditor.empresa_id:
+            return Response({"detail": "No autorizado."}, status=401)
+
+        desde, hasta = parse_rango(request.query_params)
+        tz = zona_empresa(auditor.empresa_id)
+        qs = (
+            EventoAsistencia.objects
+            .filter(filtro_rango("registrado_el", desde, hasta, tz), empresa_id=auditor.empresa_id)
+            .order_by("-registrado_el", "-id")
+        )
+        return respuesta_csv("eventos_asistencia.csv", qs, COLUMNAS_EVENTOS, tz)
+
+
+class AuditorJornadasCalculadasExportAPIView(APIView):
+    """
+    GET /api/auditor/asistencia/jornadas/export/?desde=YYYY-MM-DD&hasta=YYYY-MM-DD
+    """
+    permission_classes = [con_rol("auditor")]
+
+    def get(self, request):
+        auditor = _get_usuario_tt(request)
+        if not auditor or not auditor.empresa_id:
+            return Response({"detail": "No autorizado."}, status=401)
+
+        desde, hasta = parse_rango(request.query_params)
+        qs = (
+            JornadaCalculada.objects
+            .filter(filtro_rango("fecha", desde, hasta, timestamp=False), empresa_id=auditor.empresa_id)
+            .order_by("-fecha", "-id")
+        )
+        return respuesta_csv("jornadas_calculadas.csv", qs, COLUMNAS_JORNADAS, zona_empresa(auditor.empresa_id))
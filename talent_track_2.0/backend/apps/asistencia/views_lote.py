@@ -0,0 +1,56 @@
+# apps/asistencia/views_lote.py
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework import status
+
+from apps.asistencia.ingesta import CREADO, DUPLICADO, LOTE_MAX, RECHAZADO, ingestar_lote
+from apps.core.red import ip_cliente
+from apps.usuarios.contexto import get_contexto
+
+
+class AsistenciaLoteAPIView(APIView):
+    """
+    POST /api/asistencia/eventos/lote/
+    Body: {"eventos": [{"empleado_id", "device_uid", "tipo", "registrado_el",
+                        "gps_lat"?, "gps_lng"?, "observaciones"?}, ...]}
+
+    - rrhh: lectores de la empresa; empleado_id obligatorio en cada item
+    - empleado: app offline; todas las marcaciones son del propio empleado
+
+    Responde 200 con el resultado de cada item (creado / duplicado / rechazado).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ctx = get_contexto(request)
+        if not ctx or not ctx.empresa_id or not ctx.tiene_rol("rrhh", "empleado"):
+            return Response({"detail": "No autorizado."}, status=401)
+
+        # rrhh sube por cualquier empleado de su empresa; si no, solo por sí mismo
+        empleado_id = None if ctx.tiene_rol("rrhh") else ctx.empleado_id
+        if not ctx.tiene_rol("rrhh") and not empleado_id:
+            return Response({"detail": "Usuario sin empresa/empleado asociado."}, status=400)
+
+        eventos = request.data.get("eventos") if isinstance(request.data, dict) else None
+        if not isinstance(eventos, list) or not eventos:
+            return Response({"eventos": "Debe enviar una lista no vacía de eventos."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(eventos) > LOTE_MAX:
+            return Response({"eventos": f"Máximo {LOTE_MAX} eventos por lote."}, status=status.HTTP_400_BAD_REQUEST)
+
+        resultados = ingestar_lote(
+            ctx.empresa_id,
+            eventos,
+            empleado_id=empleado_id,
+            ip=ip_cliente(request),
+        )
+
+        return Response(
+            {
+                "creados": sum(r["estado"] == CREADO for r in resultados),
+                "duplicados": sum(r["estado"] == DUPLICADO for r in resultados),
+                "rechazados": sum(r["estado"] == RECHAZADO for r in resultados),
+                "resultados": resultados,
+            },
+            status=status.HTTP_200_OK,
+        )
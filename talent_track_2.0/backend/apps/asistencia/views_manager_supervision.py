@@ -4,7 +4,8 @@ from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from apps.usuarios.models import Usuario
+from apps.usuarios.contexto import get_contexto
+from apps.core.fechas import rango_dia, zona_empresa
 from apps.asistencia.models import EventoAsistencia, JornadaCalculada
 from apps.asistencia.serializers_manager_supervision import (
     EventoAsistenciaManagerSerializer,
@@ -13,15 +14,9 @@ from apps.asistencia.serializers_manager_supervision import (
 
 
 def _get_usuario_tt(request):
-    auth_user = getattr(request, "user", None)
-    if not auth_user or not getattr(auth_user, "is_authenticated", False):
-        return None
-
-    usuario_id = getattr(auth_user, "usuario_id", None)
-    if not usuario_id:
-        return None
-
-    return Usuario.objects.select_related("empleado", "empresa").filter(id=usuario_id).first()
+    # contexto del token (apps/usuarios/contexto.py): sin consultar usuarios.Usuario
+    ctx = get_contexto(request)
+    return ctx if ctx and ctx.usuario_id else None
 
 
 def _parse_date_yyyy_mm_dd(value):
@@ -52,9 +47,9 @@ class ManagerEventosAsistenciaDiaAPIView(APIView):
             EventoAsistencia.objects
             .select_related("empleado")
             .filter(
+                rango_dia("registrado_el", fecha, zona_empresa(u.empresa_id)),
                 empresa_id=u.empresa_id,
                 empleado__manager_id=u.empleado_id,
-                registrado_el__date=fecha
             )
             .order_by("registrado_el", "id")
         )
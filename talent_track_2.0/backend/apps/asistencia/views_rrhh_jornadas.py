@@ -1,10 +1,12 @@
 # apps/asistencia/views_rrhh_jornadas.py
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 
 from apps.asistencia.models import JornadaCalculada
+from apps.core.exportacion import filtro_rango, parse_rango, respuesta_csv
+from apps.core.fechas import zona_empresa
+from apps.core.paginacion import paginar_keyset, respuesta_paginada
 
 
 def get_scope(request):
@@ -35,6 +37,22 @@ ESTADO_JORNADA_LABEL = {
 }
 
 
+COLUMNAS_EXPORT = [
+    ("id", "id"),
+    ("nombres", "empleado__nombres"),
+    ("apellidos", "empleado__apellidos"),
+    ("email", "empleado__email"),
+    ("fecha", "fecha"),
+    ("hora_primera_entrada", "hora_primera_entrada"),
+    ("hora_ultimo_salida", "hora_ultimo_salida"),
+    ("minutos_trabajados", "minutos_trabajados"),
+    ("minutos_tardanza", "minutos_tardanza"),
+    ("minutos_extra", "minutos_extra"),
+    ("estado", "estado"),
+    ("estado_label", "estado", lambda e: ESTADO_JORNADA_LABEL.get(e, f"desconocido({e})")),
+]
+
+
 def fmt_date(d):
     return d.isoformat() if d else None
 
@@ -58,11 +76,11 @@ class RRHHJornadasCalculadasAPIView(APIView):
             JornadaCalculada.objects
             .select_related("empleado")
             .filter(empresa_id=empresa_id)
-            .order_by("-fecha", "-id")
         )
+        jornadas, next_cursor = paginar_keyset(request, qs, ("-fecha", "-id"))
 
         data = []
-        for j in qs:
+        for j in jornadas:
             emp = j.empleado
             data.append(
                 {
@@ -81,4 +99,24 @@ class RRHHJornadasCalculadasAPIView(APIView):
                 }
             )
 
-        return Response(data, status=200)
+        return respuesta_paginada(request, data, next_cursor)
+
+
+class RRHHJornadasCalculadasExportAPIView(APIView):
+    """
+    GET /api/rrhh/jornadas-calculadas/export/?desde=YYYY-MM-DD&hasta=YYYY-MM-DD
+    Mismas columnas que el listado, en CSV y en streaming (sin paginar).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        scope = require_rrhh(request)
+        empresa_id = scope["empresa_id"]
+
+        desde, hasta = parse_rango(request.query_params)
+        qs = (
+            JornadaCalculada.objects
+            .filter(filtro_rango("fecha", desde, hasta, timestamp=False), empresa_id=empresa_id)
+            .order_by("-fecha", "-id")
+        )
+        return respuesta_csv("jornadas_calculadas.csv", qs, COLUMNAS_EXPORT, zona_empresa(empresa_id))
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class AuditoriaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.auditoria'
+
+    def ready(self):
+        # diff de los modelos auditados -> buffer de LogAuditoria
+        from .signals import conectar
+        conectar()
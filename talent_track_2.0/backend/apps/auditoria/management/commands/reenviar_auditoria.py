@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.auditoria.registro import SPOOL_DIR, TAMANO, cargar_spool
+
+
+class Command(BaseCommand):
+    help = "Carga en LogAuditoria las filas que quedaron en el spool (BD caída / apagado)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default=str(SPOOL_DIR), help="Carpeta del spool")
+        parser.add_argument("--lote", type=int, default=TAMANO, help="Filas por bulk_create")
+
+    def handle(self, *args, **options):
+        insertadas, rechazadas = cargar_spool(options["dir"], lote=options["lote"])
+        self.stdout.write(self.style.SUCCESS(f"Filas insertadas: {insertadas}"))
+        if rechazadas:
+            self.stdout.write(self.style.ERROR(f"Filas rechazadas (ver *.rechazadas): {rechazadas}"))
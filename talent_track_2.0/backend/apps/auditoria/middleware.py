@@ -0,0 +1,50 @@
+# apps/auditoria/middleware.py
+"""
+Marca las peticiones que modifican datos (POST/PUT/PATCH/DELETE) para que
+signals.py audite los save()/delete() que ocurran dentro de ellas.
+
+El usuario y la empresa se leen recién al auditar (request.contexto lo pone
+JWTContextoAuthentication dentro de la vista, después de este middleware).
+"""
+from contextvars import ContextVar
+
+from apps.core.red import ip_cliente
+
+METODOS_AUDITADOS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+_peticion = ContextVar("auditoria_peticion", default=None)
+
+
+def peticion_actual():
+    """
+    HttpRequest mutante en curso o None (GET, comandos, shell).
+    """
+    return _peticion.get()
+
+
+def datos_peticion(request):
+    """
+    -> (usuario_id, empresa_id, ip, metodo, ruta)
+    """
+    ctx = getattr(request, "contexto", None)
+    return (
+        getattr(ctx, "usuario_id", None),
+        getattr(ctx, "empresa_id", None),
+        ip_cliente(request),
+        request.method,
+        request.path,
+    )
+
+
+class AuditoriaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in METODOS_AUDITADOS:
+            return self.get_response(request)
+        token = _peticion.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _peticion.reset(token)
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditoria', '0002_alter_logauditoria_empresa'),
+        ('core', '0002_alter_puesto_empresa_alter_puesto_unidad_and_more'),
+        ('usuarios', '0003_alter_usuariorol_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['empresa', 'fecha'], name='log_emp_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='logauditoria',
+            index=models.Index(fields=['fecha'], name='log_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 15:30
+
+from django.db import migrations
+
+
+def particionar(apps, schema_editor):
+    from apps.core.particiones import convertir
+    convertir(schema_editor, "logauditoria", "fecha")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditoria', '0003_logauditoria_log_emp_fecha_idx_and_more'),
+    ]
+
+    operations = [
+        # solo PostgreSQL (ver apps/core/particiones.py); el estado del modelo no cambia
+        migrations.RunPython(particionar, migrations.RunPython.noop),
+    ]
@@ -15,3 +15,8 @@ class LogAuditoria(models.Model):
 
     class Meta:
         db_table = 'logauditoria'
+        indexes = [
+            models.Index(fields=["empresa", "fecha"], name="log_emp_fecha_idx"),
+            # dashboard superadmin (global, sin empresa)
+            models.Index(fields=["fecha"], name="log_fecha_idx"),
+        ]
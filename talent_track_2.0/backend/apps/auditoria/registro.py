@@ -0,0 +1,196 @@
+# apps/auditoria/registro.py
+"""
+Escritura de LogAuditoria en bloque y fuera de la petición.
+
+registrar(...) solo agrega la fila a un buffer en memoria (sin tocar la BD).
+Un hilo de fondo vacía el buffer con bulk_create cuando llega a
+AUDITORIA_BUFFER_TAMANO filas o cada AUDITORIA_BUFFER_INTERVALO segundos.
+
+Respaldo durable: si el bulk_create falla (BD caída) o el proceso se
+apaga con filas pendientes y la BD no responde, las filas van a un archivo
+JSON Lines en AUDITORIA_SPOOL_DIR; manage.py reenviar_auditoria las carga.
+
+Quién genera las filas: signals.py (diff de campos de los modelos
+auditados) dentro de peticiones que modifican datos (middleware.py).
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.auditoria.models import LogAuditoria
+
+logger = logging.getLogger(__name__)
+
+TAMANO = getattr(settings, "AUDITORIA_BUFFER_TAMANO", 200)
+INTERVALO = getattr(settings, "AUDITORIA_BUFFER_INTERVALO", 2.0)
+SPOOL_DIR = Path(getattr(settings, "AUDITORIA_SPOOL_DIR", settings.BASE_DIR / "auditoria_spool"))
+
+
+class BufferAuditoria:
+    """
+    hilo=False: sin hilo de fondo; se vacía al llenarse o con vaciar()
+    (tests / procesos cortos).
+    """
+
+    def __init__(self, tamano=TAMANO, intervalo=INTERVALO, hilo=True, spool_dir=SPOOL_DIR):
+        self.tamano = tamano
+        self.intervalo = intervalo
+        self.spool_dir = Path(spool_dir)
+        self._usar_hilo = hilo
+        self._filas = []
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._parar = threading.Event()
+        self._hilo = None
+
+    def __len__(self):
+        return len(self._filas)
+
+    def agregar(self, fila):
+        with self._lock:
+            self._filas.append(fila)
+            lleno = len(self._filas) >= self.tamano
+        if not self._usar_hilo:
+            if lleno:
+                self.vaciar()
+            return
+        self._iniciar_hilo()
+        if lleno:
+            self._despertar.set()
+
+    def _tomar(self):
+        with self._lock:
+            filas, self._filas = self._filas, []
+        return filas
+
+    def vaciar(self):
+        """
+        -> filas insertadas (0 si no había o si fueron al spool).
+        """
+        filas = self._tomar()
+        if not filas:
+            return 0
+        try:
+            LogAuditoria.objects.bulk_create([LogAuditoria(**f) for f in filas], batch_size=self.tamano)
+        except Exception:
+            logger.exception("No se pudo insertar %s filas de auditoría: van al spool", len(filas))
+            self.a_spool(filas)
+            return 0
+        return len(filas)
+
+    def a_spool(self, filas):
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        ruta = self.spool_dir / f"auditoria_{os.getpid()}_{uuid.uuid4().hex}.jsonl"
+        with open(ruta, "w", encoding="utf-8") as f:
+            for fila in filas:
+                f.write(json.dumps({**fila, "fecha": fila["fecha"].isoformat()}, ensure_ascii=False) + "\n")
+        return ruta
+
+    # ---- hilo de fondo ----
+    def _iniciar_hilo(self):
+        if self._hilo and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo and self._hilo.is_alive():
+                return
+            self._hilo = threading.Thread(target=self._bucle, name="auditoria-buffer", daemon=True)
+            self._hilo.start()
+
+    def _bucle(self):
+        while not self._parar.is_set():
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            self.vaciar()
+            # conexión propia del hilo: se descarta si la BD la cortó
+            connection.close_if_unusable_or_obsolete()
+        connection.close()
+
+    def cerrar(self, timeout=5.0):
+        """
+        Apagado: detiene el hilo y vacía lo pendiente (BD o spool).
+        """
+        self._parar.set()
+        self._despertar.set()
+        if self._hilo and self._hilo.is_alive():
+            self._hilo.join(timeout)
+        self.vaciar()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = BufferAuditoria()
+                atexit.register(_buffer.cerrar)
+    return _buffer
+
+
+def registrar(empresa_id, accion, entidad, entidad_id, detalles, usuario_id=None, ip=None):
+    """
+    Encola una fila de LogAuditoria (no bloquea la petición).
+    """
+    get_buffer().agregar({
+        "empresa_id": empresa_id,
+        "usuario_id": usuario_id,
+        "accion": accion,
+        "entidad": entidad,
+        "entidad_id": entidad_id,
+        "detalles": detalles,
+        "fecha": timezone.now(),
+        "ip": ip,
+    })
+
+
+def cargar_spool(spool_dir=SPOOL_DIR, lote=TAMANO):
+    """
+    Inserta los archivos del spool y los borra. Si un bloque falla se
+    reintenta fila a fila; las que no entran quedan en <archivo>.rechazadas.
+    -> (insertadas, rechazadas)
+    """
+    insertadas = rechazadas = 0
+    for ruta in sorted(Path(spool_dir).glob("auditoria_*.jsonl")):
+        with open(ruta, encoding="utf-8") as f:
+            filas = [json.loads(linea) for linea in f if linea.strip()]
+        for fila in filas:
+            fecha = fila["fecha"]
+            fila["fecha"] = parse_datetime(fecha) if isinstance(fecha, str) else fecha or datetime.now()
+
+        malas = []
+        for i in range(0, len(filas), lote):
+            bloque = filas[i:i + lote]
+            try:
+                LogAuditoria.objects.bulk_create([LogAuditoria(**f) for f in bloque])
+                insertadas += len(bloque)
+                continue
+            except Exception:
+                logger.exception("Bloque del spool %s rechazado: se reintenta fila a fila", ruta.name)
+            for f in bloque:
+                try:
+                    LogAuditoria.objects.create(**f)
+                    insertadas += 1
+                except Exception:
+                    malas.append(f)
+
+        if malas:
+            rechazadas += len(malas)
+            with open(ruta.with_suffix(".rechazadas"), "a", encoding="utf-8") as out:
+                for f in malas:
+                    out.write(json.dumps({**f, "fecha": f["fecha"].isoformat()}, ensure_ascii=False) + "\n")
+        ruta.unlink()
+    return insertadas, rechazadas
+
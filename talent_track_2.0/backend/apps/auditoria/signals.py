@@ -0,0 +1,123 @@
+# apps/auditoria/signals.py
+"""
+Diff de campos de los modelos de AUDITORIA_MODELOS -> registro.registrar().
+
+- post_init guarda los valores con los que se cargó la fila,
+- post_save compara contra ellos (accion "crear" / "actualizar"),
+- post_delete deja la foto de lo borrado (accion "eliminar").
+
+Solo dentro de una petición mutante (middleware.py): lecturas, comandos y
+shell no pagan nada. La fila se encola con transaction.on_commit: lo que
+se revierte (rollback) no queda auditado. QuerySet.update() /
+bulk_create() no disparan signals y por eso no quedan auditados por esta
+vía.
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+
+from apps.auditoria.middleware import datos_peticion, peticion_actual
+from apps.auditoria.registro import registrar
+
+CAMPOS_EXCLUIDOS = frozenset({"hash_password", "password", "secreto", "credenciales"})
+
+MODELOS = getattr(settings, "AUDITORIA_MODELOS", [])
+
+ATRIBUTO = "_auditoria_antes"
+
+
+def _json(valor):
+    if isinstance(valor, (datetime, date, time)):
+        return valor.isoformat()
+    if isinstance(valor, (Decimal, UUID)):
+        return str(valor)
+    if valor is None or isinstance(valor, (str, int, float, bool, list, dict)):
+        return valor
+    return str(valor)
+
+
+def _campos(instance):
+    """
+    attname de los campos concretos cargados (omite diferidos y sensibles).
+    """
+    cargados = instance.__dict__
+    return {
+        f.attname
+        for f in instance._meta.concrete_fields
+        if f.attname in cargados and f.name not in CAMPOS_EXCLUIDOS
+    }
+
+
+def _foto(instance):
+    return {c: _json(instance.__dict__[c]) for c in _campos(instance)}
+
+
+def _empresa_id(instance, empresa_ctx):
+    if instance._meta.db_table == "empresa":
+        return instance.pk
+    return getattr(instance, "empresa_id", None) or empresa_ctx
+
+
+def _registrar(instance, accion, detalles):
+    request = peticion_actual()
+    usuario_id, empresa_ctx, ip, metodo, ruta = datos_peticion(request)
+    empresa_id = _empresa_id(instance, empresa_ctx)
+    if empresa_id is None or instance.pk is None:
+        return
+    fila = dict(
+        empresa_id=empresa_id,
+        usuario_id=usuario_id,
+        accion=accion,
+        entidad=instance._meta.db_table,
+        entidad_id=instance.pk,
+        detalles={**detalles, "metodo": metodo, "ruta": ruta},
+        ip=ip,
+    )
+    # solo lo que llega a confirmarse: un rollback descarta la fila
+    transaction.on_commit(lambda: registrar(**fila))
+
+
+def al_cargar(sender, instance, **kwargs):
+    if peticion_actual() is None or instance.pk is None:
+        return
+    setattr(instance, ATRIBUTO, _foto(instance))
+
+
+def al_guardar(sender, instance, created, **kwargs):
+    if peticion_actual() is None:
+        return
+    despues = _foto(instance)
+    if created:
+        _registrar(instance, "crear", {"campos": despues})
+    else:
+        antes = getattr(instance, ATRIBUTO, None) or {}
+        cambios = {
+            campo: [antes.get(campo), valor]
+            for campo, valor in despues.items()
+            if campo in antes and antes[campo] != valor
+        }
+        if not cambios:
+            return
+        _registrar(instance, "actualizar", {"cambios": cambios})
+    # varios save() en la misma petición: el siguiente diff parte de aquí
+    setattr(instance, ATRIBUTO, despues)
+
+
+def al_eliminar(sender, instance, **kwargs):
+    if peticion_actual() is None:
+        return
+    _registrar(instance, "eliminar", {"antes": getattr(instance, ATRIBUTO, None) or _foto(instance)})
+
+
+def conectar():
+    for etiqueta in MODELOS:
+        modelo = apps.get_model(etiqueta)
+        uid = f"auditoria:{etiqueta}"
+        post_init.connect(al_cargar, sender=modelo, dispatch_uid=uid)
+        post_save.connect(al_guardar, sender=modelo, dispatch_uid=uid)
+        post_delete.connect(al_eliminar, sender=modelo, dispatch_uid=uid)
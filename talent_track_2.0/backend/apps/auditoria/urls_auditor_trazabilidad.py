@@ -1,7 +1,11 @@
 # apps/auditoria/urls_auditor_trazabilidad.py
 from django.urls import path
-from apps.auditoria.views_auditor_trazabilidad import AuditorLogsAuditoriaAPIView
+from apps.auditoria.views_auditor_trazabilidad import (
+    AuditorLogsAuditoriaAPIView,
+    AuditorLogsAuditoriaExportAPIView,
+)
 
 urlpatterns = [
     path("auditor/trazabilidad/logs/", AuditorLogsAuditoriaAPIView.as_view()),
+    path("auditor/trazabilidad/logs/export/", AuditorLogsAuditoriaExportAPIView.as_view()),
 ]
@@ -14,6 +14,8 @@ from apps.auditoria.models import LogAuditoria
 from apps.usuarios.models import Usuario
 from apps.usuarios.permissions import IsSuperAdmin, IsAuditor
 from apps.usuarios.scopes import get_scope
+from apps.core.paginacion import paginar_keyset, respuesta_paginada
+from apps.core.fechas import rango_dia, zona_empresa
 
 from .serializers import LogAuditoriaListSerializer, LogAuditoriaDetailSerializer
 
@@ -41,7 +43,6 @@ class SuperAdminLogsAuditoriaAPIView(APIView):
             LogAuditoria.objects
             .select_related("empresa", "usuario")
             .all()
-            .order_by("-fecha", "-id")
         )
 
         if empresa_id:
@@ -53,9 +54,10 @@ class SuperAdminLogsAuditoriaAPIView(APIView):
         if fecha_str:
             d = parse_date(fecha_str)
             if d:
-                qs = qs.filter(fecha__date=d)
+                qs = qs.filter(rango_dia("fecha", d, zona_empresa(empresa_id)))
 
-        return Response(LogAuditoriaListSerializer(qs, many=True).data, status=200)
+        logs, next_cursor = paginar_keyset(request, qs, ("-fecha", "-id"))
+        return respuesta_paginada(request, LogAuditoriaListSerializer(logs, many=True).data, next_cursor)
 
 
 class SuperAdminLogAuditoriaDetailAPIView(APIView):
@@ -128,7 +130,6 @@ class AuditorLogsAuditoriaAPIView(APIView):
             LogAuditoria.objects
             .select_related("empresa", "usuario")
             .filter(empresa_id=empresa_id)
-            .order_by("-fecha", "-id")
         )
 
         if usuario_email:
@@ -137,6 +138,7 @@ class AuditorLogsAuditoriaAPIView(APIView):
         if fecha_str:
             d = parse_date(fecha_str)
             if d:
-                qs = qs.filter(fecha__date=d)
+                qs = qs.filter(rango_dia("fecha", d, zona_empresa(empresa_id)))
 
-        return Response(LogAuditoriaListSerializer(qs, many=True).data, status=200)
+        logs, next_cursor = paginar_keyset(request, qs, ("-fecha", "-id"))
+        return respuesta_paginada(request, LogAuditoriaListSerializer(logs, many=True).data, next_cursor)
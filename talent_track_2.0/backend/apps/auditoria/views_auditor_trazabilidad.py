@@ -1,28 +1,34 @@
 # apps/auditoria/views_auditor_trazabilidad.py
+import json
 from datetime import datetime
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+from apps.usuarios.contexto import get_contexto
+from apps.usuarios.permissions import con_rol
 from apps.usuarios.models import Usuario
+from apps.core.exportacion import filtro_rango, parse_rango, respuesta_csv
+from apps.core.paginacion import paginar_keyset
+from apps.core.fechas import rango_dia, zona_empresa
 from apps.auditoria.models import LogAuditoria
 from apps.auditoria.serializers_auditor_trazabilidad import AuditorLogAuditoriaSerializer
 
+COLUMNAS_LOGS = [
+    ("id", "id"),
+    ("fecha", "fecha"),
+    ("usuario_email", "usuario__email"),
+    ("accion", "accion"),
+    ("entidad", "entidad"),
+    ("entidad_id", "entidad_id"),
+    ("ip", "ip"),
+    ("detalles", "detalles", lambda d: json.dumps(d, ensure_ascii=False, default=str)),
+]
 
-def _get_usuario_tt(request):
-    auth_user = getattr(request, "user", None)
-    if not auth_user or not getattr(auth_user, "is_authenticated", False):
-        return None
-
-    usuario_id = getattr(auth_user, "usuario_id", None)
-    if not usuario_id:
-        return None
 
-    return (
-        Usuario.objects
-        .select_related("empresa")
-        .filter(id=usuario_id)
-        .first()
-    )
+def _get_usuario_tt(request):
+    # contexto del token (apps/usuarios/contexto.py): sin consultar usuarios.Usuario
+    ctx = get_contexto(request)
+    return ctx if ctx and ctx.usuario_id else None
 
 
 class AuditorLogsAuditoriaAPIView(APIView):
@@ -33,6 +39,8 @@ class AuditorLogsAuditoriaAPIView(APIView):
         usuario_id (id de usuarios.Usuario)
         fecha (YYYY-MM-DD)
     Retorna:
+        - count: total de logs con esos filtros
+        - next: cursor de la página siguiente (solo con ?page_size= / ?cursor=)
         - results: logs
         - filtros: usuarios de la empresa (para toggle en front)
     """
@@ -63,11 +71,12 @@ class AuditorLogsAuditoriaAPIView(APIView):
         if fecha:
             try:
                 d = datetime.strptime(fecha, "%Y-%m-%d").date()
-                qs = qs.filter(fecha__date=d)
+                qs = qs.filter(rango_dia("fecha", d, zona_empresa(empresa_id)))
             except ValueError:
                 return Response({"detail": "fecha inválida. Use YYYY-MM-DD."}, status=400)
 
-        qs = qs.order_by("-fecha", "-id")[:1000]  # tope para evitar tablas gigantes
+        # paginado por cursor con ?cursor=&page_size=; sin ellos, tope de 1000
+        logs, next_cursor = paginar_keyset(request, qs, ("-fecha", "-id"), tope=1000)
 
         # catálogo de usuarios de la empresa (para el toggle del front)
         usuarios_empresa = (
@@ -79,11 +88,39 @@ class AuditorLogsAuditoriaAPIView(APIView):
 
         return Response(
             {
-                "count": qs.count(),
-                "results": AuditorLogAuditoriaSerializer(qs, many=True).data,
+                "count": qs.count(),  # total con los filtros, no solo esta página
+                "next": next_cursor,
+                "results": AuditorLogAuditoriaSerializer(logs, many=True).data,
                 "filtros": {
                     "usuarios": list(usuarios_empresa),
                 }
             },
             status=200
         )
+
+
+class AuditorLogsAuditoriaExportAPIView(APIView):
+    """
+    GET /api/auditor/trazabilidad/logs/export/?usuario_id=12&desde=YYYY-MM-DD&hasta=YYYY-MM-DD
+    CSV en streaming con todos los logs de la empresa del auditor.
+    """
+    permission_classes = [con_rol("auditor")]
+
+    def get(self, request):
+        auditor = _get_usuario_tt(request)
+        if not auditor or not auditor.empresa_id:
+            return Response({"detail": "No autorizado."}, status=401)
+
+        empresa_id = auditor.empresa_id
+        desde, hasta = parse_rango(request.query_params)
+        tz = zona_empresa(empresa_id)
+        qs = LogAuditoria.objects.filter(filtro_rango("fecha", desde, hasta, tz), empresa_id=empresa_id)
+
+        usuario_id = request.query_params.get("usuario_id")
+        if usuario_id:
+            try:
+                qs = qs.filter(usuario_id=int(usuario_id))
+            except ValueError:
+                return Response({"detail": "usuario_id inválido."}, status=400)
+
+        return respuesta_csv("logs_auditoria.csv", qs.order_by("-fecha", "-id"), COLUMNAS_LOGS, tz)
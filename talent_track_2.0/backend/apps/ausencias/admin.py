@@ -2,9 +2,11 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
-from .models import TipoAusencia, SolicitudAusencia, AprobacionAusencia, SaldoVacaciones
+from .models import TipoAusencia, SolicitudAusencia, AprobacionAusencia, SaldoVacaciones, Feriado, MovimientoSaldo
 
 admin.site.register(TipoAusencia)
 admin.site.register(SolicitudAusencia)
 admin.site.register(AprobacionAusencia)
 admin.site.register(SaldoVacaciones)
+admin.site.register(Feriado)
+admin.site.register(MovimientoSaldo)
@@ -0,0 +1,214 @@
+# apps/ausencias/dias_habiles.py
+"""
+Días hábiles de SolicitudAusencia calculados en el servidor.
+
+Día hábil = día de la semana laborable para el empleado y que no es
+feriado de su empresa:
+- semana: Turno.dias_semana del empleado (última AsignacionTurno o, si no
+  tiene, turno_base del contrato activo; igual que motor_jornadas). Sin
+  turno: AUSENCIAS_SEMANA_DEFECTO (lunes a viernes).
+- feriados: Feriado de la empresa.
+
+El conteo es numpy.busday_count sobre arrays de fechas: un
+busdaycalendar por (empresa, semana) y UNA llamada por grupo, sin loop
+por solicitud. recalcular(...) lo aplica en bloque y solo escribe las
+filas que cambian, agrupadas por valor.
+
+Los feriados de cada empresa se cachean en memoria (TTL + invalidación
+por señal de Feriado, ver signals.py).
+"""
+import time
+from datetime import date
+
+import numpy as np
+from django.conf import settings
+
+from apps.asistencia.models import AsignacionTurno
+from apps.asistencia.motor_jornadas import _dias_laborables
+from apps.ausencias.models import Feriado, SolicitudAusencia
+from apps.empleados.models import Contrato
+
+CACHE_TTL = getattr(settings, "FERIADOS_CACHE_TTL", 300)
+# "1111100" = lunes a viernes (formato weekmask de numpy, lunes primero)
+SEMANA_DEFECTO = getattr(settings, "AUSENCIAS_SEMANA_DEFECTO", "1111100")
+LOTE = getattr(settings, "AUSENCIAS_RECALCULO_LOTE", 5000)
+
+_CHUNK_IDS = 5000
+
+
+def mascara_semana(dias_semana):
+    """
+    Turno.dias_semana -> weekmask "1111100" (None si no hay configuración)
+    """
+    dias = _dias_laborables(dias_semana)
+    if not dias:
+        return None
+    return "".join("1" if d in dias else "0" for d in range(1, 8))
+
+
+def semanas_por_empleado(empleado_ids):
+    """
+    {empleado_id: weekmask}; prioridad: última AsignacionTurno, luego
+    turno_base del contrato activo, luego SEMANA_DEFECTO.
+    """
+    empleado_ids = list(set(empleado_ids))
+    out = {e: SEMANA_DEFECTO for e in empleado_ids}
+    for i in range(0, len(empleado_ids), _CHUNK_IDS):
+        chunk = empleado_ids[i:i + _CHUNK_IDS]
+        contratos = (
+            Contrato.objects
+            .filter(empleado_id__in=chunk, estado=1, turno_base__isnull=False)
+            .order_by("id")
+            .values_list("empleado_id", "turno_base__dias_semana")
+        )
+        asignaciones = (
+            AsignacionTurno.objects
+            .filter(empleado_id__in=chunk)
+            .order_by("id")
+            .values_list("empleado_id", "turno__dias_semana")
+        )
+        # en orden: lo último gana, asignaciones sobre contratos
+        for filas in (contratos, asignaciones):
+            for empleado_id, dias_semana in filas:
+                out[empleado_id] = mascara_semana(dias_semana) or out[empleado_id]
+    return out
+
+
+# ---------------- feriados ----------------
+
+_FERIADOS = {}
+
+
+def feriados_empresa(empresa_id):
+    """
+    Feriados de la empresa como array datetime64[D] ordenado.
+    """
+    ahora = time.monotonic()
+    cacheado = _FERIADOS.get(empresa_id)
+    if cacheado and ahora - cacheado[0] < CACHE_TTL:
+        return cacheado[1]
+    fechas = Feriado.objects.filter(empresa_id=empresa_id).order_by("fecha").values_list("fecha", flat=True)
+    arr = np.array(list(fechas), dtype="datetime64[D]")
+    _FERIADOS[empresa_id] = (ahora, arr)
+    return arr
+
+
+def invalidar(empresa_id):
+    _FERIADOS.pop(empresa_id, None)
+
+
+def calendarios(pares):
+    """
+    {(empresa_id, weekmask): numpy.busdaycalendar}
+    """
+    return {
+        (empresa_id, semana): np.busdaycalendar(weekmask=semana, holidays=feriados_empresa(empresa_id))
+        for empresa_id, semana in set(pares)
+    }
+
+
+# ---------------- cálculo ----------------
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _a_dias(fechas):
+    # list[date] -> datetime64[D] vía ordinal: ~20x más rápido que np.asarray(..., "datetime64[D]")
+    if isinstance(fechas, np.ndarray):
+        return fechas.astype("datetime64[D]")
+    ordinales = np.fromiter((f.toordinal() for f in fechas), dtype=np.int64, count=len(fechas))
+    return (ordinales - _EPOCH_ORDINAL).astype("datetime64[D]")
+
+
+def contar(empresa_ids, semanas, inicios, fines):
+    """
+    Arrays/listas alineadas (una posición por solicitud) -> array int64 de
+    días hábiles entre inicio y fin, ambos incluidos.
+    """
+    inicios = _a_dias(inicios)
+    fines = _a_dias(fines) + np.timedelta64(1, "D")
+    resultado = np.zeros(len(inicios), dtype=np.int64)
+    if not len(inicios):
+        return resultado
+
+    claves = list(zip(empresa_ids, semanas))
+    cals = calendarios(claves)
+    indice = {clave: i for i, clave in enumerate(cals)}
+    grupos = np.fromiter((indice[c] for c in claves), dtype=np.int64, count=len(claves))
+
+    orden = np.argsort(grupos, kind="stable")
+    cortes = np.flatnonzero(np.diff(grupos[orden])) + 1
+    calendario_de = list(cals.values())
+    for posiciones in np.split(orden, cortes):
+        cal = calendario_de[grupos[posiciones[0]]]
+        resultado[posiciones] = np.busday_count(inicios[posiciones], fines[posiciones], busdaycal=cal)
+    return resultado
+
+
+def dias_habiles(empresa_id, empleado_id, inicio, fin=None):
+    """
+    Días hábiles de una solicitud (fin None = un solo día).
+    """
+    semana = semanas_por_empleado([empleado_id])[empleado_id]
+    return int(contar([empresa_id], [semana], [inicio], [fin or inicio])[0])
+
+
+def recalcular(empresa_id=None, desde=None, hasta=None, estados=None, lote=LOTE):
+    """
+    Recalcula dias_habiles en bloque para las solicitudes que tocan
+    [desde, hasta] -> {"revisadas": n, "actualizadas": n}
+    """
+    qs = SolicitudAusencia.objects.all()
+    if empresa_id:
+        qs = qs.filter(empresa_id=empresa_id)
+    if desde:
+        # fecha_fin NULL = solicitud de un día (fecha_inicio)
+        qs = qs.exclude(fecha_fin__lt=desde).exclude(fecha_fin__isnull=True, fecha_inicio__lt=desde)
+    if hasta:
+        qs = qs.filter(fecha_inicio__lte=hasta)
+    if estados:
+        qs = qs.filter(estado__in=estados)
+
+    filas = list(qs.order_by("id").values_list(
+        "id", "empresa_id", "empleado_id", "fecha_inicio", "fecha_fin", "dias_habiles"
+    ))
+    if not filas:
+        return {"revisadas": 0, "actualizadas": 0}
+
+    ids, empresas, empleados, inicios, fines, actuales = zip(*filas)
+    semana_de = semanas_por_empleado(empleados)
+    nuevos = contar(
+        empresas,
+        [semana_de[e] for e in empleados],
+        inicios,
+        [f or i for i, f in zip(inicios, fines)],
+    )
+    cambiados = np.flatnonzero(nuevos != np.asarray(actuales, dtype=np.int64))
+    _guardar(np.asarray(ids, dtype=np.int64)[cambiados], nuevos[cambiados], lote)
+    return {"revisadas": len(filas), "actualizadas": len(cambiados)}
+
+
+def _guardar(ids, valores, lote):
+    """
+    Un UPDATE ... WHERE id IN (...) por valor distinto (y por lote): los
+    días hábiles toman pocos valores, así que son pocas sentencias; un
+    bulk_update (CASE por fila) con 100k filas tarda decenas de segundos.
+    """
+    orden = np.argsort(valores, kind="stable")
+    ids, valores = ids[orden], valores[orden]
+    cortes = np.flatnonzero(np.diff(valores)) + 1
+    for grupo_ids, grupo_valores in zip(np.split(ids, cortes), np.split(valores, cortes)):
+        if not len(grupo_ids):
+            continue
+        for i in range(0, len(grupo_ids), lote):
+            SolicitudAusencia.objects.filter(id__in=grupo_ids[i:i + lote].tolist()).update(
+                dias_habiles=int(grupo_valores[0])
+            )
+
+
+def recalcular_por_feriado(empresa_id, fecha):
+    """
+    Tras crear/borrar un feriado: solo las solicitudes pendientes que lo
+    cruzan (las ya decididas conservan lo aprobado).
+    """
+    return recalcular(empresa_id=empresa_id, desde=fecha, hasta=fecha, estados=[1])
@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.ausencias.saldos import LOTE, conciliar
+
+
+class Command(BaseCommand):
+    help = "Recalcula SaldoVacaciones.dias_tomados/dias_disponibles desde las solicitudes de vacaciones aprobadas"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--empresa-id", type=int, default=None, help="Solo una empresa")
+        parser.add_argument("--lote", type=int, default=LOTE, help="Filas por UPDATE/INSERT")
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        r = conciliar(empresa_id=options["empresa_id"], lote=options["lote"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Saldos revisados: {r['revisados']}, corregidos: {r['corregidos']} "
+            f"({time.perf_counter() - inicio:.1f} s)"
+        ))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from apps.ausencias.dias_habiles import LOTE, recalcular
+
+
+class Command(BaseCommand):
+    help = "Recalcula SolicitudAusencia.dias_habiles (turno del empleado + feriados) en bloque"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--empresa-id", type=int, default=None, help="Solo una empresa")
+        parser.add_argument("--desde", type=parse_date, default=None, help="AAAA-MM-DD: solicitudes que terminan desde")
+        parser.add_argument("--hasta", type=parse_date, default=None, help="AAAA-MM-DD: solicitudes que empiezan hasta")
+        parser.add_argument("--estado", type=int, action="append", default=None,
+                            help="Solo esos estados (1 pendiente, 2 aprobado...); se puede repetir")
+        parser.add_argument("--lote", type=int, default=LOTE, help="Ids por UPDATE")
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        r = recalcular(
+            empresa_id=options["empresa_id"], desde=options["desde"], hasta=options["hasta"],
+            estados=options["estado"], lote=options["lote"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Solicitudes revisadas: {r['revisadas']}, actualizadas: {r['actualizadas']} "
+            f"({time.perf_counter() - inicio:.1f} s)"
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ausencias', '0002_alter_aprobacionausencia_aprobador_and_more'),
+        ('core', '0002_alter_puesto_empresa_alter_puesto_unidad_and_more'),
+        ('empleados', '0002_alter_contrato_empleado_alter_contrato_empresa_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='solicitudausencia',
+            index=models.Index(fields=['empresa', 'estado', 'creada_el'], name='solicitud_emp_est_creada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitudausencia',
+            index=models.Index(fields=['empresa', 'empleado', 'creada_el'], name='solicitud_emp_empl_creada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='solicitudausencia',
+            index=models.Index(condition=models.Q(('estado', 1)), fields=['empresa', 'creada_el'], name='solicitud_pendientes_idx'),
+        ),
+    ]
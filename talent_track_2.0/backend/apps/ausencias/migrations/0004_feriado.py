@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 17:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ausencias', '0003_solicitudausencia_solicitud_emp_est_creada_idx_and_more'),
+        ('core', '0004_politicaretencion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Feriado',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('fecha', models.DateField()),
+                ('nombre', models.CharField(max_length=150)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.empresa')),
+            ],
+            options={
+                'db_table': 'feriado',
+                'constraints': [models.UniqueConstraint(fields=('empresa', 'fecha'), name='feriado_empresa_fecha_uniq')],
+            },
+        ),
+    ]
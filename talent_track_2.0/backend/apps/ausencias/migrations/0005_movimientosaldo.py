@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 17:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ausencias', '0004_feriado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovimientoSaldo',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('tipo', models.SmallIntegerField()),
+                ('dias', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('creado_el', models.DateTimeField()),
+                ('saldo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos', to='ausencias.saldovacaciones')),
+                ('solicitud', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='ausencias.solicitudausencia')),
+            ],
+            options={
+                'db_table': 'movimientosaldo',
+            },
+        ),
+    ]
@@ -14,6 +14,23 @@ class TipoAusencia(models.Model):
         db_table = 'tipoausencia'
 
 
+class Feriado(models.Model):
+    """
+    Calendario de feriados de la empresa (no cuentan como días hábiles,
+    ver apps/ausencias/dias_habiles.py).
+    """
+    id = models.BigAutoField(primary_key=True)
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
+    fecha = models.DateField()
+    nombre = models.CharField(max_length=150)
+
+    class Meta:
+        db_table = 'feriado'
+        constraints = [
+            models.UniqueConstraint(fields=["empresa", "fecha"], name="feriado_empresa_fecha_uniq"),
+        ]
+
+
 class SolicitudAusencia(models.Model):
     id = models.BigAutoField(primary_key=True)
     empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
@@ -30,6 +47,16 @@ class SolicitudAusencia(models.Model):
 
     class Meta:
         db_table = 'solicitudausencia'
+        indexes = [
+            models.Index(fields=["empresa", "estado", "creada_el"], name="solicitud_emp_est_creada_idx"),
+            models.Index(fields=["empresa", "empleado", "creada_el"], name="solicitud_emp_empl_creada_idx"),
+            # bandejas de aprobación: solo pendientes (estado=1), índice pequeño
+            models.Index(
+                fields=["empresa", "creada_el"],
+                condition=models.Q(estado=1),
+                name="solicitud_pendientes_idx",
+            ),
+        ]
 
 
 class AprobacionAusencia(models.Model):
@@ -55,3 +82,25 @@ class SaldoVacaciones(models.Model):
 
     class Meta:
         db_table = 'saldovacaciones'
+
+
+class MovimientoSaldo(models.Model):
+    """
+    Libro de SaldoVacaciones: cada cambio de dias_tomados deja un
+    movimiento (ver apps/ausencias/saldos.py). La suma de dias de un saldo
+    es su dias_tomados.
+    """
+    TIPO_CONSUMO = 1
+    TIPO_REVERSO = 2
+    TIPO_AJUSTE = 3
+
+    id = models.BigAutoField(primary_key=True)
+    saldo = models.ForeignKey(SaldoVacaciones, on_delete=models.CASCADE, related_name="movimientos")
+    solicitud = models.ForeignKey(SolicitudAusencia, on_delete=models.SET_NULL, null=True, blank=True)
+    tipo = models.SmallIntegerField()
+    # positivo = días tomados; negativo = devueltos
+    dias = models.DecimalField(max_digits=5, decimal_places=2)
+    creado_el = models.DateTimeField()
+
+    class Meta:
+        db_table = 'movimientosaldo'
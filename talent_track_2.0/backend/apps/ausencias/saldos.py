@@ -0,0 +1,175 @@
+# apps/ausencias/saldos.py
+"""
+Libro de saldos de vacaciones (SaldoVacaciones + MovimientoSaldo).
+
+- Aprobar una solicitud de un tipo de vacaciones (VACACIONES_TIPOS, por
+  nombre) descuenta sus dias_habiles del saldo del periodo = año de
+  fecha_inicio; anular una aprobada los devuelve al mismo saldo.
+- Cada cambio es un movimiento + UN UPDATE con F() sobre la fila del
+  saldo bloqueada (select_for_update): dos aprobaciones simultáneas del
+  mismo empleado se serializan y ninguna pisa a la otra ni deja pasar un
+  saldo insuficiente.
+- Sin saldo para ese periodo la aprobación sigue sin movimiento (la
+  empresa no lleva saldo de ese año).
+
+conciliar(...) recalcula dias_tomados de todos los saldos desde las
+solicitudes aprobadas con UNA consulta agregada y deja un movimiento de
+ajuste por cada diferencia (p. ej. tras recalcular_dias_habiles sobre
+aprobadas o saldos creados después de aprobar).
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from apps.ausencias.models import MovimientoSaldo, SaldoVacaciones, SolicitudAusencia
+
+TIPOS = getattr(settings, "VACACIONES_TIPOS", ("vacaciones",))
+LOTE = getattr(settings, "SALDOS_CONCILIAR_LOTE", 1000)
+
+ESTADO_APROBADO = 2
+
+
+class SaldoInsuficiente(Exception):
+    def __init__(self, disponible, solicitados):
+        self.disponible, self.solicitados = disponible, solicitados
+        super().__init__(f"Saldo de vacaciones insuficiente: disponible {disponible}, solicitados {solicitados}.")
+
+
+def filtro_vacaciones(prefijo="tipo_ausencia__"):
+    """
+    Q de los tipos de ausencia que descuentan saldo (nombre sin distinguir mayúsculas).
+    """
+    q = Q(pk__in=[])
+    for nombre in TIPOS:
+        q |= Q(**{f"{prefijo}nombre__iexact": nombre})
+    return q
+
+
+def es_vacaciones(solicitud):
+    nombre = (solicitud.tipo_ausencia.nombre or "").strip().lower()
+    return nombre in {t.lower() for t in TIPOS}
+
+
+def periodo_de(solicitud):
+    return str(solicitud.fecha_inicio.year)
+
+
+def _mover(saldo_id, solicitud, tipo, dias):
+    # F(): el incremento lo hace la BD sobre el valor vigente de la fila
+    SaldoVacaciones.objects.filter(id=saldo_id).update(
+        dias_tomados=F("dias_tomados") + dias,
+        dias_disponibles=F("dias_disponibles") - dias,
+    )
+    return MovimientoSaldo.objects.create(
+        saldo_id=saldo_id, solicitud=solicitud, tipo=tipo, dias=dias, creado_el=timezone.now(),
+    )
+
+
+def registrar_consumo(solicitud):
+    """
+    Descuenta la solicitud (recién aprobada) de su saldo. Llamar dentro de
+    transaction.atomic(); SaldoInsuficiente revierte la transacción.
+    """
+    if not es_vacaciones(solicitud):
+        return None
+    saldo = (
+        SaldoVacaciones.objects
+        .select_for_update()
+        .filter(empresa_id=solicitud.empresa_id, empleado_id=solicitud.empleado_id, periodo=periodo_de(solicitud))
+        .order_by("id")
+        .first()
+    )
+    if not saldo:
+        return None
+    dias = Decimal(solicitud.dias_habiles)
+    if saldo.dias_disponibles < dias:
+        raise SaldoInsuficiente(saldo.dias_disponibles, dias)
+    return _mover(saldo.id, solicitud, MovimientoSaldo.TIPO_CONSUMO, dias)
+
+
+def registrar_reverso(solicitud):
+    """
+    Devuelve lo que la solicitud tenga descontado (neto de sus
+    movimientos, en el saldo donde se descontó). Dentro de transaction.atomic().
+    """
+    netos = dict(
+        MovimientoSaldo.objects
+        .filter(solicitud=solicitud)
+        .values("saldo_id")
+        .annotate(neto=Sum("dias"))
+        .values_list("saldo_id", "neto")
+    )
+    pendientes = {saldo_id: neto for saldo_id, neto in netos.items() if neto}
+    if not pendientes:
+        return []
+    # mismo bloqueo que el consumo, en orden de id para no cruzarse
+    list(SaldoVacaciones.objects.select_for_update().filter(id__in=pendientes).order_by("id").values_list("id"))
+    return [
+        _mover(saldo_id, solicitud, MovimientoSaldo.TIPO_REVERSO, -neto)
+        for saldo_id, neto in sorted(pendientes.items())
+    ]
+
+
+def conciliar(empresa_id=None, saldo_ids=None, lote=LOTE):
+    """
+    dias_tomados = suma de dias_habiles de las solicitudes de vacaciones
+    aprobadas del empleado con fecha_inicio en el año del periodo ->
+    {"revisados": n, "corregidos": n}
+    """
+    saldos = SaldoVacaciones.objects.all()
+    if empresa_id:
+        saldos = saldos.filter(empresa_id=empresa_id)
+    if saldo_ids is not None:
+        saldos = saldos.filter(id__in=saldo_ids)
+
+    with transaction.atomic():
+        # bloquear primero los saldos: una aprobación en curso espera y suma
+        # con F() sobre lo conciliado, o ya está confirmada y entra en el agregado
+        filas = list(
+            saldos.select_for_update().order_by("id")
+            .values_list("id", "empleado_id", "periodo", "dias_tomados")
+        )
+        if not filas:
+            return {"revisados": 0, "corregidos": 0}
+
+        aprobadas = SolicitudAusencia.objects.filter(filtro_vacaciones(), estado=ESTADO_APROBADO)
+        if empresa_id:
+            aprobadas = aprobadas.filter(empresa_id=empresa_id)
+        if saldo_ids is not None:
+            aprobadas = aprobadas.filter(empleado_id__in={f[1] for f in filas})
+        tomados = {
+            (empleado_id, str(anio)): total
+            for empleado_id, anio, total in (
+                aprobadas
+                .annotate(anio=ExtractYear("fecha_inicio"))
+                .values("empleado_id", "anio")
+                .annotate(total=Sum("dias_habiles"))
+                .values_list("empleado_id", "anio", "total")
+            )
+        }
+
+        por_valor, ajustes = defaultdict(list), []
+        ahora = timezone.now()
+        for saldo_id, empleado_id, periodo, actual in filas:
+            esperado = Decimal(tomados.get((empleado_id, (periodo or "").strip()), 0))
+            if esperado == actual:
+                continue
+            por_valor[esperado].append(saldo_id)
+            ajustes.append(MovimientoSaldo(
+                saldo_id=saldo_id, tipo=MovimientoSaldo.TIPO_AJUSTE, dias=esperado - actual, creado_el=ahora,
+            ))
+
+        # un UPDATE por valor (y lote), como dias_habiles._guardar: los días
+        # tomados toman pocos valores y bulk_update arma un CASE por fila
+        for esperado, ids in por_valor.items():
+            for i in range(0, len(ids), lote):
+                SaldoVacaciones.objects.filter(id__in=ids[i:i + lote]).update(
+                    dias_tomados=esperado, dias_disponibles=F("dias_asignados") - esperado,
+                )
+        MovimientoSaldo.objects.bulk_create(ajustes, batch_size=lote)
+    return {"revisados": len(filas), "corregidos": len(ajustes)}
@@ -46,6 +46,7 @@ class TipoAusenciaUpdateSerializer(serializers.ModelSerializer):
 
 from rest_framework import serializers
 from datetime import timedelta
+from apps.ausencias.dias_habiles import dias_habiles
 from apps.ausencias.models import SolicitudAusencia, TipoAusencia
 
 ESTADO_LABEL = {
@@ -92,5 +93,8 @@ class CrearSolicitudAusenciaSerializer(serializers.Serializer):
         if ff < fi:
             raise serializers.ValidationError("fecha_fin no puede ser menor a fecha_inicio")
 
-        attrs["dias_habiles"] = (ff - fi).days + 1
+        # siempre del servidor: turno del empleado + feriados de la empresa
+        attrs["dias_habiles"] = dias_habiles(self.context["empresa_id"], self.context["empleado_id"], fi, ff)
+        if attrs["dias_habiles"] == 0:
+            raise serializers.ValidationError("El rango no incluye días hábiles.")
         return attrs
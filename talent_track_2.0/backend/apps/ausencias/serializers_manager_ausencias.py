@@ -12,6 +12,7 @@ ESTADO_SOLICITUD = {
 ACCION_APROBACION = {
     1: "aprobado",
     2: "rechazado",
+    3: "anulado",
 }
 
 
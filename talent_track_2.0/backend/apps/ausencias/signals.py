@@ -0,0 +1,24 @@
+# apps/ausencias/signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.ausencias import dias_habiles
+from apps.ausencias.models import Feriado
+
+
+@receiver(pre_save, sender=Feriado)
+def recordar_fecha_anterior(sender, instance, **kwargs):
+    # si se mueve el feriado, también cambian las solicitudes de la fecha vieja
+    instance._fecha_anterior = (
+        Feriado.objects.filter(id=instance.id).values_list("fecha", flat=True).first()
+        if instance.id else None
+    )
+
+
+@receiver(post_save, sender=Feriado)
+@receiver(post_delete, sender=Feriado)
+def recalcular_por_feriado(sender, instance, **kwargs):
+    # el calendario en memoria se rearma y las pendientes que cruzan la fecha se recalculan
+    dias_habiles.invalidar(instance.empresa_id)
+    for fecha in {instance.fecha, getattr(instance, "_fecha_anterior", None)} - {None}:
+        dias_habiles.recalcular_por_feriado(instance.empresa_id, fecha)
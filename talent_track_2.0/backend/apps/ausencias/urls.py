@@ -20,6 +20,11 @@ from apps.ausencias.views_rrhh_saldo_vacaciones import (
     RRHHEmpleadosEmpresaVacacionesHelperAPIView,
 )
 
+from apps.ausencias.views_rrhh_feriados import (
+    RRHHFeriadosListCreateAPIView,
+    RRHHFeriadoDetailAPIView,
+)
+
 from .views import SolicitudesEmpleadoAPIView, SolicitudEmpleadoDetalleAPIView
 from apps.ausencias.views import TiposAusenciaEmpleadoAPIView
 
@@ -39,6 +44,9 @@ urlpatterns = [
     path("rrhh/vacaciones/saldos/<int:pk>/", RRHHSaldosVacacionesPatchDeleteAPIView.as_view(), name="rrhh_saldo_vacaciones_patch_delete"),
     path("rrhh/vacaciones/helpers/empleados/", RRHHEmpleadosEmpresaVacacionesHelperAPIView.as_view(), name="rrhh_vacaciones_helpers_empleados"),
 
+    path("rrhh/feriados/", RRHHFeriadosListCreateAPIView.as_view(), name="rrhh_feriados"),
+    path("rrhh/feriados/<int:pk>/", RRHHFeriadoDetailAPIView.as_view(), name="rrhh_feriado_detail"),
+
     path("empleado/ausencias/", SolicitudesEmpleadoAPIView.as_view()),
     path("empleado/ausencias/<int:pk>/", SolicitudEmpleadoDetalleAPIView.as_view()),
     path("empleado/ausencias/<int:pk>/cancelar/", SolicitudEmpleadoDetalleAPIView.as_view()),
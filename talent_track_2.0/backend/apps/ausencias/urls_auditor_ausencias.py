@@ -2,12 +2,14 @@
 from django.urls import path
 from apps.ausencias.views_auditor_ausencias import (
     AuditorSolicitudesAusenciasAPIView,
+    AuditorSolicitudesAusenciasExportAPIView,
     AuditorAprobacionesAusenciasAPIView,
     AuditorSaldosVacacionesAPIView,
 )
 
 urlpatterns = [
     path("auditor/ausencias/solicitudes/", AuditorSolicitudesAusenciasAPIView.as_view()),
+    path("auditor/ausencias/solicitudes/export/", AuditorSolicitudesAusenciasExportAPIView.as_view()),
     path("auditor/ausencias/aprobaciones/", AuditorAprobacionesAusenciasAPIView.as_view()),
     path("auditor/ausencias/saldos-vacaciones/", AuditorSaldosVacacionesAPIView.as_view()),
 ]
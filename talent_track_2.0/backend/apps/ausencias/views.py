@@ -58,7 +58,7 @@ from rest_framework import status
 from django.utils import timezone
 
 from apps.ausencias.models import SolicitudAusencia, TipoAusencia
-from apps.usuarios.models import UsuarioRol
+from apps.usuarios.contexto import get_contexto
 from .serializers import (
     SolicitudAusenciaEmpleadoSerializer,
     CrearSolicitudAusenciaSerializer,
@@ -66,15 +66,13 @@ from .serializers import (
 
 
 def ctx(request):
-    u = request.user.usuario
-    return u.empresa_id, u.empleado_id, u.id
+    c = get_contexto(request)
+    return c.empresa_id, c.empleado_id, c.usuario_id
 
 
 def require_empleado(request):
-    return UsuarioRol.objects.filter(
-        usuario_id=request.user.usuario.id,
-        rol__nombre="empleado"
-    ).exists()
+    ctx = get_contexto(request)
+    return bool(ctx and ctx.usuario_id and ctx.tiene_rol("empleado"))
 
 
 class SolicitudesEmpleadoAPIView(APIView):
@@ -97,11 +95,13 @@ class SolicitudesEmpleadoAPIView(APIView):
         if not require_empleado(request):
             return Response(status=401)
 
-        ser = CrearSolicitudAusenciaSerializer(data=request.data)
-        ser.is_valid(raise_exception=True)
-
         empresa_id, empleado_id, _ = ctx(request)
 
+        ser = CrearSolicitudAusenciaSerializer(
+            data=request.data, context={"empresa_id": empresa_id, "empleado_id": empleado_id}
+        )
+        ser.is_valid(raise_exception=True)
+
         obj = SolicitudAusencia.objects.create(
             empresa_id=empresa_id,
             empleado_id=empleado_id,
@@ -138,7 +138,9 @@ class SolicitudEmpleadoDetalleAPIView(APIView):
         if not obj:
             return Response({"detail": "No editable"}, status=400)
 
-        ser = CrearSolicitudAusenciaSerializer(data=request.data)
+        ser = CrearSolicitudAusenciaSerializer(
+            data=request.data, context={"empresa_id": empresa_id, "empleado_id": empleado_id}
+        )
         ser.is_valid(raise_exception=True)
 
         for k, v in ser.validated_data.items():
@@ -170,16 +172,17 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.ausencias.models import TipoAusencia
-from apps.usuarios.models import UsuarioRol
+from apps.usuarios.contexto import get_contexto
 
 
 def _ctx(request):
-    u = request.user.usuario
-    return u.empresa_id, u.empleado_id, u.id
+    ctx = get_contexto(request)
+    return ctx.empresa_id, ctx.empleado_id, ctx.usuario_id
 
 
 def _require_empleado(request):
-    return UsuarioRol.objects.filter(usuario_id=request.user.usuario.id, rol__nombre="empleado").exists()
+    ctx = get_contexto(request)
+    return bool(ctx and ctx.usuario_id and ctx.tiene_rol("empleado"))
 
 
 class TiposAusenciaEmpleadoAPIView(APIView):
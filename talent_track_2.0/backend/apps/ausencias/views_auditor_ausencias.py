@@ -2,30 +2,39 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from apps.usuarios.models import Usuario
+from apps.usuarios.contexto import get_contexto
+from apps.usuarios.permissions import con_rol
+from apps.core.exportacion import filtro_rango, parse_rango, respuesta_csv
+from apps.core.fechas import zona_empresa
+from apps.core.paginacion import paginar_keyset, respuesta_paginada
 from apps.ausencias.models import SolicitudAusencia, AprobacionAusencia, SaldoVacaciones
 from apps.ausencias.serializers_auditor_ausencias import (
     AuditorSolicitudAusenciaSerializer,
     AuditorAprobacionAusenciaSerializer,
     AuditorSaldoVacacionesSerializer,
+    ESTADO_SOLICITUD,
 )
 
+COLUMNAS_SOLICITUDES = [
+    ("id", "id"),
+    ("nombres", "empleado__nombres"),
+    ("apellidos", "empleado__apellidos"),
+    ("email", "empleado__email"),
+    ("tipo_ausencia", "tipo_ausencia__nombre"),
+    ("fecha_inicio", "fecha_inicio"),
+    ("fecha_fin", "fecha_fin"),
+    ("dias_habiles", "dias_habiles"),
+    ("motivo", "motivo"),
+    ("estado", "estado", ESTADO_SOLICITUD.get),
+    ("flujo_actual", "flujo_actual"),
+    ("creada_el", "creada_el"),
+]
 
-def _get_usuario_tt(request):
-    auth_user = getattr(request, "user", None)
-    if not auth_user or not getattr(auth_user, "is_authenticated", False):
-        return None
-
-    usuario_id = getattr(auth_user, "usuario_id", None)
-    if not usuario_id:
-        return None
 
-    return (
-        Usuario.objects
-        .select_related("empresa", "empleado")
-        .filter(id=usuario_id)
-        .first()
-    )
+def _get_usuario_tt(request):
+    # contexto del token (apps/usuarios/contexto.py): sin consultar usuarios.Usuario
+    ctx = get_contexto(request)
+    return ctx if ctx and ctx.usuario_id else None
 
 
 class AuditorSolicitudesAusenciasAPIView(APIView):
@@ -39,10 +48,10 @@ class AuditorSolicitudesAusenciasAPIView(APIView):
             SolicitudAusencia.objects
             .select_related("empleado", "tipo_ausencia")
             .filter(empresa_id=auditor.empresa_id)
-            .order_by("-creada_el", "-id")
         )
+        solicitudes, next_cursor = paginar_keyset(request, qs, ("-creada_el", "-id"))
 
-        return Response(AuditorSolicitudAusenciaSerializer(qs, many=True).data, status=200)
+        return respuesta_paginada(request, AuditorSolicitudAusenciaSerializer(solicitudes, many=True).data, next_cursor)
 
 
 class AuditorAprobacionesAusenciasAPIView(APIView):
@@ -63,10 +72,10 @@ class AuditorAprobacionesAusenciasAPIView(APIView):
                 "aprobador__empleado",
             )
             .filter(solicitud__empresa_id=auditor.empresa_id)
-            .order_by("-fecha", "-id")
         )
+        aprobaciones, next_cursor = paginar_keyset(request, qs, ("-fecha", "-id"))
 
-        return Response(AuditorAprobacionAusenciaSerializer(qs, many=True).data, status=200)
+        return respuesta_paginada(request, AuditorAprobacionAusenciaSerializer(aprobaciones, many=True).data, next_cursor)
 
 
 class AuditorSaldosVacacionesAPIView(APIView):
@@ -84,3 +93,22 @@ class AuditorSaldosVacacionesAPIView(APIView):
         )
 
         return Response(AuditorSaldoVacacionesSerializer(qs, many=True).data, status=200)
+
+
+class AuditorSolicitudesAusenciasExportAPIView(APIView):
+    # GET /api/auditor/ausencias/solicitudes/export/?desde=&hasta= (por creada_el)
+    permission_classes = [con_rol("auditor")]
+
+    def get(self, request):
+        auditor = _get_usuario_tt(request)
+        if not auditor or not auditor.empresa_id:
+            return Response({"detail": "No autorizado."}, status=401)
+
+        desde, hasta = parse_rango(request.query_params)
+        tz = zona_empresa(auditor.empresa_id)
+        qs = (
+            SolicitudAusencia.objects
+            .filter(filtro_rango("creada_el", desde, hasta, tz), empresa_id=auditor.empresa_id)
+            .order_by("-creada_el", "-id")
+        )
+        return respuesta_csv("solicitudes_ausencia.csv", qs, COLUMNAS_SOLICITUDES, tz)
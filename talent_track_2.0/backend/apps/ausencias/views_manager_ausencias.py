@@ -1,11 +1,13 @@
 # apps/ausencias/views_manager_ausencias.py
+from django.db import transaction
 from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from apps.usuarios.models import Usuario
+from apps.usuarios.contexto import get_contexto
+from apps.ausencias import saldos
 from apps.ausencias.models import SolicitudAusencia, AprobacionAusencia
-from apps.notificaciones.models import Notificacion
+from apps.notificaciones.outbox import encolar
 
 from apps.ausencias.serializers_manager_ausencias import (
     SolicitudPendienteManagerSerializer,
@@ -22,15 +24,9 @@ TITULO_APROBACION = "Aprobacion Solicitud"
 
 
 def _get_usuario_tt(request):
-    auth_user = getattr(request, "user", None)
-    if not auth_user or not getattr(auth_user, "is_authenticated", False):
-        return None
-
-    usuario_id = getattr(auth_user, "usuario_id", None)
-    if not usuario_id:
-        return None
-
-    return Usuario.objects.select_related("empresa", "empleado").filter(id=usuario_id).first()
+    # contexto del token (apps/usuarios/contexto.py): sin consultar usuarios.Usuario
+    ctx = get_contexto(request)
+    return ctx if ctx and ctx.usuario_id else None
 
 
 def _msg_aprobado(nombres, apellidos):
@@ -141,31 +137,41 @@ class ManagerSolicitudDecidirAPIView(APIView):
         if sol.estado != ESTADO_PENDIENTE:
             return Response({"detail": "Solo se pueden decidir solicitudes en estado pendiente."}, status=400)
 
-        # 1) PATCH SolicitudAusencia (estado)
-        sol.estado = ESTADO_APROBADO if accion == 1 else ESTADO_RECHAZADO
-        sol.save(update_fields=["estado"])
-
-        # 2) POST AprobacionAusencia (usa nombres correctos del modelo!)
-        AprobacionAusencia.objects.create(
-            solicitud_id=sol.id,
-            aprobador_id=u.id,  # usuario_id del manager
-            accion=accion,
-            comentario=comentario if comentario else "",
-            fecha=timezone.now(),
-        )
-
-        # 3) POST Notificacion
-        emp = sol.empleado
-        Notificacion.objects.create(
-            empresa_id=u.empresa_id,
-            empleado_id=emp.id,
-            canal=CANAL_WEBHOOK,
-            titulo=TITULO_APROBACION,
-            mensaje=_msg_aprobado(emp.nombres, emp.apellidos) if accion == 1 else _msg_rechazado(emp.nombres, emp.apellidos),
-            enviada_el=timezone.now(),
-            leida_el=None,
-            accion_url=None,
-        )
+        try:
+            with transaction.atomic():
+                # fila bloqueada: dos decisiones simultáneas no aprueban (ni descuentan) dos veces
+                if not SolicitudAusencia.objects.select_for_update().filter(id=sol.id, estado=ESTADO_PENDIENTE).exists():
+                    return Response({"detail": "Solo se pueden decidir solicitudes en estado pendiente."}, status=400)
+
+                # 1) PATCH SolicitudAusencia (estado)
+                sol.estado = ESTADO_APROBADO if accion == 1 else ESTADO_RECHAZADO
+                sol.save(update_fields=["estado"])
+
+                # 2) POST AprobacionAusencia (usa nombres correctos del modelo!)
+                AprobacionAusencia.objects.create(
+                    solicitud_id=sol.id,
+                    aprobador_id=u.usuario_id,  # usuario_id del manager
+                    accion=accion,
+                    comentario=comentario if comentario else "",
+                    fecha=timezone.now(),
+                )
+
+                # 3) saldo de vacaciones (F() sobre la fila bloqueada)
+                if accion == 1:
+                    saldos.registrar_consumo(sol)
+
+                # 4) Notificacion (outbox: se confirma junto con la decisión;
+                # la crea el worker procesar_notificaciones)
+                emp = sol.empleado
+                encolar(
+                    u.empresa_id,
+                    TITULO_APROBACION,
+                    _msg_aprobado(emp.nombres, emp.apellidos) if accion == 1 else _msg_rechazado(emp.nombres, emp.apellidos),
+                    empleado_ids=[emp.id],
+                    canal=CANAL_WEBHOOK,
+                )
+        except saldos.SaldoInsuficiente as e:
+            return Response({"detail": str(e)}, status=400)
 
         return Response(
             {
@@ -196,7 +202,7 @@ class ManagerAprobacionesHechasAPIView(APIView):
                 "aprobador__empleado",
             )
             .filter(
-                aprobador_id=u.id,
+                aprobador_id=u.usuario_id,
                 solicitud__empresa_id=u.empresa_id,  # por coherencia
             )
             .order_by("-fecha", "-id")
@@ -8,10 +8,12 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
+from apps.ausencias import saldos
 from apps.ausencias.models import SolicitudAusencia, AprobacionAusencia
-from apps.notificaciones.models import Notificacion
+from apps.notificaciones.outbox import CANAL_WEBHOOK, encolar
 from apps.empleados.models import Empleado
 from apps.core.models import UnidadOrganizacional, Puesto
+from apps.usuarios.contexto import get_contexto
 
 
 # =========================
@@ -23,21 +25,19 @@ def require_rrhh(request):
     - empresa_id: int
     - usuario_id: int
 
-    Ajusta este helper a tu implementación real si ya lo tienes en otro lado.
+    Se arma desde el token (apps/usuarios/contexto.py), sin consultar la BD.
     """
-    usuario = getattr(request.user, "usuario", None)
-    if not usuario:
-        # si tu auth no usa request.user.usuario, ajusta aquí
+    ctx = get_contexto(request)
+    if not ctx or not ctx.usuario_id:
         raise PermissionError("Usuario no autenticado en tabla negocio usuarios.Usuario")
 
     # empresa del usuario (RRHH siempre tiene empresa)
-    if not usuario.empresa_id:
+    if not ctx.empresa_id:
         raise PermissionError("El usuario no tiene empresa asignada.")
 
     return {
-        "empresa_id": usuario.empresa_id,
-        "usuario_id": usuario.id,
-        "usuario": usuario,
+        "empresa_id": ctx.empresa_id,
+        "usuario_id": ctx.usuario_id,
     }
 
 
@@ -80,12 +80,26 @@ ESTADO_SOL_LABEL = {
 ACCION_APROB_LABEL = {
     1: "aprobado",
     2: "rechazado",
+    3: "anulado",
 }
 
 
 # =========================
 # HU01 - Solicitudes pendientes (RRHH)
 # =========================
+def _msg_anulada(emp_nombre, devueltos):
+    anulada = "Le informamos que su solicitud de ausencia aprobada ha sido anulada por Recursos Humanos."
+    if devueltos:
+        # solo si el reverso registró movimientos de saldo (vacaciones)
+        anulada += " Los días descontados han sido devueltos a su saldo de vacaciones."
+    return (
+        f"Estimado/a {emp_nombre}:\n\n"
+        f"{anulada}\n\n"
+        "Para mayor detalle sobre esta decisión, puede revisar la información disponible en el sistema.\n\n"
+        "Agradecemos su atención."
+    )
+
+
 class RRHHSolicitudesAusenciasPendientesAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -181,7 +195,8 @@ class RRHHSolicitudAusenciaDetalleAPIView(APIView):
 # =========================
 # HU02 - Decidir (aprobar/rechazar) (RRHH)
 # PATCH /api/rrhh/ausencias/solicitudes/<id>/decidir/
-# body: { accion: 1|2, comentario?: string|null }
+# body: { accion: 1|2|3, comentario?: string|null }
+# accion 3 (anular): una aprobada pasa a cancelada y devuelve el saldo
 # =========================
 class RRHHSolicitudAusenciaDecidirAPIView(APIView):
     permission_classes = [IsAuthenticated]
@@ -194,7 +209,7 @@ class RRHHSolicitudAusenciaDecidirAPIView(APIView):
         raw_accion = request.data.get("accion", None)
         comentario = request.data.get("comentario", None)
 
-        # Normalizar accion: acepta 1/2, "1"/"2", "aprobar"/"rechazar"
+        # Normalizar accion: acepta 1/2/3, "1"/"2"/"3", "aprobar"/"rechazar"/"anular"
         accion = None
 
         if raw_accion is None:
@@ -208,25 +223,31 @@ class RRHHSolicitudAusenciaDecidirAPIView(APIView):
                 accion = 1
             elif s in ("2", "rechazar", "rechazado", "rechazada"):
                 accion = 2
+            elif s in ("3", "anular", "anulado", "anulada"):
+                accion = 3
             else:
                 accion = None
 
-        if accion not in (1, 2):
-            return Response({"accion": "accion debe ser 1 (aprobar) o 2 (rechazar)."}, status=400)
+        if accion not in (1, 2, 3):
+            return Response({"accion": "accion debe ser 1 (aprobar), 2 (rechazar) o 3 (anular)."}, status=400)
 
         # comentario no puede ser None porque tu modelo NO permite null
         comentario_db = (comentario or "").strip()
 
         sol = (
             SolicitudAusencia.objects
-            .select_related("empleado")
+            .select_related("empleado", "tipo_ausencia")
             .filter(id=pk, empresa_id=empresa_id)
             .first()
         )
         if not sol:
             return Response({"detail": "No encontrado."}, status=404)
 
-        if sol.estado != 1:
+        # anular solo aplica a aprobadas; aprobar/rechazar a pendientes
+        estado_requerido = 2 if accion == 3 else 1
+        if sol.estado != estado_requerido:
+            if accion == 3:
+                return Response({"detail": "Solo se puede anular una solicitud aprobada."}, status=400)
             return Response({"detail": "Solo se puede decidir una solicitud en estado pendiente."}, status=400)
 
         now = timezone.now()
@@ -241,7 +262,7 @@ class RRHHSolicitudAusenciaDecidirAPIView(APIView):
                 "Para consultar fechas, tipo de ausencia u otros detalles asociados, le recomendamos revisar la información disponible en el sistema.\n\n"
                 "Agradecemos su atención."
             )
-        else:
+        elif accion == 2:
             nuevo_estado = 3
             msg = (
                 f"Estimado/a {emp_nombre}:\n\n"
@@ -249,31 +270,38 @@ class RRHHSolicitudAusenciaDecidirAPIView(APIView):
                 "Para mayor detalle sobre esta decisión, puede revisar la información disponible en el sistema.\n\n"
                 "Agradecemos su atención."
             )
-
-        with transaction.atomic():
-            sol.estado = nuevo_estado
-            sol.save()
-
-            AprobacionAusencia.objects.create(
-                solicitud=sol,
-                aprobador_id=usuario_id,
-                accion=accion,
-                comentario=comentario_db,
-                fecha=now,
-            )
-
-            if empleado:
-                Notificacion.objects.create(
-                    empresa_id=empresa_id,
-                    empleado_id=empleado.id,
-                    canal=4,
-                    titulo="Aprobacion Solicitud",
-                    mensaje=msg,
-                    enviada_el=now,
-                    leida_el=None,
-                    accion_url=None,
+        else:
+            nuevo_estado = 4
+            msg = None  # depende de si el reverso devuelve días (ver abajo)
+
+        try:
+            with transaction.atomic():
+                # fila bloqueada: dos decisiones simultáneas no descuentan (ni devuelven) dos veces
+                if not SolicitudAusencia.objects.select_for_update().filter(id=sol.id, estado=estado_requerido).exists():
+                    return Response({"detail": "La solicitud ya fue decidida."}, status=400)
+
+                sol.estado = nuevo_estado
+                sol.save()
+
+                if accion == 1:
+                    saldos.registrar_consumo(sol)
+                elif accion == 3:
+                    msg = _msg_anulada(emp_nombre, devueltos=bool(saldos.registrar_reverso(sol)))
+
+                AprobacionAusencia.objects.create(
+                    solicitud=sol,
+                    aprobador_id=usuario_id,
+                    accion=accion,
+                    comentario=comentario_db,
+                    fecha=now,
                 )
 
+                if empleado:
+                    # outbox: se confirma junto con la aprobación
+                    encolar(empresa_id, "Aprobacion Solicitud", msg, empleado_ids=[empleado.id], canal=CANAL_WEBHOOK)
+        except saldos.SaldoInsuficiente as e:
+            return Response({"detail": str(e)}, status=400)
+
         return Response({"ok": True, "estado": sol.estado, "estado_label": ESTADO_SOL_LABEL.get(sol.estado)}, status=200)
 
 
@@ -0,0 +1,67 @@
+# apps/ausencias/views_rrhh_feriados.py
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_date
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from apps.ausencias.models import Feriado
+from apps.usuarios.contexto import get_contexto
+from apps.usuarios.permissions import con_rol
+
+
+def to_dict(obj: Feriado):
+    return {"id": obj.id, "fecha": obj.fecha.isoformat(), "nombre": obj.nombre}
+
+
+class RRHHFeriadosListCreateAPIView(APIView):
+    """
+    GET  /api/rrhh/feriados/?anio=2026
+    POST /api/rrhh/feriados/   body: { "fecha": "2026-05-01", "nombre": "Día del Trabajo" }
+
+    Calendario de feriados de la empresa: no cuentan como días hábiles de
+    las ausencias. Al crear/borrar se recalculan las solicitudes pendientes
+    que cruzan la fecha (ver apps/ausencias/signals.py).
+    """
+    permission_classes = [con_rol("rrhh")]
+
+    def get(self, request):
+        ctx = get_contexto(request)
+        qs = Feriado.objects.filter(empresa_id=ctx.empresa_id).order_by("fecha")
+        anio = request.query_params.get("anio")
+        if anio:
+            if not anio.isdigit():
+                return Response({"anio": "Año inválido."}, status=400)
+            qs = qs.filter(fecha__year=int(anio))
+        return Response([to_dict(x) for x in qs], status=200)
+
+    def post(self, request):
+        ctx = get_contexto(request)
+        fecha = parse_date(str(request.data.get("fecha") or ""))
+        nombre = (request.data.get("nombre") or "").strip()
+
+        if not fecha:
+            return Response({"fecha": "Fecha inválida (AAAA-MM-DD)."}, status=400)
+        if not nombre:
+            return Response({"nombre": "Nombre es obligatorio."}, status=400)
+
+        try:
+            with transaction.atomic():
+                obj = Feriado.objects.create(empresa_id=ctx.empresa_id, fecha=fecha, nombre=nombre[:150])
+        except IntegrityError:
+            return Response({"fecha": "Ya existe un feriado en esa fecha."}, status=400)
+        return Response(to_dict(obj), status=201)
+
+
+class RRHHFeriadoDetailAPIView(APIView):
+    """
+    DELETE /api/rrhh/feriados/<id>/
+    """
+    permission_classes = [con_rol("rrhh")]
+
+    def delete(self, request, pk):
+        ctx = get_contexto(request)
+        obj = Feriado.objects.filter(id=pk, empresa_id=ctx.empresa_id).first()
+        if not obj:
+            return Response({"detail": "No encontrado."}, status=404)
+        obj.delete()
+        return Response(status=204)
@@ -9,7 +9,9 @@ from rest_framework.permissions import IsAuthenticated
 
 from apps.usuarios.permissions import IsRRHH
 from apps.usuarios.scopes import get_scope
+from apps.core.paginacion import paginar_keyset, respuesta_paginada
 
+from apps.ausencias import saldos
 from apps.ausencias.models import SaldoVacaciones
 from apps.empleados.models import Empleado
 
@@ -31,9 +33,9 @@ class RRHHSaldosVacacionesListCreateAPIView(APIView):
             SaldoVacaciones.objects
             .select_related("empleado")
             .filter(empresa_id=empresa_id)
-            .order_by("-id")
         )
-        return Response(SaldoVacacionesListSerializer(qs, many=True).data, status=200)
+        saldos, next_cursor = paginar_keyset(request, qs, ("-id",))
+        return respuesta_paginada(request, SaldoVacacionesListSerializer(saldos, many=True).data, next_cursor)
 
     def post(self, request):
         scope = get_scope(request)
@@ -56,6 +58,8 @@ class RRHHSaldosVacacionesListCreateAPIView(APIView):
             dias_tomados=dias_tomados,
             dias_disponibles=dias_disponibles,
         )
+        # aprobaciones del periodo anteriores al saldo: se descuentan ya
+        saldos.conciliar(empresa_id=empresa_id, saldo_ids=[obj.id])
 
         obj = SaldoVacaciones.objects.select_related("empleado").get(id=obj.id)
         return Response(SaldoVacacionesListSerializer(obj).data, status=status.HTTP_201_CREATED)
@@ -86,6 +90,8 @@ class RRHHSaldosVacacionesPatchDeleteAPIView(APIView):
 
         obj.periodo = nuevo_periodo
         obj.save()
+        # otro periodo = otras solicitudes aprobadas
+        saldos.conciliar(empresa_id=empresa_id, saldo_ids=[obj.id])
 
         obj = SaldoVacaciones.objects.select_related("empleado").get(id=obj.id)
         return Response(SaldoVacacionesListSerializer(obj).data, status=200)
@@ -2,8 +2,9 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
-from .models import Empresa, UnidadOrganizacional, Puesto
+from .models import Empresa, UnidadOrganizacional, Puesto, PoliticaRetencion
 
 admin.site.register(Empresa)
 admin.site.register(UnidadOrganizacional)
 admin.site.register(Puesto)
+admin.site.register(PoliticaRetencion)
@@ -0,0 +1,57 @@
+# apps/core/cache_dashboards.py
+"""
+Caché de las respuestas de los dashboards Plotly (figuras ya serializadas).
+
+Clave: (vista, empresa, desde, question) + versión. Invalidar no borra
+claves: sube la versión de la empresa (y la global del superadmin), así
+las entradas viejas dejan de leerse y expiran solas (LRU / TIMEOUT).
+
+Con LocMemCache (por defecto) la caché es por proceso; para que una
+escritura en un worker invalide a los demás usar un backend compartido
+(Redis/Memcached) vía DJANGO_CACHE_BACKEND.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+TIMEOUT = getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 600)
+
+_GLOBAL = "global"
+
+
+def _clave_version(ambito):
+    return f"dash:v:{ambito}"
+
+
+def _nueva_version():
+    # basada en el reloj: si la versión se pierde (LRU/reinicio) no revive claves viejas
+    return time.time_ns()
+
+
+def _version(ambito):
+    return cache.get_or_set(_clave_version(ambito), _nueva_version, None)
+
+
+def clave_dashboard(vista, empresa_id, desde, question):
+    ambito = empresa_id or _GLOBAL
+    return f"dash:{vista}:{ambito}:{_version(ambito)}:{desde.isoformat()}:{question}"
+
+
+def obtener(clave):
+    return cache.get(clave)
+
+
+def guardar(clave, data):
+    cache.set(clave, data, TIMEOUT)
+
+
+def invalidar(empresa_ids):
+    """
+    Invalida los dashboards de esas empresas y el global (superadmin).
+    """
+    for ambito in {*(e for e in empresa_ids if e), _GLOBAL}:
+        try:
+            cache.incr(_clave_version(ambito))
+        except ValueError:
+            cache.set(_clave_version(ambito), _nueva_version(), None)
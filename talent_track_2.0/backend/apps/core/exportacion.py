@@ -0,0 +1,137 @@
+# apps/core/exportacion.py
+"""
+Exportación CSV en streaming para tablas grandes (jornadas, eventos,
+solicitudes, resultados KPI, logs).
+
+La consulta se recorre con un cursor del lado del servidor
+(.values_list(...).iterator(chunk_size=...)) y cada fila se escribe al
+vuelo en un StreamingHttpResponse: la memoria no crece con el número de
+filas.
+
+Uso en una vista (el scoping por rol/empresa lo hace la vista, igual que
+en su endpoint JSON):
+
+    COLUMNAS = [
+        ("fecha", "fecha"),
+        ("email", "empleado__email"),
+        ("estado", "estado", ESTADO.get),
+    ]
+    return respuesta_csv("jornadas.csv", qs.order_by("-fecha", "-id"), COLUMNAS, tz)
+"""
+import csv
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from apps.core.fechas import inicio_dia
+
+CHUNK_SIZE = getattr(settings, "EXPORTACION_CHUNK_SIZE", 2000)
+
+# Excel/LibreOffice interpretan estas celdas como fórmula (CSV injection)
+_PREFIJOS_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+
+
+class _Eco:
+    """
+    "Archivo" que devuelve lo escrito: csv.writer produce la línea y el
+    generador la entrega sin acumularla.
+    """
+
+    def write(self, value):
+        return value
+
+
+def valor_celda(v, tz=None):
+    """
+    Valor de una celda CSV: fechas en ISO (datetimes en tz), None vacío y
+    texto que Excel tomaría como fórmula con un apóstrofo delante.
+    """
+    if v is None:
+        return ""
+    if isinstance(v, datetime):
+        return timezone.localtime(v, tz).isoformat(timespec="seconds") if timezone.is_aware(v) else v.isoformat()
+    if isinstance(v, date):
+        return v.isoformat()
+    if isinstance(v, str) and v.startswith(_PREFIJOS_FORMULA):
+        return "'" + v
+    return v
+
+
+def filas_valores(qs, columnas, tz=None):
+    """
+    Generador de filas (listas ya formateadas, sin encabezado).
+    columnas: [(encabezado, campo_orm[, formato])]
+    """
+    tz = tz or timezone.get_default_timezone()
+    campos = [c[1] for c in columnas]
+    formatos = [c[2] if len(c) > 2 else None for c in columnas]
+
+    for fila in qs.values_list(*campos).iterator(chunk_size=CHUNK_SIZE):
+        yield [
+            valor_celda(fmt(v) if fmt else v, tz)
+            for v, fmt in zip(fila, formatos)
+        ]
+
+
+def filas_csv(qs, columnas, tz=None):
+    """
+    Generador de líneas CSV (encabezado incluido).
+    """
+    writer = csv.writer(_Eco())
+
+    # BOM: Excel abre el UTF-8 (tildes/ñ) correctamente
+    yield "\ufeff" + writer.writerow([c[0] for c in columnas])
+
+    for fila in filas_valores(qs, columnas, tz):
+        yield writer.writerow(fila)
+
+
+def respuesta_csv(nombre, qs, columnas, tz=None):
+    response = StreamingHttpResponse(filas_csv(qs, columnas, tz), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{nombre}"'
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def parse_rango(params):
+    """
+    ?desde=YYYY-MM-DD&hasta=YYYY-MM-DD (ambos opcionales) -> (desde, hasta)
+    """
+    out = []
+    for nombre in ("desde", "hasta"):
+        raw = (params.get(nombre) or "").strip()
+        if not raw:
+            out.append(None)
+            continue
+        try:
+            out.append(datetime.strptime(raw, "%Y-%m-%d").date())
+        except ValueError:
+            raise ValidationError({nombre: "Formato inválido. Use YYYY-MM-DD."})
+
+    desde, hasta = out
+    if desde and hasta and desde > hasta:
+        raise ValidationError({"desde": "desde no puede ser mayor que hasta."})
+    return desde, hasta
+
+
+def filtro_rango(campo, desde, hasta, tz=None, timestamp=True):
+    """
+    Q de días [desde, hasta] (cualquiera puede ser None).
+    timestamp=True: días locales en tz -> rango semiabierto (usa el índice).
+    """
+    q = Q()
+    if timestamp:
+        if desde:
+            q &= Q(**{f"{campo}__gte": inicio_dia(desde, tz)})
+        if hasta:
+            q &= Q(**{f"{campo}__lt": inicio_dia(hasta + timedelta(days=1), tz)})
+    else:
+        if desde:
+            q &= Q(**{f"{campo}__gte": desde})
+        if hasta:
+            q &= Q(**{f"{campo}__lte": hasta})
+    return q
@@ -0,0 +1,106 @@
+# apps/core/fechas.py
+"""
+Filtros de fecha "sargables" sobre columnas timestamp.
+
+`registrado_el__date=hoy` o `creada_el__date__gte=desde` envuelven la
+columna en un cast y Postgres ya no puede usar el índice btree. Aquí se
+traduce el día local a un rango semiabierto [inicio, fin) en la zona
+horaria de la empresa (según Empresa.pais):
+
+    qs.filter(rango_dia("registrado_el", hoy, tz))
+    qs.filter(desde_dia("creada_el", desde, tz))
+"""
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.models import Empresa
+
+# Mismo catálogo que PAISES (apps/core/serializers.py)
+ZONAS_POR_PAIS = {
+    1: "America/Argentina/Buenos_Aires",
+    2: "America/La_Paz",
+    3: "America/Santiago",
+    4: "America/Bogota",
+    5: "America/Costa_Rica",
+    6: "America/Havana",
+    7: "America/Santo_Domingo",
+    8: "America/Guayaquil",
+    9: "America/El_Salvador",
+    10: "Europe/Madrid",
+    11: "America/Guatemala",
+    12: "America/Tegucigalpa",
+    13: "America/Mexico_City",
+    14: "America/Managua",
+    15: "America/Panama",
+    16: "America/Asuncion",
+    17: "America/Lima",
+    18: "America/Montevideo",
+    19: "America/Caracas",
+}
+
+
+def zona_pais(pais):
+    nombre = ZONAS_POR_PAIS.get(pais)
+    return ZoneInfo(nombre) if nombre else timezone.get_default_timezone()
+
+
+# el país de una empresa prácticamente no cambia: se cachea por proceso
+@lru_cache(maxsize=4096)
+def _pais_empresa(empresa_id):
+    return Empresa.objects.filter(id=empresa_id).values_list("pais", flat=True).first()
+
+
+def zona_empresa(empresa_id):
+    """
+    Zona horaria de la empresa. Sin empresa (p.ej. vistas globales del
+    superadmin) se usa TIME_ZONE de settings.
+    """
+    try:
+        empresa_id = int(empresa_id)
+    except (TypeError, ValueError):
+        return timezone.get_default_timezone()
+    return zona_pais(_pais_empresa(empresa_id))
+
+
+def hoy_empresa(empresa_id):
+    return timezone.localdate(timezone.now(), zona_empresa(empresa_id))
+
+
+def inicio_dia(fecha, tz=None):
+    """
+    date local -> datetime aware de las 00:00 de ese día en tz.
+    """
+    return timezone.make_aware(datetime.combine(fecha, time.min), tz or timezone.get_default_timezone())
+
+
+def limites_dia(fecha, tz=None):
+    """
+    (inicio, fin) del día local, con fin = 00:00 del día siguiente.
+    """
+    return inicio_dia(fecha, tz), inicio_dia(fecha + timedelta(days=1), tz)
+
+
+def rango_dia(campo, fecha, tz=None):
+    """
+    Equivalente sargable de `campo__date=fecha`.
+    """
+    inicio, fin = limites_dia(fecha, tz)
+    return Q(**{f"{campo}__gte": inicio, f"{campo}__lt": fin})
+
+
+def desde_dia(campo, fecha, tz=None):
+    """
+    Equivalente sargable de `campo__date__gte=fecha`.
+    """
+    return Q(**{f"{campo}__gte": inicio_dia(fecha, tz)})
+
+
+def rango_fechas(campo, desde, hasta, tz=None):
+    """
+    Días locales [desde, hasta] (ambos incluidos) -> [inicio(desde), inicio(hasta + 1)).
+    """
+    return Q(**{f"{campo}__gte": inicio_dia(desde, tz), f"{campo}__lt": inicio_dia(hasta + timedelta(days=1), tz)})
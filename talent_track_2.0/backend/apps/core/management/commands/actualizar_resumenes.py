@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.resumenes import LOTE_DEFAULT, marcar_rango, procesar_resumenes
+
+
+class Command(BaseCommand):
+    help = "Actualiza los resúmenes diarios/mensuales de los dashboards solo para los días con cambios"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=LOTE_DEFAULT, help="Días (empresa, fecha) por lote")
+        parser.add_argument("--max-lotes", type=int, default=None, help="Corta después de N lotes")
+        parser.add_argument("--desde", help="YYYY-MM-DD: encola todo el rango antes de procesar (carga inicial)")
+        parser.add_argument("--hasta", help="YYYY-MM-DD (por defecto = --desde)")
+        parser.add_argument("--empresa-id", type=int, default=None, help="Limita el encolado por rango a una empresa")
+
+    def handle(self, *args, **options):
+        if options["desde"]:
+            try:
+                desde = datetime.strptime(options["desde"], "%Y-%m-%d").date()
+                hasta = datetime.strptime(options["hasta"] or options["desde"], "%Y-%m-%d").date()
+            except ValueError:
+                raise CommandError("Fechas inválidas. Usa YYYY-MM-DD.")
+            if hasta < desde:
+                raise CommandError("--hasta no puede ser menor que --desde.")
+
+            encolados = marcar_rango(desde, hasta, empresa_id=options["empresa_id"])
+            self.stdout.write(f"Días encolados por rango: {encolados}")
+
+        r = procesar_resumenes(lote=options["lote"], max_lotes=options["max_lotes"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Lotes: {r['lotes']}, días: {r['dias']}, "
+            f"resúmenes diarios: {r['diarios']}, mensuales: {r['mensuales']}"
+        ))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.retencion import (
+    ENTIDADES, FILAS_POR_SEGUNDO, LOTE, NOMBRE_ENTIDAD, aplicar_retencion, politicas,
+)
+
+
+class Command(BaseCommand):
+    help = "Archiva (.npz columnar) y borra por lotes los históricos vencidos según PoliticaRetencion"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--empresa-id", type=int, default=None, help="Solo una empresa")
+        parser.add_argument("--entidad", type=int, choices=sorted(ENTIDADES), default=None,
+                            help="1 eventos, 2 jornadas, 3 logs de auditoría")
+        parser.add_argument("--lote", type=int, default=LOTE, help="Filas por lote (archivo + DELETE)")
+        parser.add_argument("--filas-por-segundo", type=int, default=FILAS_POR_SEGUNDO, help="Tope de ritmo (0 = sin tope)")
+        parser.add_argument("--max-lotes", type=int, default=None, help="Corta después de N lotes (se retoma luego)")
+        parser.add_argument("--dry-run", action="store_true", help="Solo lista las políticas a aplicar")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            for empresa_id, entidad, meses, archivar in politicas(options["empresa_id"], options["entidad"]):
+                modo = "archivar y borrar" if archivar else "borrar"
+                self.stdout.write(f"Empresa {empresa_id} {NOMBRE_ENTIDAD[entidad]}: {meses} meses ({modo})")
+            return
+
+        resultados = aplicar_retencion(
+            empresa_id=options["empresa_id"], entidad=options["entidad"], lote=options["lote"],
+            filas_por_segundo=options["filas_por_segundo"], max_lotes=options["max_lotes"],
+        )
+        total = 0
+        for r in resultados:
+            if not r["lotes"]:
+                continue
+            total += r["eliminadas"]
+            self.stdout.write(
+                f"Empresa {r['empresa_id']} {NOMBRE_ENTIDAD[r['entidad']]} (antes de {r['corte']}): "
+                f"archivadas {r['archivadas']}, eliminadas {r['eliminadas']} en {r['lotes']} lotes"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Filas retiradas: {total}"))
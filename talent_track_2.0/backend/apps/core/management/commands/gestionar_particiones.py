@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.particiones import (
+    ACCIONES, DETACH, MESES_ADELANTE, RETENCION_MESES, TABLAS,
+    asegurar_particiones, es_postgres, retirar_particiones,
+)
+
+
+class Command(BaseCommand):
+    help = "Crea las particiones mensuales de los próximos meses y retira las vencidas (logauditoria, eventoasistencia)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tabla", choices=sorted(TABLAS), default=None, help="Solo una tabla")
+        parser.add_argument("--meses-adelante", type=int, default=MESES_ADELANTE, help="Meses a pre-crear")
+        parser.add_argument("--accion", choices=ACCIONES, default=DETACH, help="Qué hacer con las particiones vencidas")
+        parser.add_argument("--retener-meses", type=int, default=None,
+                            help="Meses a conservar (por defecto PARTICIONES_RETENCION_MESES; 0 = no retirar)")
+        parser.add_argument("--solo-crear", action="store_true", help="No retira particiones")
+
+    def handle(self, *args, **options):
+        if not es_postgres():
+            raise CommandError("El particionado requiere PostgreSQL.")
+
+        for tabla in [options["tabla"]] if options["tabla"] else sorted(TABLAS):
+            creadas = asegurar_particiones(tabla, meses_adelante=options["meses_adelante"])
+            self.stdout.write(f"{tabla}: creadas {', '.join(creadas) or '-'}")
+
+            retener = options["retener_meses"]
+            if retener is None:
+                retener = RETENCION_MESES.get(tabla, 0)
+            if options["solo_crear"] or not retener:
+                continue
+            retiradas = retirar_particiones(tabla, retener, accion=options["accion"])
+            self.stdout.write(f"{tabla}: {options['accion']} {', '.join(retiradas) or '-'}")
+
+        self.stdout.write(self.style.SUCCESS("Particiones al día."))
@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-18 11:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_alter_puesto_empresa_alter_puesto_unidad_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiarioEmpresa',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('fecha', models.DateField()),
+                ('jornadas', models.IntegerField(default=0)),
+                ('jornadas_con_tardanza', models.IntegerField(default=0)),
+                ('minutos_tardanza', models.BigIntegerField(default=0)),
+                ('solicitudes', models.IntegerField(default=0)),
+                ('solicitudes_pendientes', models.IntegerField(default=0)),
+                ('solicitudes_aprobadas', models.IntegerField(default=0)),
+                ('solicitudes_rechazadas', models.IntegerField(default=0)),
+                ('kpi_ok', models.IntegerField(default=0)),
+                ('kpi_medio', models.IntegerField(default=0)),
+                ('kpi_critico', models.IntegerField(default=0)),
+                ('actualizado_el', models.DateTimeField()),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.empresa')),
+            ],
+            options={
+                'db_table': 'resumendiarioempresa',
+                'unique_together': {('empresa', 'fecha')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenMensualEmpresa',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('mes', models.DateField()),
+                ('jornadas', models.IntegerField(default=0)),
+                ('jornadas_con_tardanza', models.IntegerField(default=0)),
+                ('minutos_tardanza', models.BigIntegerField(default=0)),
+                ('solicitudes', models.IntegerField(default=0)),
+                ('solicitudes_pendientes', models.IntegerField(default=0)),
+                ('solicitudes_aprobadas', models.IntegerField(default=0)),
+                ('solicitudes_rechazadas', models.IntegerField(default=0)),
+                ('kpi_ok', models.IntegerField(default=0)),
+                ('kpi_medio', models.IntegerField(default=0)),
+                ('kpi_critico', models.IntegerField(default=0)),
+                ('actualizado_el', models.DateTimeField()),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.empresa')),
+            ],
+            options={
+                'db_table': 'resumenmensualempresa',
+                'unique_together': {('empresa', 'mes')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenPendiente',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('fecha', models.DateField()),
+                ('marcado_el', models.DateTimeField()),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.empresa')),
+            ],
+            options={
+                'db_table': 'resumenpendiente',
+                'unique_together': {('empresa', 'fecha')},
+            },
+        ),
+    ]
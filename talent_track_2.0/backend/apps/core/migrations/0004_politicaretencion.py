@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 15:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_resumendiarioempresa_resumenmensualempresa_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PoliticaRetencion',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entidad', models.SmallIntegerField()),
+                ('meses_retencion', models.PositiveIntegerField()),
+                ('archivar', models.BooleanField(default=True)),
+                ('activo', models.BooleanField(default=True)),
+                ('actualizado_el', models.DateTimeField(auto_now=True)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.empresa')),
+            ],
+            options={
+                'db_table': 'politicaretencion',
+                'unique_together': {('empresa', 'entidad')},
+            },
+        ),
+    ]
@@ -46,3 +46,97 @@ class Puesto(models.Model):
 
     class Meta:
         db_table = 'puesto'
+
+
+# =========================
+# Resúmenes para dashboards (ver apps/core/resumenes.py)
+# =========================
+class ResumenDiarioEmpresa(models.Model):
+    """
+    Agregado por empresa y día local (zona de la empresa).
+    Se guardan sumas y conteos (no promedios) para poder re-agregar.
+    """
+    id = models.BigAutoField(primary_key=True)
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
+    fecha = models.DateField()
+
+    jornadas = models.IntegerField(default=0)
+    jornadas_con_tardanza = models.IntegerField(default=0)
+    minutos_tardanza = models.BigIntegerField(default=0)
+
+    solicitudes = models.IntegerField(default=0)
+    solicitudes_pendientes = models.IntegerField(default=0)
+    solicitudes_aprobadas = models.IntegerField(default=0)
+    solicitudes_rechazadas = models.IntegerField(default=0)
+
+    kpi_ok = models.IntegerField(default=0)
+    kpi_medio = models.IntegerField(default=0)
+    kpi_critico = models.IntegerField(default=0)
+
+    actualizado_el = models.DateTimeField()
+
+    class Meta:
+        db_table = 'resumendiarioempresa'
+        unique_together = ("empresa", "fecha")
+
+
+class ResumenMensualEmpresa(models.Model):
+    """
+    Mismo contenido que ResumenDiarioEmpresa, sumado por mes (mes = día 1).
+    """
+    id = models.BigAutoField(primary_key=True)
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
+    mes = models.DateField()
+
+    jornadas = models.IntegerField(default=0)
+    jornadas_con_tardanza = models.IntegerField(default=0)
+    minutos_tardanza = models.BigIntegerField(default=0)
+
+    solicitudes = models.IntegerField(default=0)
+    solicitudes_pendientes = models.IntegerField(default=0)
+    solicitudes_aprobadas = models.IntegerField(default=0)
+    solicitudes_rechazadas = models.IntegerField(default=0)
+
+    kpi_ok = models.IntegerField(default=0)
+    kpi_medio = models.IntegerField(default=0)
+    kpi_critico = models.IntegerField(default=0)
+
+    actualizado_el = models.DateTimeField()
+
+    class Meta:
+        db_table = 'resumenmensualempresa'
+        unique_together = ("empresa", "mes")
+
+
+class ResumenPendiente(models.Model):
+    """
+    Cola de (empresa, día) cuyos resúmenes hay que recalcular.
+    """
+    id = models.BigAutoField(primary_key=True)
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
+    fecha = models.DateField()
+    marcado_el = models.DateTimeField()
+
+    class Meta:
+        db_table = 'resumenpendiente'
+        unique_together = ("empresa", "fecha")
+
+
+class PoliticaRetencion(models.Model):
+    """
+    Cuántos meses se conservan en línea los datos históricos de una empresa
+    (apps/core/retencion.py). Sin política se usa RETENCION_MESES_DEFECTO.
+    """
+    id = models.BigAutoField(primary_key=True)
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
+    # 1 eventos de asistencia, 2 jornadas calculadas, 3 logs de auditoría
+    entidad = models.SmallIntegerField()
+    meses_retencion = models.PositiveIntegerField()
+    # False: se borra sin dejar archivo
+    archivar = models.BooleanField(default=True)
+    activo = models.BooleanField(default=True)
+    actualizado_el = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'politicaretencion'
+        unique_together = ("empresa", "entidad")
@@ -0,0 +1,143 @@
+# apps/core/paginacion.py
+"""
+Paginación keyset (cursor) compartida para listados grandes.
+
+- Usa el MISMO orden que ya tiene cada vista, p.ej. ("-fecha", "-id").
+  El último campo debe ser único (normalmente "id") y ninguno nulo.
+- El cursor es opaco (base64 de los valores de la última fila) y la
+  siguiente página se obtiene con WHERE (fecha, id) < (...), sin OFFSET,
+  así que cuesta lo mismo la página 1 que la 10.000.
+
+Uso en una vista:
+    items, next_cursor = paginar_keyset(request, qs, ("-fecha", "-id"))
+    return respuesta_paginada(request, data, next_cursor)
+
+Query params: ?cursor=<opaco>&page_size=N
+
+Opt-in: sin ?cursor ni ?page_size la vista devuelve el listado completo
+(como antes, opcionalmente con un tope), porque los clientes que leen
+solo el body quedarían cortados en silencio en la primera página. Quien
+manda ?page_size recibe páginas y sigue X-Next-Cursor.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+PAGE_SIZE_DEFAULT = getattr(settings, "PAGINACION_PAGE_SIZE", 100)
+PAGE_SIZE_MAX = getattr(settings, "PAGINACION_MAX_PAGE_SIZE", 500)
+
+
+def _page_size(request):
+    raw = request.query_params.get("page_size")
+    if raw in (None, ""):
+        return PAGE_SIZE_DEFAULT
+    try:
+        n = int(raw)
+    except (TypeError, ValueError):
+        raise ValidationError({"page_size": "page_size debe ser entero."})
+    return max(1, min(n, PAGE_SIZE_MAX))
+
+
+def _campo(model, path):
+    """
+    Resuelve "empleado__apellidos" -> Field de Empleado.apellidos
+    """
+    field = None
+    for parte in path.split("__"):
+        field = model._meta.get_field(parte)
+        if field.is_relation:
+            model = field.related_model
+    if field.is_relation:
+        field = field.target_field
+    return field
+
+
+def _valor(obj, path):
+    for parte in path.split("__"):
+        obj = obj.get(parte) if isinstance(obj, dict) else getattr(obj, parte)
+    return obj
+
+
+def _encode(ordering, obj):
+    valores = []
+    for o in ordering:
+        v = _valor(obj, o.lstrip("-"))
+        valores.append(v.isoformat() if hasattr(v, "isoformat") else (str(v) if v is not None else None))
+    raw = json.dumps({"o": list(ordering), "v": valores}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor, ordering, model):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if data.get("o") != list(ordering) or len(data.get("v") or []) != len(ordering):
+            raise ValueError
+        return [_campo(model, o.lstrip("-")).to_python(v) for o, v in zip(ordering, data["v"])]
+    except Exception:
+        raise ValidationError({"cursor": "Cursor inválido."})
+
+
+def _keyset_q(ordering, valores):
+    """
+    Para ("-fecha", "-id") con valores (f, i):
+        fecha <= f AND (fecha < f OR (fecha = f AND id < i))
+    La primera condición redundante le da al planner un rango de índice.
+    """
+    cond = Q()
+    iguales = {}
+    for o, v in zip(ordering, valores):
+        campo = o.lstrip("-")
+        op = "lt" if o.startswith("-") else "gt"
+        cond |= Q(**iguales, **{f"{campo}__{op}": v})
+        iguales[campo] = v
+
+    primero = ordering[0]
+    op_rango = "lte" if primero.startswith("-") else "gte"
+    return Q(**{f"{primero.lstrip('-')}__{op_rango}": valores[0]}) & cond
+
+
+def pide_pagina(request):
+    params = request.query_params
+    return "cursor" in params or "page_size" in params
+
+
+def paginar_keyset(request, qs, ordering, tope=None):
+    """
+    Devuelve (items, next_cursor). next_cursor es None en la última página.
+    Sin ?cursor/?page_size: todo el queryset (hasta `tope` filas) y None.
+    """
+    ordering = tuple(ordering)
+    qs = qs.order_by(*ordering)
+    if not pide_pagina(request):
+        return list(qs[:tope] if tope else qs), None
+
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        qs = qs.filter(_keyset_q(ordering, _decode(cursor, ordering, qs.model)))
+
+    page_size = _page_size(request)
+    items = list(qs[:page_size + 1])
+    if len(items) <= page_size:
+        return items, None
+
+    items = items[:page_size]
+    return items, _encode(ordering, items[-1])
+
+
+def respuesta_paginada(request, data, next_cursor, status=200):
+    """
+    Mantiene el body tal cual (lista) para no romper al front y expone
+    el cursor en cabeceras: X-Next-Cursor y Link rel="next".
+    """
+    resp = Response(data, status=status)
+    if next_cursor:
+        url = replace_query_param(request.build_absolute_uri(), "cursor", next_cursor)
+        resp["X-Next-Cursor"] = next_cursor
+        resp["Link"] = f'<{url}>; rel="next"'
+    return resp
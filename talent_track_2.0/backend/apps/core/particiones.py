@@ -0,0 +1,295 @@
+# apps/core/particiones.py
+"""
+Particionado mensual por rango (PostgreSQL) de las tablas append-only que
+más crecen y que casi siempre se consultan por rango de fechas.
+
+- convertir(): una sola vez (migraciones auditoria 0004 / asistencia 0006).
+  La tabla existente se renombra a <tabla>_historico y queda adjunta como
+  partición [MINVALUE, inicio del mes siguiente): las filas no se copian.
+  Además se crea <tabla>_default para filas fuera de todo rango (p.ej. un
+  reloj de dispositivo mal configurado).
+- asegurar_particiones(): crea las particiones <tabla>_pYYYYMM que faltan
+  desde el mes actual hasta N meses adelante.
+- retirar_particiones(): separa (DETACH), archiva (schema "archivo") o
+  elimina las particiones enteras anteriores al horizonte de retención:
+  un DROP/DETACH en lugar de un DELETE masivo.
+
+Postgres exige la clave de partición en la PK: en la BD pasa a ser
+(id, <columna>). id sigue siendo único (sale de <tabla>_particion_id_seq)
+y el modelo Django no cambia; las vistas consultan la tabla padre igual
+que antes y el filtro por fecha descarta las particiones que no aplican.
+
+Los límites son inicios de mes en settings.TIME_ZONE. Fuera de PostgreSQL
+(sqlite de tests) todo es no-op.
+"""
+import re
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+# tabla -> columna de partición
+TABLAS = {
+    "logauditoria": "fecha",
+    "eventoasistencia": "registrado_el",
+}
+
+DETACH = "detach"
+ARCHIVAR = "archivar"
+ELIMINAR = "eliminar"
+ACCIONES = (DETACH, ARCHIVAR, ELIMINAR)
+
+ESQUEMA_ARCHIVO = "archivo"
+
+MESES_ADELANTE = getattr(settings, "PARTICIONES_MESES_ADELANTE", 3)
+RETENCION_MESES = getattr(settings, "PARTICIONES_RETENCION_MESES", {})
+
+_LIMITE_RE = re.compile(r"'([^']+)'|(MINVALUE|MAXVALUE)")
+
+
+def inicio_mes(dia):
+    return date(dia.year, dia.month, 1)
+
+
+def sumar_meses(dia, meses):
+    """
+    Primer día del mes `meses` después (o antes, si es negativo) del de `dia`.
+    """
+    total = dia.year * 12 + dia.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def nombre_particion(tabla, mes):
+    return f"{tabla}_p{mes:%Y%m}"
+
+
+def _instante(dia):
+    tz = timezone.get_default_timezone()
+    return datetime.combine(dia, time.min, tz)
+
+
+def _dia(valor):
+    """
+    Límite de pg_get_expr ('2026-10-01 00:00:00+00' / MINVALUE) -> date | None
+    """
+    if valor is None:
+        return None
+    return timezone.localtime(datetime.fromisoformat(valor), timezone.get_default_timezone()).date()
+
+
+def es_postgres(conexion=connection):
+    return conexion.vendor == "postgresql"
+
+
+# ---------------- planificación (funciones puras) ----------------
+
+def meses_faltantes(existentes, hoy, meses_adelante):
+    """
+    existentes: [(nombre, desde, hasta)] con date o None (MINVALUE/MAXVALUE).
+    -> meses (date día 1) entre el actual y +meses_adelante que no se
+       solapan con ninguna partición existente.
+    """
+    faltantes = []
+    for i in range(meses_adelante + 1):
+        mes = sumar_meses(hoy, i)
+        siguiente = sumar_meses(mes, 1)
+        ocupado = any(
+            (desde is None or desde < siguiente) and (hasta is None or hasta > mes)
+            for _, desde, hasta in existentes
+        )
+        if not ocupado:
+            faltantes.append(mes)
+    return faltantes
+
+
+def particiones_vencidas(existentes, hoy, retener_meses):
+    """
+    Particiones cuyo rango termina antes del inicio del mes actual menos
+    `retener_meses` (completamente fuera de la retención).
+    """
+    corte = sumar_meses(hoy, -retener_meses)
+    return [nombre for nombre, _, hasta in existentes if hasta is not None and hasta <= corte]
+
+
+# ---------------- catálogo de Postgres ----------------
+
+def esta_particionada(cursor, tabla):
+    cursor.execute(
+        """
+        SELECT 1 FROM pg_partitioned_table p
+        JOIN pg_class c ON c.oid = p.partrelid
+        WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+        """,
+        [tabla],
+    )
+    return cursor.fetchone() is not None
+
+
+def listar_particiones(cursor, tabla):
+    """
+    -> [(nombre, desde, hasta)] de las particiones de rango (sin la DEFAULT).
+    """
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        ORDER BY c.relname
+        """,
+        [tabla],
+    )
+    particiones = []
+    for nombre, expr in cursor.fetchall():
+        if expr == "DEFAULT":
+            continue
+        limites = [texto or None for texto, _ in _LIMITE_RE.findall(expr)]
+        particiones.append((nombre, _dia(limites[0]), _dia(limites[1])))
+    return particiones
+
+
+# ---------------- operaciones ----------------
+
+def convertir(schema_editor, tabla, columna, hoy=None):
+    """
+    Convierte `tabla` en particionada por mes sobre `columna` (idempotente).
+    """
+    conexion = schema_editor.connection
+    if not es_postgres(conexion):
+        return
+    q = schema_editor.quote_name
+    historico = f"{tabla}_historico"
+    secuencia = f"{tabla}_particion_id_seq"
+
+    with conexion.cursor() as cursor:
+        if esta_particionada(cursor, tabla):
+            return
+
+        # índices (menos la PK) y FKs actuales: se recrean en la tabla padre
+        cursor.execute(
+            """
+            SELECT i.relname, pg_get_indexdef(i.oid)
+            FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = %s::regclass AND NOT x.indisprimary
+            """,
+            [tabla],
+        )
+        indices = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [tabla],
+        )
+        fks = cursor.fetchall()
+        cursor.execute("SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'", [tabla])
+        (pk,) = cursor.fetchone()
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1, MAX({q(columna)}) FROM {q(tabla)}")
+        siguiente_id, ultima = cursor.fetchone()
+
+        hoy = hoy or timezone.localdate(timezone=timezone.get_default_timezone())
+        if ultima is not None:
+            hoy = max(hoy, timezone.localtime(ultima, timezone.get_default_timezone()).date())
+        limite = _instante(sumar_meses(hoy, 1)).isoformat()
+
+        sentencias = [f"ALTER TABLE {q(tabla)} RENAME TO {q(historico)}"]
+        sentencias += [f"ALTER INDEX {q(nombre)} RENAME TO {q(nombre[:61] + '_h')}" for nombre, _ in indices]
+        sentencias += [
+            # la PK de la partición debe coincidir con la de la padre
+            f"ALTER TABLE {q(historico)} DROP CONSTRAINT {q(pk)}",
+            f"ALTER TABLE {q(historico)} ADD PRIMARY KEY (id, {q(columna)})",
+            f"ALTER TABLE {q(historico)} ALTER COLUMN id DROP IDENTITY IF EXISTS",
+            f"ALTER TABLE {q(historico)} ALTER COLUMN id DROP DEFAULT",
+            f"CREATE SEQUENCE {q(secuencia)} START WITH {int(siguiente_id)}",
+            f"CREATE TABLE {q(tabla)} (LIKE {q(historico)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({q(columna)})",
+            f"ALTER TABLE {q(tabla)} ALTER COLUMN id SET DEFAULT nextval('{secuencia}')",
+            f"ALTER SEQUENCE {q(secuencia)} OWNED BY {q(tabla)}.id",
+            f"ALTER TABLE {q(tabla)} ADD PRIMARY KEY (id, {q(columna)})",
+        ]
+        sentencias += [f"ALTER TABLE {q(tabla)} ADD CONSTRAINT {q(nombre)} {definicion}" for nombre, definicion in fks]
+        # las definiciones se leyeron antes del RENAME: apuntan a la tabla padre
+        sentencias += [definicion for _, definicion in indices]
+        sentencias += [
+            f"ALTER TABLE {q(tabla)} ATTACH PARTITION {q(historico)} FOR VALUES FROM (MINVALUE) TO ('{limite}')",
+            f"CREATE TABLE {q(tabla + '_default')} PARTITION OF {q(tabla)} DEFAULT",
+        ]
+        for sql in sentencias:
+            cursor.execute(sql)
+
+
+def _crear_particion(cursor, tabla, columna, mes):
+    q = connection.ops.quote_name
+    nombre = nombre_particion(tabla, mes)
+    desde, hasta = _instante(mes), _instante(sumar_meses(mes, 1))
+    crear = f"CREATE TABLE {q(nombre)} PARTITION OF {q(tabla)} FOR VALUES FROM (%s) TO (%s)"
+    default = f"{tabla}_default"
+
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [default])
+    hay_default = cursor.fetchone()[0]
+    filas_en_default = False
+    if hay_default:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {q(default)} WHERE {q(columna)} >= %s AND {q(columna)} < %s)",
+            [desde, hasta],
+        )
+        filas_en_default = cursor.fetchone()[0]
+
+    if not filas_en_default:
+        cursor.execute(crear, [desde, hasta])
+        return nombre
+
+    # Postgres no deja crear el rango si la DEFAULT ya tiene filas de ese
+    # mes: se separa, se crea la partición y se mueven las filas.
+    cursor.execute(f"ALTER TABLE {q(tabla)} DETACH PARTITION {q(default)}")
+    cursor.execute(crear, [desde, hasta])
+    cursor.execute(
+        f"INSERT INTO {q(tabla)} SELECT * FROM {q(default)} WHERE {q(columna)} >= %s AND {q(columna)} < %s",
+        [desde, hasta],
+    )
+    cursor.execute(f"DELETE FROM {q(default)} WHERE {q(columna)} >= %s AND {q(columna)} < %s", [desde, hasta])
+    cursor.execute(f"ALTER TABLE {q(tabla)} ATTACH PARTITION {q(default)} DEFAULT")
+    return nombre
+
+
+def asegurar_particiones(tabla, meses_adelante=MESES_ADELANTE, hoy=None):
+    """
+    -> nombres de las particiones creadas.
+    """
+    if not es_postgres():
+        return []
+    columna = TABLAS[tabla]
+    hoy = hoy or timezone.localdate(timezone=timezone.get_default_timezone())
+    creadas = []
+    with connection.cursor() as cursor:
+        if not esta_particionada(cursor, tabla):
+            return []
+        for mes in meses_faltantes(listar_particiones(cursor, tabla), hoy, meses_adelante):
+            with transaction.atomic():
+                creadas.append(_crear_particion(cursor, tabla, columna, mes))
+    return creadas
+
+
+def retirar_particiones(tabla, retener_meses, accion=DETACH, hoy=None):
+    """
+    -> nombres de las particiones separadas / archivadas / eliminadas.
+    """
+    if accion not in ACCIONES:
+        raise ValueError(f"accion inválida: {accion}")
+    if not es_postgres():
+        return []
+    q = connection.ops.quote_name
+    hoy = hoy or timezone.localdate(timezone=timezone.get_default_timezone())
+    retiradas = []
+    with connection.cursor() as cursor:
+        if not esta_particionada(cursor, tabla):
+            return []
+        for nombre in particiones_vencidas(listar_particiones(cursor, tabla), hoy, retener_meses):
+            with transaction.atomic():
+                cursor.execute(f"ALTER TABLE {q(tabla)} DETACH PARTITION {q(nombre)}")
+                if accion == ARCHIVAR:
+                    cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {q(ESQUEMA_ARCHIVO)}")
+                    cursor.execute(f"ALTER TABLE {q(nombre)} SET SCHEMA {q(ESQUEMA_ARCHIVO)}")
+                elif accion == ELIMINAR:
+                    cursor.execute(f"DROP TABLE {q(nombre)}")
+            retiradas.append(nombre)
+    return retiradas
@@ -0,0 +1,24 @@
+# apps/core/red.py
+"""
+IP del cliente de la petición.
+
+Detrás de proxies/balanceadores (nginx, ALB) REMOTE_ADDR es la IP del
+último proxy. Cada proxy AGREGA al final de X-Forwarded-For la IP de quien
+se le conectó (nginx $proxy_add_x_forwarded_for, ALB), así que lo de la
+izquierda lo pudo escribir el cliente. Con PROXIES_CONFIABLES = N se toma
+la entrada N-ésima desde la derecha: la que puso el primer proxy propio.
+Con 0 (default) se ignora el header.
+"""
+from django.conf import settings
+
+
+def ip_cliente(request):
+    proxies = getattr(settings, "PROXIES_CONFIABLES", 0)
+    if proxies > 0:
+        reenviada = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        entradas = [e.strip() for e in reenviada.split(",") if e.strip()]
+        if entradas:
+            # "falsa, cliente, proxy1": con 2 proxies propios el cliente es entradas[-2];
+            # si hay menos entradas que proxies, todas las agregaron ellos
+            return entradas[-min(proxies, len(entradas))]
+    return request.META.get("REMOTE_ADDR") or None
@@ -0,0 +1,332 @@
+# apps/core/resumenes.py
+"""
+Resúmenes materializados para los dashboards (ResumenDiarioEmpresa /
+ResumenMensualEmpresa).
+
+Flujo (igual que el motor de jornadas):
+- Cada JornadaCalculada / SolicitudAusencia / ResultadoKPI escrito deja su
+  (empresa, día local) en la cola ResumenPendiente (ver signals.py y
+  motor_jornadas.recalcular()).
+- procesar_resumenes() recalcula SOLO esos días desde las tablas de hechos
+  y luego re-suma los meses afectados a partir de los diarios.
+
+Los dashboards leen estas tablas: su costo depende de empresas x días del
+rango, no de cuántas marcaciones/solicitudes/KPIs hay en la historia.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from apps.asistencia.models import JornadaCalculada
+from apps.ausencias.models import SolicitudAusencia
+from apps.core.cache_dashboards import invalidar
+from apps.core.fechas import rango_fechas, zona_empresa
+from apps.core.models import Empresa, ResumenDiarioEmpresa, ResumenMensualEmpresa, ResumenPendiente
+from apps.kpi.agregados import agregaciones_tramos
+from apps.kpi.models import ResultadoKPI
+
+LOTE_DEFAULT = 500
+
+CAMPOS_RESUMEN = [
+    "jornadas",
+    "jornadas_con_tardanza",
+    "minutos_tardanza",
+    "solicitudes",
+    "solicitudes_pendientes",
+    "solicitudes_aprobadas",
+    "solicitudes_rechazadas",
+    "kpi_ok",
+    "kpi_medio",
+    "kpi_critico",
+]
+
+
+# =========================
+# Cola de pendientes
+# =========================
+def marcar_resumenes(pares):
+    """
+    pares: iterable de (empresa_id, fecha)
+    También invalida la caché de dashboards de esas empresas.
+    """
+    ahora = timezone.now()
+    objs = [
+        ResumenPendiente(empresa_id=empresa_id, fecha=fecha, marcado_el=ahora)
+        for (empresa_id, fecha) in set(pares)
+        if empresa_id and fecha
+    ]
+    if not objs:
+        return 0
+
+    invalidar({o.empresa_id for o in objs})
+
+    ResumenPendiente.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=["empresa", "fecha"],
+        update_fields=["marcado_el"],
+    )
+    return len(objs)
+
+
+def marcar_instancias(objs, campo):
+    """
+    Encola el día local (zona de la empresa) de `campo` para cada instancia.
+    Para JornadaCalculada usar directamente marcar_resumenes (fecha ya es date).
+    """
+    return marcar_resumenes(
+        (o.empresa_id, timezone.localdate(getattr(o, campo), zona_empresa(o.empresa_id)))
+        for o in objs
+        if getattr(o, campo, None)
+    )
+
+
+def marcar_rango(desde, hasta, empresa_id=None):
+    """
+    Encola todos los días [desde, hasta] de una o todas las empresas
+    (carga inicial o reconstrucción).
+    """
+    empresa_ids = [empresa_id] if empresa_id else list(Empresa.objects.values_list("id", flat=True))
+    total = 0
+    for emp_id in empresa_ids:
+        dias = (hasta - desde).days + 1
+        total += marcar_resumenes((emp_id, desde + timedelta(days=i)) for i in range(dias))
+    return total
+
+
+# =========================
+# Recalcular
+# =========================
+def _vacio():
+    return {c: 0 for c in CAMPOS_RESUMEN}
+
+
+def _agregar_jornadas(out, empresa_ids, fechas):
+    filas = (
+        JornadaCalculada.objects
+        .filter(empresa_id__in=empresa_ids, fecha__in=fechas)
+        .values("empresa_id", "fecha")
+        .annotate(
+            jornadas=Count("id"),
+            jornadas_con_tardanza=Count("id", filter=Q(minutos_tardanza__gt=0)),
+            minutos_tardanza=Sum("minutos_tardanza"),
+        )
+        .order_by()
+    )
+    for f in filas:
+        key = (f["empresa_id"], f["fecha"])
+        if key in out:
+            out[key].update(
+                jornadas=f["jornadas"],
+                jornadas_con_tardanza=f["jornadas_con_tardanza"],
+                minutos_tardanza=f["minutos_tardanza"] or 0,
+            )
+
+
+def _agregar_por_dia_local(out, model, campo, empresa_id, desde, hasta, aggs):
+    """
+    Agrega `model` por día local de `campo` (timestamp) en la zona de la empresa.
+    """
+    tz = zona_empresa(empresa_id)
+    filas = (
+        model.objects
+        .filter(rango_fechas(campo, desde, hasta, tz), empresa_id=empresa_id)
+        .annotate(dia=TruncDate(campo, tzinfo=tz))
+        .values("dia")
+        .annotate(**aggs)
+        .order_by()
+    )
+    for f in filas:
+        key = (empresa_id, f.pop("dia"))
+        if key in out:
+            out[key].update(f)
+
+
+def _calcular_diarios(pares):
+    """
+    pares: set de (empresa_id, fecha) -> {(empresa_id, fecha): {campo: valor}}
+    """
+    out = {p: _vacio() for p in pares}
+
+    _agregar_jornadas(out, {e for e, _ in pares}, {f for _, f in pares})
+
+    por_empresa = {}
+    for empresa_id, fecha in pares:
+        por_empresa.setdefault(empresa_id, []).append(fecha)
+
+    for empresa_id, fechas in por_empresa.items():
+        desde, hasta = min(fechas), max(fechas)
+        _agregar_por_dia_local(out, SolicitudAusencia, "creada_el", empresa_id, desde, hasta, {
+            "solicitudes": Count("id"),
+            "solicitudes_pendientes": Count("id", filter=Q(estado=1)),
+            "solicitudes_aprobadas": Count("id", filter=Q(estado=2)),
+            "solicitudes_rechazadas": Count("id", filter=Q(estado=3)),
+        })
+        _agregar_por_dia_local(
+            out, ResultadoKPI, "calculado_el", empresa_id, desde, hasta, agregaciones_tramos(prefijo="kpi_"),
+        )
+
+    return out
+
+
+def _recalcular_meses(meses):
+    """
+    meses: set de (empresa_id, mes) -> re-suma los diarios de esos meses.
+    """
+    if not meses:
+        return 0
+
+    ahora = timezone.now()
+    filtro = Q()
+    for empresa_id, mes in meses:
+        siguiente = (mes.replace(day=28) + timedelta(days=4)).replace(day=1)
+        filtro |= Q(empresa_id=empresa_id, fecha__gte=mes, fecha__lt=siguiente)
+
+    filas = (
+        ResumenDiarioEmpresa.objects
+        .filter(filtro)
+        .annotate(mes=TruncMonth("fecha"))
+        .values("empresa_id", "mes")
+        .annotate(**{c: Sum(c) for c in CAMPOS_RESUMEN})
+        .order_by()
+    )
+
+    objs = []
+    for f in filas:
+        objs.append(ResumenMensualEmpresa(actualizado_el=ahora, **f))
+    if objs:
+        ResumenMensualEmpresa.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=["empresa", "mes"],
+            update_fields=CAMPOS_RESUMEN + ["actualizado_el"],
+        )
+
+    # meses que se quedaron sin días con datos
+    con_datos = {(o.empresa_id, o.mes) for o in objs}
+    for empresa_id, mes in meses - con_datos:
+        ResumenMensualEmpresa.objects.filter(empresa_id=empresa_id, mes=mes).delete()
+
+    return len(objs)
+
+
+def recalcular(pares):
+    """
+    pares: iterable de (empresa_id, fecha)
+    Upsert de los diarios con datos, borra los que quedaron en cero y
+    recalcula los meses afectados.
+    """
+    pares = set(pares)
+    if not pares:
+        return {"diarios": 0, "mensuales": 0}
+
+    ahora = timezone.now()
+    datos = _calcular_diarios(pares)
+
+    diarios = []
+    vacios = {}
+    for (empresa_id, fecha), valores in datos.items():
+        if not any(valores.values()):
+            vacios.setdefault(empresa_id, []).append(fecha)
+            continue
+        diarios.append(ResumenDiarioEmpresa(empresa_id=empresa_id, fecha=fecha, actualizado_el=ahora, **valores))
+
+    if diarios:
+        ResumenDiarioEmpresa.objects.bulk_create(
+            diarios,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=["empresa", "fecha"],
+            update_fields=CAMPOS_RESUMEN + ["actualizado_el"],
+        )
+    for empresa_id, fechas in vacios.items():
+        ResumenDiarioEmpresa.objects.filter(empresa_id=empresa_id, fecha__in=fechas).delete()
+
+    mensuales = _recalcular_meses({(empresa_id, fecha.replace(day=1)) for empresa_id, fecha in pares})
+    # los dashboards leen estos resúmenes: sus figuras cacheadas ya no valen
+    invalidar({empresa_id for empresa_id, _ in pares})
+    return {"diarios": len(diarios), "mensuales": mensuales}
+
+
+def procesar_resumenes(lote=LOTE_DEFAULT, max_lotes=None):
+    """
+    Vacía la cola ResumenPendiente por lotes.
+    """
+    resumen = {"lotes": 0, "dias": 0, "diarios": 0, "mensuales": 0}
+
+    while max_lotes is None or resumen["lotes"] < max_lotes:
+        corte = timezone.now()
+        pendientes = list(
+            ResumenPendiente.objects
+            .order_by("fecha", "empresa_id")
+            .values_list("id", "empresa_id", "fecha")[:lote]
+        )
+        if not pendientes:
+            break
+
+        with transaction.atomic():
+            r = recalcular((empresa_id, fecha) for _, empresa_id, fecha in pendientes)
+            # si se volvió a marcar mientras calculábamos, se queda en cola
+            ResumenPendiente.objects.filter(
+                id__in=[p[0] for p in pendientes],
+                marcado_el__lt=corte,
+            ).delete()
+
+        resumen["lotes"] += 1
+        resumen["dias"] += len(pendientes)
+        resumen["diarios"] += r["diarios"]
+        resumen["mensuales"] += r["mensuales"]
+
+    return resumen
+
+
+# =========================
+# Lectura (dashboards)
+# =========================
+def resumen_por_mes(desde, empresa_id=None, por_empresa=False):
+    """
+    Filas {"mes", [empresa_id], campos...} desde `desde` (inclusive).
+    El mes de `desde` sale de los diarios (mes parcial); los siguientes,
+    de la tabla mensual.
+    """
+    primer_mes = desde.replace(day=1)
+    siguiente = (primer_mes.replace(day=28) + timedelta(days=4)).replace(day=1)
+    claves = ["empresa_id", "mes"] if por_empresa else ["mes"]
+    sumas = {c: Sum(c) for c in CAMPOS_RESUMEN}
+
+    diarios = ResumenDiarioEmpresa.objects.filter(fecha__gte=desde, fecha__lt=siguiente)
+    mensuales = ResumenMensualEmpresa.objects.filter(mes__gte=siguiente)
+    if empresa_id:
+        diarios = diarios.filter(empresa_id=empresa_id)
+        mensuales = mensuales.filter(empresa_id=empresa_id)
+
+    filas = list(
+        diarios.annotate(mes=TruncMonth("fecha")).values(*claves).annotate(**sumas).order_by()
+    )
+    filas += list(mensuales.values(*claves).annotate(**sumas).order_by())
+    return sorted(filas, key=lambda f: f["mes"])
+
+
+def sumar(filas):
+    total = _vacio()
+    for f in filas:
+        for c in CAMPOS_RESUMEN:
+            total[c] += f[c] or 0
+    return total
+
+
+def resumen_por_empresa(desde, empresa_id=None):
+    """
+    Totales del rango [desde, hoy] por empresa: {empresa_id: {campo: valor}}
+    """
+    out = {}
+    for f in resumen_por_mes(desde, empresa_id=empresa_id, por_empresa=True):
+        out.setdefault(f["empresa_id"], []).append(f)
+    return {emp: sumar(filas) for emp, filas in out.items()}
+
+
+def promedio(suma, cantidad):
+    return float(suma) / cantidad if cantidad else 0
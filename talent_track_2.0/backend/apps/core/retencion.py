@@ -0,0 +1,250 @@
+# apps/core/retencion.py
+"""
+Retención de datos históricos por empresa (PoliticaRetencion).
+
+Para cada (empresa, entidad) con meses de retención > 0:
+- corte = inicio del mes actual (hora local de la empresa) menos N meses,
+- lotes de a lo sumo `lote` filas anteriores al corte, en orden (fecha, id),
+- cada lote se archiva (si la política lo pide) en un .npz comprimido
+  con una columna por array (numpy.savez_compressed) y luego se borra con
+  un DELETE ... WHERE id IN (...) en SQL directo: sin cargar instancias ni
+  disparar signals/cascadas en Python.
+
+Reanudable: lo borrado ya no vuelve a salir y el nombre del archivo se
+deriva del primer/último id del lote, así que si el proceso cae entre el
+archivo y el DELETE, el reintento reescribe el mismo archivo.
+Con `filas_por_segundo` se duerme entre lotes para no saturar la BD.
+
+Los resúmenes (ResumenDiario/Mensual) no se tocan: los dashboards de
+meses viejos siguen mostrando sus totales. Las particiones enteras las
+retira gestionar_particiones; esto cubre la retención fila a fila de
+cada empresa.
+"""
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.asistencia.models import EventoAsistencia, JornadaCalculada
+from apps.auditoria.models import LogAuditoria
+from apps.core.fechas import zona_empresa
+from apps.core.models import Empresa, PoliticaRetencion
+from apps.core.particiones import sumar_meses
+
+logger = logging.getLogger(__name__)
+
+EVENTOS = 1
+JORNADAS = 2
+LOGS = 3
+
+# entidad -> (modelo, columna de fecha)
+ENTIDADES = {
+    EVENTOS: (EventoAsistencia, "registrado_el"),
+    JORNADAS: (JornadaCalculada, "fecha"),
+    LOGS: (LogAuditoria, "fecha"),
+}
+
+NOMBRE_ENTIDAD = {
+    EVENTOS: "eventos_asistencia",
+    JORNADAS: "jornadas_calculadas",
+    LOGS: "logs_auditoria",
+}
+
+RETENCION_DIR = Path(getattr(settings, "RETENCION_DIR", settings.BASE_DIR / "archivo_historico"))
+MESES_DEFECTO = getattr(settings, "RETENCION_MESES_DEFECTO", {})
+LOTE = getattr(settings, "RETENCION_LOTE", 5000)
+FILAS_POR_SEGUNDO = getattr(settings, "RETENCION_FILAS_POR_SEGUNDO", 0)
+
+NULOS = "__nulos__"
+
+
+def corte(empresa_id, entidad, meses, hoy=None):
+    """
+    Límite excluyente: se retiran las filas con fecha < corte.
+    """
+    tz = zona_empresa(empresa_id)
+    hoy = hoy or timezone.localdate(timezone.now(), tz)
+    primero = sumar_meses(hoy, -meses)
+    modelo, columna = ENTIDADES[entidad]
+    if modelo._meta.get_field(columna).get_internal_type() == "DateField":
+        return primero
+    return datetime.combine(primero, datetime.min.time(), tz)
+
+
+def politicas(empresa_id=None, entidad=None):
+    """
+    -> [(empresa_id, entidad, meses, archivar)] a aplicar: la política de
+       la empresa si existe, si no RETENCION_MESES_DEFECTO. 0 = no retirar.
+    """
+    propias = {
+        (p.empresa_id, p.entidad): p
+        for p in PoliticaRetencion.objects.filter(
+            **({"empresa_id": empresa_id} if empresa_id else {}),
+            **({"entidad": entidad} if entidad else {}),
+        )
+    }
+    empresas = Empresa.objects.order_by("id").values_list("id", flat=True)
+    if empresa_id:
+        empresas = empresas.filter(id=empresa_id)
+
+    salida = []
+    for eid in empresas:
+        for ent in ([entidad] if entidad else sorted(ENTIDADES)):
+            politica = propias.get((eid, ent))
+            if politica is None:
+                meses, archivar = MESES_DEFECTO.get(ent, 0), True
+            elif not politica.activo:
+                continue
+            else:
+                meses, archivar = politica.meses_retencion, politica.archivar
+            if meses:
+                salida.append((eid, ent, meses, archivar))
+    return salida
+
+
+# ---------------- archivo columnar ----------------
+
+def _columna(campo, valores):
+    """
+    Valores de una columna -> (array numpy, máscara de nulos | None)
+    """
+    nulos = np.array([v is None for v in valores])
+    tipo = campo.get_internal_type()
+    if tipo == "DateTimeField":
+        arr = np.array(
+            [v.astimezone(dt_timezone.utc).replace(tzinfo=None) if v is not None else None for v in valores],
+            dtype="datetime64[us]",
+        )
+    elif tipo == "DateField":
+        arr = np.array(valores, dtype="datetime64[D]")
+    elif tipo == "BooleanField":
+        arr = np.array([bool(v) for v in valores], dtype=bool)
+    elif tipo.endswith("IntegerField") or tipo.endswith("AutoField") or tipo == "ForeignKey":
+        arr = np.array([v if v is not None else 0 for v in valores], dtype=np.int64)
+    elif tipo == "JSONField":
+        arr = np.array([json.dumps(v, ensure_ascii=False) if v is not None else "" for v in valores], dtype=str)
+    else:
+        # texto y Decimal (como texto, sin perder precisión)
+        arr = np.array([str(v) if v is not None else "" for v in valores], dtype=str)
+    return arr, (nulos if nulos.any() else None)
+
+
+def escribir_archivo(ruta, campos, filas):
+    datos = {}
+    for i, campo in enumerate(campos):
+        arr, nulos = _columna(campo, [fila[i] for fila in filas])
+        datos[campo.attname] = arr
+        if nulos is not None:
+            datos[NULOS + campo.attname] = nulos
+
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(ruta.name + ".tmp")
+    with open(temporal, "wb") as f:
+        np.savez_compressed(f, **datos)
+    os.replace(temporal, ruta)
+
+
+def leer_archivo(ruta):
+    """
+    .npz de retención -> {columna: [valores]} (None donde había nulos).
+    Fechas/horas salen como datetime sin zona (UTC).
+    """
+    with np.load(ruta) as z:
+        salida = {}
+        for nombre in z.files:
+            if nombre.startswith(NULOS):
+                continue
+            valores = z[nombre].tolist()
+            if NULOS + nombre in z.files:
+                valores = [None if nulo else v for v, nulo in zip(valores, z[NULOS + nombre].tolist())]
+            salida[nombre] = valores
+    return salida
+
+
+# ---------------- ejecución ----------------
+
+def _borrar(tabla, columna, limite, ids):
+    # el filtro por fecha deja a Postgres descartar particiones (ver particiones.py)
+    q = connection.ops.quote_name
+    marcas = ", ".join(["%s"] * len(ids))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {q(tabla)} WHERE id IN ({marcas}) AND {q(columna)} < %s", [*ids, limite])
+        return cursor.rowcount
+
+
+def retirar(empresa_id, entidad, meses, archivar=True, lote=LOTE, filas_por_segundo=FILAS_POR_SEGUNDO,
+            max_lotes=None, hoy=None, directorio=None):
+    """
+    Archiva y borra por lotes las filas vencidas de una (empresa, entidad).
+    -> dict con archivadas / eliminadas / lotes / archivos.
+    """
+    modelo, columna = ENTIDADES[entidad]
+    campos = list(modelo._meta.concrete_fields)
+    attnames = [c.attname for c in campos]
+    i_id = attnames.index("id")
+    limite = corte(empresa_id, entidad, meses, hoy=hoy)
+    limite_db = modelo._meta.get_field(columna).get_db_prep_value(limite, connection)
+    carpeta = Path(directorio or RETENCION_DIR) / str(empresa_id) / NOMBRE_ENTIDAD[entidad]
+
+    resultado = {"empresa_id": empresa_id, "entidad": entidad, "corte": limite,
+                 "archivadas": 0, "eliminadas": 0, "lotes": 0, "archivos": []}
+    qs = (
+        modelo.objects
+        .filter(empresa_id=empresa_id, **{f"{columna}__lt": limite})
+        .order_by(columna, "id")
+        .values_list(*attnames)
+    )
+    while max_lotes is None or resultado["lotes"] < max_lotes:
+        inicio = time.monotonic()
+        filas = list(qs[:lote])
+        if not filas:
+            break
+        ids = [fila[i_id] for fila in filas]
+
+        if archivar:
+            ruta = carpeta / f"{modelo._meta.db_table}_{ids[0]}_{ids[-1]}.npz"
+            escribir_archivo(ruta, campos, filas)
+            resultado["archivadas"] += len(filas)
+            resultado["archivos"].append(str(ruta))
+
+        eliminadas = _borrar(modelo._meta.db_table, columna, limite_db, ids)
+        resultado["eliminadas"] += eliminadas
+        resultado["lotes"] += 1
+        if not eliminadas:
+            # el mismo lote volvería a salir: se corta en lugar de girar
+            logger.error("Retención empresa %s %s: el lote no se borró", empresa_id, NOMBRE_ENTIDAD[entidad])
+            break
+
+        if filas_por_segundo:
+            espera = len(filas) / filas_por_segundo - (time.monotonic() - inicio)
+            if espera > 0:
+                time.sleep(espera)
+    return resultado
+
+
+def aplicar_retencion(empresa_id=None, entidad=None, lote=LOTE, filas_por_segundo=FILAS_POR_SEGUNDO,
+                      max_lotes=None, hoy=None, directorio=None):
+    """
+    Recorre las políticas (ver politicas()) -> [resultado por (empresa, entidad)]
+    max_lotes acota el total de la corrida (se retoma en la siguiente).
+    """
+    resultados = []
+    restantes = max_lotes
+    for eid, ent, meses, archivar in politicas(empresa_id, entidad):
+        if restantes is not None and restantes <= 0:
+            break
+        r = retirar(eid, ent, meses, archivar=archivar, lote=lote, filas_por_segundo=filas_por_segundo,
+                    max_lotes=restantes, hoy=hoy, directorio=directorio)
+        if restantes is not None:
+            restantes -= r["lotes"]
+        if r["lotes"]:
+            logger.info("Retención empresa %s %s: %s filas", eid, NOMBRE_ENTIDAD[ent], r["eliminadas"])
+        resultados.append(r)
+    return resultados
@@ -0,0 +1,36 @@
+# apps/core/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.asistencia.models import JornadaCalculada
+from apps.ausencias.models import SolicitudAusencia
+from apps.core.cache_dashboards import invalidar
+from apps.core.resumenes import marcar_instancias, marcar_resumenes
+from apps.empleados.models import Empleado
+from apps.kpi.models import ResultadoKPI
+
+
+# solo se encola; el recálculo lo hace actualizar_resumenes
+@receiver(post_save, sender=JornadaCalculada)
+@receiver(post_delete, sender=JornadaCalculada)
+def encolar_resumen_jornada(sender, instance, **kwargs):
+    marcar_resumenes([(instance.empresa_id, instance.fecha)])
+
+
+@receiver(post_save, sender=SolicitudAusencia)
+@receiver(post_delete, sender=SolicitudAusencia)
+def encolar_resumen_solicitud(sender, instance, **kwargs):
+    marcar_instancias([instance], "creada_el")
+
+
+@receiver(post_save, sender=ResultadoKPI)
+@receiver(post_delete, sender=ResultadoKPI)
+def encolar_resumen_kpi(sender, instance, **kwargs):
+    marcar_instancias([instance], "calculado_el")
+
+
+# conteos de empleados (por empresa / unidad) de los dashboards
+@receiver(post_save, sender=Empleado)
+@receiver(post_delete, sender=Empleado)
+def invalidar_dashboard_empleado(sender, instance, **kwargs):
+    invalidar([instance.empresa_id])
@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-18 15:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empleados', '0002_alter_contrato_empleado_alter_contrato_empresa_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empleado',
+            name='actualizado_el',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='contrato',
+            name='actualizado_el',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='empleado',
+            index=models.Index(fields=['empresa', 'actualizado_el', 'id'], name='empleado_emp_act_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contrato',
+            index=models.Index(fields=['empresa', 'actualizado_el', 'id'], name='contrato_emp_act_idx'),
+        ),
+    ]
@@ -23,9 +23,16 @@ class Empleado(models.Model):
     fecha_ingreso = models.DateField()
     foto_url = models.CharField(max_length=150, null=True, blank=True)
     estado = models.SmallIntegerField()
+    # marca de cambio para la sincronización incremental con ERP (auto_now
+    # no se dispara con .update()/bulk_update y save(update_fields=...) solo
+    # la escribe si está en la lista: incluirla siempre)
+    actualizado_el = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'empleado'
+        indexes = [
+            models.Index(fields=["empresa", "actualizado_el", "id"], name="empleado_emp_act_idx"),
+        ]
 
 
 class Contrato(models.Model):
@@ -44,9 +51,13 @@ class Contrato(models.Model):
     salario_base = models.DecimalField(max_digits=12, decimal_places=2)
     jornada_semanal_horas = models.IntegerField()
     estado = models.SmallIntegerField()
+    actualizado_el = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'contrato'
+        indexes = [
+            models.Index(fields=["empresa", "actualizado_el", "id"], name="contrato_emp_act_idx"),
+        ]
 
 
 class DocumentoEmpleado(models.Model):
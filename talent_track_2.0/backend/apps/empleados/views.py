@@ -128,20 +128,18 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.empleados.models import Empleado
-from apps.usuarios.models import UsuarioRol
+from apps.usuarios.contexto import get_contexto
 from .serializers import MiEmpleadoSerializer, MiEmpleadoUpdateSerializer
 
 
 def _ctx(request):
-    u = request.user.usuario
-    return u.empresa_id, u.empleado_id, u.id
+    ctx = get_contexto(request)
+    return ctx.empresa_id, ctx.empleado_id, ctx.usuario_id
 
 
 def _require_empleado(request):
-    return UsuarioRol.objects.filter(
-        usuario_id=request.user.usuario.id,
-        rol__nombre="empleado"
-    ).exists()
+    ctx = get_contexto(request)
+    return bool(ctx and ctx.usuario_id and ctx.tiene_rol("empleado"))
 
 
 # apps/empleados/views.py
@@ -3,7 +3,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 
-from apps.usuarios.models import Usuario
+from apps.usuarios.contexto import get_contexto
 from apps.empleados.models import Empleado, Contrato
 from apps.asistencia.models import JornadaCalculada
 
@@ -16,20 +16,9 @@ from apps.empleados.serializers_auditor_expedientes import (
 
 
 def _get_usuario_tt(request):
-    auth_user = getattr(request, "user", None)
-    if not auth_user or not getattr(auth_user, "is_authenticated", False):
-        return None
-
-    usuario_id = getattr(auth_user, "usuario_id", None)
-    if not usuario_id:
-        return None
-
-    return (
-        Usuario.objects
-        .select_related("empresa", "empleado")
-        .filter(id=usuario_id)
-        .first()
-    )
+    # contexto del token (apps/usuarios/contexto.py): sin consultar usuarios.Usuario
+    ctx = get_contexto(request)
+    return ctx if ctx and ctx.usuario_id else None
 
 
 class AuditorEmpleadosListAPIView(APIView):
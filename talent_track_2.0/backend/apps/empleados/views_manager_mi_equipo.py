@@ -6,6 +6,7 @@ from rest_framework import status
 
 from apps.empleados.models import Empleado, Contrato
 from apps.asistencia.models import JornadaCalculada
+from apps.usuarios.contexto import get_contexto
 
 
 ESTADO_EMPLEADO = {
@@ -23,13 +24,11 @@ ESTADO_JORNADA = {
 
 def get_usuario_tt(request):
     """
-    Asume que estás autenticando con AuthUser (accounts.AuthUser)
-    y que request.user.usuario apunta a usuarios.Usuario.
+    Contexto del usuario negocio (usuarios.Usuario) tomado del token,
+    sin consultar la BD. Ver apps/usuarios/contexto.py
     """
-    u = getattr(request, "user", None)
-    if not u or not getattr(u, "is_authenticated", False):
-        return None
-    return getattr(u, "usuario", None)
+    ctx = get_contexto(request)
+    return ctx if ctx and ctx.usuario_id else None
 
 
 def get_context_manager(request):
@@ -162,7 +161,8 @@ class MiEquipoEmpleadoCambiarEstadoAPIView(APIView):
             return Response({"estado": "estado debe ser 1 (activo), 2 (suspendido) o 3 (baja)."}, status=400)
 
         e.estado = estado
-        e.save(update_fields=["estado"])
+        # actualizado_el: el cambio de estado también se envía al ERP
+        e.save(update_fields=["estado", "actualizado_el"])
 
         return Response({
             "id": e.id,
@@ -11,6 +11,7 @@ from rest_framework import status
 
 from apps.empleados.models import Contrato, Empleado
 from apps.asistencia.models import Turno
+from apps.core.paginacion import paginar_keyset, respuesta_paginada
 
 
 # ===== Helpers (empresa desde token) =====
@@ -206,9 +207,9 @@ class RRHHContratosListCreateAPIView(APIView):
             Contrato.objects
             .select_related("empleado", "turno_base")
             .filter(empresa_id=empresa_id)
-            .order_by("id")
         )
-        return Response([contrato_to_dict(c) for c in qs], status=200)
+        contratos, next_cursor = paginar_keyset(request, qs, ("id",))
+        return respuesta_paginada(request, [contrato_to_dict(c) for c in contratos], next_cursor)
 
     def post(self, request):
         scope = require_rrhh(request)
@@ -11,6 +11,7 @@ from rest_framework import status
 
 from apps.empleados.models import Empleado, Contrato
 from apps.core.models import UnidadOrganizacional, Puesto
+from apps.core.paginacion import paginar_keyset, respuesta_paginada
 
 
 # ===== Helpers (empresa desde token) =====
@@ -150,9 +151,9 @@ class RRHHEmpleadosListCreateAPIView(APIView):
             Empleado.objects
             .select_related("unidad", "puesto", "manager")
             .filter(empresa_id=empresa_id)
-            .order_by("id")
         )
-        return Response([empleado_to_dict(e) for e in qs], status=200)
+        empleados, next_cursor = paginar_keyset(request, qs, ("id",))
+        return respuesta_paginada(request, [empleado_to_dict(e) for e in empleados], next_cursor)
 
     def post(self, request):
         scope = require_rrhh(request)
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class IntegracionesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.integraciones'
+
+    def ready(self):
+        # registra el despachador del canal webhook del outbox de notificaciones
+        from . import webhooks  # noqa: F401
@@ -0,0 +1,169 @@
+# apps/integraciones/cron.py
+"""
+Expresiones cron de ReporteProgramado.frecuencia_cron (5 campos):
+
+    minuto hora dia_mes mes dia_semana
+    */15   8-18 *       *   mon-fri
+
+Soporta *, listas (1,15), rangos (1-5), pasos (*/10, 8-18/2), nombres de
+mes/día en inglés (jan, mon) y las macros @hourly @daily @weekly @monthly
+@yearly. Igual que cron: si dia_mes y dia_semana están restringidos ambos,
+basta con que se cumpla uno de los dos. Domingo es 0 (o 7).
+
+Cron.siguiente() salta campo por campo (mes -> día -> hora -> minuto) en
+vez de probar minuto a minuto: calcular la próxima ejecución cuesta unas
+pocas iteraciones aunque falten meses.
+"""
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+MESES = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+DIAS = {d: i for i, d in enumerate(("sun", "mon", "tue", "wed", "thu", "fri", "sat"))}
+
+MACROS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+
+# (nombre, mínimo, máximo, nombres)
+CAMPOS = (
+    ("minuto", 0, 59, None),
+    ("hora", 0, 23, None),
+    ("dia_mes", 1, 31, None),
+    ("mes", 1, 12, MESES),
+    ("dia_semana", 0, 7, DIAS),
+)
+
+# un cron que no calza en 8 años (p.ej. 30 de febrero) no tiene ejecución
+MAX_ANIOS = 8
+
+
+class CronInvalido(ValueError):
+    pass
+
+
+def _numero(texto, campo, nombres):
+    texto = texto.strip().lower()
+    if nombres and texto in nombres:
+        return nombres[texto]
+    if not texto.isdigit():
+        raise CronInvalido(f"{campo}: valor inválido '{texto}'.")
+    return int(texto)
+
+
+def _parsear_campo(texto, campo, minimo, maximo, nombres):
+    valores = set()
+    for parte in texto.split(","):
+        paso = 1
+        con_paso = "/" in parte
+        if con_paso:
+            parte, p = parte.split("/", 1)
+            if not p.isdigit() or int(p) < 1:
+                raise CronInvalido(f"{campo}: paso inválido '{p}'.")
+            paso = int(p)
+
+        if parte == "*":
+            ini, fin = minimo, maximo
+        elif "-" in parte:
+            a, b = parte.split("-", 1)
+            ini, fin = _numero(a, campo, nombres), _numero(b, campo, nombres)
+        else:
+            ini = _numero(parte, campo, nombres)
+            # "5/15" = desde 5 cada 15
+            fin = maximo if con_paso else ini
+
+        if not (minimo <= ini <= maximo and minimo <= fin <= maximo) or ini > fin:
+            raise CronInvalido(f"{campo}: fuera de rango ({minimo}-{maximo}) en '{texto}'.")
+        valores.update(range(ini, fin + 1, paso))
+    return valores
+
+
+class Cron:
+    def __init__(self, expresion):
+        self.expresion = expresion.strip()
+        texto = MACROS.get(self.expresion.lower(), self.expresion)
+        partes = texto.split()
+        if len(partes) != 5:
+            raise CronInvalido("La expresión cron debe tener 5 campos: minuto hora dia_mes mes dia_semana.")
+
+        conjuntos = [
+            _parsear_campo(p, nombre, minimo, maximo, nombres)
+            for p, (nombre, minimo, maximo, nombres) in zip(partes, CAMPOS)
+        ]
+        minutos, horas, dias, meses, semana = conjuntos
+        semana = {d % 7 for d in semana}
+
+        self.minutos = tuple(sorted(minutos))
+        self.horas = tuple(sorted(horas))
+        self.dias = frozenset(dias)
+        self.meses = frozenset(meses)
+        self.dias_semana = frozenset(semana)
+        self._dia_libre = partes[2] == "*"
+        self._semana_libre = partes[4] == "*"
+
+    def __repr__(self):
+        return f"Cron({self.expresion!r})"
+
+    def dia_ok(self, fecha):
+        en_mes = fecha.day in self.dias
+        en_semana = fecha.isoweekday() % 7 in self.dias_semana
+        if self._dia_libre and self._semana_libre:
+            return True
+        if self._dia_libre:
+            return en_semana
+        if self._semana_libre:
+            return en_mes
+        return en_mes or en_semana
+
+    def _siguiente_local(self, t):
+        """
+        t: datetime naive (hora local). -> primera coincidencia >= t
+        """
+        limite = t.year + MAX_ANIOS
+        while t.year <= limite:
+            if t.month not in self.meses:
+                anio, mes = (t.year + 1, 1) if t.month == 12 else (t.year, t.month + 1)
+                t = datetime(anio, mes, 1)
+                continue
+
+            if not self.dia_ok(t.date()):
+                t = datetime(t.year, t.month, t.day) + timedelta(days=1)
+                continue
+
+            i = bisect_left(self.horas, t.hour)
+            if i == len(self.horas):
+                t = datetime(t.year, t.month, t.day) + timedelta(days=1)
+                continue
+            if self.horas[i] != t.hour:
+                t = t.replace(hour=self.horas[i], minute=0)
+
+            i = bisect_left(self.minutos, t.minute)
+            if i == len(self.minutos):
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            return t.replace(minute=self.minutos[i])
+
+        raise CronInvalido(f"'{self.expresion}' no tiene próxima ejecución.")
+
+    def siguiente(self, desde, tz):
+        """
+        Próxima ejecución estrictamente posterior a `desde` (aware), evaluando
+        la expresión en la zona horaria `tz` (la de la empresa).
+        """
+        local = desde.astimezone(tz).replace(tzinfo=None, second=0, microsecond=0) + timedelta(minutes=1)
+        return self._siguiente_local(local).replace(tzinfo=tz)
+
+
+def parsear_cron(expresion):
+    """
+    -> Cron (CronInvalido si la expresión no es válida).
+    """
+    if not isinstance(expresion, str) or not expresion.strip():
+        raise CronInvalido("La expresión cron es requerida.")
+    return Cron(expresion)
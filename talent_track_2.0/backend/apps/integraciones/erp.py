@@ -0,0 +1,531 @@
+# apps/integraciones/erp.py
+"""
+Conectores ERP guiados por IntegracionERP.mapeos.
+
+IntegracionERP.tipo (entidad): 1 empleados, 2 contratos
+IntegracionERP.metodo:         1 push (TalentTrack -> ERP), 2 pull (ERP -> TalentTrack), 3 ambos
+
+mapeos (campo del ERP -> campo local):
+    {
+      "clave": ["documento"],                  # llave natural local (default por entidad)
+      "campos": {
+        "cedula": "documento",
+        "nombre": "nombres",
+        "ingreso": {"campo": "fecha_ingreso", "tipo": "fecha"},
+        "cedula_empleado": "empleado__documento"   # FK a Empleado por otro campo
+      },
+      "defaults": {"unidad_id": 1, "puesto_id": 1, "estado": 1}   # solo al crear (pull)
+    }
+tipos: texto, entero, decimal, fecha, bool (default: tal cual).
+Los destinos y defaults deben ser campos del modelo (attname: unidad_id,
+no unidad); id y empresa_id no se pueden mapear (la empresa es la de la
+integración) y las filas cuyas FK (unidad_id, puesto_id, manager_id...)
+no son de esa empresa se omiten.
+
+El mapeo se compila UNA vez por integración (cacheado por id + contenido)
+a listas de (origen, destino, conversor): mapear una fila es un recorrido
+plano, sin volver a leer el JSON.
+
+Protocolo HTTP con el ERP (JSON, endpoint = URL base):
+    push: POST {endpoint}/{ruta}               {"items": [...]}
+    pull: GET  {endpoint}/{ruta}?cursor=&limite= -> {"items": [...], "cursor": "..", "hay_mas": bool}
+credenciales: {"token": ".."} (Bearer) o {"usuario": "..", "clave": ".."} (Basic).
+
+Deltas: push envía solo filas con (actualizado_el, id) posterior al cursor
+guardado; pull guarda el cursor que devuelve el ERP. El cursor avanza en
+la misma transacción que aplica cada lote (CursorERP = checkpoint).
+Con metodo=3 (ambos) el push salta las filas que el pull de esa misma
+pasada acaba de escribir (mismo id y actualizado_el): el cursor las pasa
+sin reenviarlas al ERP del que vinieron. Si después se editan localmente,
+actualizado_el cambia y sí van.
+"""
+import base64
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from apps.empleados.models import Contrato, Empleado
+from apps.integraciones.models import CursorERP, IntegracionERP
+
+logger = logging.getLogger(__name__)
+
+EMPLEADOS = 1
+CONTRATOS = 2
+
+PUSH = 1
+PULL = 2
+AMBOS = 3
+
+LOTE = getattr(settings, "ERP_LOTE", 500)
+TIMEOUT = getattr(settings, "ERP_TIMEOUT", 30)
+WORKERS = getattr(settings, "ERP_WORKERS", 4)
+
+
+class ErrorERP(Exception):
+    pass
+
+
+# la fila pertenece a la empresa de la integración: el ERP no la elige
+PROTEGIDOS = frozenset({"id", "empresa_id"})
+
+
+@dataclass(frozen=True)
+class Entidad:
+    modelo: type
+    ruta: str
+    clave: tuple
+
+
+ENTIDADES = {
+    EMPLEADOS: Entidad(Empleado, "empleados", ("documento",)),
+    CONTRATOS: Entidad(Contrato, "contratos", ("empleado_id", "fecha_inicio")),
+}
+
+
+# =========================
+# Mapeo compilado
+# =========================
+def _a_fecha(v):
+    if v in (None, "") or isinstance(v, date):
+        return v or None
+    d = parse_date(str(v)[:10])
+    if d is None:
+        raise ValueError(f"fecha inválida '{v}'")
+    return d
+
+
+def _a_decimal(v):
+    if v in (None, ""):
+        return None
+    try:
+        return Decimal(str(v))
+    except InvalidOperation:
+        raise ValueError(f"decimal inválido '{v}'")
+
+
+def _a_bool(v):
+    if isinstance(v, str):
+        return v.strip().lower() in ("1", "true", "si", "sí", "s", "y", "yes")
+    return bool(v)
+
+
+CONVERSORES = {
+    "texto": lambda v: None if v is None else str(v),
+    "entero": lambda v: None if v in (None, "") else int(v),
+    "decimal": _a_decimal,
+    "fecha": _a_fecha,
+    "bool": _a_bool,
+}
+
+
+def _a_json(v):
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return str(v)
+    return v
+
+
+def _validar_campo(modelo, campo, donde):
+    if campo in PROTEGIDOS or campo == modelo._meta.pk.attname:
+        raise ErrorERP(f"{donde}: '{campo}' no se puede mapear.")
+    if campo not in {f.attname for f in modelo._meta.concrete_fields}:
+        raise ErrorERP(f"{donde}: '{campo}' no es un campo de {modelo.__name__}.")
+
+
+class Mapeo:
+    """
+    mapeos (JSON) -> funciones de fila. Ver docstring del módulo.
+    """
+
+    def __init__(self, entidad, mapeos):
+        mapeos = mapeos or {}
+        campos = mapeos.get("campos") or {}
+        if not isinstance(campos, dict) or not campos:
+            raise ErrorERP("mapeos.campos es requerido (campo_erp -> campo_local).")
+
+        self.entidad = entidad
+        self.clave = tuple(mapeos.get("clave") or entidad.clave)
+        self.defaults = dict(mapeos.get("defaults") or {})
+        for campo in self.defaults:
+            _validar_campo(entidad.modelo, campo, "mapeos.defaults")
+
+        pares = []
+        for origen, destino in campos.items():
+            tipo = None
+            if isinstance(destino, dict):
+                tipo = destino.get("tipo")
+                destino = destino.get("campo")
+            if not destino or not isinstance(destino, str):
+                raise ErrorERP(f"mapeos.campos.{origen}: falta el campo local.")
+            if tipo and tipo not in CONVERSORES:
+                raise ErrorERP(f"mapeos.campos.{origen}: tipo '{tipo}' no soportado.")
+            if destino.startswith("empleado__"):
+                _validar_campo(Empleado, destino.split("__", 1)[1], f"mapeos.campos.{origen}")
+            else:
+                _validar_campo(entidad.modelo, destino, f"mapeos.campos.{origen}")
+            pares.append((origen, destino, CONVERSORES.get(tipo)))
+        self._pares = tuple(pares)
+
+        # "empleado__documento" -> se resuelve a empleado_id por lote
+        self.referencias = tuple(sorted({d.split("__", 1)[1] for _, d, _ in pares if d.startswith("empleado__")}))
+        self.campos_locales = tuple(d for _, d, _ in pares)
+
+        locales = {self._local(d) for d in self.campos_locales}
+        faltan = [c for c in self.clave if c not in locales]
+        if faltan:
+            raise ErrorERP(f"La clave {self.clave} no está mapeada ({', '.join(faltan)}).")
+
+    @staticmethod
+    def _local(destino):
+        return "empleado_id" if destino.startswith("empleado__") else destino
+
+    def a_local(self, fila_erp):
+        """
+        dict del ERP -> dict local (con empleado__x aún sin resolver).
+        """
+        return {
+            destino: conv(fila_erp.get(origen)) if conv else fila_erp.get(origen)
+            for origen, destino, conv in self._pares
+            if origen in fila_erp
+        }
+
+    def a_erp(self, fila_local):
+        """
+        dict de .values(*campos_locales) -> dict para el ERP.
+        """
+        return {origen: _a_json(fila_local.get(destino)) for origen, destino, _ in self._pares}
+
+
+_MAPEOS = {}
+
+
+def mapeo_integracion(integracion):
+    """
+    Mapeo compilado, cacheado por (id, entidad, contenido de mapeos).
+    """
+    firma = (integracion.tipo, json.dumps(integracion.mapeos, sort_keys=True, default=str))
+    cacheado = _MAPEOS.get(integracion.id)
+    if cacheado and cacheado[0] == firma:
+        return cacheado[1]
+    entidad = ENTIDADES.get(integracion.tipo)
+    if not entidad:
+        raise ErrorERP(f"IntegracionERP.tipo no soportado: {integracion.tipo}.")
+    mapeo = Mapeo(entidad, integracion.mapeos)
+    _MAPEOS[integracion.id] = (firma, mapeo)
+    return mapeo
+
+
+# =========================
+# HTTP
+# =========================
+def _headers(credenciales):
+    h = {"Content-Type": "application/json", "Accept": "application/json"}
+    credenciales = credenciales or {}
+    if credenciales.get("token"):
+        h["Authorization"] = f"Bearer {credenciales['token']}"
+    elif credenciales.get("usuario"):
+        par = f"{credenciales['usuario']}:{credenciales.get('clave', '')}".encode()
+        h["Authorization"] = "Basic " + base64.b64encode(par).decode()
+    return h
+
+
+def _http(integracion, metodo, ruta, params=None, cuerpo=None):
+    url = integracion.endpoint.rstrip("/") + "/" + ruta
+    if params:
+        url += "?" + urlencode({k: v for k, v in params.items() if v is not None})
+    data = json.dumps(cuerpo, cls=DjangoJSONEncoder).encode() if cuerpo is not None else None
+    req = Request(url, data=data, method=metodo, headers=_headers(integracion.credenciales))
+    try:
+        with urlopen(req, timeout=TIMEOUT) as resp:
+            contenido = resp.read()
+    except HTTPError as exc:
+        raise ErrorERP(f"{metodo} {ruta}: HTTP {exc.code}")
+    except (URLError, OSError) as exc:
+        raise ErrorERP(f"{metodo} {ruta}: {exc}")
+    if not contenido:
+        return {}
+    try:
+        return json.loads(contenido)
+    except ValueError:
+        raise ErrorERP(f"{metodo} {ruta}: respuesta no es JSON")
+
+
+# =========================
+# Checkpoints
+# =========================
+def _cursor(integracion, entidad, direccion):
+    obj, _ = CursorERP.objects.get_or_create(
+        integracion=integracion, entidad=entidad, direccion=direccion,
+        defaults={"actualizado_el": timezone.now()},
+    )
+    return obj
+
+
+def _avanzar(cursor, valor, filas):
+    cursor.cursor = valor
+    cursor.filas_total += filas
+    cursor.actualizado_el = timezone.now()
+    cursor.save(update_fields=["cursor", "filas_total", "actualizado_el"])
+
+
+# =========================
+# Push
+# =========================
+def push(integracion, lote=LOTE, omitir=None):
+    """
+    Envía las filas cambiadas desde el último checkpoint. -> enviados
+
+    omitir: {id: actualizado_el} de las filas que escribió el pull (no se
+    devuelven al ERP).
+    """
+    omitir = omitir or {}
+    mapeo = mapeo_integracion(integracion)
+    modelo = mapeo.entidad.modelo
+    cursor = _cursor(integracion, integracion.tipo, PUSH)
+
+    qs = modelo.objects.filter(empresa_id=integracion.empresa_id)
+    enviados = 0
+    while True:
+        q = qs
+        if cursor.cursor:
+            marca, ultimo_id = cursor.cursor.rsplit("|", 1)
+            marca = parse_datetime(marca)
+            q = q.filter(Q(actualizado_el__gt=marca) | Q(actualizado_el=marca, id__gt=int(ultimo_id)))
+        filas = list(
+            q.order_by("actualizado_el", "id")
+            .values(*dict.fromkeys(("id", "actualizado_el") + mapeo.campos_locales))[:lote]
+        )
+        if not filas:
+            return enviados
+
+        items = [mapeo.a_erp(f) for f in filas if omitir.get(f["id"]) != f["actualizado_el"]]
+        if items:
+            _http(integracion, "POST", mapeo.entidad.ruta, cuerpo={"items": items})
+        ultima = filas[-1]
+        _avanzar(cursor, f"{ultima['actualizado_el'].isoformat()}|{ultima['id']}", len(items))
+        enviados += len(items)
+        if len(filas) < lote:
+            return enviados
+
+
+# =========================
+# Pull
+# =========================
+def _resolver_empleados(integracion, mapeo, filas):
+    """
+    empleado__<campo> -> empleado_id (una consulta por campo y lote).
+    Filas sin empleado encontrado se descartan.
+    """
+    for campo in mapeo.referencias:
+        llave = f"empleado__{campo}"
+        valores = {f[llave] for f in filas if f.get(llave) is not None}
+        ids = dict(
+            Empleado.objects
+            .filter(empresa_id=integracion.empresa_id, **{f"{campo}__in": valores})
+            .values_list(campo, "id")
+        )
+        resueltas = []
+        for f in filas:
+            empleado_id = ids.get(f.pop(llave, None))
+            if empleado_id:
+                f["empleado_id"] = empleado_id
+                resueltas.append(f)
+        filas = resueltas
+    return filas
+
+
+def _de_la_empresa(integracion, modelo, por_clave):
+    """
+    Descarta las filas cuyas FK (unidad_id, puesto_id, manager_id,
+    turno_base_id...), vengan del ERP o de mapeos.defaults, no existen en
+    la empresa de la integración. Una consulta por FK y lote.
+    """
+    for campo in modelo._meta.concrete_fields:
+        if not campo.is_relation or campo.attname in PROTEGIDOS:
+            continue
+        valores = {}
+        for k, f in por_clave.items():
+            v = f.get(campo.attname)
+            if v is not None:
+                try:
+                    valores[k] = campo.target_field.to_python(v)
+                except ValidationError:
+                    valores[k] = None
+        if not valores:
+            continue
+        destino = campo.related_model.objects.filter(pk__in={v for v in valores.values() if v is not None})
+        if any(f.attname == "empresa_id" for f in campo.related_model._meta.concrete_fields):
+            destino = destino.filter(empresa_id=integracion.empresa_id)
+        validos = set(destino.values_list("pk", flat=True))
+        por_clave = {k: f for k, f in por_clave.items() if k not in valores or valores[k] in validos}
+    return por_clave
+
+
+def _requeridos(modelo):
+    return {
+        f.attname for f in modelo._meta.concrete_fields
+        if not f.null and not f.has_default() and not f.primary_key
+        and not getattr(f, "auto_now", False) and f.attname != "empresa_id"
+    }
+
+
+def _aplicar(integracion, mapeo, items, escritos=None):
+    """
+    Upsert de un lote por la clave natural. -> (creados, actualizados, omitidos)
+
+    escritos: dict que recibe {id: actualizado_el} de cada fila escrita.
+    """
+    modelo = mapeo.entidad.modelo
+    filas = []
+    omitidos = 0
+    for item in items:
+        try:
+            filas.append(mapeo.a_local(item))
+        except (TypeError, ValueError):
+            omitidos += 1
+    antes = len(filas)
+    filas = _resolver_empleados(integracion, mapeo, filas)
+    omitidos += antes - len(filas)
+
+    clave = mapeo.clave
+    por_clave = {}
+    for f in filas:
+        k = tuple(f.get(c) for c in clave)
+        if None in k:
+            omitidos += 1
+            continue
+        por_clave[k] = f  # la última del lote gana
+
+    base = modelo.objects.filter(empresa_id=integracion.empresa_id)
+    if len(clave) == 1:
+        base = base.filter(**{f"{clave[0]}__in": [k[0] for k in por_clave]})
+    else:
+        q = Q()
+        for k in por_clave:
+            q |= Q(**dict(zip(clave, k)))
+        base = base.filter(q) if por_clave else base.none()
+    existentes = {tuple(getattr(o, c) for c in clave): o for o in base}
+
+    # los defaults solo aplican al crear
+    requeridos = _requeridos(modelo)
+    datos = {}
+    for k, f in por_clave.items():
+        if k not in existentes:
+            f = {**mapeo.defaults, **f}
+            if requeridos - set(f):
+                continue
+        datos[k] = f
+    datos = _de_la_empresa(integracion, modelo, datos)
+    omitidos += len(por_clave) - len(datos)
+
+    ahora = timezone.now()
+    nuevos, cambiados, campos = [], [], set()
+    for k, f in datos.items():
+        obj = existentes.get(k)
+        if obj:
+            for campo, valor in f.items():
+                setattr(obj, campo, valor)
+            obj.actualizado_el = ahora
+            campos.update(f)
+            cambiados.append(obj)
+            continue
+        nuevos.append(modelo(empresa_id=integracion.empresa_id, **f))
+
+    if nuevos:
+        # auto_now fija actualizado_el en cada instancia (y el id vuelve de la BD)
+        modelo.objects.bulk_create(nuevos)
+    if cambiados:
+        # bulk_update no pasa por auto_now: actualizado_el va explícito
+        modelo.objects.bulk_update(cambiados, sorted(campos | {"actualizado_el"}))
+    if escritos is not None:
+        escritos.update((o.pk, o.actualizado_el) for o in nuevos + cambiados)
+    return len(nuevos), len(cambiados), omitidos
+
+
+def pull(integracion, lote=LOTE, escritos=None):
+    """
+    Trae del ERP los cambios desde el último cursor. -> (creados, actualizados, omitidos)
+    """
+    mapeo = mapeo_integracion(integracion)
+    cursor = _cursor(integracion, integracion.tipo, PULL)
+    totales = [0, 0, 0]
+    while True:
+        resp = _http(integracion, "GET", mapeo.entidad.ruta, params={"cursor": cursor.cursor, "limite": lote})
+        items = resp.get("items") or []
+        with transaction.atomic():
+            parcial = _aplicar(integracion, mapeo, items, escritos)
+            _avanzar(cursor, resp.get("cursor") or cursor.cursor, len(items))
+        totales = [a + b for a, b in zip(totales, parcial)]
+        if not resp.get("hay_mas") or not items:
+            return tuple(totales)
+
+
+# =========================
+# Orquestación
+# =========================
+def sincronizar_integracion(integracion, lote=LOTE):
+    r = {"integracion_id": integracion.id, "empresa_id": integracion.empresa_id,
+         "enviados": 0, "creados": 0, "actualizados": 0, "omitidos": 0, "error": None}
+    escritos = {}
+    try:
+        if integracion.metodo in (PULL, AMBOS):
+            r["creados"], r["actualizados"], r["omitidos"] = pull(integracion, lote, escritos)
+        if integracion.metodo in (PUSH, AMBOS):
+            r["enviados"] = push(integracion, lote, omitir=escritos)
+    except ErrorERP as exc:
+        r["error"] = str(exc)
+        logger.warning("Integración ERP %s: %s", integracion.id, exc)
+    except Exception as exc:
+        # un fallo inesperado (BD, mapeo) no corta las demás integraciones
+        r["error"] = f"{type(exc).__name__}: {exc}"
+        logger.exception("Integración ERP %s falló", integracion.id)
+    return r
+
+
+def _sincronizar_grupo(integraciones, lote):
+    # contratos después de empleados (resuelven empleado__x)
+    return [sincronizar_integracion(i, lote) for i in sorted(integraciones, key=lambda i: (i.tipo, i.id))]
+
+
+def _sincronizar_en_hilo(integraciones, lote):
+    try:
+        return _sincronizar_grupo(integraciones, lote)
+    finally:
+        # cada hilo abre su propia conexión: se cierra al terminar
+        connection.close()
+
+
+def sincronizar_todas(empresa_id=None, workers=WORKERS, lote=LOTE):
+    """
+    Integraciones activas agrupadas por empresa: cada empresa en su hilo
+    (sus integraciones en serie), empresas en paralelo. workers=0: en el
+    hilo actual.
+    """
+    qs = IntegracionERP.objects.filter(activo=True)
+    if empresa_id:
+        qs = qs.filter(empresa_id=empresa_id)
+    por_empresa = {}
+    for integracion in qs.order_by("empresa_id", "id"):
+        por_empresa.setdefault(integracion.empresa_id, []).append(integracion)
+
+    if workers <= 0:
+        grupos = [_sincronizar_grupo(g, lote) for g in por_empresa.values()]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            grupos = list(pool.map(lambda g: _sincronizar_en_hilo(g, lote), por_empresa.values()))
+    return [r for grupo in grupos for r in grupo]
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.integraciones.webhooks import LOTE_DEFAULT, TIMEOUT, entregar_pendientes
+
+
+class Command(BaseCommand):
+    help = "Entrega las EntregaWebhook pendientes (HTTP asíncrono, firma HMAC y reintentos con backoff)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limite", type=int, default=LOTE_DEFAULT, help="Entregas por pasada")
+        parser.add_argument("--timeout", type=float, default=TIMEOUT, help="Segundos por petición")
+        parser.add_argument("--loop", action="store_true", help="No termina: vuelve a revisar cada --intervalo segundos")
+        parser.add_argument("--intervalo", type=float, default=5.0, help="Segundos entre pasadas con --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            r = entregar_pendientes(limite=options["limite"], timeout=options["timeout"])
+            if any(r.values()) or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Entregadas: {r['entregadas']}, reintentos: {r['reintentos']}, fallidas: {r['fallidas']}"
+                ))
+            # lote lleno: puede haber más vencidas, se sigue sin esperar
+            if sum(r.values()) >= options["limite"]:
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["intervalo"])
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.models import Empresa
+from apps.integraciones.nomina import GENERADA, generar_exportacion, rango_periodo
+
+
+class Command(BaseCommand):
+    help = "Genera la ExportacionNomina (CSV por empleado + totales) de un período YYYY-MM"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--periodo", required=True, help="YYYY-MM")
+        parser.add_argument("--empresa-id", type=int, default=None, help="Solo una empresa (default: todas las activas)")
+
+    def handle(self, *args, **options):
+        periodo = options["periodo"]
+        try:
+            rango_periodo(periodo)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        empresas = Empresa.objects.filter(estado=1)
+        if options["empresa_id"]:
+            empresas = Empresa.objects.filter(id=options["empresa_id"])
+
+        for empresa_id in empresas.order_by("id").values_list("id", flat=True):
+            exp = generar_exportacion(empresa_id, periodo)
+            if exp.estado == GENERADA:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Empresa {empresa_id}: {exp.total_horas} h, {exp.total_extras} h extra -> {exp.archivo_url}"
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f"Empresa {empresa_id}: {exp.observaciones}"))
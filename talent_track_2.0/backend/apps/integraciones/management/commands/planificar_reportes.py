@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.integraciones.models import EjecucionReporte
+from apps.integraciones.planificador import WORKERS, Planificador, PoolReportes, registrar_ejecuciones
+
+
+class Command(BaseCommand):
+    help = "Corre los ReporteProgramado activos según su frecuencia_cron (pool de procesos acotado)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=WORKERS, help="Procesos del pool (0 = en el mismo proceso)")
+        parser.add_argument("--sync", type=float, default=60.0, help="Segundos entre relecturas de los reportes")
+
+    def handle(self, *args, **options):
+        plan = Planificador()
+        pool = PoolReportes(workers=options["workers"])
+        sincronizado = None
+        try:
+            while True:
+                ahora = timezone.now()
+                if sincronizado is None or (ahora - sincronizado).total_seconds() >= options["sync"]:
+                    plan.sincronizar(ahora)
+                    sincronizado = ahora
+
+                resultados = pool.enviar(registrar_ejecuciones(plan.vencidos(ahora)))
+
+                # dormir hasta la próxima ejecución o la próxima relectura
+                espera = options["sync"]
+                proxima = plan.proxima()
+                if proxima:
+                    espera = min(espera, (proxima - timezone.now()).total_seconds())
+                espera = max(espera, 1.0)
+
+                if pool.ocupado:
+                    resultados += pool.recoger(timeout=espera)
+                else:
+                    time.sleep(espera)
+
+                for r in resultados:
+                    if r["estado"] == EjecucionReporte.COMPLETADA:
+                        self.stdout.write(self.style.SUCCESS(f"Ejecución {r['id']}: {r['filas']} filas"))
+                    else:
+                        self.stdout.write(self.style.ERROR(f"Ejecución {r['id']}: {r['error']}"))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pool.cerrar()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.integraciones.erp import LOTE, WORKERS, sincronizar_todas
+
+
+class Command(BaseCommand):
+    help = "Sincroniza (push/pull por deltas) las IntegracionERP activas, empresas en paralelo"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--empresa-id", type=int, default=None, help="Solo una empresa")
+        parser.add_argument("--workers", type=int, default=WORKERS, help="Empresas en paralelo (0 = en serie)")
+        parser.add_argument("--lote", type=int, default=LOTE, help="Filas por petición al ERP")
+
+    def handle(self, *args, **options):
+        resultados = sincronizar_todas(empresa_id=options["empresa_id"], workers=options["workers"], lote=options["lote"])
+        for r in resultados:
+            texto = (
+                f"Integración {r['integracion_id']} (empresa {r['empresa_id']}): enviados {r['enviados']}, "
+                f"creados {r['creados']}, actualizados {r['actualizados']}, omitidos {r['omitidos']}"
+            )
+            if r["error"]:
+                self.stdout.write(self.style.ERROR(f"{texto} -> {r['error']}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(texto))
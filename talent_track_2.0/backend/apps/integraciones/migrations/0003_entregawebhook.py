@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_resumendiarioempresa_resumenmensualempresa_and_more'),
+        ('integraciones', '0002_alter_exportacionnomina_empresa_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntregaWebhook',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('evento', models.SmallIntegerField()),
+                ('payload', models.JSONField()),
+                ('estado', models.SmallIntegerField(default=1)),
+                ('intentos', models.IntegerField(default=0)),
+                ('proximo_intento_el', models.DateTimeField()),
+                ('ultimo_status', models.IntegerField(blank=True, null=True)),
+                ('ultimo_error', models.TextField(blank=True, null=True)),
+                ('duracion_ms', models.IntegerField(blank=True, null=True)),
+                ('creada_el', models.DateTimeField()),
+                ('entregada_el', models.DateTimeField(blank=True, null=True)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.empresa')),
+                ('webhook', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entregas', to='integraciones.webhook')),
+            ],
+            options={
+                'db_table': 'entregawebhook',
+                'indexes': [models.Index(condition=models.Q(('estado', 1)), fields=['proximo_intento_el'], name='webhook_ent_pend_idx'), models.Index(fields=['webhook', 'creada_el'], name='webhook_ent_hist_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-18 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_resumendiarioempresa_resumenmensualempresa_and_more'),
+        ('integraciones', '0003_entregawebhook'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EjecucionReporte',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('programada_para', models.DateTimeField()),
+                ('iniciada_el', models.DateTimeField()),
+                ('finalizada_el', models.DateTimeField(blank=True, null=True)),
+                ('estado', models.SmallIntegerField(default=1)),
+                ('filas', models.IntegerField(default=0)),
+                ('archivo', models.TextField(blank=True, null=True)),
+                ('tamano_bytes', models.BigIntegerField(blank=True, null=True)),
+                ('duracion_ms', models.IntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.empresa')),
+                ('reporte', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ejecuciones', to='integraciones.reporteprogramado')),
+            ],
+            options={
+                'db_table': 'ejecucionreporte',
+                'constraints': [models.UniqueConstraint(fields=('reporte', 'programada_para'), name='ejec_reporte_prog_uniq')],
+            },
+        ),
+    ]
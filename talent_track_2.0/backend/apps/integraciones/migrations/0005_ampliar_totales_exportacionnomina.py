@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integraciones', '0004_ejecucionreporte'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportacionnomina',
+            name='total_extras',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='exportacionnomina',
+            name='total_horas',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+    ]
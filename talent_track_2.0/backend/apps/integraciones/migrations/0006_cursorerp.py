@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 15:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('integraciones', '0005_ampliar_totales_exportacionnomina'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CursorERP',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('entidad', models.SmallIntegerField()),
+                ('direccion', models.SmallIntegerField()),
+                ('cursor', models.CharField(blank=True, max_length=255, null=True)),
+                ('filas_total', models.BigIntegerField(default=0)),
+                ('actualizado_el', models.DateTimeField()),
+                ('integracion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cursores', to='integraciones.integracionerp')),
+            ],
+            options={
+                'db_table': 'cursorerp',
+                'constraints': [models.UniqueConstraint(fields=('integracion', 'entidad', 'direccion'), name='cursor_erp_uniq')],
+            },
+        ),
+    ]
@@ -50,8 +50,9 @@ class ExportacionNomina(models.Model):
     id = models.BigAutoField(primary_key=True)
     empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
     periodo = models.CharField(max_length=150)
-    total_horas = models.DecimalField(max_digits=7, decimal_places=2)
-    total_extras = models.DecimalField(max_digits=7, decimal_places=2)
+    # totales de toda la empresa: 20k empleados x 160 h no caben en 7 dígitos
+    total_horas = models.DecimalField(max_digits=12, decimal_places=2)
+    total_extras = models.DecimalField(max_digits=12, decimal_places=2)
     observaciones = models.TextField(null=True, blank=True)
     archivo_url = models.TextField()
     generado_el = models.DateTimeField()
@@ -59,3 +60,93 @@ class ExportacionNomina(models.Model):
 
     class Meta:
         db_table = 'exportacionnomina'
+
+
+class EntregaWebhook(models.Model):
+    """
+    Bitácora de entregas de Webhook: una fila por (webhook, evento emitido).
+    El worker (entregar_webhooks) toma las pendientes cuyo proximo_intento_el
+    ya venció y reintenta con backoff exponencial hasta reintentos_max.
+    """
+    PENDIENTE = 1
+    ENTREGADA = 2
+    FALLIDA = 3
+
+    id = models.BigAutoField(primary_key=True)
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
+    webhook = models.ForeignKey(Webhook, on_delete=models.CASCADE, related_name="entregas")
+    evento = models.SmallIntegerField()
+    payload = models.JSONField()
+    estado = models.SmallIntegerField(default=PENDIENTE)
+    intentos = models.IntegerField(default=0)
+    proximo_intento_el = models.DateTimeField()
+    ultimo_status = models.IntegerField(null=True, blank=True)
+    ultimo_error = models.TextField(null=True, blank=True)
+    duracion_ms = models.IntegerField(null=True, blank=True)
+    creada_el = models.DateTimeField()
+    entregada_el = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'entregawebhook'
+        indexes = [
+            # cola del worker: pendientes por vencimiento
+            models.Index(
+                fields=["proximo_intento_el"],
+                condition=models.Q(estado=1),
+                name="webhook_ent_pend_idx",
+            ),
+            models.Index(fields=["webhook", "creada_el"], name="webhook_ent_hist_idx"),
+        ]
+
+
+class EjecucionReporte(models.Model):
+    """
+    Historial de corridas de ReporteProgramado (planificar_reportes).
+    UNIQUE (reporte, programada_para): si dos planificadores ven la misma
+    ejecución vencida, solo uno la crea y la corre.
+    """
+    EN_CURSO = 1
+    COMPLETADA = 2
+    ERROR = 3
+
+    id = models.BigAutoField(primary_key=True)
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
+    reporte = models.ForeignKey(ReporteProgramado, on_delete=models.CASCADE, related_name="ejecuciones")
+    programada_para = models.DateTimeField()
+    iniciada_el = models.DateTimeField()
+    finalizada_el = models.DateTimeField(null=True, blank=True)
+    estado = models.SmallIntegerField(default=EN_CURSO)
+    filas = models.IntegerField(default=0)
+    archivo = models.TextField(null=True, blank=True)
+    tamano_bytes = models.BigIntegerField(null=True, blank=True)
+    duracion_ms = models.IntegerField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'ejecucionreporte'
+        constraints = [
+            models.UniqueConstraint(fields=["reporte", "programada_para"], name="ejec_reporte_prog_uniq"),
+        ]
+
+
+class CursorERP(models.Model):
+    """
+    Checkpoint de sincronización por (integración, entidad, dirección):
+    push = última (actualizado_el, id) enviada; pull = cursor opaco del ERP.
+    """
+    PUSH = 1
+    PULL = 2
+
+    id = models.BigAutoField(primary_key=True)
+    integracion = models.ForeignKey(IntegracionERP, on_delete=models.CASCADE, related_name="cursores")
+    entidad = models.SmallIntegerField()
+    direccion = models.SmallIntegerField()
+    cursor = models.CharField(max_length=255, null=True, blank=True)
+    filas_total = models.BigIntegerField(default=0)
+    actualizado_el = models.DateTimeField()
+
+    class Meta:
+        db_table = 'cursorerp'
+        constraints = [
+            models.UniqueConstraint(fields=["integracion", "entidad", "direccion"], name="cursor_erp_uniq"),
+        ]
@@ -0,0 +1,179 @@
+# apps/integraciones/nomina.py
+"""
+Exportación de nómina por período (YYYY-MM) -> ExportacionNomina + CSV.
+
+Una sola consulta agrega, por empleado de la empresa:
+- minutos trabajados / extra / tardanza de JornadaCalculada del mes
+  (LEFT JOIN con FilteredRelation: el rango de fechas va en el ON y el
+  GROUP BY se hace en la BD),
+- días de SolicitudAusencia aprobadas cuyo TipoAusencia.afecta_sueldo,
+  contando las que INICIAN en el mes (dias_habiles completos),
+- salario_base y jornada_semanal_horas del contrato vigente en el período
+  (el de fecha_inicio más reciente).
+
+El resultado se recorre con un cursor del servidor y cada línea se escribe
+al archivo en cuanto llega; los totales se acumulan en la misma pasada.
+"""
+import calendar
+import csv
+import os
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import F, FilteredRelation, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.empleados.models import Contrato, Empleado
+from apps.ausencias.models import SolicitudAusencia
+from apps.core.exportacion import CHUNK_SIZE, valor_celda
+from apps.integraciones.models import ExportacionNomina
+
+GENERANDO = 1
+GENERADA = 2
+ERROR = 3
+
+ESTADO_EXPORTACION = {
+    GENERANDO: "generando",
+    GENERADA: "generada",
+    ERROR: "error",
+}
+
+ESTADO_SOLICITUD_APROBADA = 2
+
+NOMINA_DIR = Path(getattr(settings, "NOMINA_DIR", settings.BASE_DIR / "reportes_generados" / "nomina"))
+
+ENCABEZADOS = [
+    "empleado_id", "nombres", "apellidos", "email",
+    "salario_base", "jornada_semanal_horas",
+    "horas_trabajadas", "horas_extra", "minutos_tardanza",
+    "dias_ausencia_descuento",
+]
+
+DOS_DECIMALES = Decimal("0.01")
+
+
+def rango_periodo(periodo):
+    """
+    "YYYY-MM" -> (primer_dia, ultimo_dia). ValueError si no es válido.
+    """
+    try:
+        anio, mes = (int(p) for p in periodo.split("-"))
+        return date(anio, mes, 1), date(anio, mes, calendar.monthrange(anio, mes)[1])
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError("periodo inválido. Use YYYY-MM.")
+
+
+def _horas(minutos):
+    return (Decimal(minutos) / 60).quantize(DOS_DECIMALES)
+
+
+def consulta_nomina(empresa_id, desde, hasta):
+    """
+    QuerySet de .values() con una fila por empleado (ver docstring del módulo).
+    """
+    contrato = (
+        Contrato.objects
+        .filter(empleado_id=OuterRef("pk"), fecha_inicio__lte=hasta)
+        .filter(Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=desde))
+        .order_by("-fecha_inicio", "-id")
+    )
+    dias_ausencia = (
+        SolicitudAusencia.objects
+        .filter(
+            empleado_id=OuterRef("pk"),
+            estado=ESTADO_SOLICITUD_APROBADA,
+            tipo_ausencia__afecta_sueldo=True,
+            fecha_inicio__gte=desde,
+            fecha_inicio__lte=hasta,
+        )
+        .order_by()
+        .values("empleado_id")
+        .annotate(total=Sum("dias_habiles"))
+        .values("total")
+    )
+
+    return (
+        Empleado.objects
+        .filter(empresa_id=empresa_id)
+        .annotate(
+            jornadas_mes=FilteredRelation(
+                "jornadacalculada",
+                condition=Q(jornadacalculada__fecha__gte=desde, jornadacalculada__fecha__lte=hasta),
+            ),
+        )
+        .annotate(
+            min_trabajados=Coalesce(Sum(F("jornadas_mes__minutos_trabajados")), Value(0)),
+            min_extra=Coalesce(Sum(F("jornadas_mes__minutos_extra")), Value(0)),
+            min_tardanza=Coalesce(Sum(F("jornadas_mes__minutos_tardanza")), Value(0)),
+            dias_ausencia=Coalesce(Subquery(dias_ausencia, output_field=IntegerField()), Value(0)),
+            salario_base=Subquery(contrato.values("salario_base")[:1]),
+            jornada_semanal_horas=Subquery(contrato.values("jornada_semanal_horas")[:1]),
+        )
+        # solo quien tuvo contrato en el período
+        .filter(salario_base__isnull=False)
+        .order_by("id")
+        .values(
+            "id", "nombres", "apellidos", "email", "salario_base", "jornada_semanal_horas",
+            "min_trabajados", "min_extra", "min_tardanza", "dias_ausencia",
+        )
+    )
+
+
+def generar_exportacion(empresa_id, periodo, observaciones=None):
+    """
+    Crea la ExportacionNomina, escribe el CSV y guarda los totales.
+    -> ExportacionNomina (estado GENERADA o ERROR)
+    """
+    desde, hasta = rango_periodo(periodo)
+    exportacion = ExportacionNomina.objects.create(
+        empresa_id=empresa_id,
+        periodo=periodo,
+        total_horas=0,
+        total_extras=0,
+        observaciones=observaciones,
+        archivo_url="",
+        generado_el=timezone.now(),
+        estado=GENERANDO,
+    )
+
+    carpeta = NOMINA_DIR / str(empresa_id)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    ruta = carpeta / f"nomina_{periodo}_{exportacion.id}.csv"
+    temporal = ruta.with_name(ruta.name + ".tmp")
+
+    min_trabajados = min_extra = 0
+    try:
+        with open(temporal, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            f.write("\ufeff")
+            writer.writerow(ENCABEZADOS)
+            for fila in consulta_nomina(empresa_id, desde, hasta).iterator(chunk_size=CHUNK_SIZE):
+                min_trabajados += fila["min_trabajados"]
+                min_extra += fila["min_extra"]
+                # nombres/apellidos/email los escribe el empleado: mismo escape
+                # de fórmulas (CSV injection) que las exportaciones de core
+                writer.writerow([valor_celda(v) for v in (
+                    fila["id"], fila["nombres"], fila["apellidos"], fila["email"],
+                    Decimal(fila["salario_base"]).quantize(DOS_DECIMALES), fila["jornada_semanal_horas"],
+                    _horas(fila["min_trabajados"]), _horas(fila["min_extra"]), fila["min_tardanza"],
+                    fila["dias_ausencia"],
+                )])
+        os.replace(temporal, ruta)
+    except Exception as exc:
+        exportacion.estado = ERROR
+        exportacion.observaciones = f"{type(exc).__name__}: {exc}"[:2000]
+        exportacion.save(update_fields=["estado", "observaciones"])
+        return exportacion
+    finally:
+        temporal.unlink(missing_ok=True)
+
+    exportacion.total_horas = _horas(min_trabajados)
+    exportacion.total_extras = _horas(min_extra)
+    exportacion.archivo_url = str(ruta)
+    exportacion.generado_el = timezone.now()
+    exportacion.estado = GENERADA
+    exportacion.save(update_fields=["total_horas", "total_extras", "archivo_url", "generado_el", "estado"])
+    return exportacion
@@ -0,0 +1,197 @@
+# apps/integraciones/planificador.py
+"""
+Planificador de ReporteProgramado (manage.py planificar_reportes).
+
+- sincronizar(): lee los reportes activos (id, empresa, frecuencia_cron) y,
+  solo para los nuevos o modificados, parsea el cron y calcula su próxima
+  ejecución en la zona horaria de la empresa. Las próximas ejecuciones viven
+  en un heap (cuando, reporte_id, version): ver la siguiente es O(1) y sacar
+  las vencidas O(log n), sin recorrer todos los reportes cada minuto.
+- Un reporte modificado/desactivado no se busca en el heap: se sube su
+  version y la entrada vieja se descarta al salir.
+- Tras una caída no se recuperan todas las ejecuciones perdidas: la primera
+  vencida se corre una vez y la siguiente se calcula desde "ahora".
+- Cada ejecución se registra en EjecucionReporte ANTES de correr (UNIQUE
+  reporte + programada_para: dos planificadores no la corren dos veces) y se
+  manda a un ProcessPoolExecutor acotado (reportes.ejecutar_reporte).
+"""
+import heapq
+import itertools
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from apps.core.fechas import zona_empresa
+from apps.integraciones.cron import CronInvalido, parsear_cron
+from apps.integraciones.models import EjecucionReporte, ReporteProgramado
+from apps.integraciones.reportes import ejecutar_reporte
+
+logger = logging.getLogger(__name__)
+
+WORKERS = getattr(settings, "REPORTES_WORKERS", 2)
+
+
+class Planificador:
+    def __init__(self):
+        self._heap = []
+        # reporte_id -> (firma, version, cron, tz)
+        self._reportes = {}
+        # global: una version nunca se repite aunque el reporte vuelva
+        self._versiones = itertools.count()
+
+    def sincronizar(self, ahora=None):
+        ahora = ahora or timezone.now()
+        filas = list(ReporteProgramado.objects.filter(activo=True).values_list("id", "empresa_id", "frecuencia_cron"))
+        vigentes = {reporte_id for reporte_id, _, _ in filas}
+
+        for reporte_id in set(self._reportes) - vigentes:
+            del self._reportes[reporte_id]
+
+        cambiados = [f for f in filas if self._reportes.get(f[0], (None,))[0] != (f[1], f[2])]
+        if not cambiados:
+            return 0
+
+        # última ejecución registrada: base para no repetir tras un reinicio
+        ultimas = dict(
+            EjecucionReporte.objects
+            .filter(reporte_id__in=[f[0] for f in cambiados])
+            .values("reporte_id")
+            .annotate(ultima=Max("programada_para"))
+            .values_list("reporte_id", "ultima")
+        )
+
+        for reporte_id, empresa_id, expresion in cambiados:
+            self._reportes.pop(reporte_id, None)
+            version = next(self._versiones)
+            try:
+                cron = parsear_cron(expresion)
+                tz = zona_empresa(empresa_id)
+                cuando = cron.siguiente(ultimas.get(reporte_id) or ahora, tz)
+            except CronInvalido as exc:
+                logger.warning("ReporteProgramado %s con cron inválido: %s", reporte_id, exc)
+                continue
+            self._reportes[reporte_id] = ((empresa_id, expresion), version, cron, tz)
+            heapq.heappush(self._heap, (cuando, reporte_id, version))
+        return len(cambiados)
+
+    def proxima(self):
+        """
+        Próxima ejecución (o None). Puede ser una entrada obsoleta: solo se
+        usa para decidir cuánto dormir.
+        """
+        return self._heap[0][0] if self._heap else None
+
+    def vencidos(self, ahora=None):
+        """
+        Saca del heap las ejecuciones vencidas y agenda la siguiente de cada
+        reporte. -> [(reporte_id, programada_para)]
+        """
+        ahora = ahora or timezone.now()
+        out = []
+        while self._heap and self._heap[0][0] <= ahora:
+            cuando, reporte_id, version = heapq.heappop(self._heap)
+            actual = self._reportes.get(reporte_id)
+            if not actual or actual[1] != version:
+                continue
+            out.append((reporte_id, cuando))
+            _, _, cron, tz = actual
+            heapq.heappush(self._heap, (cron.siguiente(max(cuando, ahora), tz), reporte_id, version))
+        return out
+
+
+def registrar_ejecuciones(vencidos):
+    """
+    Crea las EjecucionReporte (EN_CURSO). -> ids creados (las que otro
+    planificador ya registró se saltan).
+    """
+    empresas = dict(
+        ReporteProgramado.objects
+        .filter(id__in=[r for r, _ in vencidos])
+        .values_list("id", "empresa_id")
+    )
+    ids = []
+    for reporte_id, cuando in vencidos:
+        if reporte_id not in empresas:
+            continue
+        try:
+            with transaction.atomic():
+                ejecucion = EjecucionReporte.objects.create(
+                    empresa_id=empresas[reporte_id],
+                    reporte_id=reporte_id,
+                    programada_para=cuando,
+                    iniciada_el=timezone.now(),
+                )
+        except IntegrityError:
+            continue
+        ids.append(ejecucion.id)
+    return ids
+
+
+def _inicializar_proceso():
+    # proceso nuevo (spawn): configura Django con el mismo DJANGO_SETTINGS_MODULE
+    django.setup()
+
+
+class PoolReportes:
+    """
+    Ejecuta reportes en procesos aparte, con a lo sumo `workers` en curso;
+    el resto espera en cola. workers=0 corre en el mismo proceso (tests).
+    """
+
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self._cola = deque()
+        self._en_curso = set()
+        self._pool = None
+        if workers > 0:
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_inicializar_proceso,
+            )
+
+    @property
+    def ocupado(self):
+        return bool(self._cola or self._en_curso)
+
+    def enviar(self, ejecucion_ids):
+        self._cola.extend(ejecucion_ids)
+        return self._despachar()
+
+    def _despachar(self):
+        terminados = []
+        if not self._pool:
+            while self._cola:
+                terminados.append(ejecutar_reporte(self._cola.popleft()))
+            return terminados
+        while self._cola and len(self._en_curso) < self.workers:
+            self._en_curso.add(self._pool.submit(ejecutar_reporte, self._cola.popleft()))
+        return terminados
+
+    def recoger(self, timeout=0):
+        """
+        -> resultados de las ejecuciones terminadas (espera hasta `timeout`).
+        """
+        if not self._en_curso:
+            return []
+        listos, self._en_curso = wait(self._en_curso, timeout=timeout, return_when=FIRST_COMPLETED)
+        resultados = []
+        for futuro in listos:
+            try:
+                resultados.append(futuro.result())
+            except Exception:
+                # el proceso murió: la ejecución queda EN_CURSO en el historial
+                logger.exception("Fallo un proceso del pool de reportes")
+        resultados += self._despachar()
+        return resultados
+
+    def cerrar(self):
+        if self._pool:
+            self._pool.shutdown(wait=True)
@@ -0,0 +1,175 @@
+# apps/integraciones/reportes.py
+"""
+Generación de un ReporteProgramado a archivo (lo corre planificador.py en
+un proceso del pool).
+
+ReporteProgramado.tipo (serializers.TIPOS):
+    1 asistencia  -> jornadas calculadas (columnas del export RRHH)
+    2 kpi         -> resultados KPI (columnas del export auditor)
+    3 ausencias   -> solicitudes de ausencia (columnas del export auditor)
+
+Período: los `dias` (parametros, default 1) anteriores al día local de la
+ejecución programada; parametros.dias = 7 en un cron semanal cubre la semana.
+
+Formato (serializers.FORMATOS): 1 CSV; 2 XLS se escribe como Excel 2003 XML
+(SpreadsheetML, .xml) porque no hay librería de XLSX en las dependencias;
+3 PDF no está soportado y la ejecución queda en error.
+
+El archivo se escribe fila a fila (cursor del servidor, ver
+core/exportacion.py) a un temporal y se renombra al terminar.
+"""
+import csv
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.asistencia.models import JornadaCalculada
+from apps.asistencia.views_rrhh_jornadas import COLUMNAS_EXPORT as COLUMNAS_JORNADAS
+from apps.ausencias.models import SolicitudAusencia
+from apps.ausencias.views_auditor_ausencias import COLUMNAS_SOLICITUDES
+from apps.core.exportacion import filas_valores, filtro_rango
+from apps.core.fechas import zona_empresa
+from apps.integraciones.models import EjecucionReporte
+from apps.kpi.models import ResultadoKPI
+from apps.kpi.views_auditor_desempeno import COLUMNAS_RESULTADOS_KPI
+
+TIPO_ASISTENCIA = 1
+TIPO_KPI = 2
+TIPO_AUSENCIAS = 3
+
+FORMATO_CSV = 1
+FORMATO_XLS = 2
+FORMATO_PDF = 3
+
+REPORTES_DIR = Path(getattr(settings, "REPORTES_DIR", settings.BASE_DIR / "reportes_generados"))
+
+
+def _consulta(reporte, desde, hasta, tz):
+    """
+    -> (queryset ordenado, columnas)
+    """
+    if reporte.tipo == TIPO_ASISTENCIA:
+        qs = JornadaCalculada.objects.filter(
+            filtro_rango("fecha", desde, hasta, timestamp=False), empresa_id=reporte.empresa_id,
+        ).order_by("fecha", "id")
+        return qs, COLUMNAS_JORNADAS
+    if reporte.tipo == TIPO_KPI:
+        qs = ResultadoKPI.objects.filter(
+            filtro_rango("calculado_el", desde, hasta, tz), empresa_id=reporte.empresa_id,
+        ).order_by("calculado_el", "id")
+        return qs, COLUMNAS_RESULTADOS_KPI
+    if reporte.tipo == TIPO_AUSENCIAS:
+        qs = SolicitudAusencia.objects.filter(
+            filtro_rango("creada_el", desde, hasta, tz), empresa_id=reporte.empresa_id,
+        ).order_by("creada_el", "id")
+        return qs, COLUMNAS_SOLICITUDES
+    raise ValueError(f"Tipo de reporte no soportado: {reporte.tipo}.")
+
+
+def periodo(reporte, programada_para, tz):
+    """
+    -> (desde, hasta) días locales que cubre la ejecución.
+    """
+    try:
+        dias = max(int((reporte.parametros or {}).get("dias", 1)), 1)
+    except (AttributeError, TypeError, ValueError):
+        dias = 1
+    hasta = timezone.localtime(programada_para, tz).date() - timedelta(days=1)
+    return hasta - timedelta(days=dias - 1), hasta
+
+
+def _escribir_csv(f, encabezados, filas):
+    writer = csv.writer(f)
+    f.write("\ufeff")
+    writer.writerow(encabezados)
+    n = 0
+    for fila in filas:
+        writer.writerow(fila)
+        n += 1
+    return n
+
+
+def _celda_xml(v):
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        return f'<Cell><Data ss:Type="String">{escape(str(v))}</Data></Cell>'
+    return f'<Cell><Data ss:Type="Number">{v}</Data></Cell>'
+
+
+def _escribir_xls(f, encabezados, filas):
+    f.write(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<?mso-application progid="Excel.Sheet"?>\n'
+        '<Workbook xmlns="urn:schemas-microsoft-com:office:spreadsheet" '
+        'xmlns:ss="urn:schemas-microsoft-com:office:spreadsheet">\n'
+        '<Worksheet ss:Name="Reporte"><Table>\n'
+    )
+    f.write("<Row>" + "".join(_celda_xml(h) for h in encabezados) + "</Row>\n")
+    n = 0
+    for fila in filas:
+        # Decimal -> número de la celda
+        f.write("<Row>" + "".join(_celda_xml(float(v) if hasattr(v, "as_tuple") else v) for v in fila) + "</Row>\n")
+        n += 1
+    f.write("</Table></Worksheet></Workbook>\n")
+    return n
+
+
+ESCRITORES = {
+    FORMATO_CSV: (".csv", _escribir_csv),
+    FORMATO_XLS: (".xml", _escribir_xls),
+}
+
+
+def generar(reporte, programada_para):
+    """
+    Escribe el archivo del reporte. -> (ruta, filas)
+    """
+    if reporte.formato not in ESCRITORES:
+        raise ValueError(f"Formato de reporte no soportado: {reporte.formato}.")
+    extension, escribir = ESCRITORES[reporte.formato]
+
+    tz = zona_empresa(reporte.empresa_id)
+    desde, hasta = periodo(reporte, programada_para, tz)
+    qs, columnas = _consulta(reporte, desde, hasta, tz)
+
+    carpeta = REPORTES_DIR / str(reporte.empresa_id) / str(reporte.id)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    ruta = carpeta / f"{timezone.localtime(programada_para, tz):%Y%m%d_%H%M}{extension}"
+    temporal = ruta.with_name(ruta.name + ".tmp")
+
+    try:
+        with open(temporal, "w", encoding="utf-8", newline="") as f:
+            filas = escribir(f, [c[0] for c in columnas], filas_valores(qs, columnas, tz))
+        os.replace(temporal, ruta)
+    finally:
+        temporal.unlink(missing_ok=True)
+    return ruta, filas
+
+
+def ejecutar_reporte(ejecucion_id):
+    """
+    Corre una EjecucionReporte ya creada (EN_CURSO) y guarda el resultado.
+    Función de módulo: se envía tal cual al pool de procesos.
+    -> {"id", "estado", "filas", "error"}
+    """
+    ejecucion = EjecucionReporte.objects.select_related("reporte").get(id=ejecucion_id)
+    inicio = time.monotonic()
+    try:
+        ruta, filas = generar(ejecucion.reporte, ejecucion.programada_para)
+        ejecucion.estado = EjecucionReporte.COMPLETADA
+        ejecucion.filas = filas
+        ejecucion.archivo = str(ruta)
+        ejecucion.tamano_bytes = ruta.stat().st_size
+        ejecucion.error = None
+    except Exception as exc:
+        ejecucion.estado = EjecucionReporte.ERROR
+        ejecucion.error = f"{type(exc).__name__}: {exc}"[:2000]
+
+    ejecucion.finalizada_el = timezone.now()
+    ejecucion.duracion_ms = int((time.monotonic() - inicio) * 1000)
+    ejecucion.save(update_fields=["estado", "filas", "archivo", "tamano_bytes", "error", "finalizada_el", "duracion_ms"])
+    return {"id": ejecucion.id, "estado": ejecucion.estado, "filas": ejecucion.filas, "error": ejecucion.error}
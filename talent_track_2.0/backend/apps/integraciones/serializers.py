@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from apps.integraciones.models import ReporteProgramado
+from apps.integraciones.models import EjecucionReporte, ReporteProgramado
+from apps.integraciones.cron import CronInvalido, parsear_cron
 from apps.core.models import Empresa
 
 TIPOS = {
@@ -80,6 +81,13 @@ class ReporteProgramadoCreateSerializer(serializers.ModelSerializer):
             "activo",
         ]
 
+    def validate_frecuencia_cron(self, value):
+        try:
+            parsear_cron(value)
+        except CronInvalido as exc:
+            raise serializers.ValidationError(str(exc))
+        return value.strip()
+
     def validate_destinatarios(self, value):
         if not isinstance(value, list):
             raise serializers.ValidationError("destinatarios debe ser una lista de correos.")
@@ -110,6 +118,13 @@ class ReporteProgramadoUpdateSerializer(serializers.ModelSerializer):
             "activo",
         ]
 
+    def validate_frecuencia_cron(self, value):
+        try:
+            parsear_cron(value)
+        except CronInvalido as exc:
+            raise serializers.ValidationError(str(exc))
+        return value.strip()
+
     def validate_destinatarios(self, value):
         if not isinstance(value, list):
             raise serializers.ValidationError("destinatarios debe ser una lista de correos.")
@@ -119,3 +134,33 @@ class ReporteProgramadoUpdateSerializer(serializers.ModelSerializer):
         if len(value) == 0:
             raise serializers.ValidationError("Debe existir al menos 1 destinatario.")
         return value
+
+
+ESTADOS_EJECUCION = {
+    EjecucionReporte.EN_CURSO: "en_curso",
+    EjecucionReporte.COMPLETADA: "completada",
+    EjecucionReporte.ERROR: "error",
+}
+
+
+class EjecucionReporteSerializer(serializers.ModelSerializer):
+    estado_nombre = serializers.SerializerMethodField()
+
+    class Meta:
+        model = EjecucionReporte
+        fields = [
+            "id",
+            "programada_para",
+            "iniciada_el",
+            "finalizada_el",
+            "estado",
+            "estado_nombre",
+            "filas",
+            "archivo",
+            "tamano_bytes",
+            "duracion_ms",
+            "error",
+        ]
+
+    def get_estado_nombre(self, obj):
+        return ESTADOS_EJECUCION.get(obj.estado, str(obj.estado))
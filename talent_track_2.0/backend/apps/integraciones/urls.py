@@ -3,10 +3,14 @@ from apps.integraciones.views import (
     ReporteProgramadoListCreateAPIView,
     ReporteProgramadoRetrieveUpdateDeleteAPIView,
     ToggleActivoReporteProgramadoAPIView,
+    EjecucionesReporteProgramadoAPIView,
 )
+from apps.integraciones.views_rrhh_nomina import RRHHExportacionesNominaAPIView
 
 urlpatterns = [
     path("reportes-programados/", ReporteProgramadoListCreateAPIView.as_view(), name="reporte_programado_list_create"),
     path("reportes-programados/<int:pk>/", ReporteProgramadoRetrieveUpdateDeleteAPIView.as_view(), name="reporte_programado_detail"),
     path("reportes-programados/<int:pk>/toggle-activo/", ToggleActivoReporteProgramadoAPIView.as_view(), name="reporte_programado_toggle_activo"),
+    path("reportes-programados/<int:pk>/ejecuciones/", EjecucionesReporteProgramadoAPIView.as_view(), name="reporte_programado_ejecuciones"),
+    path("rrhh/nomina/exportaciones/", RRHHExportacionesNominaAPIView.as_view(), name="rrhh_nomina_exportaciones"),
 ]
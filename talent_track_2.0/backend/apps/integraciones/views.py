@@ -4,8 +4,10 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 
 from apps.usuarios.permissions import IsSuperAdmin
-from apps.integraciones.models import ReporteProgramado
+from apps.core.paginacion import paginar_keyset, respuesta_paginada
+from apps.integraciones.models import EjecucionReporte, ReporteProgramado
 from apps.integraciones.serializers import (
+    EjecucionReporteSerializer,
     ReporteProgramadoListSerializer,
     ReporteProgramadoCreateSerializer,
     ReporteProgramadoUpdateSerializer,
@@ -54,3 +56,17 @@ class ToggleActivoReporteProgramadoAPIView(APIView):
         obj.activo = not bool(obj.activo)
         obj.save(update_fields=["activo"])
         return Response({"id": obj.id, "activo": obj.activo}, status=status.HTTP_200_OK)
+
+
+class EjecucionesReporteProgramadoAPIView(APIView):
+    """
+    GET /api/reportes-programados/<pk>/ejecuciones/
+    Historial de corridas del planificador (más recientes primero).
+    """
+    permission_classes = [IsSuperAdmin]
+
+    def get(self, request, pk):
+        reporte = get_object_or_404(ReporteProgramado, pk=pk)
+        qs = EjecucionReporte.objects.filter(reporte=reporte)
+        ejecuciones, next_cursor = paginar_keyset(request, qs, ("-programada_para", "-id"))
+        return respuesta_paginada(request, EjecucionReporteSerializer(ejecuciones, many=True).data, next_cursor)
@@ -0,0 +1,48 @@
+# apps/integraciones/views_rrhh_nomina.py
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from apps.core.paginacion import paginar_keyset, respuesta_paginada
+from apps.integraciones.models import ExportacionNomina
+from apps.integraciones.nomina import ESTADO_EXPORTACION, GENERADA, generar_exportacion, rango_periodo
+from apps.usuarios.contexto import get_contexto
+from apps.usuarios.permissions import con_rol
+
+
+def _exportacion_dict(e):
+    return {
+        "id": e.id,
+        "periodo": e.periodo,
+        "total_horas": str(e.total_horas),
+        "total_extras": str(e.total_extras),
+        "observaciones": e.observaciones,
+        "archivo_url": e.archivo_url,
+        "generado_el": e.generado_el,
+        "estado": e.estado,
+        "estado_label": ESTADO_EXPORTACION.get(e.estado, str(e.estado)),
+    }
+
+
+class RRHHExportacionesNominaAPIView(APIView):
+    """
+    GET  /api/rrhh/nomina/exportaciones/            historial de la empresa
+    POST /api/rrhh/nomina/exportaciones/  {"periodo": "YYYY-MM", "observaciones": "..."}
+    """
+    permission_classes = [con_rol("rrhh")]
+
+    def get(self, request):
+        ctx = get_contexto(request)
+        qs = ExportacionNomina.objects.filter(empresa_id=ctx.empresa_id)
+        exportaciones, next_cursor = paginar_keyset(request, qs, ("-generado_el", "-id"))
+        return respuesta_paginada(request, [_exportacion_dict(e) for e in exportaciones], next_cursor)
+
+    def post(self, request):
+        ctx = get_contexto(request)
+        periodo = (request.data.get("periodo") or "").strip()
+        try:
+            rango_periodo(periodo)
+        except ValueError as exc:
+            return Response({"periodo": str(exc)}, status=400)
+
+        exp = generar_exportacion(ctx.empresa_id, periodo, observaciones=request.data.get("observaciones") or None)
+        return Response(_exportacion_dict(exp), status=201 if exp.estado == GENERADA else 500)
@@ -0,0 +1,379 @@
+# apps/integraciones/webhooks.py
+"""
+Motor de entrega de Webhooks.
+
+1) emitir(empresa_id, evento, payload) deja una EntregaWebhook pendiente por
+   cada Webhook activo de la empresa suscrito a ese evento (bulk_create).
+   Las notificaciones por canal webhook (outbox) emiten EVENTO_NOTIFICACION.
+2) El worker (manage.py entregar_webhooks) llama a entregar_pendientes():
+   - reclama las entregas vencidas (select_for_update(skip_locked) + lease),
+   - las envía con asyncio: un pool de conexiones keep-alive por host y un
+     semáforo por webhook (CONCURRENCIA_POR_WEBHOOK) para no saturar a un
+     cliente lento,
+   - guarda el resultado con bulk_update (la BD no se toca dentro del loop).
+
+Firma: X-TalentTrack-Signature = "sha256=" + HMAC-SHA256(secreto,
+"{timestamp}.{cuerpo}"), con el timestamp en X-TalentTrack-Timestamp.
+
+Reintentos: 2xx entrega; 408, 429, 5xx y errores de red reintentan con
+backoff exponencial (BACKOFF_BASE * 2^(n-1), tope BACKOFF_MAX, +jitter)
+hasta reintentos_max; el resto de 4xx falla sin reintentar.
+
+No hay cliente HTTP en las dependencias: se usa un cliente HTTP/1.1 mínimo
+sobre asyncio.open_connection (POST con Content-Length).
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import ssl
+import time
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from apps.integraciones.models import EntregaWebhook, Webhook
+from apps.notificaciones.outbox import CANAL_WEBHOOK, registrar_canal
+
+# Webhook.evento
+EVENTO_NOTIFICACION = 1
+
+EVENTO_WEBHOOK = {
+    EVENTO_NOTIFICACION: "notificacion",
+}
+
+TIMEOUT = getattr(settings, "WEBHOOKS_TIMEOUT", 10)
+CONCURRENCIA_POR_WEBHOOK = getattr(settings, "WEBHOOKS_CONCURRENCIA_POR_WEBHOOK", 4)
+BACKOFF_BASE = getattr(settings, "WEBHOOKS_BACKOFF_BASE", 30)
+BACKOFF_MAX = getattr(settings, "WEBHOOKS_BACKOFF_MAX", 3600)
+LOTE_DEFAULT = 200
+
+# una entrega reclamada no la toma otro worker durante este tiempo
+LEASE = timedelta(minutes=5)
+# conexiones ociosas guardadas por host
+MAX_OCIOSAS_POR_HOST = 8
+# del cuerpo de la respuesta solo se guarda el comienzo
+MAX_ERROR = 500
+
+USER_AGENT = "TalentTrack-Webhooks/1.0"
+
+
+# =========================
+# Firma
+# =========================
+def firmar(secreto, timestamp, cuerpo):
+    """
+    cuerpo: bytes -> "sha256=<hex>"
+    """
+    mensaje = str(timestamp).encode() + b"." + cuerpo
+    return "sha256=" + hmac.new(secreto.encode(), mensaje, hashlib.sha256).hexdigest()
+
+
+def verificar_firma(secreto, timestamp, cuerpo, firma):
+    return hmac.compare_digest(firmar(secreto, timestamp, cuerpo), firma or "")
+
+
+def backoff(intentos):
+    """
+    Segundos de espera tras el intento N (1, 2, ...) fallido.
+    """
+    espera = min(BACKOFF_BASE * 2 ** max(intentos - 1, 0), BACKOFF_MAX)
+    return espera + random.uniform(0, espera * 0.1)
+
+
+# =========================
+# Emitir (lado aplicación)
+# =========================
+def emitir(empresa_id, evento, payload):
+    """
+    -> lista de EntregaWebhook creadas (una por webhook suscrito).
+    """
+    ahora = timezone.now()
+    webhook_ids = Webhook.objects.filter(empresa_id=empresa_id, evento=evento, activo=True).values_list("id", flat=True)
+    return EntregaWebhook.objects.bulk_create([
+        EntregaWebhook(
+            empresa_id=empresa_id,
+            webhook_id=webhook_id,
+            evento=evento,
+            payload=payload,
+            proximo_intento_el=ahora,
+            creada_el=ahora,
+        )
+        for webhook_id in webhook_ids
+    ])
+
+
+@registrar_canal(CANAL_WEBHOOK)
+def _emitir_notificacion(salida, notificaciones):
+    # una entrega por salida del outbox, no una por destinatario
+    emitir(salida.empresa_id, EVENTO_NOTIFICACION, {
+        "salida_id": salida.id,
+        "titulo": salida.titulo,
+        "mensaje": salida.mensaje,
+        "accion_url": salida.accion_url,
+        "empleado_ids": [n.empleado_id for n in notificaciones],
+    })
+
+
+# =========================
+# Cliente HTTP (asyncio)
+# =========================
+class ErrorHTTP(Exception):
+    pass
+
+
+class _Respuesta:
+    __slots__ = ("status", "cuerpo", "reusable")
+
+    def __init__(self, status, cuerpo, reusable):
+        self.status = status
+        self.cuerpo = cuerpo
+        self.reusable = reusable
+
+
+async def _leer_respuesta(reader):
+    linea = await reader.readline()
+    if not linea:
+        raise ConnectionResetError("Conexión cerrada por el servidor.")
+    partes = linea.decode("latin-1").split(" ", 2)
+    if len(partes) < 2 or not partes[0].startswith("HTTP/"):
+        raise ErrorHTTP(f"Respuesta inválida: {linea[:80]!r}")
+    version, status = partes[0], int(partes[1])
+
+    headers = {}
+    while True:
+        linea = await reader.readline()
+        if linea in (b"\r\n", b"\n", b""):
+            break
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        headers[nombre.strip().lower()] = valor.strip()
+
+    reusable = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        trozos = []
+        while True:
+            tam = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if tam == 0:
+                # trailers hasta la línea vacía
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            trozos.append(await reader.readexactly(tam))
+            await reader.readexactly(2)
+        cuerpo = b"".join(trozos)
+    elif "content-length" in headers:
+        cuerpo = await reader.readexactly(int(headers["content-length"]))
+    elif status in (204, 304) or 100 <= status < 200:
+        cuerpo = b""
+    else:
+        # sin largo conocido: se lee hasta el cierre y no se reutiliza
+        cuerpo = await reader.read()
+        reusable = False
+
+    return _Respuesta(status, cuerpo, reusable)
+
+
+class PoolHTTP:
+    """
+    Conexiones keep-alive por (esquema, host, puerto). Vive lo que dura una
+    corrida del worker (un event loop).
+    """
+
+    def __init__(self, timeout=TIMEOUT):
+        self.timeout = timeout
+        self._ociosas = {}
+        self._ssl = None
+        self.abiertas = 0
+
+    def _contexto_ssl(self):
+        if self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        return self._ssl
+
+    async def _conectar(self, clave):
+        esquema, host, puerto = clave
+        self.abiertas += 1
+        return await asyncio.open_connection(
+            host, puerto,
+            ssl=self._contexto_ssl() if esquema == "https" else None,
+        )
+
+    def _devolver(self, clave, conexion):
+        ociosas = self._ociosas.setdefault(clave, [])
+        if len(ociosas) < MAX_OCIOSAS_POR_HOST:
+            ociosas.append(conexion)
+        else:
+            conexion[1].close()
+
+    async def post(self, url, cuerpo, headers):
+        partes = urlsplit(url)
+        if partes.scheme not in ("http", "https") or not partes.hostname:
+            raise ErrorHTTP(f"URL no soportada: {url}")
+        clave = (partes.scheme, partes.hostname, partes.port or (443 if partes.scheme == "https" else 80))
+        ruta = (partes.path or "/") + (f"?{partes.query}" if partes.query else "")
+
+        host = partes.hostname if partes.port is None else f"{partes.hostname}:{partes.port}"
+        lineas = [f"POST {ruta} HTTP/1.1", f"Host: {host}", f"User-Agent: {USER_AGENT}",
+                  "Content-Type: application/json", f"Content-Length: {len(cuerpo)}", "Connection: keep-alive"]
+        lineas += [f"{k}: {v}" for k, v in headers.items()]
+        peticion = ("\r\n".join(lineas) + "\r\n\r\n").encode("latin-1") + cuerpo
+
+        # una conexión ociosa puede haber sido cerrada por el servidor:
+        # si falla antes de recibir respuesta se reintenta una vez con una nueva
+        ociosas = self._ociosas.get(clave) or []
+        while True:
+            reutilizada = bool(ociosas)
+            reader, writer = ociosas.pop() if reutilizada else await self._conectar(clave)
+            try:
+                writer.write(peticion)
+                await writer.drain()
+                respuesta = await _leer_respuesta(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reutilizada:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+
+            if respuesta.reusable:
+                self._devolver(clave, (reader, writer))
+            else:
+                writer.close()
+            return respuesta
+
+    def cerrar(self):
+        for conexiones in self._ociosas.values():
+            for _, writer in conexiones:
+                writer.close()
+        self._ociosas.clear()
+
+
+# =========================
+# Worker
+# =========================
+def _resultado(entrega, status=None, error=None, inicio=None):
+    return {
+        "id": entrega["id"],
+        "status": status,
+        "error": error,
+        "duracion_ms": int((time.monotonic() - inicio) * 1000) if inicio else None,
+    }
+
+
+async def _enviar(pool, semaforos, entrega, timeout):
+    cuerpo = json.dumps({
+        "id": entrega["id"],
+        "evento": EVENTO_WEBHOOK.get(entrega["evento"], entrega["evento"]),
+        "empresa_id": entrega["empresa_id"],
+        "creada_el": entrega["creada_el"],
+        "datos": entrega["payload"],
+    }, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+    timestamp = int(time.time())
+    headers = {
+        "X-TalentTrack-Event": EVENTO_WEBHOOK.get(entrega["evento"], entrega["evento"]),
+        "X-TalentTrack-Delivery": entrega["id"],
+        "X-TalentTrack-Timestamp": timestamp,
+        "X-TalentTrack-Signature": firmar(entrega["secreto"], timestamp, cuerpo),
+    }
+
+    semaforo = semaforos.setdefault(entrega["webhook_id"], asyncio.Semaphore(CONCURRENCIA_POR_WEBHOOK))
+    async with semaforo:
+        inicio = time.monotonic()
+        try:
+            r = await asyncio.wait_for(pool.post(entrega["url"], cuerpo, headers), timeout)
+        except asyncio.TimeoutError:
+            return _resultado(entrega, error=f"Timeout ({timeout}s).", inicio=inicio)
+        except (OSError, ErrorHTTP, asyncio.IncompleteReadError, ValueError) as exc:
+            return _resultado(entrega, error=f"{type(exc).__name__}: {exc}", inicio=inicio)
+
+    error = None if 200 <= r.status < 300 else r.cuerpo[:MAX_ERROR].decode("utf-8", "replace") or f"HTTP {r.status}"
+    return _resultado(entrega, status=r.status, error=error, inicio=inicio)
+
+
+async def _enviar_todas(entregas, timeout):
+    pool = PoolHTTP(timeout=timeout)
+    semaforos = {}
+    try:
+        return await asyncio.gather(*(_enviar(pool, semaforos, e, timeout) for e in entregas))
+    finally:
+        pool.cerrar()
+
+
+def _reclamar(limite, ahora):
+    with transaction.atomic():
+        filas = list(
+            EntregaWebhook.objects
+            .select_for_update(skip_locked=True, of=("self",))
+            .filter(estado=EntregaWebhook.PENDIENTE, proximo_intento_el__lte=ahora, webhook__activo=True)
+            .order_by("proximo_intento_el", "id")
+            .values(
+                "id", "empresa_id", "evento", "payload", "intentos", "creada_el",
+                "webhook_id", "webhook__url", "webhook__secreto", "webhook__reintentos_max",
+            )[:limite]
+        )
+        EntregaWebhook.objects.filter(id__in=[f["id"] for f in filas]).update(proximo_intento_el=ahora + LEASE)
+
+    for f in filas:
+        f["url"] = f.pop("webhook__url")
+        f["secreto"] = f.pop("webhook__secreto")
+        f["reintentos_max"] = f.pop("webhook__reintentos_max")
+    return filas
+
+
+def _reintentable(status):
+    return status is None or status in (408, 429) or status >= 500
+
+
+def entregar_pendientes(limite=LOTE_DEFAULT, timeout=TIMEOUT):
+    """
+    Una pasada del worker. -> {"entregadas", "reintentos", "fallidas"}
+    """
+    ahora = timezone.now()
+    entregas = _reclamar(limite, ahora)
+    resumen = {"entregadas": 0, "reintentos": 0, "fallidas": 0}
+    if not entregas:
+        return resumen
+
+    resultados = {r["id"]: r for r in asyncio.run(_enviar_todas(entregas, timeout))}
+
+    ahora = timezone.now()
+    objs = []
+    webhooks_ok = set()
+    for e in entregas:
+        r = resultados[e["id"]]
+        intentos = e["intentos"] + 1
+        obj = EntregaWebhook(
+            id=e["id"], intentos=intentos, ultimo_status=r["status"],
+            ultimo_error=r["error"], duracion_ms=r["duracion_ms"],
+            estado=EntregaWebhook.PENDIENTE, proximo_intento_el=ahora, entregada_el=None,
+        )
+        if r["error"] is None:
+            obj.estado = EntregaWebhook.ENTREGADA
+            obj.entregada_el = ahora
+            webhooks_ok.add(e["webhook_id"])
+            resumen["entregadas"] += 1
+        elif _reintentable(r["status"]) and intentos <= e["reintentos_max"]:
+            obj.proximo_intento_el = ahora + timedelta(seconds=backoff(intentos))
+            resumen["reintentos"] += 1
+        else:
+            obj.estado = EntregaWebhook.FALLIDA
+            resumen["fallidas"] += 1
+        objs.append(obj)
+
+    with transaction.atomic():
+        EntregaWebhook.objects.bulk_update(
+            objs,
+            ["estado", "intentos", "ultimo_status", "ultimo_error", "duracion_ms", "proximo_intento_el", "entregada_el"],
+        )
+        if webhooks_ok:
+            Webhook.objects.filter(id__in=webhooks_ok).update(ultimo_envio_el=ahora)
+
+    return resumen
@@ -0,0 +1,49 @@
+# apps/kpi/agregados.py
+"""
+Conteo de ResultadoKPI por tramo de cumplimiento en UNA sola pasada
+(COUNT(*) FILTER (WHERE ...) en Postgres), en vez de un .count() o un
+.values().annotate() por tramo.
+
+Tramos (mismos que los dashboards):
+    ok      cumplimiento_pct >= 90
+    medio   70 <= cumplimiento_pct < 90
+    critico cumplimiento_pct < 70
+"""
+from django.db.models import Count, Q
+
+UMBRAL_OK = 90
+UMBRAL_MEDIO = 70
+
+TRAMOS = {
+    "ok": Q(cumplimiento_pct__gte=UMBRAL_OK),
+    "medio": Q(cumplimiento_pct__gte=UMBRAL_MEDIO, cumplimiento_pct__lt=UMBRAL_OK),
+    "critico": Q(cumplimiento_pct__lt=UMBRAL_MEDIO),
+}
+
+
+def agregaciones_tramos(prefijo=""):
+    """
+    {"<prefijo>ok": Count(...), ...} para usar en .aggregate()/.annotate()
+    junto con otras métricas de la misma consulta.
+    """
+    return {f"{prefijo}{nombre}": Count("id", filter=q) for nombre, q in TRAMOS.items()}
+
+
+def contar_tramos(qs):
+    """
+    qs: queryset de ResultadoKPI ya filtrado -> {"ok", "medio", "critico", "total"}
+    """
+    out = qs.order_by().aggregate(total=Count("id"), **agregaciones_tramos())
+    return {k: v or 0 for k, v in out.items()}
+
+
+def contar_tramos_por(qs, campo="empresa_id"):
+    """
+    Igual que contar_tramos pero agrupado: {valor_de_campo: {"ok", "medio", "critico", "total"}}
+    """
+    filas = (
+        qs.order_by()
+        .values(campo)
+        .annotate(total=Count("id"), **agregaciones_tramos())
+    )
+    return {f.pop(campo): f for f in filas}
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_alter_puesto_empresa_alter_puesto_unidad_and_more'),
+        ('empleados', '0002_alter_contrato_empleado_alter_contrato_empresa_and_more'),
+        ('kpi', '0002_alter_asignacionkpi_empleado_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resultadokpi',
+            index=models.Index(fields=['empresa', 'empleado', 'periodo'], name='resultado_emp_empl_per_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resultadokpi',
+            index=models.Index(fields=['empresa', 'calculado_el'], name='resultado_emp_calc_idx'),
+        ),
+    ]
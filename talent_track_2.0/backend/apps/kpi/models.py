@@ -55,6 +55,11 @@ class ResultadoKPI(models.Model):
 
     class Meta:
         db_table = 'resultadokpi'
+        indexes = [
+            models.Index(fields=["empresa", "empleado", "periodo"], name="resultado_emp_empl_per_idx"),
+            # dashboards y auditor filtran/ordenan por calculado_el
+            models.Index(fields=["empresa", "calculado_el"], name="resultado_emp_calc_idx"),
+        ]
 
 
 class EvaluacionDesempeno(models.Model):
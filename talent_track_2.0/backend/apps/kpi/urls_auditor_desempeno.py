@@ -5,6 +5,8 @@ from apps.kpi.views_auditor_desempeno import (
     AuditorPlantillasKPIAPIView,
     AuditorKPIsEmpresaAPIView,
     AuditorResultadosKPIAPIView,
+    AuditorResultadosKPIExportAPIView,
+    AuditorResumenResultadosKPIAPIView,
     AuditorEvaluacionesDesempenoAPIView,
 )
 
@@ -13,5 +15,7 @@ urlpatterns = [
     path("auditor/desempeno/plantillas-kpi/", AuditorPlantillasKPIAPIView.as_view()),
     path("auditor/desempeno/kpis/", AuditorKPIsEmpresaAPIView.as_view()),
     path("auditor/desempeno/resultados-kpi/", AuditorResultadosKPIAPIView.as_view()),
+    path("auditor/desempeno/resultados-kpi/resumen/", AuditorResumenResultadosKPIAPIView.as_view()),
+    path("auditor/desempeno/resultados-kpi/export/", AuditorResultadosKPIExportAPIView.as_view()),
     path("auditor/desempeno/evaluaciones/", AuditorEvaluacionesDesempenoAPIView.as_view()),
 ]
@@ -2,30 +2,42 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from apps.usuarios.models import Usuario
+from apps.usuarios.contexto import get_contexto
+from apps.usuarios.permissions import con_rol
+from apps.core.exportacion import filtro_rango, parse_rango, respuesta_csv
+from apps.core.fechas import zona_empresa
+from apps.core.paginacion import paginar_keyset, respuesta_paginada
 from apps.kpi.models import AsignacionKPI, PlantillaKPI, KPI, ResultadoKPI, EvaluacionDesempeno
+from apps.kpi.agregados import TRAMOS, contar_tramos_por
 from apps.kpi.serializers_auditor_desempeno import (
     AuditorAsignacionKPISerializer,
     AuditorPlantillaKPISerializer,
     AuditorKPISerializer,
     AuditorResultadoKPISerializer,
     AuditorEvaluacionDesempenoSerializer,
+    RESULT_CLASIF,
 )
 
+COLUMNAS_RESULTADOS_KPI = [
+    ("id", "id"),
+    ("nombres", "empleado__nombres"),
+    ("apellidos", "empleado__apellidos"),
+    ("email", "empleado__email"),
+    ("kpi_codigo", "kpi__codigo"),
+    ("kpi_nombre", "kpi__nombre"),
+    ("periodo", "periodo"),
+    ("valor", "valor"),
+    ("cumplimiento_pct", "cumplimiento_pct"),
+    ("clasificacion", "clasificacion", RESULT_CLASIF.get),
+    ("calculado_el", "calculado_el"),
+    ("fuente", "fuente"),
+]
+
 
 def _get_usuario_tt(request):
-    auth_user = getattr(request, "user", None)
-    if not auth_user or not getattr(auth_user, "is_authenticated", False):
-        return None
-    usuario_id = getattr(auth_user, "usuario_id", None)
-    if not usuario_id:
-        return None
-    return (
-        Usuario.objects
-        .select_related("empresa", "empleado")
-        .filter(id=usuario_id)
-        .first()
-    )
+    # contexto del token (apps/usuarios/contexto.py): sin consultar usuarios.Usuario
+    ctx = get_contexto(request)
+    return ctx if ctx and ctx.usuario_id else None
 
 
 class AuditorAsignacionesKPIAPIView(APIView):
@@ -85,9 +97,46 @@ class AuditorResultadosKPIAPIView(APIView):
             ResultadoKPI.objects
             .select_related("empleado", "kpi")
             .filter(empresa_id=auditor.empresa_id)
-            .order_by("-calculado_el", "-id")
         )
-        return Response(AuditorResultadoKPISerializer(qs, many=True).data, status=200)
+        resultados, next_cursor = paginar_keyset(request, qs, ("-calculado_el", "-id"))
+        return respuesta_paginada(request, AuditorResultadoKPISerializer(resultados, many=True).data, next_cursor)
+
+
+class AuditorResumenResultadosKPIAPIView(APIView):
+    """
+    GET /api/auditor/desempeno/resultados-kpi/resumen/?periodo=
+    Conteo ok / medio / critico global y por KPI (una sola consulta).
+    """
+    def get(self, request):
+        auditor = _get_usuario_tt(request)
+        if not auditor or not auditor.empresa_id:
+            return Response({"detail": "No autorizado."}, status=401)
+
+        qs = ResultadoKPI.objects.filter(empresa_id=auditor.empresa_id)
+
+        periodo = (request.query_params.get("periodo") or "").strip()
+        if periodo:
+            qs = qs.filter(periodo=periodo)
+
+        por_kpi = contar_tramos_por(qs, "kpi_id")
+
+        total = {k: 0 for k in ["total", *TRAMOS]}
+        for fila in por_kpi.values():
+            for k in total:
+                total[k] += fila[k]
+
+        kpis = dict(KPI.objects.filter(id__in=list(por_kpi)).values_list("id", "codigo"))
+        return Response(
+            {
+                "periodo": periodo or None,
+                "global": total,
+                "por_kpi": [
+                    {"kpi_id": kpi_id, "kpi_codigo": kpis.get(kpi_id), **fila}
+                    for kpi_id, fila in sorted(por_kpi.items(), key=lambda x: kpis.get(x[0]) or "")
+                ],
+            },
+            status=200,
+        )
 
 
 class AuditorEvaluacionesDesempenoAPIView(APIView):
@@ -104,3 +153,25 @@ class AuditorEvaluacionesDesempenoAPIView(APIView):
             .order_by("-fecha", "-id")
         )
         return Response(AuditorEvaluacionDesempenoSerializer(qs, many=True).data, status=200)
+
+
+class AuditorResultadosKPIExportAPIView(APIView):
+    # GET /api/auditor/desempeno/resultados-kpi/export/?periodo=&desde=&hasta= (por calculado_el)
+    permission_classes = [con_rol("auditor")]
+
+    def get(self, request):
+        auditor = _get_usuario_tt(request)
+        if not auditor or not auditor.empresa_id:
+            return Response({"detail": "No autorizado."}, status=401)
+
+        desde, hasta = parse_rango(request.query_params)
+        tz = zona_empresa(auditor.empresa_id)
+        qs = ResultadoKPI.objects.filter(
+            filtro_rango("calculado_el", desde, hasta, tz), empresa_id=auditor.empresa_id,
+        )
+
+        periodo = (request.query_params.get("periodo") or "").strip()
+        if periodo:
+            qs = qs.filter(periodo=periodo)
+
+        return respuesta_csv("resultados_kpi.csv", qs.order_by("-calculado_el", "-id"), COLUMNAS_RESULTADOS_KPI, tz)
@@ -5,6 +5,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from apps.usuarios.contexto import get_contexto
 from .models import AsignacionKPI, ResultadoKPI, EvaluacionDesempeno, KPI
 from .serializers import (
     MiAsignacionKPISerializer,
@@ -15,17 +16,15 @@ from .serializers import (
 
 def _ctx_empresa_empleado(request):
     """
-    Asume tu esquema:
-    - request.user es AuthUser (auth_user_tt) y tiene .usuario (tabla usuarios.Usuario)
-    - usuarios.Usuario tiene empresa_id y empleado_id (FKs)
+    empresa_id / empleado_id del usuario negocio (usuarios.Usuario), tomados
+    de los claims del token (apps/usuarios/contexto.py) sin consultar la BD.
     """
-    auth_user = request.user
-    user_tt = getattr(auth_user, "usuario", None)
-    if not user_tt:
+    ctx = get_contexto(request)
+    if not ctx or not ctx.usuario_id:
         return None, None, "El usuario autenticado no está enlazado a usuarios.Usuario (auth_user_tt.usuario)."
 
-    empresa_id = user_tt.empresa_id
-    empleado_id = user_tt.empleado_id
+    empresa_id = ctx.empresa_id
+    empleado_id = ctx.empleado_id
     if not empresa_id or not empleado_id:
         return None, None, "No se pudo determinar empresa_id/empleado_id desde el usuario."
 
@@ -4,7 +4,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from apps.usuarios.models import Usuario
+from apps.usuarios.contexto import get_contexto
 from apps.empleados.models import Empleado
 from apps.kpi.models import EvaluacionDesempeno
 from apps.kpi.serializers_manager_evaluaciones import (
@@ -15,18 +15,9 @@ from apps.kpi.serializers_manager_evaluaciones import (
 
 
 def _get_usuario_tt(request):
-    """
-    Asume que request.user es AuthUser (accounts.AuthUser) y está enlazado a usuarios.Usuario.
-    """
-    auth_user = getattr(request, "user", None)
-    if not auth_user or not getattr(auth_user, "is_authenticated", False):
-        return None
-
-    usuario_id = getattr(auth_user, "usuario_id", None)
-    if not usuario_id:
-        return None
-
-    return Usuario.objects.select_related("empleado", "empresa").filter(id=usuario_id).first()
+    # contexto del token (apps/usuarios/contexto.py): sin consultar usuarios.Usuario
+    ctx = get_contexto(request)
+    return ctx if ctx and ctx.usuario_id else None
 
 
 class ManagerMiEquipoEmpleadosHelperAPIView(APIView):
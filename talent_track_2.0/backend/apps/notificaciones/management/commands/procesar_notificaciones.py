@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.notificaciones.outbox import LOTE_DEFAULT, procesar_outbox
+
+
+class Command(BaseCommand):
+    help = "Entrega las notificaciones pendientes del outbox (NotificacionSaliente) en bloque"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lote", type=int, default=LOTE_DEFAULT, help="Salidas por lote")
+        parser.add_argument("--workers", type=int, default=4, help="Hilos del pool (1 = en el mismo hilo)")
+        parser.add_argument("--max-lotes", type=int, default=None, help="Corta después de N lotes")
+        parser.add_argument("--loop", action="store_true", help="No termina: vuelve a revisar cada --intervalo segundos")
+        parser.add_argument("--intervalo", type=float, default=2.0, help="Segundos entre revisiones con --loop")
+
+    def handle(self, *args, **options):
+        while True:
+            r = procesar_outbox(lote=options["lote"], workers=options["workers"], max_lotes=options["max_lotes"])
+            if r["salidas"] or not options["loop"]:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Lotes: {r['lotes']}, salidas: {r['salidas']}, notificaciones creadas: {r['notificaciones']}"
+                ))
+            if not options["loop"]:
+                break
+            time.sleep(options["intervalo"])
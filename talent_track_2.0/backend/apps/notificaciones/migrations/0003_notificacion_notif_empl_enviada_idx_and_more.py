@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_alter_puesto_empresa_alter_puesto_unidad_and_more'),
+        ('empleados', '0002_alter_contrato_empleado_alter_contrato_empresa_and_more'),
+        ('notificaciones', '0002_alter_notificacion_empleado_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['empleado', 'enviada_el'], name='notif_empl_enviada_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(condition=models.Q(('leida_el__isnull', True)), fields=['empleado', 'enviada_el'], name='notif_no_leidas_idx'),
+        ),
+    ]
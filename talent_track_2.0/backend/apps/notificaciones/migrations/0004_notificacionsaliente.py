@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-18 13:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_resumendiarioempresa_resumenmensualempresa_and_more'),
+        ('notificaciones', '0003_notificacion_notif_empl_enviada_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificacionSaliente',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('canal', models.SmallIntegerField()),
+                ('titulo', models.CharField(max_length=150)),
+                ('mensaje', models.TextField()),
+                ('accion_url', models.CharField(blank=True, max_length=150, null=True)),
+                ('empleado_ids', models.JSONField(blank=True, null=True)),
+                ('toda_la_empresa', models.BooleanField(default=False)),
+                ('estado', models.SmallIntegerField(default=1)),
+                ('intentos', models.IntegerField(default=0)),
+                ('ultimo_error', models.TextField(blank=True, null=True)),
+                ('creada_el', models.DateTimeField()),
+                ('procesada_el', models.DateTimeField(blank=True, null=True)),
+                ('enviadas', models.IntegerField(default=0)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.empresa')),
+            ],
+            options={
+                'db_table': 'notificacionsaliente',
+                'indexes': [models.Index(condition=models.Q(('estado', 1)), fields=['id'], name='notif_out_pend_idx')],
+            },
+        ),
+    ]
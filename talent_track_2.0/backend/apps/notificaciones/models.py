@@ -16,3 +16,51 @@ class Notificacion(models.Model):
 
     class Meta:
         db_table = 'notificacion'
+        indexes = [
+            models.Index(fields=["empleado", "enviada_el"], name="notif_empl_enviada_idx"),
+            # ?solo_no_leidas=1
+            models.Index(
+                fields=["empleado", "enviada_el"],
+                condition=models.Q(leida_el__isnull=True),
+                name="notif_no_leidas_idx",
+            ),
+        ]
+
+
+class NotificacionSaliente(models.Model):
+    """
+    Outbox: la petición solo deja este registro (en su misma transacción) y
+    el worker (procesar_notificaciones) lo expande a filas Notificacion con
+    bulk_create y despacha los canales externos.
+    Un comunicado a toda la empresa es UNA fila aquí, no miles.
+    """
+    PENDIENTE = 1
+    ENVIADA = 2
+    ERROR = 3
+
+    id = models.BigAutoField(primary_key=True)
+    empresa = models.ForeignKey(Empresa, on_delete=models.CASCADE)
+    canal = models.SmallIntegerField()
+    titulo = models.CharField(max_length=150)
+    mensaje = models.TextField()
+    accion_url = models.CharField(max_length=150, null=True, blank=True)
+    # destinatarios: lista de empleado_id, o toda la empresa (empleados activos)
+    empleado_ids = models.JSONField(null=True, blank=True)
+    toda_la_empresa = models.BooleanField(default=False)
+    estado = models.SmallIntegerField(default=PENDIENTE)
+    intentos = models.IntegerField(default=0)
+    ultimo_error = models.TextField(null=True, blank=True)
+    creada_el = models.DateTimeField()
+    procesada_el = models.DateTimeField(null=True, blank=True)
+    enviadas = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'notificacionsaliente'
+        indexes = [
+            # cola del worker: solo pendientes, en orden de llegada
+            models.Index(
+                fields=["id"],
+                condition=models.Q(estado=1),
+                name="notif_out_pend_idx",
+            ),
+        ]
@@ -0,0 +1,240 @@
+# apps/notificaciones/outbox.py
+"""
+Pipeline de notificaciones tipo "outbox".
+
+1) La petición llama a encolar(...): deja UNA fila NotificacionSaliente en
+   su misma transacción (si la aprobación hace rollback, no hay aviso).
+2) El worker (manage.py procesar_notificaciones) toma las pendientes, las
+   reparte en un pool de hilos y cada una:
+     - expande destinatarios (lista de empleados o toda la empresa),
+     - inserta las Notificacion con bulk_create por bloques,
+     - al confirmar, llama a los despachadores del canal (ver registrar_canal).
+   Cada salida se procesa en su propia transacción con
+   select_for_update(skip_locked): varios workers no la toman dos veces.
+
+Para desarrollo/tests, NOTIFICACIONES_COLA_LOCAL=True procesa la salida en
+el mismo proceso apenas confirma la transacción (ColaLocal), sin worker.
+"""
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.empleados.models import Empleado
+from apps.notificaciones.models import Notificacion, NotificacionSaliente
+
+logger = logging.getLogger(__name__)
+
+# mismo catálogo que CANAL_LABEL (serializers.py)
+CANAL_APP = 1
+CANAL_EMAIL = 2
+CANAL_WHATSAPP = 3
+CANAL_WEBHOOK = 4
+
+ESTADO_EMPLEADO_ACTIVO = 1
+
+LOTE_DEFAULT = 100
+BLOQUE_INSERT = 1000
+MAX_INTENTOS = getattr(settings, "NOTIFICACIONES_MAX_INTENTOS", 5)
+
+# canal -> [callable(salida, notificaciones)]
+_DESPACHADORES = {}
+
+
+def registrar_canal(canal):
+    """
+    Decorador para despachar un canal externo (email, webhook, ...):
+
+        @registrar_canal(CANAL_WEBHOOK)
+        def enviar(salida, notificaciones): ...
+
+    Se llama después del commit de las Notificacion; si falla se registra
+    en el log y no revierte las filas ya creadas.
+    """
+    def deco(func):
+        _DESPACHADORES.setdefault(canal, []).append(func)
+        return func
+    return deco
+
+
+# =========================
+# Encolar (lado petición)
+# =========================
+def encolar(empresa_id, titulo, mensaje, empleado_ids=None, toda_la_empresa=False, canal=CANAL_APP, accion_url=None):
+    """
+    -> NotificacionSaliente (pendiente)
+    """
+    salida = NotificacionSaliente.objects.create(
+        empresa_id=empresa_id,
+        canal=canal,
+        titulo=titulo,
+        mensaje=mensaje,
+        accion_url=accion_url,
+        empleado_ids=None if toda_la_empresa else sorted({int(e) for e in (empleado_ids or [])}),
+        toda_la_empresa=toda_la_empresa,
+        creada_el=timezone.now(),
+    )
+    if getattr(settings, "NOTIFICACIONES_COLA_LOCAL", False):
+        transaction.on_commit(lambda: cola_local.poner(salida.id))
+    return salida
+
+
+# =========================
+# Worker
+# =========================
+def _destinatarios(salida):
+    if not salida.toda_la_empresa:
+        # solo empleados de la empresa de la salida
+        return (
+            Empleado.objects
+            .filter(empresa_id=salida.empresa_id, id__in=salida.empleado_ids or [])
+            .values_list("id", flat=True)
+            .iterator(chunk_size=BLOQUE_INSERT)
+        )
+    return (
+        Empleado.objects
+        .filter(empresa_id=salida.empresa_id, estado=ESTADO_EMPLEADO_ACTIVO)
+        .order_by("id")
+        .values_list("id", flat=True)
+        .iterator(chunk_size=BLOQUE_INSERT)
+    )
+
+
+def _despachar(salida, notificaciones):
+    for func in _DESPACHADORES.get(salida.canal, []):
+        try:
+            func(salida, notificaciones)
+        except Exception:
+            logger.exception("Fallo al despachar canal %s de la salida %s", salida.canal, salida.id)
+
+
+def procesar_salida(salida_id):
+    """
+    Expande y entrega una salida. -> notificaciones creadas (0 si otro
+    worker la tiene tomada o ya no está pendiente).
+    """
+    try:
+        with transaction.atomic():
+            salida = (
+                NotificacionSaliente.objects
+                .select_for_update(skip_locked=True)
+                .filter(id=salida_id, estado=NotificacionSaliente.PENDIENTE)
+                .first()
+            )
+            if not salida:
+                return 0
+
+            ahora = timezone.now()
+            creadas = []
+            bloque = []
+            for empleado_id in _destinatarios(salida):
+                bloque.append(Notificacion(
+                    empresa_id=salida.empresa_id,
+                    empleado_id=empleado_id,
+                    canal=salida.canal,
+                    titulo=salida.titulo,
+                    mensaje=salida.mensaje,
+                    enviada_el=ahora,
+                    leida_el=None,
+                    accion_url=salida.accion_url,
+                ))
+                if len(bloque) >= BLOQUE_INSERT:
+                    creadas += Notificacion.objects.bulk_create(bloque)
+                    bloque = []
+            if bloque:
+                creadas += Notificacion.objects.bulk_create(bloque)
+
+            salida.estado = NotificacionSaliente.ENVIADA
+            salida.intentos += 1
+            salida.procesada_el = ahora
+            salida.enviadas = len(creadas)
+            salida.ultimo_error = None
+            salida.save(update_fields=["estado", "intentos", "procesada_el", "enviadas", "ultimo_error"])
+
+            transaction.on_commit(lambda: _despachar(salida, creadas))
+        return len(creadas)
+
+    except Exception as exc:
+        logger.exception("Fallo al procesar la salida %s", salida_id)
+        salida = NotificacionSaliente.objects.filter(id=salida_id).first()
+        if salida:
+            salida.intentos += 1
+            salida.ultimo_error = str(exc)[:2000]
+            if salida.intentos >= MAX_INTENTOS:
+                salida.estado = NotificacionSaliente.ERROR
+            salida.save(update_fields=["intentos", "ultimo_error", "estado"])
+        return 0
+
+
+def _procesar_en_hilo(salida_id):
+    try:
+        return procesar_salida(salida_id)
+    finally:
+        # cada hilo abre su propia conexión: se cierra al terminar
+        connection.close()
+
+
+def procesar_outbox(lote=LOTE_DEFAULT, workers=1, max_lotes=None):
+    """
+    Vacía las salidas pendientes (en orden de llegada) por lotes.
+    workers > 1: cada lote se reparte en un pool de hilos.
+    """
+    resumen = {"lotes": 0, "salidas": 0, "notificaciones": 0}
+    ultimo_id = 0
+
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while max_lotes is None or resumen["lotes"] < max_lotes:
+            # keyset por id: una salida que falla no se reintenta en la misma corrida
+            ids = list(
+                NotificacionSaliente.objects
+                .filter(estado=NotificacionSaliente.PENDIENTE, id__gt=ultimo_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:lote]
+            )
+            if not ids:
+                break
+            ultimo_id = ids[-1]
+
+            if pool:
+                creadas = list(pool.map(_procesar_en_hilo, ids))
+            else:
+                creadas = [procesar_salida(i) for i in ids]
+
+            resumen["lotes"] += 1
+            resumen["salidas"] += len(ids)
+            resumen["notificaciones"] += sum(creadas)
+    finally:
+        if pool:
+            pool.shutdown(wait=True)
+
+    return resumen
+
+
+class ColaLocal:
+    """
+    Cola en memoria del proceso (NOTIFICACIONES_COLA_LOCAL): procesa cada
+    salida en cuanto su transacción confirma, sin worker aparte.
+    """
+
+    def __init__(self):
+        self._cola = queue.SimpleQueue()
+
+    def poner(self, salida_id):
+        self._cola.put(salida_id)
+        self.drenar()
+
+    def drenar(self):
+        total = 0
+        while True:
+            try:
+                salida_id = self._cola.get_nowait()
+            except queue.Empty:
+                return total
+            total += procesar_salida(salida_id)
+
+
+cola_local = ColaLocal()
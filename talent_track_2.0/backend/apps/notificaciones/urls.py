@@ -1,7 +1,9 @@
 from django.urls import path
 from .views import NotificacionesEmpleadoAPIView, MarcarNotificacionLeidaAPIView
+from .views_rrhh_comunicados import RRHHComunicadoAPIView
 
 urlpatterns = [
     path("empleado/notificaciones/", NotificacionesEmpleadoAPIView.as_view(), name="empleado_notificaciones"),
     path("empleado/notificaciones/<int:pk>/leida/", MarcarNotificacionLeidaAPIView.as_view(), name="empleado_notificacion_leida"),
+    path("rrhh/notificaciones/comunicado/", RRHHComunicadoAPIView.as_view(), name="rrhh_notificaciones_comunicado"),
 ]
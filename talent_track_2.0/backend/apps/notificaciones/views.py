@@ -7,20 +7,19 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.notificaciones.models import Notificacion
-from apps.usuarios.models import UsuarioRol
+from apps.usuarios.contexto import get_contexto
+from apps.core.paginacion import paginar_keyset, respuesta_paginada
 from .serializers import NotificacionEmpleadoSerializer
 
 
 def _ctx(request):
-    u = request.user.usuario
-    return u.empresa_id, u.empleado_id, u.id
+    ctx = get_contexto(request)
+    return ctx.empresa_id, ctx.empleado_id, ctx.usuario_id
 
 
 def _require_empleado(request):
-    return UsuarioRol.objects.filter(
-        usuario_id=request.user.usuario.id,
-        rol__nombre="empleado"
-    ).exists()
+    ctx = get_contexto(request)
+    return bool(ctx and ctx.usuario_id and ctx.tiene_rol("empleado"))
 
 
 class NotificacionesEmpleadoAPIView(APIView):
@@ -45,9 +44,9 @@ class NotificacionesEmpleadoAPIView(APIView):
         if solo_no_leidas:
             qs = qs.filter(leida_el__isnull=True)
 
-        qs = qs.order_by("-enviada_el", "-id")
+        notificaciones, next_cursor = paginar_keyset(request, qs, ("-enviada_el", "-id"))
 
-        return Response(NotificacionEmpleadoSerializer(qs, many=True).data, status=200)
+        return respuesta_paginada(request, NotificacionEmpleadoSerializer(notificaciones, many=True).data, next_cursor)
 
 
 class MarcarNotificacionLeidaAPIView(APIView):
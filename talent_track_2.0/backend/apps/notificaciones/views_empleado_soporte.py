@@ -1,4 +1,3 @@
-from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -6,7 +5,7 @@ from rest_framework.permissions import IsAuthenticated
 from apps.usuarios.permissions import IsEmpleado
 from apps.usuarios.scopes import get_scope
 from apps.usuarios.models import UsuarioRol
-from apps.notificaciones.models import Notificacion
+from apps.notificaciones.outbox import CANAL_EMAIL, encolar
 
 
 class SoporteRRHHAdminsView(APIView):
@@ -92,19 +91,13 @@ class SoporteEnviarNotificacionView(APIView):
                 status=400
             )
 
-        now = timezone.now()
-
-        creadas = 0
-        for emp_id in rrhh_empleado_ids_validos:
-            Notificacion.objects.create(
-                empresa_id=empresa_id,
-                empleado_id=emp_id,
-                canal=2,               # 2 = web (ajústalo si ya manejas enum)
-                titulo=titulo,
-                mensaje=mensaje,
-                enviada_el=now,
-                accion_url=None,
-            )
-            creadas += 1
+        # una sola fila en el outbox; el worker crea las Notificacion
+        encolar(
+            empresa_id,
+            titulo,
+            mensaje,
+            empleado_ids=rrhh_empleado_ids_validos,
+            canal=CANAL_EMAIL,
+        )
 
-        return Response({"ok": True, "creadas": creadas}, status=201)
+        return Response({"ok": True, "creadas": len(rrhh_empleado_ids_validos)}, status=201)
@@ -0,0 +1,41 @@
+# apps/notificaciones/views_rrhh_comunicados.py
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from apps.usuarios.contexto import get_contexto
+from apps.usuarios.permissions import con_rol
+from apps.notificaciones.outbox import CANAL_APP, encolar
+
+
+class RRHHComunicadoAPIView(APIView):
+    """
+    POST /api/rrhh/notificaciones/comunicado/
+    body: { "titulo": "...", "mensaje": "...", "accion_url": "..." (opcional) }
+
+    Aviso a TODOS los empleados activos de la empresa. La petición solo deja
+    una fila en el outbox; las Notificacion las crea el worker
+    (manage.py procesar_notificaciones) en bloque.
+    """
+    permission_classes = [con_rol("rrhh")]
+
+    def post(self, request):
+        ctx = get_contexto(request)
+
+        titulo = (request.data.get("titulo") or "").strip()
+        mensaje = (request.data.get("mensaje") or "").strip()
+        accion_url = (request.data.get("accion_url") or "").strip() or None
+
+        if not titulo or not mensaje:
+            return Response({"detail": "titulo y mensaje son requeridos."}, status=400)
+        if len(titulo) > 150:
+            return Response({"detail": "titulo no puede superar 150 caracteres."}, status=400)
+
+        salida = encolar(
+            ctx.empresa_id,
+            titulo,
+            mensaje,
+            toda_la_empresa=True,
+            canal=CANAL_APP,
+            accion_url=accion_url,
+        )
+        return Response({"ok": True, "salida_id": salida.id, "estado": "pendiente"}, status=202)
@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 class UsuariosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.usuarios'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .permisos_bits import registrar_declarados
+
+        post_migrate.connect(registrar_declarados, sender=self)
@@ -1,5 +1,9 @@
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework.exceptions import AuthenticationFailed, Throttled
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from apps.accounts.hashing import LoginSaturado
+from apps.accounts.models import AuthUser
 from apps.usuarios.models import UsuarioRol
 
 ROLE_HOME = {
@@ -13,6 +17,25 @@ ROLE_HOME = {
 PRIORIDAD = ["superadmin", "rrhh", "manager", "auditor", "empleado"]
 
 
+def roles_de(user, usuario):
+    """
+    Nombres de rol del usuario: los que EmailBackend ya trajo en la misma
+    consulta del login (user.roles_login / user.rol_ids_login); si no, una
+    consulta.
+    """
+    roles = getattr(user, "roles_login", None)
+    if roles is None:
+        filas = list(UsuarioRol.objects.filter(usuario_id=usuario.id).values_list("rol_id", "rol__nombre"))
+        user.rol_ids_login = [rol_id for rol_id, _ in filas]
+        user.roles_login = roles = [nombre for _, nombre in filas]
+    return roles
+
+
+def rol_principal_de(roles):
+    roles_lower = [r.lower() for r in roles]
+    return next((r for r in PRIORIDAD if r in roles_lower), None) or (roles_lower[0] if roles_lower else None)
+
+
 class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = "email"
 
@@ -22,24 +45,23 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
 
         usuario = user.usuario
         if usuario:
-            roles = list(
-                UsuarioRol.objects.filter(usuario_id=usuario.id)
-                .select_related("rol")
-                .values_list("rol__nombre", flat=True)
-            )
-            roles_lower = [r.lower() for r in roles]
-            rol_principal = next((r for r in PRIORIDAD if r in roles_lower), None) or (roles_lower[0] if roles_lower else None)
+            roles = roles_de(user, usuario)
+            rol_principal = rol_principal_de(roles)
 
             token["usuario_id"] = usuario.id
             token["empresa_id"] = usuario.empresa_id
             token["empleado_id"] = usuario.empleado_id
             token["roles"] = roles
             token["rol"] = rol_principal
+            token["rol_ids"] = user.rol_ids_login
 
         return token
 
     def validate(self, attrs):
-        data = super().validate(attrs)
+        try:
+            data = super().validate(attrs)
+        except LoginSaturado:
+            raise Throttled(wait=1, detail="Demasiados inicios de sesión simultáneos. Intente nuevamente.")
 
         auth_user = self.user
         usuario = auth_user.usuario
@@ -50,17 +72,12 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
         if usuario.estado != 1:
             raise serializers.ValidationError("Usuario bloqueado o inactivo.")
 
-        roles = list(
-            UsuarioRol.objects.filter(usuario_id=usuario.id)
-            .select_related("rol")
-            .values_list("rol__nombre", flat=True)
-        )
-        roles_lower = [r.lower() for r in roles]
+        roles = roles_de(auth_user, usuario)
 
         if not roles:
             raise serializers.ValidationError("El usuario no tiene roles asignados.")
 
-        rol_principal = next((r for r in PRIORIDAD if r in roles_lower), None) or roles_lower[0]
+        rol_principal = rol_principal_de(roles)
 
         if rol_principal == "superadmin":
             if usuario.empresa_id is not None or usuario.empleado_id is not None:
@@ -79,3 +96,26 @@ class EmailTokenObtainPairSerializer(TokenObtainPairSerializer):
         }
 
         return data
+
+
+class RefreshConRevocacionSerializer(TokenRefreshSerializer):
+    """
+    Refresh de SimpleJWT + época de revocación (apps/accounts/revocacion.py),
+    leída de la BD: un refresh emitido antes del bloqueo no puede sacar
+    access tokens nuevos (con la rotación cada refresh renueva su iat).
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        fila = (
+            AuthUser.objects
+            .filter(id=refresh.payload.get(api_settings.USER_ID_CLAIM))
+            .values_list("id", "tokens_validos_desde")
+            .first()
+        )
+        if fila is None:
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        epoca = fila[1]
+        if epoca is not None and int(refresh.get("iat") or 0) < epoca.timestamp():
+            raise AuthenticationFailed("La sesión fue revocada.", "token_revocado")
+        return super().validate(attrs)
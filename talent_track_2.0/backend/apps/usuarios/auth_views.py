@@ -1,9 +1,13 @@
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
-from .auth_serializers import EmailTokenObtainPairSerializer
+from .auth_serializers import EmailTokenObtainPairSerializer, RefreshConRevocacionSerializer
 
 
 class LoginView(TokenObtainPairView):
     permission_classes = [AllowAny]
     serializer_class = EmailTokenObtainPairSerializer
+
+
+class RefreshView(TokenRefreshView):
+    serializer_class = RefreshConRevocacionSerializer
@@ -0,0 +1,76 @@
+# apps/usuarios/authentication.py
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.accounts.models import AuthUser
+from apps.accounts.revocacion import token_revocado
+from apps.usuarios.contexto import contexto_desde_token
+
+_PROPIOS = ("id", "pk", "_user")
+
+
+class UsuarioJWT:
+    """
+    request.user sin consulta: solo el id del token. El AuthUser se carga
+    la primera vez que una vista usa algo más (email, set_password, save...).
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id):
+        object.__setattr__(self, "id", user_id)
+        object.__setattr__(self, "pk", user_id)
+        object.__setattr__(self, "_user", None)
+
+    def _cargar(self):
+        if self._user is None:
+            user = AuthUser.objects.filter(id=self.id).first()
+            if user is None:
+                raise AuthenticationFailed("Usuario no encontrado.", code="user_not_found")
+            object.__setattr__(self, "_user", user)
+        return self._user
+
+    def __getattr__(self, nombre):
+        if nombre.startswith("__"):
+            raise AttributeError(nombre)
+        return getattr(self._cargar(), nombre)
+
+    def __setattr__(self, nombre, valor):
+        if nombre in _PROPIOS:
+            object.__setattr__(self, nombre, valor)
+        else:
+            setattr(self._cargar(), nombre, valor)
+
+    def __str__(self):
+        return str(self._user) if self._user is not None else f"AuthUser {self.id}"
+
+
+class JWTContextoAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication de SimpleJWT + request.contexto (ContextoUsuario)
+    construido una sola vez desde los claims del token.
+
+    Sin consultas por petición: las cuentas bloqueadas o borradas se
+    rechazan por la época de revocación (apps/accounts/revocacion.py) y
+    request.user es un UsuarioJWT que carga el AuthUser solo si se usa.
+    """
+
+    def authenticate(self, request):
+        resultado = super().authenticate(request)
+        if resultado is None:
+            return None
+
+        user, token = resultado
+        # en el HttpRequest de Django: visible desde la vista DRF y desde middlewares
+        request._request.contexto = contexto_desde_token(token)
+        return user, token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            raise AuthenticationFailed("Token sin usuario.", code="user_not_found")
+        if token_revocado(validated_token):
+            raise AuthenticationFailed("La sesión fue revocada.", code="token_revocado")
+        return UsuarioJWT(user_id)
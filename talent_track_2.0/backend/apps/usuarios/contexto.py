@@ -0,0 +1,68 @@
+# apps/usuarios/contexto.py
+"""
+Contexto de la petición (usuario / empresa / empleado / roles) armado UNA
+vez desde los claims del JWT, sin consultar la BD.
+
+Los claims los pone EmailTokenObtainPairSerializer.get_token() al hacer
+login: usuario_id, empresa_id, empleado_id, roles, rol (principal) y
+rol_ids (para los permisos finos, ver permisos_bits.py). Como el refresh
+los copia, quitar un UsuarioRol o cambiar empresa/empleado/estado del
+Usuario revoca sus tokens (signals.revocar_sesiones).
+
+Uso en vistas:
+    ctx = get_contexto(request)
+    if not ctx or not ctx.tiene_rol("empleado"): ...
+    ctx.empresa_id, ctx.empleado_id, ctx.usuario_id
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class ContextoUsuario:
+    usuario_id: int | None
+    empresa_id: int | None
+    empleado_id: int | None
+    rol: str | None
+    roles: frozenset = frozenset()
+    rol_ids: tuple = ()
+
+    def tiene_rol(self, *roles):
+        """
+        True si el usuario tiene CUALQUIERA de esos roles (no solo el principal),
+        igual que la consulta a UsuarioRol que reemplaza.
+        """
+        return any(r in self.roles for r in roles)
+
+
+def contexto_desde_token(token):
+    """
+    token: request.auth (AccessToken de SimpleJWT) -> ContextoUsuario o None
+    """
+    if not token:
+        return None
+
+    rol = (token.get("rol") or token.get("role") or None)
+    rol = rol.lower() if rol else None
+    roles = {str(r).lower() for r in (token.get("roles") or [])}
+    if rol:
+        roles.add(rol)
+
+    return ContextoUsuario(
+        usuario_id=token.get("usuario_id"),
+        empresa_id=token.get("empresa_id"),
+        empleado_id=token.get("empleado_id"),
+        rol=rol,
+        roles=frozenset(roles),
+        rol_ids=tuple(token.get("rol_ids") or ()),
+    )
+
+
+def get_contexto(request):
+    """
+    Contexto ya resuelto por JWTContextoAuthentication; si la vista usa otra
+    autenticación (p.ej. force_authenticate en tests) se arma desde request.auth.
+    """
+    ctx = getattr(request, "contexto", None)
+    if ctx is None:
+        ctx = contexto_desde_token(getattr(request, "auth", None))
+    return ctx
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 16:30
+
+from django.db import migrations, models
+
+
+def registrar_existentes(apps, schema_editor):
+    # un bit por código ya usado en Permiso (en orden alfabético)
+    Permiso = apps.get_model("usuarios", "Permiso")
+    CodigoPermiso = apps.get_model("usuarios", "CodigoPermiso")
+    codigos = sorted({(c or "").strip().lower() for c in Permiso.objects.values_list("codigo", flat=True)} - {""})
+    CodigoPermiso.objects.bulk_create([CodigoPermiso(codigo=c, bit=i) for i, c in enumerate(codigos)])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0003_alter_usuariorol_unique_together'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodigoPermiso',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('codigo', models.CharField(max_length=150, unique=True)),
+                ('bit', models.IntegerField(unique=True)),
+            ],
+            options={
+                'db_table': 'codigopermiso',
+            },
+        ),
+        migrations.RunPython(registrar_existentes, migrations.RunPython.noop),
+    ]
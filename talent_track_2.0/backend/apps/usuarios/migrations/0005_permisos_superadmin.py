@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-18 18:30
+
+from django.db import migrations
+
+# Rol/Permiso CRUD (apps/usuarios/views.py): superadmin o estos códigos
+CODIGOS = {
+    "roles.manage": "Gestionar roles",
+    "permisos.manage": "Gestionar permisos",
+}
+
+
+def otorgar_a_superadmin(apps, schema_editor):
+    # quedan explícitos en el catálogo de permisos de los superadmin existentes
+    Rol = apps.get_model("usuarios", "Rol")
+    Permiso = apps.get_model("usuarios", "Permiso")
+    for rol in Rol.objects.filter(nombre__iexact="superadmin"):
+        for codigo, descripcion in CODIGOS.items():
+            if not Permiso.objects.filter(rol=rol, codigo__iexact=codigo).exists():
+                Permiso.objects.create(rol=rol, codigo=codigo, descripcion=descripcion)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0004_codigopermiso'),
+    ]
+
+    operations = [
+        migrations.RunPython(otorgar_a_superadmin, migrations.RunPython.noop),
+    ]
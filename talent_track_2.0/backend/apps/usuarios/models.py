@@ -86,3 +86,19 @@ class Permiso(models.Model):
 
     def __str__(self):
         return self.codigo
+
+
+class CodigoPermiso(models.Model):
+    """
+    Catálogo de códigos de Permiso -> posición de bit (apps/usuarios/permisos_bits.py).
+    Solo se agregan filas: un bit asignado no cambia nunca.
+    """
+    id = models.BigAutoField(primary_key=True)
+    codigo = models.CharField(max_length=150, unique=True)
+    bit = models.IntegerField(unique=True)
+
+    class Meta:
+        db_table = "codigopermiso"
+
+    def __str__(self):
+        return f"{self.codigo} (bit {self.bit})"
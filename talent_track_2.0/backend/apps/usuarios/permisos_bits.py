@@ -0,0 +1,225 @@
+# apps/usuarios/permisos_bits.py
+"""
+Permisos finos (Permiso.codigo por Rol) compilados a un bitset por rol.
+
+- CodigoPermiso asigna a cada código (en minúsculas) una posición de bit
+  fija; solo se agregan filas, así un bit nunca cambia de significado.
+  Se registran al guardar un Permiso y, los que exige con_permiso(...),
+  al migrar; la comprobación por petición no inserta.
+- bitset del rol = OR de los bits de sus códigos (un int de Python).
+  Se guarda en la caché compartida con clave versionada
+  perm:rol:<rol_id>:<versión> (mismo esquema que cache_dashboards.py):
+  invalidar un rol solo sube su versión.
+- El JWT lleva rol_ids (ver auth_serializers.get_token); el bitset del
+  usuario es el OR de sus roles y se memoriza en la petición.
+
+Con la caché caliente, tiene_permisos(...) no toca la BD: una lectura de
+versiones + una de bitsets (get_many) por petición y luego un AND.
+Los tokens emitidos antes de rol_ids resuelven los roles con una consulta
+cacheada por usuario (PERMISOS_CACHE_TTL).
+
+La invalidación la disparan las señales de Permiso/Rol (signals.py), p.ej.
+al crear/editar/borrar con PermisoCreateAPIView / PermisoDetalleAPIView.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.urls import get_resolver
+
+from apps.usuarios.contexto import get_contexto
+from apps.usuarios.models import CodigoPermiso, Permiso, UsuarioRol
+
+CACHE_TTL = getattr(settings, "PERMISOS_CACHE_TTL", 3600)
+
+# código -> bit (append-only: lo que se memoriza aquí no se invalida nunca)
+_BITS = {}
+_BITS_LOCK = threading.Lock()
+_DECLARADOS = set()
+
+
+def normalizar_codigo(codigo):
+    return (codigo or "").strip().lower()
+
+
+# ---------------- catálogo de bits ----------------
+
+def _bits_conocidos(codigos):
+    """
+    {codigo: bit} de los códigos ya registrados (una consulta por los que no
+    estén en memoria; no inserta).
+    """
+    faltan = codigos - _BITS.keys()
+    if faltan:
+        existentes = dict(CodigoPermiso.objects.filter(codigo__in=faltan).values_list("codigo", "bit"))
+        with _BITS_LOCK:
+            _BITS.update(existentes)
+    return {c: _BITS[c] for c in codigos if c in _BITS}
+
+
+def registrar_codigos(codigos):
+    """
+    Asegura un bit para cada código -> {codigo: bit}
+    """
+    codigos = {normalizar_codigo(c) for c in codigos} - {""}
+    bits = _bits_conocidos(codigos)
+    nuevos = {codigo: _asignar_bit(codigo) for codigo in sorted(codigos - bits.keys())}
+    if nuevos:
+        with _BITS_LOCK:
+            _BITS.update(nuevos)
+    return {**bits, **nuevos}
+
+
+def declarar_codigos(codigos):
+    """
+    Códigos que exige con_permiso(...): se registran al migrar
+    (registrar_declarados), no en la petición.
+    """
+    _DECLARADOS.update(normalizar_codigo(c) for c in codigos)
+
+
+def registrar_declarados(**kwargs):
+    # post_migrate: las vistas (y sus con_permiso) se cargan con el urlconf
+    get_resolver().url_patterns
+    registrar_codigos(_DECLARADOS)
+
+
+def _asignar_bit(codigo, intentos=5):
+    # siguiente bit libre; si otro proceso gana la carrera se relee / reintenta
+    for _ in range(intentos):
+        try:
+            with transaction.atomic():
+                ultimo = CodigoPermiso.objects.aggregate(m=Max("bit"))["m"]
+                bit = 0 if ultimo is None else ultimo + 1
+                return CodigoPermiso.objects.create(codigo=codigo, bit=bit).bit
+        except IntegrityError:
+            existente = CodigoPermiso.objects.filter(codigo=codigo).values_list("bit", flat=True).first()
+            if existente is not None:
+                return existente
+    raise RuntimeError(f"No se pudo asignar bit al permiso {codigo!r}")
+
+
+def mascara(*codigos):
+    """
+    Códigos -> int con sus bits (los registra si hace falta).
+    """
+    resultado = 0
+    for bit in registrar_codigos(codigos).values():
+        resultado |= 1 << bit
+    return resultado
+
+
+# ---------------- bitset por rol ----------------
+
+def _clave_version(rol_id):
+    return f"perm:v:{rol_id}"
+
+
+def _nueva_version():
+    # basada en el reloj: si la versión se pierde (LRU/reinicio) no revive claves viejas
+    return time.time_ns()
+
+
+def _clave_rol(rol_id, version):
+    return f"perm:rol:{rol_id}:{version}"
+
+
+def compilar_rol(rol_id):
+    codigos = Permiso.objects.filter(rol_id=rol_id).values_list("codigo", flat=True)
+    return mascara(*codigos)
+
+
+def bitsets_roles(rol_ids):
+    """
+    {rol_id: bitset}; lo que falta en caché se compila y se guarda.
+    """
+    rol_ids = sorted(set(rol_ids))
+    if not rol_ids:
+        return {}
+    versiones = cache.get_many([_clave_version(r) for r in rol_ids])
+    nuevas = {}
+    for r in rol_ids:
+        if _clave_version(r) not in versiones:
+            nuevas[_clave_version(r)] = _nueva_version()
+    if nuevas:
+        cache.set_many(nuevas, None)
+        versiones.update(nuevas)
+
+    claves = {_clave_rol(r, versiones[_clave_version(r)]): r for r in rol_ids}
+    guardados = cache.get_many(list(claves))
+    resultado = {claves[k]: v for k, v in guardados.items()}
+    compilados = {}
+    for clave, r in claves.items():
+        if r not in resultado:
+            resultado[r] = compilados[clave] = compilar_rol(r)
+    if compilados:
+        cache.set_many(compilados, CACHE_TTL)
+    return resultado
+
+
+def invalidar_rol(*rol_ids):
+    for rol_id in {r for r in rol_ids if r}:
+        try:
+            cache.incr(_clave_version(rol_id))
+        except ValueError:
+            cache.set(_clave_version(rol_id), _nueva_version(), None)
+
+
+# ---------------- por usuario / petición ----------------
+
+def clave_usuario(usuario_id):
+    return f"perm:usr:{usuario_id}"
+
+
+def _roles_usuario(usuario_id):
+    # tokens sin el claim rol_ids (emitidos antes de los permisos finos)
+    clave = clave_usuario(usuario_id)
+    rol_ids = cache.get(clave)
+    if rol_ids is None:
+        rol_ids = list(UsuarioRol.objects.filter(usuario_id=usuario_id).values_list("rol_id", flat=True))
+        cache.set(clave, rol_ids, CACHE_TTL)
+    return rol_ids
+
+
+def bitset_contexto(ctx):
+    if ctx.rol_ids:
+        rol_ids = ctx.rol_ids
+    elif ctx.usuario_id:
+        rol_ids = _roles_usuario(ctx.usuario_id)
+    else:
+        return 0
+    total = 0
+    for bits in bitsets_roles(rol_ids).values():
+        total |= bits
+    return total
+
+
+def bitset_peticion(request):
+    """
+    Bitset del usuario, memorizado en la petición de Django.
+    """
+    req = getattr(request, "_request", request)
+    bits = getattr(req, "permisos_bits", None)
+    if bits is None:
+        ctx = get_contexto(request)
+        bits = bitset_contexto(ctx) if ctx else 0
+        req.permisos_bits = bits
+    return bits
+
+
+def tiene_permisos(request, *codigos):
+    """
+    True si el usuario tiene TODOS los códigos. Un código sin bit no lo
+    tiene ningún rol (guardar un Permiso lo registra): no se inserta aquí.
+    """
+    codigos = {normalizar_codigo(c) for c in codigos} - {""}
+    bits = _bits_conocidos(codigos)
+    if len(bits) < len(codigos):
+        return False
+    requerida = 0
+    for bit in bits.values():
+        requerida |= 1 << bit
+    return bitset_peticion(request) & requerida == requerida
@@ -1,12 +1,13 @@
 from rest_framework.permissions import BasePermission
 
+from apps.usuarios.contexto import get_contexto
+from apps.usuarios.permisos_bits import declarar_codigos, tiene_permisos
+
 
 def _get_role(request):
-    # SimpleJWT guarda claims en request.auth (token decodificado)
-    token = getattr(request, "auth", None)
-    if not token:
-        return None
-    return token.get("rol") or token.get("role")
+    # rol principal del token (ver apps/usuarios/contexto.py)
+    ctx = get_contexto(request)
+    return ctx.rol if ctx else None
 
 
 class IsSuperAdmin(BasePermission):
@@ -32,3 +33,57 @@ class IsEmpleado(BasePermission):
 class IsAuditor(BasePermission):
     def has_permission(self, request, view):
         return _get_role(request) == "auditor"
+
+
+class TieneRol(BasePermission):
+    """
+    Pasa si el usuario tiene CUALQUIERA de `roles` (no solo el principal)
+    y, si `requiere_empresa`, un empresa_id en el token. Sin BD.
+    Usar con con_rol(...).
+    """
+    roles = ()
+    requiere_empresa = True
+    message = "No autorizado."
+
+    def has_permission(self, request, view):
+        ctx = get_contexto(request)
+        if not ctx or not ctx.tiene_rol(*self.roles):
+            return False
+        return bool(ctx.empresa_id) or not self.requiere_empresa
+
+
+def con_rol(*roles, requiere_empresa=True):
+    """
+    permission_classes = [con_rol("rrhh")]
+    permission_classes = [con_rol("rrhh", "auditor")]
+    """
+    nombre = "ConRol_" + "_".join(roles)
+    return type(nombre, (TieneRol,), {"roles": roles, "requiere_empresa": requiere_empresa})
+
+
+class TienePermiso(BasePermission):
+    """
+    Pasa si los roles del usuario suman TODOS los `codigos` de Permiso
+    (bitset por rol, ver permisos_bits.py) y, si `requiere_empresa`, hay
+    empresa_id en el token. Con la caché caliente no toca la BD.
+    Usar con con_permiso(...).
+    """
+    codigos = ()
+    requiere_empresa = True
+    message = "No autorizado."
+
+    def has_permission(self, request, view):
+        ctx = get_contexto(request)
+        if not ctx or (self.requiere_empresa and not ctx.empresa_id):
+            return False
+        return tiene_permisos(request, *self.codigos)
+
+
+def con_permiso(*codigos, requiere_empresa=True):
+    """
+    permission_classes = [con_permiso("vacaciones.aprobar")]
+    permission_classes = [con_rol("rrhh"), con_permiso("nomina.exportar")]
+    """
+    declarar_codigos(codigos)
+    nombre = "ConPermiso_" + "_".join(c.replace(".", "_") for c in codigos)
+    return type(nombre, (TienePermiso,), {"codigos": codigos, "requiere_empresa": requiere_empresa})
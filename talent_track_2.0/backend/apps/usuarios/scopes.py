@@ -1,5 +1,7 @@
 from rest_framework.exceptions import PermissionDenied
 
+from apps.usuarios.contexto import get_contexto
+
 
 def get_scope(request):
     """
@@ -8,13 +10,13 @@ def get_scope(request):
     - empresa_id
     - empleado_id
     """
-    token = getattr(request, "auth", None)
-    if not token:
+    ctx = get_contexto(request)
+    if not ctx:
         raise PermissionDenied("Token inválido o ausente.")
 
     return {
-        "rol": token.get("rol"),
-        "empresa_id": token.get("empresa_id"),
-        "empleado_id": token.get("empleado_id"),
-        "usuario_id": token.get("usuario_id"),
+        "rol": ctx.rol,
+        "empresa_id": ctx.empresa_id,
+        "empleado_id": ctx.empleado_id,
+        "usuario_id": ctx.usuario_id,
     }
@@ -0,0 +1,68 @@
+# apps/usuarios/signals.py
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.accounts import revocacion
+from apps.accounts.models import AuthUser
+from apps.usuarios import permisos_bits
+from apps.usuarios.models import Permiso, Rol, Usuario, UsuarioRol
+
+# claims del JWT (ver contexto.py) que salen de Usuario
+_CAMPOS_TOKEN = ("empresa_id", "empleado_id", "estado")
+
+
+def revocar_sesiones(usuario_id):
+    """
+    Los roles, empresa_id y empleado_id viajan en el token y el refresh los
+    copia tal cual: al cambiarlos se revocan los tokens emitidos y el
+    cambio aplica con el próximo login.
+    """
+    for auth_user_id in AuthUser.objects.filter(usuario_id=usuario_id).values_list("id", flat=True):
+        revocacion.revocar(auth_user_id)
+
+
+@receiver(pre_save, sender=Permiso)
+def recordar_rol_anterior(sender, instance, **kwargs):
+    # al mover un permiso de rol (PUT) hay que invalidar también el rol de origen
+    instance._rol_anterior = (
+        Permiso.objects.filter(id=instance.id).values_list("rol_id", flat=True).first()
+        if instance.id else None
+    )
+
+
+@receiver(post_save, sender=Permiso)
+@receiver(post_delete, sender=Permiso)
+def invalidar_bitset_rol(sender, instance, **kwargs):
+    permisos_bits.registrar_codigos([instance.codigo])
+    permisos_bits.invalidar_rol(instance.rol_id, getattr(instance, "_rol_anterior", None))
+
+
+@receiver(post_delete, sender=Rol)
+def invalidar_bitset_rol_borrado(sender, instance, **kwargs):
+    permisos_bits.invalidar_rol(instance.id)
+
+
+@receiver(post_save, sender=UsuarioRol)
+@receiver(post_delete, sender=UsuarioRol)
+def invalidar_roles_usuario(sender, instance, **kwargs):
+    # la caché solo afecta a tokens sin rol_ids; los nuevos llevan los roles del login
+    cache.delete(permisos_bits.clave_usuario(instance.usuario_id))
+    revocar_sesiones(instance.usuario_id)
+
+
+@receiver(pre_save, sender=Usuario)
+def recordar_claims_anteriores(sender, instance, **kwargs):
+    instance._claims_anteriores = (
+        Usuario.objects.filter(id=instance.id).values_list(*_CAMPOS_TOKEN).first()
+        if instance.id else None
+    )
+
+
+@receiver(post_save, sender=Usuario)
+def revocar_si_cambian_claims(sender, instance, created, **kwargs):
+    anteriores = getattr(instance, "_claims_anteriores", None)
+    if created or anteriores is None:
+        return
+    if anteriores != tuple(getattr(instance, c) for c in _CAMPOS_TOKEN):
+        revocar_sesiones(instance.id)
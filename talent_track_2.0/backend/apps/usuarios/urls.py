@@ -1,7 +1,5 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
-
-from .auth_views import LoginView
+from .auth_views import LoginView, RefreshView
 from .auth_profile_views import MeView
 from apps.usuarios.views import RolListCreateAPIView, RolRetrieveUpdateDeleteAPIView
 
@@ -25,7 +23,7 @@ from apps.usuarios.views import MiUsuarioCambiarPasswordAPIView
 
 urlpatterns = [
     path("auth/login/", LoginView.as_view(), name="auth-login"),
-    path("auth/refresh/", TokenRefreshView.as_view(), name="auth-refresh"),
+    path("auth/refresh/", RefreshView.as_view(), name="auth-refresh"),
     path("auth/me/", MeView.as_view(), name="auth-me"),
 
     path("roles-empresa/", RolListCreateAPIView.as_view(), name="roles-empresa-list-create"),
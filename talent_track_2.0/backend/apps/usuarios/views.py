@@ -6,13 +6,13 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
 from apps.usuarios.models import Rol
-from apps.usuarios.permissions import IsSuperAdmin
+from apps.usuarios.permissions import IsSuperAdmin, con_permiso
 
 from .serializers import RolReadSerializer, RolCreateSerializer, RolUpdateSerializer
 
 
 class RolListCreateAPIView(APIView):
-    permission_classes = [IsSuperAdmin]
+    permission_classes = [IsSuperAdmin | con_permiso("roles.manage", requiere_empresa=False)]
 
     def get(self, request):
         qs = Rol.objects.select_related("empresa").all().order_by("id")
@@ -26,7 +26,7 @@ class RolListCreateAPIView(APIView):
 
 
 class RolRetrieveUpdateDeleteAPIView(APIView):
-    permission_classes = [IsSuperAdmin]
+    permission_classes = [IsSuperAdmin | con_permiso("roles.manage", requiere_empresa=False)]
 
     def get(self, request, pk):
         obj = get_object_or_404(Rol, pk=pk)
@@ -249,6 +249,8 @@ class PermisosPorEmpresaAPIView(APIView):
     GET /api/permisos-por-empresa/?empresa_id=1
     Lista permisos cuyos roles pertenecen a esa empresa.
     """
+    permission_classes = [IsSuperAdmin | con_permiso("permisos.manage", requiere_empresa=False)]
+
     def get(self, request):
         empresa_id = request.query_params.get("empresa_id")
         if not empresa_id:
@@ -267,6 +269,8 @@ class PermisoCreateAPIView(APIView):
     """
     POST /api/permisos/
     """
+    permission_classes = [IsSuperAdmin | con_permiso("permisos.manage", requiere_empresa=False)]
+
     def post(self, request):
         ser = PermisoCreateSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
@@ -282,6 +286,8 @@ class PermisoDetalleAPIView(APIView):
     PUT /api/permisos/<id>/
     DELETE /api/permisos/<id>/
     """
+    permission_classes = [IsSuperAdmin | con_permiso("permisos.manage", requiere_empresa=False)]
+
     def get(self, request, pk):
         p = (
             Permiso.objects
@@ -327,20 +333,19 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from apps.usuarios.models import Usuario, UsuarioRol
+from apps.usuarios.contexto import get_contexto
+from apps.usuarios.models import Usuario
 from .serializers import MiUsuarioSerializer, MiUsuarioUpdateSerializer
 
 
 def _ctx(request):
-    u = request.user.usuario
-    return u.empresa_id, u.empleado_id, u.id
+    ctx = get_contexto(request)
+    return ctx.empresa_id, ctx.empleado_id, ctx.usuario_id
 
 
 def _require_empleado(request):
-    return UsuarioRol.objects.filter(
-        usuario_id=request.user.usuario.id,
-        rol__nombre="empleado"
-    ).exists()
+    ctx = get_contexto(request)
+    return bool(ctx and ctx.usuario_id and ctx.tiene_rol("empleado"))
 
 
 class MiCuentaUsuarioAPIView(APIView):
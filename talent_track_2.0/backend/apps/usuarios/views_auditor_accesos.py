@@ -2,6 +2,7 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+from apps.usuarios.contexto import get_contexto
 from apps.usuarios.models import Usuario, Rol, Permiso
 from apps.usuarios.serializers_auditor_accesos import (
     AuditorUsuarioSerializer,
@@ -11,20 +12,9 @@ from apps.usuarios.serializers_auditor_accesos import (
 
 
 def _get_usuario_tt(request):
-    auth_user = getattr(request, "user", None)
-    if not auth_user or not getattr(auth_user, "is_authenticated", False):
-        return None
-
-    usuario_id = getattr(auth_user, "usuario_id", None)
-    if not usuario_id:
-        return None
-
-    return (
-        Usuario.objects
-        .select_related("empresa", "empleado")
-        .filter(id=usuario_id)
-        .first()
-    )
+    # contexto del token (apps/usuarios/contexto.py): sin consultar usuarios.Usuario
+    ctx = get_contexto(request)
+    return ctx if ctx and ctx.usuario_id else None
 
 
 class AuditorUsuariosEmpresaAPIView(APIView):
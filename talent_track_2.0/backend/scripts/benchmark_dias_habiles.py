@@ -0,0 +1,140 @@
+"""
+Benchmark del recálculo de días hábiles: un año de solicitudes de N
+empleados (varias empresas, turnos de 5 y 6 días, feriados por empresa).
+
+Mide por separado el cálculo (numpy.busday_count por grupos) y la
+escritura (solo las filas que cambian), contra un conteo día a día en
+Python como referencia.
+
+Crea una BD de prueba desechable (igual que el runner de tests).
+
+    python scripts/benchmark_dias_habiles.py --empleados 20000 --solicitudes 6
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, time as dtime, timedelta
+
+# Agrega la carpeta backend al path para que Python encuentre talent_track
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Configura el settings correcto
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'talent_track.settings')
+
+import django
+django.setup()
+
+from django.db import connection
+from django.utils import timezone
+
+from apps.asistencia.models import AsignacionTurno, Turno
+from apps.ausencias import dias_habiles
+from apps.ausencias.models import Feriado, SolicitudAusencia, TipoAusencia
+from apps.core.models import Empresa, Puesto, UnidadOrganizacional
+from apps.empleados.models import Empleado
+
+ANIO = 2026
+EMPRESAS = 20
+
+
+def sembrar(total_empleados, por_empleado, rnd):
+    now = timezone.now()
+    empresas = Empresa.objects.bulk_create([
+        Empresa(razon_social=f"E{i}", nombre_comercial="B", ruc_nit=f"09{i:011d}", pais=8, moneda=8, estado=1,
+                creada_el=now)
+        for i in range(EMPRESAS)
+    ])
+    empleados = []
+    for empresa in empresas:
+        unidad = UnidadOrganizacional.objects.create(empresa=empresa, nombre="U", tipo=1, ubicacion="Loja", estado=1,
+                                                     creada_el=now)
+        puesto = Puesto.objects.create(empresa=empresa, unidad=unidad, nombre="P", nivel="1")
+        tipo = TipoAusencia.objects.create(empresa=empresa, nombre="Vacaciones", afecta_sueldo=False,
+                                           requiere_soporte=False)
+        seis = Turno.objects.create(empresa=empresa, nombre="L-S", hora_inicio=dtime(8), hora_fin=dtime(17),
+                                    dias_semana=[{"num": n} for n in range(1, 7)], tolerancia_minutos=5)
+        Feriado.objects.bulk_create([
+            Feriado(empresa=empresa, fecha=date(ANIO, 1, 1) + timedelta(days=d), nombre="F")
+            for d in sorted(rnd.sample(range(365), 12))
+        ])
+        nuevos = Empleado.objects.bulk_create([
+            Empleado(empresa=empresa, unidad=unidad, puesto=puesto, nombres=f"N{i}", apellidos="B",
+                     email=f"e{empresa.id}_{i}@bench.com", fecha_nacimiento=date(1990, 1, 1),
+                     fecha_ingreso=date(2020, 1, 1), estado=1)
+            for i in range(total_empleados // EMPRESAS)
+        ], batch_size=5000)
+        AsignacionTurno.objects.bulk_create([
+            AsignacionTurno(empresa=empresa, empleado=e, turno=seis, hora_inicio=dtime(8), hora_fin=dtime(17))
+            for e in nuevos[::3]
+        ], batch_size=5000)
+        empleados += [(empresa, tipo, e) for e in nuevos]
+
+    solicitudes = []
+    for empresa, tipo, e in empleados:
+        for _ in range(por_empleado):
+            inicio = date(ANIO, 1, 1) + timedelta(days=rnd.randrange(350))
+            solicitudes.append(SolicitudAusencia(
+                empresa=empresa, empleado=e, tipo_ausencia=tipo, fecha_inicio=inicio,
+                fecha_fin=inicio + timedelta(days=rnd.randrange(15)), dias_habiles=0, motivo="x",
+                estado=rnd.choice([1, 2, 3]), flujo_actual=1, creada_el=now,
+            ))
+    SolicitudAusencia.objects.bulk_create(solicitudes, batch_size=5000)
+    return len(solicitudes)
+
+
+def referencia_python(muestra):
+    """
+    Conteo día a día (lo que haría un loop por solicitud) sobre una muestra.
+    """
+    semana_de = dias_habiles.semanas_por_empleado([f[2] for f in muestra])
+    feriados = {}
+    inicio = time.perf_counter()
+    for _, empresa_id, empleado_id, fi, ff, _ in muestra:
+        if empresa_id not in feriados:
+            feriados[empresa_id] = set(Feriado.objects.filter(empresa_id=empresa_id).values_list("fecha", flat=True))
+        semana = semana_de[empleado_id]
+        sum(1 for n in range(((ff or fi) - fi).days + 1)
+            if semana[(fi + timedelta(days=n)).weekday()] == "1" and fi + timedelta(days=n) not in feriados[empresa_id])
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--empleados", type=int, default=20000)
+    parser.add_argument("--solicitudes", type=int, default=6, help="Solicitudes por empleado en el año")
+    args = parser.parse_args()
+
+    nombre_original = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        total = sembrar(args.empleados, args.solicitudes, random.Random(1))
+        print(f"BD: {connection.vendor}  empleados: {args.empleados}  solicitudes: {total}")
+
+        filas = list(SolicitudAusencia.objects.values_list(
+            "id", "empresa_id", "empleado_id", "fecha_inicio", "fecha_fin", "dias_habiles"))
+        inicio = time.perf_counter()
+        semana_de = dias_habiles.semanas_por_empleado([f[2] for f in filas])
+        cargado = time.perf_counter()
+        dias_habiles.contar([f[1] for f in filas], [semana_de[f[2]] for f in filas],
+                            [f[3] for f in filas], [f[4] or f[3] for f in filas])
+        calculado = time.perf_counter()
+        print(f"  turnos: {cargado - inicio:.2f} s  busday_count: {(calculado - cargado) * 1000:.0f} ms")
+
+        muestra = filas[:20000]
+        t = referencia_python(muestra)
+        print(f"  referencia día a día en Python: {t:.2f} s por {len(muestra)} "
+              f"(~{t * len(filas) / len(muestra):.1f} s para todas)")
+
+        for corrida in ("primera (todo cambia)", "segunda (sin cambios)"):
+            inicio = time.perf_counter()
+            r = dias_habiles.recalcular()
+            print(f"  recalcular {corrida}: {time.perf_counter() - inicio:.2f} s  "
+                  f"revisadas {r['revisadas']}  actualizadas {r['actualizadas']}")
+    finally:
+        connection.creation.destroy_test_db(nombre_original, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
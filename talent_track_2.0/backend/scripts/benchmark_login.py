@@ -0,0 +1,203 @@
+"""
+Benchmark del login: logins por segundo y consultas por login, con el flujo
+anterior (email__iexact + roles consultados dos veces + PBKDF2 en el hilo
+de la petición) y con el actual (cargar_login en una consulta + pool de
+hash acotado).
+
+Crea una BD de prueba desechable (igual que el runner de tests), siembra
+usuarios con roles y lanza los logins desde varios hilos a la vez. Mientras
+dura la tormenta, una "sonda" hace cada 50 ms una petición liviana (una
+consulta corta) y mide su latencia: es lo que sufre el resto de la API
+cuando todos los hilos están hasheando.
+
+    python scripts/benchmark_login.py --usuarios 200 --logins 400 --concurrencia 16 --workers 4
+"""
+import argparse
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+from datetime import date
+
+# Agrega la carpeta backend al path para que Python encuentre talent_track
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Configura el settings correcto
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'talent_track.settings')
+
+import django
+django.setup()
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import update_last_login
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts import hashing
+from apps.accounts.hashing import PoolHash
+from apps.accounts.models import AuthUser
+from apps.core.models import Empresa, Puesto, UnidadOrganizacional
+from apps.empleados.models import Empleado
+from apps.usuarios.auth_serializers import PRIORIDAD, EmailTokenObtainPairSerializer
+from apps.usuarios.models import Rol, Usuario, UsuarioRol
+
+CLAVE = "clave-benchmark-123"
+
+
+def sembrar(total):
+    now = timezone.now()
+    empresa = Empresa.objects.create(
+        razon_social="Benchmark", nombre_comercial="B", ruc_nit="0999999990001",
+        pais=8, moneda=8, estado=1, creada_el=now,
+    )
+    unidad = UnidadOrganizacional.objects.create(
+        empresa=empresa, nombre="U", tipo=1, ubicacion="Loja", estado=1, creada_el=now,
+    )
+    puesto = Puesto.objects.create(empresa=empresa, unidad=unidad, nombre="P", nivel="1")
+    empleados = Empleado.objects.bulk_create([
+        Empleado(
+            empresa=empresa, unidad=unidad, puesto=puesto, nombres=f"E{i}", apellidos="B",
+            email=f"e{i}@bench.com", fecha_nacimiento=date(1990, 1, 1), fecha_ingreso=date(2020, 1, 1), estado=1,
+        )
+        for i in range(total)
+    ])
+    # un solo hash real (mismo costo PBKDF2) para no tardar minutos sembrando
+    encoded = make_password(CLAVE)
+    usuarios = Usuario.objects.bulk_create([
+        Usuario(empresa=empresa, empleado=e, email=e.email, hash_password=encoded, estado=1) for e in empleados
+    ])
+    roles = [Rol.objects.create(empresa=empresa, nombre=n) for n in ("empleado", "manager")]
+    UsuarioRol.objects.bulk_create([UsuarioRol(usuario=u, rol=r) for u in usuarios for r in roles])
+    AuthUser.objects.bulk_create([AuthUser(email=u.email, password=encoded, usuario=u) for u in usuarios])
+    return [u.email for u in usuarios]
+
+
+def login_anterior(email, password):
+    """
+    Flujo previo, tal cual estaba en EmailBackend + EmailTokenObtainPairSerializer.
+    """
+    user = AuthUser.objects.get(email__iexact=email.strip().lower())
+    if not (user.check_password(password) and user.is_active):
+        raise ValueError("credenciales")
+    usuario = user.usuario
+    for _ in ("get_token", "validate"):
+        roles = list(
+            UsuarioRol.objects.filter(usuario_id=usuario.id)
+            .select_related("rol")
+            .values_list("rol__nombre", flat=True)
+        )
+    roles_lower = [r.lower() for r in roles]
+    refresh = RefreshToken.for_user(user)
+    refresh["usuario_id"] = usuario.id
+    refresh["roles"] = roles
+    refresh["rol"] = next((r for r in PRIORIDAD if r in roles_lower), None)
+    update_last_login(None, user)
+    return str(refresh.access_token)
+
+
+def login_actual(email, password):
+    serializer = EmailTokenObtainPairSerializer(data={"email": email, "password": password})
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data["access"]
+
+
+def consultas_por_login(funcion, email):
+    with CaptureQueriesContext(connection) as ctx:
+        funcion(email, CLAVE)
+    return len([q for q in ctx.captured_queries if q["sql"].startswith("SELECT")]), len(ctx.captured_queries)
+
+
+def sonda(parar, latencias):
+    try:
+        while not parar.is_set():
+            inicio = time.perf_counter()
+            Empresa.objects.filter(estado=1).count()
+            latencias.append(time.perf_counter() - inicio)
+            parar.wait(0.05)
+    finally:
+        connections.close_all()
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[max(int(len(valores) * p) - 1, 0)] if valores else 0
+
+
+def tormenta(funcion, emails, logins, concurrencia):
+    tareas = queue.Queue()
+    for i in range(logins):
+        tareas.put(emails[i % len(emails)])
+    latencias, errores = [], []
+    lock = threading.Lock()
+
+    def trabajar():
+        try:
+            while True:
+                try:
+                    email = tareas.get_nowait()
+                except queue.Empty:
+                    return
+                inicio = time.perf_counter()
+                try:
+                    funcion(email, CLAVE)
+                except Exception as exc:
+                    with lock:
+                        errores.append(repr(exc))
+                    continue
+                with lock:
+                    latencias.append(time.perf_counter() - inicio)
+        finally:
+            connections.close_all()
+
+    parar, latencias_sonda = threading.Event(), []
+    hilo_sonda = threading.Thread(target=sonda, args=(parar, latencias_sonda))
+    hilos = [threading.Thread(target=trabajar) for _ in range(concurrencia)]
+    inicio = time.perf_counter()
+    hilo_sonda.start()
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    total = time.perf_counter() - inicio
+    parar.set()
+    hilo_sonda.join()
+    return len(latencias) / total, latencias, latencias_sonda, errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=hashing.WORKERS, help="LOGIN_HASH_WORKERS del flujo actual")
+    args = parser.parse_args()
+
+    nombre_original = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        emails = sembrar(args.usuarios)
+        hashing._pool = PoolHash(workers=args.workers, cola=args.concurrencia)
+
+        print(f"BD: {connection.vendor}  usuarios: {args.usuarios}  logins: {args.logins}  "
+              f"concurrencia: {args.concurrencia}  workers hash: {args.workers}")
+        for nombre, funcion in (("anterior", login_anterior), ("actual", login_actual)):
+            selects, total = consultas_por_login(funcion, emails[0])
+            por_segundo, latencias, latencias_sonda, errores = tormenta(funcion, emails, args.logins, args.concurrencia)
+            print(
+                f"{nombre:>9}: {por_segundo:6.1f} logins/s  SELECT/login {selects} (total {total})  "
+                f"login p50 {statistics.median(latencias or [0]) * 1000:.0f} ms  "
+                f"p95 {percentil(latencias, 0.95) * 1000:.0f} ms  "
+                f"API durante la tormenta p50 {statistics.median(latencias_sonda or [0]) * 1000:.1f} ms  "
+                f"p95 {percentil(latencias_sonda, 0.95) * 1000:.1f} ms  errores {len(errores)}"
+            )
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(nombre_original, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
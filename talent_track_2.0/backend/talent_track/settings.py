@@ -66,6 +66,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.auditoria.middleware.AuditoriaMiddleware',
 ]
 
 ROOT_URLCONF = 'talent_track.urls'
@@ -163,6 +164,12 @@ CORS_ALLOW_HEADERS = [
     "x-active-role",
 ]
 
+# cursor de paginación keyset (apps/core/paginacion.py)
+CORS_EXPOSE_HEADERS = [
+    "x-next-cursor",
+    "link",
+]
+
 
 AUTH_USER_MODEL = "accounts.AuthUser"
 
@@ -174,13 +181,77 @@ AUTHENTICATION_BACKENDS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # JWT de SimpleJWT + request.contexto (apps/usuarios/contexto.py)
+        "apps.usuarios.authentication.JWTContextoAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
 }
 
+# Paginación keyset de listados, opt-in: solo con ?page_size=N / ?cursor=...
+PAGINACION_PAGE_SIZE = int(os.environ.get("PAGINACION_PAGE_SIZE", "100"))
+PAGINACION_MAX_PAGE_SIZE = int(os.environ.get("PAGINACION_MAX_PAGE_SIZE", "500"))
+
+# Exportaciones CSV en streaming: filas por viaje del cursor del servidor
+EXPORTACION_CHUNK_SIZE = int(os.environ.get("EXPORTACION_CHUNK_SIZE", "2000"))
+
+# Ingesta de marcaciones por lotes (lectores / apps offline): items por request
+ASISTENCIA_LOTE_MAX = int(os.environ.get("ASISTENCIA_LOTE_MAX", "1000"))
+
+# Índice de geocercas por empresa en memoria (segundos)
+GEOCERCAS_CACHE_TTL = int(os.environ.get("GEOCERCAS_CACHE_TTL", "300"))
+
+# Lista blanca de IPs por empresa (ReglaAsistencia.ip_permitidas) en memoria (segundos)
+IPS_PERMITIDAS_CACHE_TTL = int(os.environ.get("IPS_PERMITIDAS_CACHE_TTL", "300"))
+# Proxies propios delante de Django que agregan a X-Forwarded-For (ver
+# apps/core/red.py); 0 = usar REMOTE_ADDR. CONFIAR_X_FORWARDED_FOR=1 (antiguo) = 1 proxy
+PROXIES_CONFIABLES = int(os.environ.get(
+    "PROXIES_CONFIABLES", "1" if os.environ.get("CONFIAR_X_FORWARDED_FOR", "0") == "1" else "0"
+))
+
+# Outbox de notificaciones (apps/notificaciones/outbox.py): el worker es
+# "manage.py procesar_notificaciones"; con COLA_LOCAL se procesa en el mismo
+# proceso al confirmar la transacción (desarrollo, sin worker)
+NOTIFICACIONES_COLA_LOCAL = os.environ.get("NOTIFICACIONES_COLA_LOCAL", "0") == "1"
+NOTIFICACIONES_MAX_INTENTOS = int(os.environ.get("NOTIFICACIONES_MAX_INTENTOS", "5"))
+
+# Entrega de webhooks (apps/integraciones/webhooks.py, manage.py entregar_webhooks)
+WEBHOOKS_TIMEOUT = float(os.environ.get("WEBHOOKS_TIMEOUT", "10"))
+WEBHOOKS_CONCURRENCIA_POR_WEBHOOK = int(os.environ.get("WEBHOOKS_CONCURRENCIA_POR_WEBHOOK", "4"))
+WEBHOOKS_BACKOFF_BASE = int(os.environ.get("WEBHOOKS_BACKOFF_BASE", "30"))
+WEBHOOKS_BACKOFF_MAX = int(os.environ.get("WEBHOOKS_BACKOFF_MAX", "3600"))
+
+# Reportes programados (manage.py planificar_reportes): procesos y carpeta de salida
+REPORTES_WORKERS = int(os.environ.get("REPORTES_WORKERS", "2"))
+REPORTES_DIR = os.environ.get("REPORTES_DIR", str(BASE_DIR / "reportes_generados"))
+NOMINA_DIR = os.environ.get("NOMINA_DIR", str(BASE_DIR / "reportes_generados" / "nomina"))
+
+# Conectores ERP (apps/integraciones/erp.py, manage.py sincronizar_erp)
+ERP_LOTE = int(os.environ.get("ERP_LOTE", "500"))
+ERP_TIMEOUT = int(os.environ.get("ERP_TIMEOUT", "30"))
+ERP_WORKERS = int(os.environ.get("ERP_WORKERS", "4"))
+
+
+# Caché: LocMem (LRU por proceso) por defecto; con varios workers usar
+# Redis/Memcached para que la invalidación llegue a todos.
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", "talent-track"),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("DJANGO_CACHE_MAX_ENTRIES", "1000")),
+        },
+    }
+}
+
+# Respuestas de dashboards Plotly (apps/core/cache_dashboards.py), en segundos
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get("DASHBOARD_CACHE_TIMEOUT", "600"))
+
+# Bitsets de permisos por rol (apps/usuarios/permisos_bits.py), en segundos;
+# la invalidación es por versión, el TTL solo libera memoria
+PERMISOS_CACHE_TTL = int(os.environ.get("PERMISOS_CACHE_TTL", "3600"))
+
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=8),     # ej: 8 horas
@@ -190,3 +261,71 @@ SIMPLE_JWT = {
     "UPDATE_LAST_LOGIN": True,
 }
 
+# Auditoría de cambios (apps/auditoria/signals.py, registro.py)
+# El buffer se vacía con bulk_create al llegar a TAMANO filas o cada
+# INTERVALO segundos; si la BD falla las filas van a SPOOL_DIR
+# (manage.py reenviar_auditoria las carga).
+AUDITORIA_BUFFER_TAMANO = int(os.environ.get("AUDITORIA_BUFFER_TAMANO", "200"))
+AUDITORIA_BUFFER_INTERVALO = float(os.environ.get("AUDITORIA_BUFFER_INTERVALO", "2"))
+AUDITORIA_SPOOL_DIR = os.environ.get("AUDITORIA_SPOOL_DIR", str(BASE_DIR / "auditoria_spool"))
+AUDITORIA_MODELOS = [
+    "core.Empresa", "core.UnidadOrganizacional", "core.Puesto", "core.PoliticaRetencion",
+    "empleados.Empleado", "empleados.Contrato", "empleados.DocumentoEmpleado",
+    "usuarios.Usuario", "usuarios.UsuarioRol",
+    "asistencia.Turno", "asistencia.AsignacionTurno", "asistencia.GeoCerca", "asistencia.ReglaAsistencia",
+    "ausencias.TipoAusencia", "ausencias.SolicitudAusencia", "ausencias.AprobacionAusencia",
+    "ausencias.SaldoVacaciones", "ausencias.Feriado",
+    "kpi.KPI", "kpi.PlantillaKPI", "kpi.AsignacionKPI", "kpi.EvaluacionDesempeno",
+    "integraciones.IntegracionERP", "integraciones.Webhook", "integraciones.ReporteProgramado",
+]
+
+# Particionado mensual de logauditoria / eventoasistencia (apps/core/particiones.py,
+# manage.py gestionar_particiones). Retención en meses; 0 = no retirar.
+PARTICIONES_MESES_ADELANTE = int(os.environ.get("PARTICIONES_MESES_ADELANTE", "3"))
+PARTICIONES_RETENCION_MESES = {
+    "logauditoria": int(os.environ.get("PARTICIONES_RETENCION_AUDITORIA", "0")),
+    "eventoasistencia": int(os.environ.get("PARTICIONES_RETENCION_EVENTOS", "0")),
+}
+
+# Retención de históricos por empresa (apps/core/retencion.py, manage.py aplicar_retencion).
+# Meses en línea si la empresa no tiene PoliticaRetencion (1 eventos, 2 jornadas,
+# 3 logs de auditoría); 0 = no retirar.
+RETENCION_DIR = os.environ.get("RETENCION_DIR", str(BASE_DIR / "archivo_historico"))
+RETENCION_MESES_DEFECTO = {
+    1: int(os.environ.get("RETENCION_MESES_EVENTOS", "13")),
+    2: int(os.environ.get("RETENCION_MESES_JORNADAS", "84")),
+    3: int(os.environ.get("RETENCION_MESES_AUDITORIA", "0")),
+}
+RETENCION_LOTE = int(os.environ.get("RETENCION_LOTE", "5000"))
+RETENCION_FILAS_POR_SEGUNDO = int(os.environ.get("RETENCION_FILAS_POR_SEGUNDO", "20000"))
+
+# Login (apps/accounts/hashing.py): verificaciones PBKDF2 simultáneas por proceso,
+# cuántas más pueden esperar turno y cuántos segundos; sin cupo -> 429.
+# 0 workers = verificar en el hilo de la petición.
+LOGIN_HASH_WORKERS = int(os.environ.get("LOGIN_HASH_WORKERS", "2"))
+LOGIN_HASH_COLA = int(os.environ.get("LOGIN_HASH_COLA", "32"))
+LOGIN_HASH_ESPERA = float(os.environ.get("LOGIN_HASH_ESPERA", "2"))
+
+# Revocación de JWT (apps/accounts/revocacion.py): cada proceso relee las épocas
+# "tokens válidos desde" cada TTL segundos (retraso máximo de un bloqueo); con
+# CACHE_COMPARTIDA=1 y Redis/Memcached el bloqueo llega a todos en la siguiente petición.
+REVOCACION_CACHE_TTL = float(os.environ.get("REVOCACION_CACHE_TTL", "5"))
+REVOCACION_CACHE_COMPARTIDA = os.environ.get("REVOCACION_CACHE_COMPARTIDA", "0") == "1"
+
+# Compactación de token_blacklist (apps/accounts/blacklist.py, manage.py compactar_blacklist)
+BLACKLIST_COMPACTAR_LOTE = int(os.environ.get("BLACKLIST_COMPACTAR_LOTE", "5000"))
+
+# Días hábiles de ausencias (apps/ausencias/dias_habiles.py): semana por defecto
+# si el empleado no tiene turno (weekmask de numpy, lunes primero), TTL de los
+# feriados en memoria (segundos) y ids por UPDATE al recalcular en bloque.
+AUSENCIAS_SEMANA_DEFECTO = os.environ.get("AUSENCIAS_SEMANA_DEFECTO", "1111100")
+FERIADOS_CACHE_TTL = int(os.environ.get("FERIADOS_CACHE_TTL", "300"))
+AUSENCIAS_RECALCULO_LOTE = int(os.environ.get("AUSENCIAS_RECALCULO_LOTE", "5000"))
+
+# Saldos de vacaciones (apps/ausencias/saldos.py): nombres de TipoAusencia que
+# descuentan de SaldoVacaciones al aprobarse (separados por coma, sin distinguir
+# mayúsculas) y filas por UPDATE/INSERT al conciliar.
+VACACIONES_TIPOS = tuple(
+    t.strip() for t in os.environ.get("VACACIONES_TIPOS", "vacaciones").split(",") if t.strip()
+)
+SALDOS_CONCILIAR_LOTE = int(os.environ.get("SALDOS_CONCILIAR_LOTE", "1000"))
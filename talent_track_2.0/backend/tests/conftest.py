@@ -0,0 +1,32 @@
+from datetime import date
+
+import pytest
+from django.utils import timezone
+
+from apps.core.models import Empresa, Puesto, UnidadOrganizacional
+from apps.empleados.models import Empleado
+
+
+@pytest.fixture
+def empresa_con_empleado():
+    """
+    Fábrica: empresa_con_empleado(ruc) -> (empresa, empleado) con una
+    unidad y un puesto. El ruc distingue las empresas de un mismo test.
+    """
+    def crear(ruc):
+        now = timezone.now()
+        empresa = Empresa.objects.create(
+            razon_social=f"Empresa {ruc}", nombre_comercial="R", ruc_nit=ruc,
+            pais=8, moneda=8, estado=1, creada_el=now,
+        )
+        unidad = UnidadOrganizacional.objects.create(
+            empresa=empresa, nombre="U", tipo=1, ubicacion="Loja", estado=1, creada_el=now,
+        )
+        puesto = Puesto.objects.create(empresa=empresa, unidad=unidad, nombre="P", nivel="1")
+        empleado = Empleado.objects.create(
+            empresa=empresa, unidad=unidad, puesto=puesto, nombres="Ana", apellidos="Paz",
+            email=f"ana@{ruc}.com", fecha_nacimiento=date(1990, 1, 1), fecha_ingreso=date(2020, 1, 1), estado=1,
+        )
+        return empresa, empleado
+
+    return crear
@@ -0,0 +1,120 @@
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from apps.auditoria import registro
+from apps.auditoria.middleware import AuditoriaMiddleware
+from apps.auditoria.models import LogAuditoria
+from apps.auditoria.registro import BufferAuditoria
+from apps.empleados.models import Empleado
+from apps.usuarios.contexto import ContextoUsuario
+from apps.usuarios.models import Usuario
+
+
+def _peticion(metodo, empresa_id, usuario_id, vista):
+    request = getattr(RequestFactory(), metodo)("/api/rrhh/empleados/1/", REMOTE_ADDR="10.0.0.7")
+
+    def get_response(req):
+        # como JWTContextoAuthentication, dentro de la vista
+        req.contexto = ContextoUsuario(usuario_id=usuario_id, empresa_id=empresa_id, empleado_id=None, rol="rrhh")
+        vista()
+        return HttpResponse()
+
+    return AuditoriaMiddleware(get_response)(request)
+
+
+@pytest.mark.django_db
+def test_peticion_mutante_registra_diff_en_bloque(
+    tmp_path, monkeypatch, django_capture_on_commit_callbacks, empresa_con_empleado
+):
+    """
+    Los cambios hechos dentro de un PATCH quedan en el buffer (no en la BD)
+    con el diff campo a campo, usuario e IP; un GET no registra nada. Al
+    vaciar se insertan en un solo bulk_create.
+    """
+    buffer = BufferAuditoria(tamano=50, hilo=False, spool_dir=tmp_path)
+    monkeypatch.setattr(registro, "_buffer", buffer)
+    empresa, empleado = empresa_con_empleado("0999999997001")
+    usuario = Usuario.objects.create(empresa=empresa, email="rrhh@x.com", hash_password="x", estado=1)
+
+    def editar():
+        e = Empleado.objects.get(pk=empleado.pk)
+        e.nombres = "Ana María"
+        e.telefono = "0999"
+        e.save()
+        usuario_db = Usuario.objects.get(pk=usuario.pk)
+        usuario_db.hash_password = "nuevo"
+        usuario_db.save()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        _peticion("patch", empresa.id, usuario.id, editar)
+    _peticion("get", empresa.id, usuario.id, lambda: Empleado.objects.filter(pk=empleado.pk).update(nombres="X"))
+
+    assert LogAuditoria.objects.count() == 0
+    assert len(buffer) == 1  # el cambio de hash_password no se audita
+
+    assert buffer.vaciar() == 1
+    log = LogAuditoria.objects.get()
+    assert (log.accion, log.entidad, log.entidad_id) == ("actualizar", "empleado", empleado.id)
+    assert log.usuario_id == usuario.id and log.empresa_id == empresa.id and log.ip == "10.0.0.7"
+    assert log.detalles["cambios"]["nombres"] == ["Ana", "Ana María"]
+    assert log.detalles["cambios"]["telefono"] == [None, "0999"]
+    assert log.detalles["metodo"] == "PATCH"
+
+
+@pytest.mark.django_db
+def test_cambio_revertido_no_se_audita(tmp_path, monkeypatch, django_capture_on_commit_callbacks, empresa_con_empleado):
+    """
+    Un save() dentro de un atomic que hace rollback no deja fila en el
+    buffer: el registro espera al commit.
+    """
+    buffer = BufferAuditoria(tamano=50, hilo=False, spool_dir=tmp_path)
+    monkeypatch.setattr(registro, "_buffer", buffer)
+    empresa, empleado = empresa_con_empleado("0999999997003")
+
+    def editar_y_fallar():
+        with pytest.raises(RuntimeError), transaction.atomic():
+            e = Empleado.objects.get(pk=empleado.pk)
+            e.nombres = "Revertido"
+            e.save()
+            raise RuntimeError("rollback")
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        _peticion("patch", empresa.id, None, editar_y_fallar)
+
+    assert callbacks == []
+    assert len(buffer) == 0
+    assert Empleado.objects.get(pk=empleado.pk).nombres == "Ana"
+
+
+@pytest.mark.django_db
+def test_bd_caida_va_al_spool_y_reenviar_auditoria_lo_carga(tmp_path, monkeypatch, empresa_con_empleado):
+    """
+    Si el bulk_create falla las filas se escriben en el spool, y
+    manage.py reenviar_auditoria las inserta y borra el archivo.
+    """
+    empresa, empleado = empresa_con_empleado("0999999997002")
+    buffer = BufferAuditoria(tamano=50, hilo=False, spool_dir=tmp_path)
+    fila = {
+        "empresa_id": empresa.id, "usuario_id": None, "accion": "eliminar", "entidad": "empleado",
+        "entidad_id": empleado.id, "detalles": {"antes": {"nombres": "Ana"}}, "fecha": timezone.now(), "ip": None,
+    }
+    buffer.agregar(fila)
+
+    def caida(*args, **kwargs):
+        raise RuntimeError("BD no disponible")
+
+    with monkeypatch.context() as m:
+        m.setattr(LogAuditoria.objects, "bulk_create", caida)
+        assert buffer.vaciar() == 0
+    assert len(list(tmp_path.glob("auditoria_*.jsonl"))) == 1
+
+    call_command("reenviar_auditoria", dir=str(tmp_path))
+
+    assert list(tmp_path.iterdir()) == []
+    log = LogAuditoria.objects.get()
+    assert log.detalles == {"antes": {"nombres": "Ana"}}
+    assert log.fecha == fila["fecha"]
@@ -0,0 +1,41 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.ausencias.views import require_empleado
+from apps.usuarios.contexto import get_contexto
+from apps.usuarios.permissions import IsRRHH, con_rol
+from apps.usuarios.scopes import get_scope
+
+pytestmark = pytest.mark.django_db
+
+
+def _request(**claims):
+    token = AccessToken()
+    for k, v in claims.items():
+        token[k] = v
+    request = Request(APIRequestFactory().get("/x/"))
+    request.user, request.auth = object(), token
+    return request
+
+
+def test_rol_y_empresa_salen_del_token_sin_consultas(django_assert_num_queries):
+    """
+    Roles, empresa y empleado se resuelven desde los claims del JWT:
+    las comprobaciones de permisos de las vistas no tocan la BD.
+    """
+    request = _request(usuario_id=7, empresa_id=3, empleado_id=11, rol="rrhh", roles=["RRHH", "empleado"])
+
+    with django_assert_num_queries(0):
+        ctx = get_contexto(request)
+        assert (ctx.usuario_id, ctx.empresa_id, ctx.empleado_id) == (7, 3, 11)
+        assert IsRRHH().has_permission(request, None)
+        assert con_rol("manager", "rrhh")().has_permission(request, None)
+        assert not con_rol("superadmin")().has_permission(request, None)
+        # rol secundario (no principal) también cuenta
+        assert require_empleado(request)
+        assert get_scope(request)["empresa_id"] == 3
+
+    sin_empresa = _request(usuario_id=1, rol="rrhh", roles=["rrhh"])
+    assert not con_rol("rrhh")().has_permission(sin_empresa, None)
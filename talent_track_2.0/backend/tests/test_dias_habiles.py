@@ -0,0 +1,173 @@
+import random
+from datetime import date, time, timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.asistencia.models import AsignacionTurno, Turno
+from apps.auditoria import registro
+from apps.auditoria.registro import BufferAuditoria
+from apps.ausencias import dias_habiles
+from apps.ausencias.models import Feriado, SolicitudAusencia, TipoAusencia
+
+pytestmark = pytest.mark.django_db
+
+# semana del 27-abr (lunes) al 3-may-2026 (domingo); 1-may es viernes
+LUNES = date(2026, 4, 27)
+
+
+@pytest.fixture(autouse=True)
+def _aislar(monkeypatch, tmp_path):
+    dias_habiles._FERIADOS.clear()
+    monkeypatch.setattr(registro, "_buffer", BufferAuditoria(hilo=False, spool_dir=tmp_path))
+
+
+def _solicitud(empleado, inicio, fin, dias=0, estado=1):
+    tipo = TipoAusencia.objects.get_or_create(
+        empresa=empleado.empresa, nombre="Vacaciones", defaults={"afecta_sueldo": False, "requiere_soporte": False},
+    )[0]
+    return SolicitudAusencia.objects.create(
+        empresa=empleado.empresa, empleado=empleado, tipo_ausencia=tipo, fecha_inicio=inicio, fecha_fin=fin,
+        dias_habiles=dias, motivo="x", estado=estado, flujo_actual=1, creada_el=timezone.now(),
+    )
+
+
+def _cliente(empleado, rol="empleado"):
+    token = AccessToken()
+    token["user_id"] = "1"
+    for k, v in {"usuario_id": 1, "empresa_id": empleado.empresa_id, "empleado_id": empleado.id,
+                 "rol": rol, "roles": [rol]}.items():
+        token[k] = v
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def test_semana_del_turno_y_feriados_de_la_empresa(empresa_con_empleado):
+    """
+    Sin turno cuenta lunes a viernes; con turno usa sus dias_semana; los
+    feriados de la empresa (y solo de ella) se descuentan.
+    """
+    empresa, empleado = empresa_con_empleado("0999999998101")
+    otra, _ = empresa_con_empleado("0999999998102")
+    domingo = LUNES + timedelta(days=6)
+
+    assert dias_habiles.dias_habiles(empresa.id, empleado.id, LUNES, domingo) == 5
+    assert dias_habiles.dias_habiles(empresa.id, empleado.id, domingo) == 0
+
+    Feriado.objects.create(empresa=empresa, fecha=date(2026, 5, 1), nombre="Día del Trabajo")
+    Feriado.objects.create(empresa=otra, fecha=date(2026, 4, 28), nombre="Local")
+    assert dias_habiles.dias_habiles(empresa.id, empleado.id, LUNES, domingo) == 4
+
+    turno = Turno.objects.create(
+        empresa=empresa, nombre="L-S", hora_inicio=time(8, 0), hora_fin=time(17, 0),
+        dias_semana=[{"num": n, "nombre": "x"} for n in range(1, 7)], tolerancia_minutos=5,
+    )
+    AsignacionTurno.objects.create(empresa=empresa, empleado=empleado, turno=turno,
+                                   hora_inicio=time(8, 0), hora_fin=time(17, 0))
+    assert dias_habiles.dias_habiles(empresa.id, empleado.id, LUNES, domingo) == 5
+
+
+def test_contar_vectorizado_coincide_con_dia_a_dia(empresa_con_empleado):
+    """
+    busday_count por grupos (empresa, semana) da lo mismo que recorrer
+    día por día, con grupos mezclados y en cualquier orden.
+    """
+    empresa, empleado = empresa_con_empleado("0999999998103")
+    feriados = {date(2026, 1, 1), date(2026, 2, 16), date(2026, 2, 17), date(2026, 5, 1)}
+    for f in feriados:
+        Feriado.objects.create(empresa=empresa, fecha=f, nombre="F")
+
+    rnd = random.Random(7)
+    semanas = ["1111100", "1111110", "0011111"]
+    filas = []
+    for _ in range(500):
+        inicio = date(2026, 1, 1) + timedelta(days=rnd.randrange(150))
+        filas.append((rnd.choice([empresa.id, 0]), rnd.choice(semanas), inicio,
+                      inicio + timedelta(days=rnd.randrange(30))))
+
+    empresas, sem, inicios, fines = zip(*filas)
+    obtenido = dias_habiles.contar(empresas, sem, inicios, fines)
+
+    for (emp, semana, inicio, fin), valor in zip(filas, obtenido):
+        esperado = sum(
+            1 for n in range((fin - inicio).days + 1)
+            if semana[(inicio + timedelta(days=n)).weekday()] == "1"
+            and not (emp == empresa.id and inicio + timedelta(days=n) in feriados)
+        )
+        assert valor == esperado
+
+
+def test_api_calcula_dias_habiles_en_el_servidor(empresa_con_empleado):
+    """
+    El POST del empleado ignora cualquier dias_habiles del cliente; un rango
+    solo de fin de semana se rechaza.
+    """
+    empresa, empleado = empresa_con_empleado("0999999998104")
+    tipo = TipoAusencia.objects.create(empresa=empresa, nombre="Vacaciones", afecta_sueldo=False, requiere_soporte=False)
+    Feriado.objects.create(empresa=empresa, fecha=date(2026, 5, 1), nombre="Día del Trabajo")
+    client = _cliente(empleado)
+
+    r = client.post("/api/empleado/ausencias/", {
+        "id_tipo_ausencia": tipo.id, "fecha_inicio": "2026-04-27", "fecha_fin": "2026-05-03",
+        "motivo": "viaje", "dias_habiles": 30,
+    }, format="json")
+    assert r.status_code == 201, r.data
+    assert r.data["dias_habiles"] == 4
+
+    r = client.put(f"/api/empleado/ausencias/{r.data['id']}/", {
+        "id_tipo_ausencia": tipo.id, "fecha_inicio": "2026-04-29", "fecha_fin": "2026-04-30", "motivo": "viaje",
+    }, format="json")
+    assert r.status_code == 200, r.data
+    assert r.data["dias_habiles"] == 2
+
+    r = client.post("/api/empleado/ausencias/", {
+        "id_tipo_ausencia": tipo.id, "fecha_inicio": "2026-05-02", "fecha_fin": "2026-05-03", "motivo": "x",
+    }, format="json")
+    assert r.status_code == 400
+
+
+def test_feriado_nuevo_recalcula_pendientes_y_recalcular_solo_escribe_cambios(
+    django_assert_max_num_queries, empresa_con_empleado
+):
+    """
+    Crear un feriado por la API de RRHH recalcula las pendientes que lo
+    cruzan (no las aprobadas); recalcular() en bloque solo actualiza filas
+    cuyo valor cambia.
+    """
+    empresa, empleado = empresa_con_empleado("0999999998105")
+    domingo = LUNES + timedelta(days=6)
+    pendiente = _solicitud(empleado, LUNES, domingo, dias=5)
+    aprobada = _solicitud(empleado, LUNES, domingo, dias=5, estado=2)
+    otra_semana = _solicitud(empleado, LUNES + timedelta(days=7), None, dias=1)
+
+    r = _cliente(empleado, rol="rrhh").post("/api/rrhh/feriados/", {"fecha": "2026-05-01", "nombre": "Trabajo"},
+                                            format="json")
+    assert r.status_code == 201, r.data
+    pendiente.refresh_from_db()
+    aprobada.refresh_from_db()
+    assert (pendiente.dias_habiles, aprobada.dias_habiles) == (4, 5)
+
+    with django_assert_max_num_queries(6):
+        resultado = dias_habiles.recalcular(empresa_id=empresa.id)
+    assert resultado == {"revisadas": 3, "actualizadas": 1}
+    aprobada.refresh_from_db()
+    otra_semana.refresh_from_db()
+    assert (aprobada.dias_habiles, otra_semana.dias_habiles) == (4, 1)
+    assert dias_habiles.recalcular(empresa_id=empresa.id)["actualizadas"] == 0
+
+
+def test_recalcular_por_rango_de_fechas(empresa_con_empleado):
+    """
+    desde/hasta filtran por solapamiento (fecha_fin NULL = un solo día).
+    """
+    _, empleado = empresa_con_empleado("0999999998106")
+    _solicitud(empleado, date(2026, 3, 30), date(2026, 4, 3))
+    _solicitud(empleado, date(2026, 4, 6), None)
+    _solicitud(empleado, date(2026, 4, 20), date(2026, 4, 24))
+
+    r = dias_habiles.recalcular(desde=date(2026, 4, 1), hasta=date(2026, 4, 10))
+    assert r["revisadas"] == 2
+    assert sorted(SolicitudAusencia.objects.values_list("dias_habiles", flat=True)) == [0, 1, 5]
@@ -0,0 +1,301 @@
+import json
+import threading
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from django.db import IntegrityError
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import AuthUser
+from apps.empleados.models import Contrato, Empleado
+from apps.integraciones import erp as motor_erp
+from apps.integraciones.erp import sincronizar_todas
+from apps.integraciones.models import CursorERP, IntegracionERP
+
+
+class _ERP(BaseHTTPRequestHandler):
+    """
+    ERP falso: GET pagina `paginas[ruta]` por cursor (índice), POST guarda
+    lo recibido en `recibidos[ruta]`.
+    """
+    paginas = {}
+    recibidos = {}
+    crudas = set()  # rutas que responden texto en vez de JSON
+
+    def _json(self, status, data):
+        cuerpo = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        ruta = partes.path.rsplit("/", 1)[-1]
+        if ruta in self.crudas:
+            cuerpo = b"<html>mantenimiento</html>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+            return
+        i = int(parse_qs(partes.query).get("cursor", ["0"])[0])
+        paginas = self.paginas.get(ruta, [])
+        items = paginas[i] if i < len(paginas) else []
+        self._json(200, {"items": items, "cursor": str(i + 1 if items else i), "hay_mas": i + 1 < len(paginas)})
+
+    def do_POST(self):
+        if self.headers.get("Authorization") != "Bearer t0k":
+            return self._json(401, {})
+        ruta = urlsplit(self.path).path.rsplit("/", 1)[-1]
+        cuerpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.recibidos.setdefault(ruta, []).append(cuerpo["items"])
+        self._json(200, {"ok": True})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def erp():
+    _ERP.paginas, _ERP.recibidos, _ERP.crudas = {}, {}, set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ERP)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield _ERP, f"http://127.0.0.1:{server.server_address[1]}/api"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db
+def test_pull_upsert_por_clave_y_push_solo_deltas(erp, empresa_con_empleado):
+    """
+    Pull de empleados crea/actualiza por documento (paginado, con cursor)
+    y pull de contratos resuelve el empleado por su documento. El push
+    envía solo lo que cambió localmente: lo que escribió el pull no vuelve
+    al ERP.
+    """
+    servidor, url = erp
+    empresa, ana = empresa_con_empleado("0999999998001")
+    ana.documento = "0101"
+    ana.save()
+    Empleado.objects.create(
+        empresa=empresa, unidad_id=ana.unidad_id, puesto_id=ana.puesto_id, documento="0505", nombres="Rita",
+        apellidos="Loor", email="rita@x.com", fecha_nacimiento=date(1992, 2, 2), fecha_ingreso=date(2021, 1, 1),
+        estado=1,
+    )
+
+    servidor.paginas["empleados"] = [
+        [{"cedula": "0101", "nombre": "Ana María", "apellido": "Paz", "correo": "ana@x.com",
+          "nacimiento": "1990-01-01", "ingreso": "2020-01-01"}],
+        [{"cedula": "0202", "nombre": "Luis", "apellido": "Mora", "correo": "luis@x.com",
+          "nacimiento": "1991-05-05", "ingreso": "2024-03-01"},
+         {"cedula": "0303", "nombre": "Mal", "apellido": "Dato", "correo": "x", "nacimiento": "no-es-fecha"}],
+    ]
+    servidor.paginas["contratos"] = [[
+        {"cedula_empleado": "0202", "inicio": "2024-03-01", "tipo": 1, "sueldo": "750.50", "horas": 40, "estado": 1},
+        {"cedula_empleado": "9999", "inicio": "2024-03-01", "tipo": 1, "sueldo": "1", "horas": 40, "estado": 1},
+    ]]
+
+    campos_emp = {
+        "cedula": "documento", "nombre": "nombres", "apellido": "apellidos", "correo": "email",
+        "nacimiento": {"campo": "fecha_nacimiento", "tipo": "fecha"},
+        "ingreso": {"campo": "fecha_ingreso", "tipo": "fecha"},
+    }
+    IntegracionERP.objects.create(
+        empresa=empresa, erp_nombre="SAP", tipo=1, metodo=3, endpoint=url, credenciales={"token": "t0k"},
+        mapeos={"campos": campos_emp, "defaults": {"unidad_id": ana.unidad_id, "puesto_id": ana.puesto_id, "estado": 1}},
+        activo=True,
+    )
+    IntegracionERP.objects.create(
+        empresa=empresa, erp_nombre="SAP", tipo=2, metodo=2, endpoint=url, credenciales={"token": "t0k"},
+        mapeos={"campos": {
+            "cedula_empleado": "empleado__documento",
+            "inicio": {"campo": "fecha_inicio", "tipo": "fecha"},
+            "tipo": {"campo": "tipo", "tipo": "entero"},
+            "sueldo": {"campo": "salario_base", "tipo": "decimal"},
+            "horas": {"campo": "jornada_semanal_horas", "tipo": "entero"},
+            "estado": {"campo": "estado", "tipo": "entero"},
+        }},
+        activo=True,
+    )
+
+    r_emp, r_con = sincronizar_todas(workers=0)
+
+    assert r_emp["error"] is None
+    assert (r_emp["creados"], r_emp["actualizados"], r_emp["omitidos"]) == (1, 1, 1)
+    ana.refresh_from_db()
+    assert ana.nombres == "Ana María"
+    luis = Empleado.objects.get(empresa=empresa, documento="0202")
+    contrato = Contrato.objects.get(empleado=luis)
+    assert contrato.salario_base == Decimal("750.50") and contrato.fecha_inicio == date(2024, 3, 1)
+    assert (r_con["creados"], r_con["omitidos"]) == (1, 1)
+
+    # push: solo el empleado local; Ana y Luis los acaba de escribir el pull
+    assert r_emp["enviados"] == 1
+    assert servidor.recibidos["empleados"] == [[{
+        "cedula": "0505", "nombre": "Rita", "apellido": "Loor", "correo": "rita@x.com",
+        "nacimiento": "1992-02-02", "ingreso": "2021-01-01",
+    }]]
+    assert CursorERP.objects.get(integracion__tipo=1, direccion=2).cursor == "2"
+    assert CursorERP.objects.get(integracion__tipo=1, direccion=1).cursor.endswith(f"|{luis.id}")
+
+    servidor.paginas = {}
+    assert sincronizar_todas(workers=0)[0]["enviados"] == 0
+
+    luis.telefono = "0999"
+    luis.nombres = "Luis Alberto"
+    luis.save()
+    r_emp, _ = sincronizar_todas(workers=0)
+    assert r_emp["enviados"] == 1
+    assert servidor.recibidos["empleados"][-1] == [{
+        "cedula": "0202", "nombre": "Luis Alberto", "apellido": "Mora", "correo": "luis@x.com",
+        "nacimiento": "1991-05-05", "ingreso": "2024-03-01",
+    }]
+
+
+@pytest.mark.django_db
+def test_error_http_del_erp_no_avanza_el_cursor(erp, empresa_con_empleado):
+    """
+    Si el ERP rechaza el push, el resultado trae el error y el checkpoint
+    no avanza (el próximo intento reenvía).
+    """
+    _, url = erp
+    empresa, _ = empresa_con_empleado("0999999998002")
+    IntegracionERP.objects.create(
+        empresa=empresa, erp_nombre="X", tipo=1, metodo=1, endpoint=url, credenciales={"token": "malo"},
+        mapeos={"campos": {"cedula": "documento"}}, activo=True,
+    )
+
+    (r,) = sincronizar_todas(workers=0)
+
+    assert "HTTP 401" in r["error"]
+    assert CursorERP.objects.get().cursor is None
+
+
+@pytest.mark.django_db
+def test_fallos_quedan_en_su_integracion_y_no_cortan_las_demas(erp, monkeypatch, empresa_con_empleado):
+    """
+    Un mapeo a empresa_id o a un campo inexistente, una respuesta que no es
+    JSON y un error de BD inesperado quedan en r["error"] de su integración;
+    las demás empresas se sincronizan igual.
+    """
+    servidor, url = erp
+    servidor.crudas.add("contratos")
+    servidor.paginas["empleados"] = [[{"cedula": "0404", "nombre": "Eva"}]]
+
+    def crear(ruc, tipo, campos):
+        empresa, empleado = empresa_con_empleado(ruc)
+        IntegracionERP.objects.create(
+            empresa=empresa, erp_nombre="X", tipo=tipo, metodo=2, endpoint=url, credenciales={"token": "t0k"},
+            mapeos={"campos": campos}, activo=True,
+        )
+        return empresa, empleado
+
+    a, _ = crear("0999999998003", 1, {"cedula": "documento", "otra": "empresa_id"})
+    b, _ = crear("0999999998004", 1, {"cedula": "documento", "nombre": "no_existe"})
+    c, _ = crear("0999999998005", 2, {"cedula": "empleado__documento", "inicio": "fecha_inicio"})
+    d, _ = crear("0999999998006", 1, {"cedula": "documento", "nombre": "nombres"})
+    e, ana = crear("0999999998007", 1, {"cedula": "documento", "nombre": "nombres"})
+    ana.documento = "0404"
+    ana.save()
+
+    aplicar = motor_erp._aplicar
+
+    def aplicar_con_fallo(integracion, mapeo, items, escritos=None):
+        if integracion.empresa_id == d.id:
+            raise IntegrityError("duplicate key")
+        return aplicar(integracion, mapeo, items, escritos)
+
+    monkeypatch.setattr(motor_erp, "_aplicar", aplicar_con_fallo)
+
+    r = {x["empresa_id"]: x for x in sincronizar_todas(workers=0)}
+
+    assert "'empresa_id' no se puede mapear" in r[a.id]["error"]
+    assert "'no_existe' no es un campo de Empleado" in r[b.id]["error"]
+    assert "no es JSON" in r[c.id]["error"]
+    assert r[d.id]["error"] == "IntegrityError: duplicate key"
+    assert r[e.id]["error"] is None and r[e.id]["actualizados"] == 1
+    ana.refresh_from_db()
+    assert ana.nombres == "Eva" and ana.empresa_id == e.id
+
+
+@pytest.mark.django_db
+def test_cambio_de_estado_del_manager_se_envia_en_el_siguiente_push(erp, empresa_con_empleado):
+    """
+    Suspender a un empleado desde Mi equipo (save con update_fields) marca
+    actualizado_el: el siguiente push lo envía.
+    """
+    servidor, url = erp
+    empresa, ana = empresa_con_empleado("0999999998008")
+    ana.documento = "0101"
+    ana.save()
+    rita = Empleado.objects.create(
+        empresa=empresa, unidad_id=ana.unidad_id, puesto_id=ana.puesto_id, manager=ana, documento="0505",
+        nombres="Rita", apellidos="Loor", email="rita@x.com", fecha_nacimiento=date(1992, 2, 2),
+        fecha_ingreso=date(2021, 1, 1), estado=1,
+    )
+    IntegracionERP.objects.create(
+        empresa=empresa, erp_nombre="X", tipo=1, metodo=1, endpoint=url, credenciales={"token": "t0k"},
+        mapeos={"campos": {"cedula": "documento", "estado": {"campo": "estado", "tipo": "entero"}}}, activo=True,
+    )
+    assert sincronizar_todas(workers=0)[0]["enviados"] == 2
+
+    token = AccessToken()
+    token["usuario_id"], token["empresa_id"], token["empleado_id"], token["rol"] = 1, empresa.id, ana.id, "manager"
+    client = APIClient()
+    client.force_authenticate(user=AuthUser(email="ana@x.com"), token=token)
+    r = client.patch(f"/api/manager/mi-equipo/empleados/{rita.id}/estado/", {"estado": 2}, format="json")
+    assert r.status_code == 200, r.data
+
+    (r,) = sincronizar_todas(workers=0)
+    assert r["enviados"] == 1
+    assert servidor.recibidos["empleados"][-1] == [{"cedula": "0505", "estado": 2}]
+
+
+@pytest.mark.django_db
+def test_pull_omite_fk_de_otra_empresa(erp, empresa_con_empleado):
+    """
+    unidad_id/puesto_id de mapeos.defaults y manager_id del ERP deben ser
+    de la empresa de la integración; si no, la fila se omite.
+    """
+    servidor, url = erp
+    empresa, ana = empresa_con_empleado("0999999998009")
+    ajena, intruso = empresa_con_empleado("0999999998010")
+    servidor.paginas["empleados"] = [[
+        {"cedula": "0202", "nombre": "Luis", "jefe": None},
+        {"cedula": "0303", "nombre": "Mia", "jefe": intruso.id},
+        {"cedula": "0404", "nombre": "Noa", "jefe": ana.id},
+        {"cedula": "0606", "nombre": "Oto", "jefe": "no-es-id"},
+    ]]
+    comunes = {"apellidos": "X", "email": "x@x.com", "fecha_nacimiento": "1990-01-01",
+               "fecha_ingreso": "2020-01-01", "estado": 1}
+    campos = {"cedula": "documento", "nombre": "nombres", "jefe": "manager_id"}
+    propia = IntegracionERP.objects.create(
+        empresa=empresa, erp_nombre="X", tipo=1, metodo=2, endpoint=url, credenciales={"token": "t0k"},
+        mapeos={"campos": campos, "defaults": {"unidad_id": ana.unidad_id, "puesto_id": ana.puesto_id, **comunes}},
+        activo=True,
+    )
+
+    r = motor_erp.sincronizar_integracion(propia)
+
+    assert r["error"] is None
+    assert (r["creados"], r["omitidos"]) == (2, 2)
+    assert set(Empleado.objects.filter(empresa=empresa).values_list("documento", "manager_id")) == {
+        (None, None), ("0202", None), ("0404", ana.id),
+    }
+
+    # defaults que apuntan a la unidad/puesto de otra empresa: no se crea nada
+    IntegracionERP.objects.filter(id=propia.id).update(
+        mapeos={"campos": campos, "defaults": {"unidad_id": intruso.unidad_id, "puesto_id": ana.puesto_id, **comunes}},
+    )
+    CursorERP.objects.all().delete()
+    servidor.paginas["empleados"] = [[{"cedula": "0707", "nombre": "Pia"}]]
+    r = motor_erp.sincronizar_integracion(IntegracionERP.objects.get(id=propia.id))
+    assert (r["creados"], r["omitidos"]) == (0, 1)
+    assert not Empleado.objects.filter(documento="0707").exists()
+    assert not Empleado.objects.filter(empresa=ajena).exclude(id=intruso.id).exists()
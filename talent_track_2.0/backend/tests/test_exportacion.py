@@ -0,0 +1,80 @@
+import csv
+import io
+from datetime import date, datetime, time
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import AuthUser
+from apps.ausencias.models import SolicitudAusencia, TipoAusencia
+from apps.ausencias.views_auditor_ausencias import AuditorSolicitudesAusenciasExportAPIView
+
+GYE = ZoneInfo("America/Guayaquil")
+
+
+def _solicitud(empresa, empleado, tipo, dia, motivo):
+    return SolicitudAusencia.objects.create(
+        empresa=empresa, empleado=empleado, tipo_ausencia=tipo, fecha_inicio=dia, dias_habiles=1,
+        motivo=motivo, estado=2, flujo_actual=1, creada_el=datetime.combine(dia, time(9, 0), GYE),
+    )
+
+
+@pytest.mark.django_db
+def test_export_csv_en_streaming_filtrado_por_empresa_y_rango(empresa_con_empleado):
+    """
+    El export devuelve un StreamingHttpResponse con solo la empresa del
+    auditor, respeta ?desde/?hasta y neutraliza celdas con fórmulas.
+    """
+    empresa, empleado = empresa_con_empleado("0999999999301")
+    otra, otro_empleado = empresa_con_empleado("0999999999302")
+    tipo = TipoAusencia.objects.create(empresa=empresa, nombre="Vacaciones", afecta_sueldo=False, requiere_soporte=False)
+    tipo_otra = TipoAusencia.objects.create(empresa=otra, nombre="Vacaciones", afecta_sueldo=False, requiere_soporte=False)
+
+    _solicitud(empresa, empleado, tipo, date(2026, 1, 5), "=HYPERLINK(\"x\")")
+    _solicitud(empresa, empleado, tipo, date(2026, 1, 20), "viaje")
+    _solicitud(empresa, empleado, tipo, date(2026, 3, 1), "fuera de rango")
+    _solicitud(otra, otro_empleado, tipo_otra, date(2026, 1, 10), "otra empresa")
+
+    token = AccessToken()
+    token["usuario_id"], token["empresa_id"], token["rol"] = 1, empresa.id, "auditor"
+    request = APIRequestFactory().get("/x/", {"desde": "2026-01-01", "hasta": "2026-01-31"})
+    force_authenticate(request, user=AnonymousUser(), token=token)
+
+    response = AuditorSolicitudesAusenciasExportAPIView.as_view()(request)
+
+    assert response.status_code == 200
+    assert response.streaming
+    contenido = b"".join(response.streaming_content).decode("utf-8").lstrip("\ufeff")
+    filas = list(csv.DictReader(io.StringIO(contenido)))
+
+    assert [f["motivo"] for f in filas] == ["viaje", "'=HYPERLINK(\"x\")"]
+    assert {f["email"] for f in filas} == {empleado.email}
+    assert filas[0]["estado"] == "aprobado"
+    assert filas[0]["creada_el"] == "2026-01-20T09:00:00-05:00"
+
+
+@pytest.mark.parametrize("ruta", [
+    "/api/auditor/asistencia/eventos/export/",
+    "/api/auditor/asistencia/jornadas/export/",
+    "/api/auditor/trazabilidad/logs/export/",
+    "/api/auditor/ausencias/solicitudes/export/",
+    "/api/auditor/desempeno/resultados-kpi/export/",
+    "/api/rrhh/jornadas-calculadas/export/",
+])
+@pytest.mark.django_db
+def test_export_rechaza_al_empleado(ruta, empresa_con_empleado):
+    """
+    Los exports completos son del auditor (o de rrhh): un empleado de la
+    misma empresa recibe 403.
+    """
+    empresa, empleado = empresa_con_empleado("0999999999303")
+    token = AccessToken()
+    token["usuario_id"], token["empresa_id"], token["empleado_id"] = 1, empresa.id, empleado.id
+    token["rol"], token["roles"] = "empleado", ["empleado"]
+    client = APIClient()
+    client.force_authenticate(user=AuthUser(email="eva@x.com"), token=token)
+
+    assert client.get(ruta).status_code == 403
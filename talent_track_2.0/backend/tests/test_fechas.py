@@ -0,0 +1,30 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from apps.asistencia.models import EventoAsistencia
+from apps.core.fechas import rango_dia, zona_empresa
+
+
+@pytest.mark.django_db
+def test_rango_dia_usa_la_zona_de_la_empresa(empresa_con_empleado):
+    """
+    El día local de una empresa en Ecuador (UTC-5) va de 05:00 UTC a 05:00
+    UTC del día siguiente; el filtro no usa __date y respeta ese corte.
+    """
+    empresa, empleado = empresa_con_empleado("0999999999103")
+    utc = ZoneInfo("UTC")
+    for hora_utc in (datetime(2026, 3, 2, 4, 59, tzinfo=utc), datetime(2026, 3, 2, 5, 0, tzinfo=utc),
+                     datetime(2026, 3, 3, 4, 59, tzinfo=utc), datetime(2026, 3, 3, 5, 0, tzinfo=utc)):
+        EventoAsistencia.objects.create(
+            empresa=empresa, empleado=empleado, tipo=1, registrado_el=hora_utc, fuente=2,
+        )
+
+    tz = zona_empresa(empresa.id)
+    qs = EventoAsistencia.objects.filter(rango_dia("registrado_el", date(2026, 3, 2), tz))
+
+    assert str(tz) == "America/Guayaquil"
+    assert "::date" not in str(qs.query) and "django_datetime_cast_date" not in str(qs.query)
+    assert sorted(e.registrado_el.hour for e in qs) == [4, 5]
+    assert qs.count() == 2
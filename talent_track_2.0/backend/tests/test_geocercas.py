@@ -0,0 +1,86 @@
+from datetime import datetime
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+
+from apps.asistencia.geocercas import ERROR_FUERA, ERROR_SIN_GPS, IndiceGeocercas, evaluar_marcacion, parsear_geocerca
+from apps.asistencia.models import EventoAsistencia, GeoCerca, ReglaAsistencia
+
+# oficina en Loja
+LAT, LNG = -3.993100, -79.204200
+
+
+def test_circulo_y_poligono_escalar_y_vectorizado_coinciden():
+    """
+    Círculo (radio en metros) y polígono se evalúan igual punto a punto
+    y en lote (numpy); coordenadas mal formadas se ignoran.
+    """
+    circulo = parsear_geocerca(1, 1, {"lat": LAT, "lng": LNG, "radio_m": 100})
+    cuadrado = parsear_geocerca(2, 2, {"puntos": [
+        {"lat": -3.9900, "lng": -79.2100}, {"lat": -3.9900, "lng": -79.2000},
+        {"lat": -3.9800, "lng": -79.2000}, {"lat": -3.9800, "lng": -79.2100},
+    ]})
+    assert parsear_geocerca(3, 1, None) is None
+    assert parsear_geocerca(4, 2, {"puntos": [[0, 0], [1, 1]]}) is None
+
+    # ~0.0008° de latitud = ~89 m (dentro) / 0.0010° = ~111 m (fuera)
+    assert circulo.contiene(LAT + 0.0008, LNG)
+    assert not circulo.contiene(LAT + 0.0010, LNG)
+    assert cuadrado.contiene(-3.985, -79.205)
+    assert not cuadrado.contiene(-3.975, -79.205)
+
+    indice = IndiceGeocercas([circulo, cuadrado])
+    assert indice.contienen(LAT, LNG) == [1]
+    assert indice.evaluar(None, None) == (False, None)
+
+    rng = np.random.default_rng(7)
+    lats = rng.uniform(-4.0, -3.97, 2000)
+    lngs = rng.uniform(-79.22, -79.19, 2000)
+    escalar = [indice.evaluar(a, b)[0] for a, b in zip(lats, lngs)]
+    assert indice.clasificar_lote(lats, lngs).tolist() == escalar
+    assert 0 < sum(escalar) < len(escalar)
+
+    # con geocerca en la regla: se exige GPS y estar dentro de ESA geocerca
+    exigida = IndiceGeocercas([circulo, cuadrado], geocerca_regla_id=1)
+    assert exigida.evaluar(None, None) == (False, ERROR_SIN_GPS)
+    assert exigida.evaluar(-3.985, -79.205) == (False, ERROR_FUERA)
+    assert exigida.evaluar(LAT, LNG) == (True, None)
+
+
+@pytest.mark.django_db
+def test_regla_con_geocerca_y_backfill_de_historicos(empresa_con_empleado):
+    """
+    La ReglaAsistencia con geocerca se aplica a nuevas marcaciones y el
+    comando recalcular_geocercas corrige dentro_geocerca en el histórico.
+    """
+    empresa, empleado = empresa_con_empleado("0999999999501")
+    gye = ZoneInfo("America/Guayaquil")
+
+    def _evento(lat, lng, hora):
+        return EventoAsistencia.objects.create(
+            empresa=empresa, empleado=empleado, tipo=1, registrado_el=datetime(2026, 1, 5, hora, 0, tzinfo=gye),
+            fuente=1, gps_lat=Decimal(str(lat)), gps_lng=Decimal(str(lng)), dentro_geocerca=False,
+        )
+
+    cerca = _evento(LAT, LNG, 8)
+    lejos = _evento(LAT + 0.01, LNG, 9)
+
+    geocerca = GeoCerca.objects.create(
+        empresa=empresa, nombre="Oficina", tipo=1, activo=True,
+        coordenadas={"lat": LAT, "lng": LNG, "radio_m": 150},
+    )
+    ReglaAsistencia.objects.create(empresa=empresa, geocerca=geocerca, considera_tardanza_desde_min=0)
+
+    # las señales invalidan el índice cacheado de la empresa
+    assert evaluar_marcacion(empresa.id, None, None) == (False, ERROR_SIN_GPS)
+    assert evaluar_marcacion(empresa.id, LAT, LNG) == (True, None)
+
+    call_command("recalcular_geocercas", empresa_id=empresa.id, lote=1)
+
+    cerca.refresh_from_db()
+    lejos.refresh_from_db()
+    assert cerca.dentro_geocerca is True
+    assert lejos.dentro_geocerca is False
@@ -0,0 +1,65 @@
+from datetime import date, datetime, time
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from apps.asistencia.ingesta import ingestar_lote
+from apps.asistencia.models import DispositivoEmpleado, EventoAsistencia, JornadaPendiente
+
+GYE = ZoneInfo("America/Guayaquil")
+
+
+def _iso(dia, hora):
+    return datetime.combine(dia, hora, GYE).isoformat()
+
+
+@pytest.mark.django_db
+def test_lote_valida_dispositivo_deduplica_por_dia_y_reporta_por_item(empresa_con_empleado):
+    """
+    Un lote mezcla marcaciones válidas, duplicadas (contra la BD y dentro
+    del lote), de dispositivos no registrados y de otra empresa: se crean
+    solo las válidas y cada item trae su propio resultado.
+    """
+    empresa, empleado = empresa_con_empleado("0999999999401")
+    _, ajeno = empresa_con_empleado("0999999999402")
+    DispositivoEmpleado.objects.create(empresa=empresa, empleado=empleado, tipo=3, device_uid="LECTOR-1", activo=True)
+    DispositivoEmpleado.objects.create(empresa=empresa, empleado=empleado, tipo=3, device_uid="VIEJO", activo=False)
+
+    dia = date(2026, 1, 15)
+    EventoAsistencia.objects.create(
+        empresa=empresa, empleado=empleado, tipo=1, registrado_el=datetime.combine(dia, time(8, 0), GYE),
+        fuente=2, dentro_geocerca=False,
+    )
+
+    base = {"empleado_id": empleado.id, "device_uid": "LECTOR-1"}
+    items = [
+        {**base, "tipo": 2, "registrado_el": _iso(dia, time(17, 5))},        # 0 creado
+        {**base, "tipo": 2, "registrado_el": _iso(dia, time(17, 0))},        # 1 más temprano: gana éste
+        {**base, "tipo": 1, "registrado_el": _iso(dia, time(8, 1))},         # 2 ya existe en BD
+        {**base, "tipo": 9, "registrado_el": _iso(dia, time(9, 0))},         # 3 tipo inválido
+        {**base, "device_uid": "VIEJO", "tipo": 3, "registrado_el": _iso(dia, time(12, 0))},  # 4 inactivo
+        {"empleado_id": ajeno.id, "device_uid": "LECTOR-1", "tipo": 1, "registrado_el": _iso(dia, time(8, 0))},  # 5
+        {**base, "tipo": 1, "registrado_el": _iso(date(2026, 1, 16), time(7, 55))},  # 6 otro día
+    ]
+
+    resultados = ingestar_lote(empresa.id, items)
+
+    assert [r["estado"] for r in resultados] == [
+        "duplicado", "creado", "duplicado", "rechazado", "rechazado", "rechazado", "creado",
+    ]
+    assert "tipo" in resultados[3]["errores"]
+    assert "device_uid" in resultados[4]["errores"]
+    assert "empleado_id" in resultados[5]["errores"]
+
+    creado = EventoAsistencia.objects.get(id=resultados[1]["id"])
+    assert creado.fuente == 3
+    assert creado.registrado_el == datetime.combine(dia, time(17, 0), GYE)
+    assert EventoAsistencia.objects.filter(empresa=empresa).count() == 3
+    # bulk_create no dispara señales: el motor de jornadas igual queda avisado
+    assert set(JornadaPendiente.objects.values_list("fecha", flat=True)) >= {dia, date(2026, 1, 16)}
+    assert DispositivoEmpleado.objects.get(device_uid="LECTOR-1").ultimo_uso_el is not None
+
+    # el empleado solo puede subir sus propias marcaciones
+    r = ingestar_lote(empresa.id, [{**base, "empleado_id": ajeno.id, "tipo": 3, "registrado_el": _iso(dia, time(13, 0))}],
+                      empleado_id=empleado.id)
+    assert r[0]["estado"] == "rechazado"
@@ -0,0 +1,76 @@
+import pytest
+from django.test import RequestFactory
+
+from apps.asistencia.ips import ListaIPs, ip_permitida
+from apps.asistencia.models import ReglaAsistencia
+from apps.asistencia.serializers import ReglaAsistenciaUpdateSerializer
+from apps.core.red import ip_cliente
+
+
+def test_cidrs_se_fusionan_y_se_buscan_por_biseccion():
+    """
+    Rangos solapados/contiguos quedan en un solo intervalo; IPv4, IPv6 e
+    IPv4 mapeada en IPv6 se resuelven contra su propia tabla.
+    """
+    lista = ListaIPs.desde_entradas([
+        "10.0.0.0/25", "10.0.0.128/25",   # contiguos -> 10.0.0.0/24
+        "10.0.0.10",                      # contenido en el anterior
+        "192.168.1.0/24",
+        "2800:370::/32",
+        "no-es-ip",                       # se ignora
+    ])
+
+    assert len(lista) == 3
+    assert "10.0.0.255" in lista
+    assert "10.0.1.0" not in lista
+    assert "192.168.1.77" in lista
+    assert "::ffff:192.168.1.77" in lista
+    assert "2800:370:1::5" in lista
+    assert "2800:371::1" not in lista
+    assert None not in lista
+    assert not ListaIPs.desde_entradas(None)
+
+
+@pytest.mark.django_db
+def test_actualizar_regla_invalida_la_lista_cacheada(empresa_con_empleado):
+    """
+    Sin lista no se restringe; al guardar ip_permitidas con el serializer
+    de ActualizarReglaAsistenciaAPIView la lista compilada se renueva.
+    """
+    empresa, _ = empresa_con_empleado("0999999999601")
+    regla = ReglaAsistencia.objects.create(empresa=empresa, considera_tardanza_desde_min=0)
+
+    assert ip_permitida(empresa.id, "8.8.8.8")
+
+    ser = ReglaAsistenciaUpdateSerializer(regla, data={
+        "considera_tardanza_desde_min": 0, "calculo_horas_extra": 1, "ip_permitidas": ["190.15.128.0/20"],
+    })
+    assert ser.is_valid(), ser.errors
+    ser.save()
+
+    assert not ip_permitida(empresa.id, "8.8.8.8")
+    assert ip_permitida(empresa.id, "190.15.140.3")
+
+    malo = ReglaAsistenciaUpdateSerializer(regla, data={
+        "considera_tardanza_desde_min": 0, "calculo_horas_extra": 1, "ip_permitidas": ["300.1.1.1"],
+    })
+    assert not malo.is_valid()
+
+
+def test_ip_cliente_toma_la_entrada_del_primer_proxy_propio(settings):
+    """
+    Los proxies agregan a X-Forwarded-For: lo que el cliente antepone (una
+    IP de la lista blanca) se ignora y se toma la N-ésima desde la derecha.
+    """
+    request = RequestFactory().get(
+        "/", REMOTE_ADDR="10.9.9.9", HTTP_X_FORWARDED_FOR="192.168.1.77, 200.1.1.1, 10.1.1.1",
+    )
+
+    settings.PROXIES_CONFIABLES = 0
+    assert ip_cliente(request) == "10.9.9.9"
+    settings.PROXIES_CONFIABLES = 1
+    assert ip_cliente(request) == "10.1.1.1"
+    settings.PROXIES_CONFIABLES = 2
+    assert ip_cliente(request) == "200.1.1.1"
+    settings.PROXIES_CONFIABLES = 5
+    assert ip_cliente(request) == "192.168.1.77"
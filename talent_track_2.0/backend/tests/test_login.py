@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.accounts import hashing
+from apps.accounts.hashing import PoolHash
+from apps.accounts.models import AuthUser
+from apps.usuarios.models import Rol, Usuario, UsuarioRol
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def rrhh(empresa_con_empleado):
+    empresa, empleado = empresa_con_empleado("0999999994001")
+    usuario = Usuario.objects.create(empresa=empresa, empleado=empleado, email="ana@x.com", hash_password="x", estado=1)
+    for nombre in ("empleado", "rrhh"):
+        UsuarioRol.objects.create(usuario=usuario, rol=Rol.objects.create(empresa=empresa, nombre=nombre))
+    AuthUser.objects.create_user(email="Ana@X.com ", password="clave-123", usuario=usuario)
+    return usuario
+
+
+def test_login_resuelve_usuario_y_roles_en_una_consulta(rrhh, monkeypatch):
+    """
+    AuthUser, Usuario y roles salen de un solo SELECT por email normalizado
+    (el único otro query es el UPDATE de last_login).
+    """
+    monkeypatch.setattr(hashing, "_pool", PoolHash(workers=2, cola=4))
+
+    with CaptureQueriesContext(connection) as ctx:
+        r = APIClient().post("/api/auth/login/", {"email": "  ANA@x.com", "password": "clave-123"}, format="json")
+
+    assert r.status_code == 200, r.data
+    assert r.data["context"]["rol"] == "rrhh"
+    assert sorted(r.data["context"]["roles"]) == ["empleado", "rrhh"]
+    assert r.data["context"]["empresa_id"] == rrhh.empresa_id
+    assert len([q for q in ctx.captured_queries if q["sql"].startswith("SELECT")]) == 1
+
+    r = APIClient().post("/api/auth/login/", {"email": "ana@x.com", "password": "otra"}, format="json")
+    assert r.status_code == 401
+
+
+def test_login_sin_cupo_en_el_pool_responde_429(rrhh, monkeypatch):
+    """
+    Con todos los cupos del pool de hash ocupados el login no se encola sin
+    límite: responde 429 tras la espera configurada.
+    """
+    pool = PoolHash(workers=1, cola=0, espera=0.01)
+    monkeypatch.setattr(hashing, "_pool", pool)
+    assert pool._cupos.acquire(blocking=False)
+
+    r = APIClient().post("/api/auth/login/", {"email": "ana@x.com", "password": "clave-123"}, format="json")
+
+    assert r.status_code == 429
@@ -0,0 +1,135 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.utils import timezone
+
+from apps.asistencia.models import (
+    AsignacionTurno,
+    EventoAsistencia,
+    JornadaCalculada,
+    JornadaPendiente,
+    ReglaAsistencia,
+    Turno,
+)
+from apps.asistencia.motor_jornadas import calcular_jornada, procesar_pendientes
+
+LUNES = date(2026, 1, 5)
+SABADO = date(2026, 1, 10)
+HORARIO = {
+    "hora_inicio": time(8, 0),
+    "hora_fin": time(17, 0),
+    "tolerancia": 5,
+    "dias": {1, 2, 3, 4, 5},
+}
+
+
+def _dt(d, hh, mm, tz=None):
+    return timezone.make_aware(datetime.combine(d, time(hh, mm)), tz)
+
+
+def test_jornada_completa_con_pausa_tardanza_y_extra():
+    """
+    Verifica minutos trabajados (descontando pausa), tardanza fuera de
+    tolerancia y horas extra sobre la duración del turno.
+    """
+    eventos = [
+        (1, _dt(LUNES, 8, 20)),
+        (3, _dt(LUNES, 13, 0)),
+        (4, _dt(LUNES, 13, 30)),
+        (2, _dt(LUNES, 18, 20)),
+    ]
+    j = calcular_jornada(LUNES, eventos, horario=HORARIO, tardanza_desde_min=0)
+
+    assert j["estado"] == 1
+    assert j["minutos_trabajados"] == 600 - 30
+    assert j["minutos_tardanza"] == 20
+    assert j["minutos_extra"] == 570 - 540
+
+
+def test_tardanza_respeta_tolerancia_y_regla_empresa():
+    """
+    Un retraso dentro de la tolerancia del turno o bajo el umbral de la
+    ReglaAsistencia no cuenta como tardanza.
+    """
+    dentro_tolerancia = calcular_jornada(LUNES, [(1, _dt(LUNES, 8, 4))], horario=HORARIO)
+    bajo_umbral = calcular_jornada(LUNES, [(1, _dt(LUNES, 8, 9))], horario=HORARIO, tardanza_desde_min=10)
+
+    assert dentro_tolerancia["minutos_tardanza"] == 0
+    assert bajo_umbral["minutos_tardanza"] == 0
+    assert bajo_umbral["estado"] == 2  # sin check_out
+
+
+def test_dia_no_laborable_todo_es_extra():
+    eventos = [(1, _dt(SABADO, 9, 0)), (2, _dt(SABADO, 11, 0))]
+    j = calcular_jornada(SABADO, eventos, horario=HORARIO)
+
+    assert j["minutos_tardanza"] == 0
+    assert j["minutos_extra"] == 120
+
+
+@pytest.mark.django_db
+def test_motor_procesa_solo_pares_pendientes_y_hace_upsert(empresa_con_empleado):
+    """
+    Registrar marcaciones encola el (empleado, fecha); el motor crea la
+    jornada, vacía la cola y al volver a marcar actualiza la misma fila.
+    Las horas se interpretan en la zona de la empresa (Ecuador).
+    """
+    gye = ZoneInfo("America/Guayaquil")
+    empresa, empleado = empresa_con_empleado("0999999999101")
+    turno = Turno.objects.create(
+        empresa=empresa, nombre="Diurno", hora_inicio=time(8, 0), hora_fin=time(17, 0),
+        dias_semana=[{"num": n, "nombre": "x"} for n in range(1, 6)], tolerancia_minutos=5,
+    )
+    AsignacionTurno.objects.create(
+        empresa=empresa, empleado=empleado, turno=turno, hora_inicio=time(8, 0), hora_fin=time(17, 0),
+    )
+    ReglaAsistencia.objects.create(empresa=empresa, considera_tardanza_desde_min=0)
+
+    for tipo, hh in ((1, 8), (2, 17)):
+        EventoAsistencia.objects.create(
+            empresa=empresa, empleado=empleado, tipo=tipo, registrado_el=_dt(LUNES, hh, 30, gye), fuente=2,
+        )
+
+    assert JornadaPendiente.objects.count() == 1
+    r = procesar_pendientes()
+    assert r["pares"] == 1
+    assert JornadaPendiente.objects.count() == 0
+
+    j = JornadaCalculada.objects.get(empleado=empleado, fecha=LUNES)
+    assert j.minutos_trabajados == 540
+    assert j.minutos_tardanza == 30
+
+    EventoAsistencia.objects.filter(tipo=2).update(registrado_el=_dt(LUNES, 17, 30, gye) + timedelta(hours=1))
+    EventoAsistencia.objects.create(
+        empresa=empresa, empleado=empleado, tipo=3, registrado_el=_dt(LUNES, 12, 0, gye), fuente=2,
+    )
+    procesar_pendientes()
+
+    assert JornadaCalculada.objects.filter(empleado=empleado).count() == 1
+    j.refresh_from_db()
+    assert j.minutos_trabajados == 600
+
+
+@pytest.mark.django_db
+def test_mover_marcacion_de_dia_recalcula_ambos_dias(empresa_con_empleado):
+    """
+    Editar registrado_el de una marcación y pasarla a otro día encola el día
+    nuevo y también el anterior, que se queda sin esa marcación.
+    """
+    empresa, empleado = empresa_con_empleado("0999999999102")
+    evento = EventoAsistencia.objects.create(
+        empresa=empresa, empleado=empleado, tipo=1, registrado_el=_dt(LUNES, 8, 0), fuente=2,
+    )
+    procesar_pendientes()
+    assert JornadaCalculada.objects.filter(empleado=empleado, fecha=LUNES).exists()
+
+    evento = EventoAsistencia.objects.get(pk=evento.pk)
+    evento.registrado_el = _dt(LUNES + timedelta(days=1), 8, 0)
+    evento.save()
+
+    assert set(JornadaPendiente.objects.values_list("fecha", flat=True)) == {LUNES, LUNES + timedelta(days=1)}
+    procesar_pendientes()
+    assert list(JornadaCalculada.objects.filter(empleado=empleado).values_list("fecha", flat=True)) == [
+        LUNES + timedelta(days=1)
+    ]
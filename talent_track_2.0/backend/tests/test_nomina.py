@@ -0,0 +1,97 @@
+import csv
+from datetime import date, datetime, time
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.asistencia.models import JornadaCalculada
+from apps.ausencias.models import SolicitudAusencia, TipoAusencia
+from apps.empleados.models import Contrato, Empleado
+from apps.integraciones import nomina
+from apps.integraciones.nomina import GENERADA, generar_exportacion
+
+GYE = ZoneInfo("America/Guayaquil")
+
+
+def _jornada(empleado, dia, trabajados, extra=0, tardanza=0):
+    JornadaCalculada.objects.create(
+        empresa=empleado.empresa, empleado=empleado, fecha=dia,
+        hora_primera_entrada=datetime.combine(dia, time(8, 0), GYE),
+        hora_ultimo_salida=datetime.combine(dia, time(17, 0), GYE),
+        minutos_trabajados=trabajados, minutos_tardanza=tardanza, minutos_extra=extra, estado=1,
+    )
+
+
+def _ausencia(empleado, tipo, inicio, dias, estado=2):
+    SolicitudAusencia.objects.create(
+        empresa=empleado.empresa, empleado=empleado, tipo_ausencia=tipo, fecha_inicio=inicio,
+        dias_habiles=dias, motivo="x", estado=estado, flujo_actual=1,
+        creada_el=datetime.combine(inicio, time(9, 0), GYE),
+    )
+
+
+@pytest.mark.django_db
+def test_exportacion_nomina_agrega_en_una_consulta_y_registra_totales(tmp_path, monkeypatch, empresa_con_empleado):
+    """
+    Jornadas del mes, ausencias aprobadas que afectan sueldo y el contrato
+    vigente salen en una línea por empleado; los totales quedan en
+    ExportacionNomina. Sin contrato en el período no hay línea.
+    """
+    monkeypatch.setattr(nomina, "NOMINA_DIR", tmp_path)
+    empresa, ana = empresa_con_empleado("0999999999901")
+    luis = Empleado.objects.create(
+        empresa=empresa, unidad=ana.unidad, puesto=ana.puesto, nombres="Luis", apellidos='=HYPERLINK("x")',
+        email="luis@x.com", fecha_nacimiento=date(1990, 1, 1), fecha_ingreso=date(2020, 1, 1), estado=1,
+    )
+    Empleado.objects.create(
+        empresa=empresa, unidad=ana.unidad, puesto=ana.puesto, nombres="Sin", apellidos="Contrato",
+        email="sin@x.com", fecha_nacimiento=date(1990, 1, 1), fecha_ingreso=date(2020, 1, 1), estado=1,
+    )
+    Contrato.objects.create(empresa=empresa, empleado=ana, tipo=1, fecha_inicio=date(2020, 1, 1),
+                            fecha_fin=date(2025, 12, 31), salario_base=Decimal("800.00"), jornada_semanal_horas=40, estado=2)
+    Contrato.objects.create(empresa=empresa, empleado=ana, tipo=1, fecha_inicio=date(2026, 1, 1),
+                            salario_base=Decimal("950.00"), jornada_semanal_horas=40, estado=1)
+    Contrato.objects.create(empresa=empresa, empleado=luis, tipo=2, fecha_inicio=date(2025, 6, 1),
+                            salario_base=Decimal("600.00"), jornada_semanal_horas=20, estado=1)
+
+    _jornada(ana, date(2026, 2, 2), 480, extra=30, tardanza=5)
+    _jornada(ana, date(2026, 2, 3), 500, extra=20)
+    _jornada(ana, date(2026, 3, 1), 480)  # otro mes
+    _jornada(luis, date(2026, 2, 2), 240)
+
+    sin_sueldo = TipoAusencia.objects.create(empresa=empresa, nombre="Permiso", afecta_sueldo=True, requiere_soporte=False)
+    vacaciones = TipoAusencia.objects.create(empresa=empresa, nombre="Vacaciones", afecta_sueldo=False, requiere_soporte=False)
+    _ausencia(ana, sin_sueldo, date(2026, 2, 10), 2)
+    _ausencia(ana, sin_sueldo, date(2026, 2, 20), 1, estado=3)  # rechazada
+    _ausencia(ana, vacaciones, date(2026, 2, 12), 5)
+
+    with CaptureQueriesContext(connection) as ctx:
+        exp = generar_exportacion(empresa.id, "2026-02")
+    # insert + 1 consulta agregada + update (sin N+1 por empleado). En
+    # PostgreSQL .iterator() abre un cursor del servidor (chunked_cursor),
+    # que CaptureQueriesContext no ve: ahí no debe quedar ningún SELECT
+    selects = [q for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+    cursor_servidor = connection.vendor == "postgresql" and not connection.settings_dict.get(
+        "DISABLE_SERVER_SIDE_CURSORS"
+    )
+    assert len(selects) == (0 if cursor_servidor else 1)
+
+    assert exp.estado == GENERADA
+    assert exp.total_horas == Decimal("20.33")  # (480 + 500 + 240) / 60
+    assert exp.total_extras == Decimal("0.83")
+
+    with open(exp.archivo_url, encoding="utf-8-sig", newline="") as f:
+        filas = {int(f["empleado_id"]): f for f in csv.DictReader(f)}
+
+    assert set(filas) == {ana.id, luis.id}
+    assert filas[ana.id]["salario_base"] == "950.00"
+    assert filas[ana.id]["horas_trabajadas"] == "16.33"
+    assert filas[ana.id]["minutos_tardanza"] == "5"
+    assert filas[ana.id]["dias_ausencia_descuento"] == "2"
+    assert filas[luis.id]["horas_trabajadas"] == "4.00"
+    assert filas[luis.id]["dias_ausencia_descuento"] == "0"
+    # texto del empleado que Excel tomaría como fórmula sale escapado
+    assert filas[luis.id]["apellidos"] == "'=HYPERLINK(\"x\")"
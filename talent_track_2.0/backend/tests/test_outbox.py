@@ -0,0 +1,75 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.empleados.models import Empleado
+from apps.notificaciones.models import Notificacion, NotificacionSaliente
+from apps.notificaciones.outbox import encolar, procesar_outbox
+from apps.notificaciones.views_rrhh_comunicados import RRHHComunicadoAPIView
+
+
+def _otro_empleado(base, nombre, estado=1):
+    return Empleado.objects.create(
+        empresa=base.empresa, unidad=base.unidad, puesto=base.puesto, nombres=nombre, apellidos="Paz",
+        email=f"{nombre}@{base.empresa.ruc_nit}.com", fecha_nacimiento=base.fecha_nacimiento,
+        fecha_ingreso=base.fecha_ingreso, estado=estado,
+    )
+
+
+@pytest.mark.django_db
+def test_comunicado_se_encola_y_el_worker_lo_expande_a_toda_la_empresa(settings, empresa_con_empleado):
+    """
+    El endpoint de RRHH solo deja una fila pendiente en el outbox (202); el
+    worker crea una Notificacion por empleado activo de ESA empresa y marca
+    la salida como enviada. Una segunda corrida no duplica nada.
+    """
+    settings.NOTIFICACIONES_COLA_LOCAL = False
+    empresa, empleado = empresa_con_empleado("0999999999601")
+    otra, _ = empresa_con_empleado("0999999999602")
+    for i in range(4):
+        _otro_empleado(empleado, f"e{i}")
+    _otro_empleado(empleado, "inactivo", estado=2)
+
+    token = AccessToken()
+    token["usuario_id"], token["empresa_id"], token["rol"] = 1, empresa.id, "rrhh"
+    request = APIRequestFactory().post("/x/", {"titulo": "Feriado", "mensaje": "El lunes no se labora."}, format="json")
+    force_authenticate(request, user=AnonymousUser(), token=token)
+
+    response = RRHHComunicadoAPIView.as_view()(request)
+
+    assert response.status_code == 202
+    salida = NotificacionSaliente.objects.get(id=response.data["salida_id"])
+    assert salida.estado == NotificacionSaliente.PENDIENTE
+    assert not Notificacion.objects.exists()
+
+    resumen = procesar_outbox(lote=10, workers=1)
+
+    assert resumen == {"lotes": 1, "salidas": 1, "notificaciones": 5}
+    assert Notificacion.objects.filter(empresa=empresa, titulo="Feriado").count() == 5
+    assert not Notificacion.objects.filter(empresa=otra).exists()
+    salida.refresh_from_db()
+    assert (salida.estado, salida.enviadas, salida.intentos) == (NotificacionSaliente.ENVIADA, 5, 1)
+
+    assert procesar_outbox()["salidas"] == 0
+    assert Notificacion.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_cola_local_procesa_al_confirmar_y_filtra_empleados_ajenos(
+    settings, django_capture_on_commit_callbacks, empresa_con_empleado
+):
+    """
+    Con NOTIFICACIONES_COLA_LOCAL la salida se entrega al confirmar la
+    transacción, y una lista explícita ignora empleados de otra empresa.
+    """
+    settings.NOTIFICACIONES_COLA_LOCAL = True
+    empresa, empleado = empresa_con_empleado("0999999999603")
+    _, ajeno = empresa_con_empleado("0999999999604")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        salida = encolar(empresa.id, "Aprobacion Solicitud", "ok", empleado_ids=[empleado.id, ajeno.id], canal=4)
+
+    salida.refresh_from_db()
+    assert salida.estado == NotificacionSaliente.ENVIADA
+    assert list(Notificacion.objects.values_list("empleado_id", "canal")) == [(empleado.id, 4)]
@@ -0,0 +1,67 @@
+from datetime import date
+
+import pytest
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.asistencia.models import JornadaCalculada
+from apps.core.paginacion import paginar_keyset
+from apps.empleados.models import Empleado
+
+pytestmark = pytest.mark.django_db
+
+
+def _request(**params):
+    return Request(APIRequestFactory().get("/x/", params))
+
+
+def test_keyset_recorre_todo_sin_repetir_con_empates_en_fecha(empresa_con_empleado):
+    """
+    Con varias filas por fecha (empates en el primer campo) el cursor
+    recorre todas las jornadas una sola vez y en el orden de la vista.
+    """
+    now = timezone.now()
+    empresa, primero = empresa_con_empleado("0999999999102")
+    empleados = [primero] + [
+        Empleado.objects.create(
+            empresa=empresa, unidad=primero.unidad, puesto=primero.puesto, nombres=f"N{i}", apellidos="A",
+            email=f"p{i}@x.com", fecha_nacimiento=date(1990, 1, 1), fecha_ingreso=date(2020, 1, 1), estado=1,
+        )
+        for i in range(2)
+    ]
+    for dia in range(1, 6):
+        for e in empleados:
+            JornadaCalculada.objects.create(
+                empresa=empresa, empleado=e, fecha=date(2026, 1, dia), hora_primera_entrada=now,
+                hora_ultimo_salida=now, minutos_trabajados=0,
+                minutos_tardanza=0, minutos_extra=0, estado=2,
+            )
+
+    ordering = ("-fecha", "-id")
+    qs = JornadaCalculada.objects.filter(empresa=empresa)
+    esperado = list(qs.order_by(*ordering).values_list("id", flat=True))
+
+    vistos, cursor, paginas = [], None, 0
+    while True:
+        params = {"page_size": 4}
+        if cursor:
+            params["cursor"] = cursor
+        items, cursor = paginar_keyset(_request(**params), qs, ordering)
+        vistos += [j.id for j in items]
+        paginas += 1
+        if not cursor:
+            break
+
+    assert vistos == esperado
+    assert paginas == 4
+
+    with pytest.raises(ValidationError):
+        paginar_keyset(_request(cursor="no-es-un-cursor"), qs, ordering)
+
+    # sin ?page_size ni ?cursor (clientes que leen solo el body): todo, sin cursor
+    items, cursor = paginar_keyset(_request(), qs, ordering)
+    assert [j.id for j in items] == esperado and cursor is None
+    items, cursor = paginar_keyset(_request(), qs, ordering, tope=5)
+    assert [j.id for j in items] == esperado[:5] and cursor is None
@@ -0,0 +1,58 @@
+from datetime import date, datetime, time
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from apps.asistencia.models import EventoAsistencia
+from apps.core import particiones
+from apps.core.particiones import meses_faltantes, particiones_vencidas, sumar_meses
+
+
+def test_plan_de_particiones_crea_lo_que_falta_y_retira_lo_vencido():
+    """
+    Solo se crean los meses sin partición (la histórica con MINVALUE cubre
+    el pasado) y solo se retiran rangos que terminan antes del corte.
+    """
+    assert sumar_meses(date(2026, 11, 20), 2) == date(2027, 1, 1)
+    assert sumar_meses(date(2026, 1, 5), -1) == date(2025, 12, 1)
+
+    existentes = [
+        ("t_historico", None, date(2026, 9, 1)),
+        ("t_p202609", date(2026, 9, 1), date(2026, 10, 1)),
+        ("t_p202611", date(2026, 11, 1), date(2026, 12, 1)),
+    ]
+    assert meses_faltantes(existentes, date(2026, 10, 18), 2) == [date(2026, 10, 1), date(2026, 12, 1)]
+
+    assert particiones_vencidas(existentes, date(2026, 10, 18), 1) == ["t_historico"]
+    assert particiones_vencidas(existentes, date(2026, 10, 18), 0) == ["t_historico", "t_p202609"]
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="Particionado nativo solo en PostgreSQL.")
+def test_particiones_mensuales_de_eventos(empresa_con_empleado):
+    """
+    Un evento fuera de rango cae en la DEFAULT y se mueve al crear su mes;
+    al retirar con ELIMINAR desaparecen los meses vencidos y el ORM sigue
+    consultando la tabla padre sin cambios.
+    """
+    empresa, empleado = empresa_con_empleado("0999999996001")
+    tz = timezone.get_default_timezone()
+    lejano = EventoAsistencia.objects.create(
+        empresa=empresa, empleado=empleado, tipo=1, fuente=1,
+        registrado_el=datetime.combine(date(2031, 3, 10), time(8, 0), tz),
+    )
+
+    with connection.cursor() as cursor:
+        # las FK diferidas del INSERT impedirían el DETACH/DROP dentro de la transacción del test
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+    creadas = particiones.asegurar_particiones("eventoasistencia", meses_adelante=0, hoy=date(2031, 3, 1))
+    assert creadas == ["eventoasistencia_p203103"]
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM eventoasistencia_p203103")
+        assert cursor.fetchall() == [(lejano.id,)]
+
+    retiradas = particiones.retirar_particiones("eventoasistencia", 0, particiones.ELIMINAR, hoy=date(2031, 4, 1))
+    assert "eventoasistencia_p203103" in retiradas
+    assert not EventoAsistencia.objects.filter(pk=lejano.pk).exists()
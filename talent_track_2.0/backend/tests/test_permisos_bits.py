@@ -0,0 +1,175 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts import hashing
+from apps.accounts.hashing import PoolHash
+from apps.accounts.models import AuthUser
+from apps.usuarios import permisos_bits
+from apps.usuarios.models import CodigoPermiso, Permiso, Rol, Usuario, UsuarioRol
+from apps.usuarios.permissions import con_permiso
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _limpiar():
+    # el catálogo en memoria sobrevive al rollback de cada test
+    permisos_bits._BITS.clear()
+    cache.clear()
+    yield
+    permisos_bits._BITS.clear()
+
+
+@pytest.fixture
+def roles(empresa_con_empleado):
+    empresa, empleado = empresa_con_empleado("0999999995001")
+    rrhh = Rol.objects.create(empresa=empresa, nombre="rrhh")
+    manager = Rol.objects.create(empresa=empresa, nombre="manager")
+    Permiso.objects.create(rol=rrhh, codigo="Nomina.Exportar")
+    Permiso.objects.create(rol=manager, codigo="vacaciones.aprobar")
+    return empresa, empleado, rrhh, manager
+
+
+def _token(**claims):
+    token = AccessToken()
+    for k, v in claims.items():
+        token[k] = v
+    return token
+
+
+def _request(**claims):
+    token = _token(**claims)
+    request = Request(APIRequestFactory().get("/x/"))
+    request.user, request.auth = object(), token
+    return request
+
+
+def test_permisos_desde_bitset_sin_consultas(roles, django_assert_num_queries):
+    """
+    Con la caché caliente con_permiso no toca la BD; el bitset del usuario
+    es el OR de sus roles (rol_ids del token) y los códigos no distinguen
+    mayúsculas.
+    """
+    empresa, _, rrhh, manager = roles
+    exportar = con_permiso("nomina.exportar")()
+    ambos = con_permiso("nomina.exportar", "vacaciones.aprobar")()
+
+    permisos_bits.bitset_peticion(_request(usuario_id=1, empresa_id=empresa.id, rol_ids=[rrhh.id, manager.id]))
+
+    with django_assert_num_queries(0):
+        solo_rrhh = _request(usuario_id=1, empresa_id=empresa.id, rol="rrhh", rol_ids=[rrhh.id])
+        assert exportar.has_permission(solo_rrhh, None)
+        assert not ambos.has_permission(solo_rrhh, None)
+
+        dos_roles = _request(usuario_id=1, empresa_id=empresa.id, rol="rrhh", rol_ids=[rrhh.id, manager.id])
+        assert ambos.has_permission(dos_roles, None)
+
+        sin_empresa = _request(usuario_id=1, rol="rrhh", rol_ids=[rrhh.id])
+        assert not exportar.has_permission(sin_empresa, None)
+
+    assert CodigoPermiso.objects.filter(codigo="nomina.exportar").exists()
+
+
+def test_cambios_en_permisos_por_api_invalidan_el_rol(roles):
+    """
+    Crear, mover de rol y borrar un Permiso con PermisoCreateAPIView /
+    PermisoDetalleAPIView sube la versión del rol: la siguiente petición ve
+    el cambio sin esperar el TTL.
+    """
+    empresa, _, rrhh, manager = roles
+    admin = Rol.objects.create(empresa=None, nombre="superadmin")
+    Permiso.objects.create(rol=admin, codigo="permisos.manage")
+    client = APIClient()
+    client.force_authenticate(user=AuthUser(email="admin@x.com"),
+                              token=_token(usuario_id=1, rol="superadmin", rol_ids=[admin.id]))
+    aprobar = con_permiso("vacaciones.aprobar")()
+
+    def puede(rol):
+        return aprobar.has_permission(_request(usuario_id=1, empresa_id=empresa.id, rol_ids=[rol.id]), None)
+
+    assert not puede(rrhh)
+
+    r = client.post("/api/permisos/", {"empresa_id": empresa.id, "rol_id": rrhh.id, "codigo": "Vacaciones.Aprobar"},
+                    format="json")
+    assert r.status_code == 201, r.data
+    assert puede(rrhh)
+
+    # el permiso original de manager pasa a rrhh: manager lo pierde
+    original = Permiso.objects.get(rol=manager)
+    r = client.put(f"/api/permisos/{original.id}/",
+                   {"empresa_id": empresa.id, "rol_id": rrhh.id, "codigo": "reportes.ver"}, format="json")
+    assert r.status_code == 200, r.data
+    assert not puede(manager)
+
+    r = client.delete(f"/api/permisos/{r.data['id']}/")
+    assert r.status_code == 204
+    assert not con_permiso("reportes.ver")().has_permission(
+        _request(usuario_id=1, empresa_id=empresa.id, rol_ids=[rrhh.id]), None
+    )
+
+
+def test_login_emite_rol_ids_y_tokens_viejos_usan_respaldo(roles, monkeypatch):
+    """
+    El login pone rol_ids en el JWT; un token sin ese claim resuelve los
+    roles una vez por usuario (cacheado hasta que cambie UsuarioRol).
+    """
+    monkeypatch.setattr(hashing, "_pool", PoolHash(workers=2, cola=4))
+    empresa, empleado, rrhh, _ = roles
+    usuario = Usuario.objects.create(empresa=empresa, empleado=empleado, email="luz@x.com", hash_password="x", estado=1)
+    UsuarioRol.objects.create(usuario=usuario, rol=rrhh)
+    AuthUser.objects.create_user(email="luz@x.com", password="clave-123", usuario=usuario)
+
+    r = APIClient().post("/api/auth/login/", {"email": "luz@x.com", "password": "clave-123"}, format="json")
+    assert r.status_code == 200, r.data
+    assert AccessToken(r.data["access"])["rol_ids"] == [rrhh.id]
+
+    exportar = con_permiso("nomina.exportar")()
+    viejo = dict(usuario_id=usuario.id, empresa_id=empresa.id, rol="rrhh")
+    assert exportar.has_permission(_request(**viejo), None)
+
+    UsuarioRol.objects.filter(usuario=usuario).delete()
+    assert not exportar.has_permission(_request(**viejo), None)
+
+
+def test_crud_de_roles_y_permisos_exige_superadmin_o_el_permiso(roles):
+    """
+    /api/roles-empresa/ y /api/permisos-por-empresa/ responden 403 a quien
+    no es superadmin ni tiene roles.manage / permisos.manage, y 200 en
+    cuanto se le otorga el Permiso (sin volver a iniciar sesión). El
+    superadmin entra aunque su rol no tenga los códigos (BD restaurada).
+    Los códigos de con_permiso se registran al migrar, no en la petición.
+    """
+    empresa, _, rrhh, _ = roles
+    assert set(CodigoPermiso.objects.filter(codigo__in=["roles.manage", "permisos.manage"])
+               .values_list("codigo", flat=True)) == {"roles.manage", "permisos.manage"}
+
+    admin = Rol.objects.create(empresa=None, nombre="superadmin")
+    superadmin = APIClient()
+    superadmin.force_authenticate(user=AuthUser(email="admin@x.com"),
+                                  token=_token(usuario_id=1, rol="superadmin", rol_ids=[admin.id]))
+    assert superadmin.get("/api/roles-empresa/").status_code == 200
+    assert superadmin.get(f"/api/permisos-por-empresa/?empresa_id={empresa.id}").status_code == 200
+
+    client = APIClient()
+    client.force_authenticate(user=AuthUser(email="rrhh@x.com"),
+                              token=_token(usuario_id=2, empresa_id=empresa.id, rol="rrhh", rol_ids=[rrhh.id]))
+    codigos = CodigoPermiso.objects.count()
+    assert client.get("/api/roles-empresa/").status_code == 403
+    assert client.get(f"/api/permisos-por-empresa/?empresa_id={empresa.id}").status_code == 403
+    assert CodigoPermiso.objects.count() == codigos
+    assert not con_permiso("no.declarado")().has_permission(
+        _request(usuario_id=2, empresa_id=empresa.id, rol_ids=[rrhh.id]), None
+    )
+    assert CodigoPermiso.objects.count() == codigos
+
+    Permiso.objects.create(rol=rrhh, codigo="roles.manage")
+    assert client.get("/api/roles-empresa/").status_code == 200
+    assert client.get(f"/api/permisos-por-empresa/?empresa_id={empresa.id}").status_code == 403
+
+    Permiso.objects.create(rol=rrhh, codigo="Permisos.Manage")
+    r = client.get(f"/api/permisos-por-empresa/?empresa_id={empresa.id}")
+    assert r.status_code == 200
+    assert {p["codigo"] for p in r.data} == {"Nomina.Exportar", "vacaciones.aprobar", "roles.manage", "Permisos.Manage"}
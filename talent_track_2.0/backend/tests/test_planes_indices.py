@@ -0,0 +1,157 @@
+import os
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from apps.asistencia.models import EventoAsistencia, JornadaCalculada
+from apps.auditoria.models import LogAuditoria
+from apps.ausencias.models import SolicitudAusencia
+from apps.empleados.models import Empleado
+from apps.notificaciones.models import Notificacion
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "postgresql",
+        reason="Los planes (EXPLAIN) solo tienen sentido en PostgreSQL.",
+    ),
+]
+
+# 1M por defecto; se puede bajar en local con TT_PLAN_EVENTOS=200000
+TOTAL_EVENTOS = int(os.environ.get("TT_PLAN_EVENTOS", "1000000"))
+EMPRESAS = 20
+EMPLEADOS_POR_EMPRESA = 50
+PAGINA = 50
+
+
+@pytest.fixture
+def dataset(empresa_con_empleado):
+    """
+    Siembra masiva con generate_series (rápido) y ANALYZE para que el
+    planner tenga estadísticas reales.
+    """
+    empleados = []
+    for i in range(EMPRESAS):
+        empresa, primero = empresa_con_empleado(f"09{i:011d}")
+        empleados += [primero] + Empleado.objects.bulk_create([
+            Empleado(
+                empresa=empresa, unidad=primero.unidad, puesto=primero.puesto, nombres=f"N{j}", apellidos="A",
+                email=f"e{i}_{j}@x.com", fecha_nacimiento=date(1990, 1, 1), fecha_ingreso=date(2020, 1, 1), estado=1,
+            )
+            for j in range(1, EMPLEADOS_POR_EMPRESA)
+        ])
+
+    por_empleado = max(1, TOTAL_EVENTOS // len(empleados))
+
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO eventoasistencia (empresa_id, empleado_id, tipo, registrado_el, fuente, dentro_geocerca)
+            SELECT e.empresa_id, e.id, 1 + (g %% 4), now() - g * interval '6 hours', 2, false
+            FROM empleado e CROSS JOIN generate_series(1, %s) g
+            """,
+            [por_empleado],
+        )
+        cur.execute(
+            """
+            INSERT INTO jornadacalculada (empresa_id, empleado_id, fecha, hora_primera_entrada, hora_ultimo_salida,
+                                          minutos_trabajados, minutos_tardanza, minutos_extra, estado)
+            SELECT e.empresa_id, e.id, current_date - g, now(), now(), 480, g %% 15, 0, 1
+            FROM empleado e CROSS JOIN generate_series(1, %s) g
+            """,
+            [por_empleado // 4],
+        )
+        cur.execute(
+            """
+            INSERT INTO logauditoria (empresa_id, accion, entidad, entidad_id, detalles, fecha)
+            SELECT e.empresa_id, 'update', 'empleado', e.id, '{}'::jsonb, now() - g * interval '1 hour'
+            FROM empleado e CROSS JOIN generate_series(1, %s) g
+            """,
+            [por_empleado // 2],
+        )
+        cur.execute(
+            """
+            INSERT INTO tipoausencia (empresa_id, nombre, afecta_sueldo, requiere_soporte)
+            SELECT id, 'Vacaciones', false, false FROM empresa
+            """
+        )
+        cur.execute(
+            """
+            INSERT INTO solicitudausencia (empresa_id, empleado_id, tipo_ausencia_id, fecha_inicio, dias_habiles,
+                                           motivo, estado, flujo_actual, creada_el)
+            SELECT e.empresa_id, e.id, t.id, current_date, 1, 'x', CASE WHEN g %% 20 = 0 THEN 1 ELSE 2 END, 1,
+                   now() - g * interval '1 day'
+            FROM empleado e
+            JOIN tipoausencia t ON t.empresa_id = e.empresa_id
+            CROSS JOIN generate_series(1, %s) g
+            """,
+            [max(1, por_empleado // 20)],
+        )
+        cur.execute(
+            """
+            INSERT INTO notificacion (empresa_id, empleado_id, canal, titulo, mensaje, enviada_el, leida_el)
+            SELECT e.empresa_id, e.id, 1, 't', 'm', now() - g * interval '1 hour',
+                   CASE WHEN g %% 10 = 0 THEN NULL ELSE now() END
+            FROM empleado e CROSS JOIN generate_series(1, %s) g
+            """,
+            [max(1, por_empleado // 10)],
+        )
+        cur.execute("ANALYZE")
+
+    return empleados[len(empleados) // 2]
+
+
+def _assert_index_scan(qs, tabla):
+    plan = qs.explain()
+    assert "Index" in plan, plan
+    assert f"Seq Scan on {tabla}" not in plan, plan
+
+
+def test_listados_principales_usan_indices(dataset):
+    """
+    Regresión de planes: los listados por empresa (con su orden y tamaño
+    de página) y las búsquedas por empleado/día deben resolverse con
+    índices, no con un Seq Scan de la tabla completa.
+    """
+    empleado = dataset
+    empresa_id = empleado.empresa_id
+    hoy = timezone.localdate()
+    inicio = timezone.make_aware(datetime.combine(hoy, time.min))
+    fin = inicio + timedelta(days=1)
+
+    # empleado: marcaciones de hoy
+    _assert_index_scan(
+        EventoAsistencia.objects
+        .filter(empresa_id=empresa_id, empleado_id=empleado.id, registrado_el__gte=inicio, registrado_el__lt=fin)
+        .order_by("registrado_el"),
+        "eventoasistencia",
+    )
+    # auditor: eventos de la empresa
+    _assert_index_scan(
+        EventoAsistencia.objects.filter(empresa_id=empresa_id).order_by("-registrado_el", "-id")[:PAGINA],
+        "eventoasistencia",
+    )
+    # rrhh: jornadas calculadas
+    _assert_index_scan(
+        JornadaCalculada.objects.filter(empresa_id=empresa_id).order_by("-fecha", "-id")[:PAGINA],
+        "jornadacalculada",
+    )
+    # auditor: trazabilidad
+    _assert_index_scan(
+        LogAuditoria.objects.filter(empresa_id=empresa_id).order_by("-fecha", "-id")[:PAGINA],
+        "logauditoria",
+    )
+    # rrhh: bandeja de pendientes (índice parcial estado=1)
+    _assert_index_scan(
+        SolicitudAusencia.objects.filter(empresa_id=empresa_id, estado=1).order_by("-creada_el", "-id")[:PAGINA],
+        "solicitudausencia",
+    )
+    # empleado: notificaciones no leídas (índice parcial leida_el IS NULL)
+    _assert_index_scan(
+        Notificacion.objects
+        .filter(empresa_id=empresa_id, empleado_id=empleado.id, leida_el__isnull=True)
+        .order_by("-enviada_el", "-id"),
+        "notificacion",
+    )
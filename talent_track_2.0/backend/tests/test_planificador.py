@@ -0,0 +1,102 @@
+import csv
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from apps.asistencia.models import JornadaCalculada
+from apps.integraciones import reportes
+from apps.integraciones.cron import CronInvalido, parsear_cron
+from apps.integraciones.models import EjecucionReporte, ReporteProgramado
+from apps.integraciones.planificador import Planificador, PoolReportes, registrar_ejecuciones
+
+GYE = ZoneInfo("America/Guayaquil")
+
+
+def test_cron_siguiente_salta_por_campos_y_respeta_dia_mes_o_semana():
+    """
+    La próxima ejecución se calcula en la zona de la empresa; dia_mes y
+    dia_semana restringidos se combinan con OR (como cron).
+    """
+    base = datetime(2026, 1, 30, 18, 59, tzinfo=GYE)  # viernes
+
+    assert parsear_cron("*/15 8-18 * * mon-fri").siguiente(base, GYE) == datetime(2026, 2, 2, 8, 0, tzinfo=GYE)
+    assert parsear_cron("@monthly").siguiente(base, GYE) == datetime(2026, 2, 1, 0, 0, tzinfo=GYE)
+    # día 1 O domingo
+    assert parsear_cron("30 6 1 * 0").siguiente(base, GYE) == datetime(2026, 2, 1, 6, 30, tzinfo=GYE)
+    assert parsear_cron("0 0 29 feb *").siguiente(base, GYE) == datetime(2028, 2, 29, 0, 0, tzinfo=GYE)
+    # en UTC la misma expresión cae 5 horas antes
+    utc = parsear_cron("0 7 * * *").siguiente(base, ZoneInfo("UTC"))
+    assert utc == datetime(2026, 1, 31, 7, 0, tzinfo=ZoneInfo("UTC"))
+
+    for malo in ("", "* * * *", "61 * * * *", "*/0 * * * *", "0 0 30 feb *"):
+        with pytest.raises(CronInvalido):
+            parsear_cron(malo).siguiente(base, GYE)
+
+
+@pytest.mark.django_db
+def test_planificador_corre_vencidos_una_vez_y_guarda_historial(tmp_path, monkeypatch, empresa_con_empleado):
+    """
+    El heap entrega solo los reportes vencidos; la ejecución escribe el
+    archivo del período y queda en el historial. Un segundo planificador no
+    vuelve a correr la misma ejecución, y un reporte desactivado sale del heap.
+    """
+    monkeypatch.setattr(reportes, "REPORTES_DIR", tmp_path)
+    empresa, empleado = empresa_con_empleado("0999999999801")
+    for dia in (date(2026, 3, 9), date(2026, 3, 10)):
+        JornadaCalculada.objects.create(
+            empresa=empresa, empleado=empleado, fecha=dia,
+            hora_primera_entrada=datetime.combine(dia, time(8, 0), GYE),
+            hora_ultimo_salida=datetime.combine(dia, time(17, 0), GYE),
+            minutos_trabajados=540, minutos_tardanza=0, minutos_extra=0, estado=1,
+        )
+    csv_diario = ReporteProgramado.objects.create(
+        empresa=empresa, nombre="Asistencia diaria", tipo=1, parametros={}, frecuencia_cron="0 6 * * *",
+        formato=1, destinatarios=["rrhh@x.com"], activo=True,
+    )
+    xml_semanal = ReporteProgramado.objects.create(
+        empresa=empresa, nombre="Semanal", tipo=1, parametros={"dias": 7}, frecuencia_cron="0 7 * * mon",
+        formato=2, destinatarios=["rrhh@x.com"], activo=True,
+    )
+    pdf = ReporteProgramado.objects.create(
+        empresa=empresa, nombre="PDF", tipo=1, parametros={}, frecuencia_cron="0 6 * * *",
+        formato=3, destinatarios=["rrhh@x.com"], activo=True,
+    )
+
+    plan = Planificador()
+    plan.sincronizar(datetime(2026, 3, 10, 23, 0, tzinfo=GYE))
+    assert plan.proxima() == datetime(2026, 3, 11, 6, 0, tzinfo=GYE)
+    assert plan.vencidos(datetime(2026, 3, 11, 5, 59, tzinfo=GYE)) == []
+
+    vencidos = plan.vencidos(datetime(2026, 3, 11, 6, 0, 30, tzinfo=GYE))
+    assert sorted(r for r, _ in vencidos) == [csv_diario.id, pdf.id]
+
+    pool = PoolReportes(workers=0)
+    resultados = pool.enviar(registrar_ejecuciones(vencidos))
+    assert {r["estado"] for r in resultados} == {EjecucionReporte.COMPLETADA, EjecucionReporte.ERROR}
+
+    ok = EjecucionReporte.objects.get(reporte=csv_diario)
+    with open(ok.archivo, encoding="utf-8-sig", newline="") as f:
+        filas = list(csv.DictReader(f))
+    # período: el día anterior a la ejecución
+    assert [f["fecha"] for f in filas] == ["2026-03-10"] and ok.filas == 1
+    fallida = EjecucionReporte.objects.get(reporte=pdf)
+    assert fallida.estado == EjecucionReporte.ERROR and "Formato" in fallida.error
+
+    # otro planificador (reinicio) parte del historial: no repite las 06:00
+    otro = Planificador()
+    otro.sincronizar(datetime(2026, 3, 11, 6, 0, 40, tzinfo=GYE))
+    assert registrar_ejecuciones(vencidos) == []
+    assert [r for r, _ in otro.vencidos(datetime(2026, 3, 11, 6, 1, tzinfo=GYE))] == []
+
+    # lunes 16: el semanal cubre 7 días en Excel XML
+    lunes = datetime(2026, 3, 16, 7, 0, 5, tzinfo=GYE)
+    ReporteProgramado.objects.filter(id=pdf.id).update(activo=False)
+    plan.sincronizar(lunes)
+    vencidos = plan.vencidos(lunes)
+    assert sorted(r for r, _ in vencidos) == [csv_diario.id, xml_semanal.id]
+    pool.enviar(registrar_ejecuciones(vencidos))
+
+    semanal = EjecucionReporte.objects.get(reporte=xml_semanal)
+    assert semanal.archivo.endswith(".xml") and semanal.filas == 2
+    assert plan.proxima() > lunes + timedelta(hours=22)
@@ -0,0 +1,116 @@
+from datetime import date, datetime, time
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from apps.asistencia.models import JornadaCalculada
+from apps.ausencias.models import SolicitudAusencia, TipoAusencia
+from apps.core.dashboard_views import SuperAdminOverviewPlotlyAPIView
+from apps.core.models import ResumenDiarioEmpresa, ResumenMensualEmpresa
+from apps.core.resumenes import procesar_resumenes, resumen_por_empresa, resumen_por_mes
+from apps.kpi.agregados import contar_tramos, contar_tramos_por
+from apps.kpi.models import KPI, ResultadoKPI
+
+GYE = ZoneInfo("America/Guayaquil")
+
+
+@pytest.mark.django_db
+def test_resumenes_incrementales_cuadran_con_las_tablas_de_hechos(empresa_con_empleado):
+    """
+    Las escrituras encolan (empresa, día); procesar_resumenes deja diarios y
+    mensuales que cuadran con los hechos, y al borrar datos se limpian.
+    """
+    now = timezone.now()
+    empresa, empleado = empresa_con_empleado("0999999999104")
+
+    for fecha, tardanza in ((date(2026, 1, 30), 10), (date(2026, 2, 2), 0), (date(2026, 2, 3), 20)):
+        JornadaCalculada.objects.create(
+            empresa=empresa, empleado=empleado, fecha=fecha, hora_primera_entrada=now, hora_ultimo_salida=now,
+            minutos_trabajados=480, minutos_tardanza=tardanza, minutos_extra=0, estado=1,
+        )
+
+    tipo = TipoAusencia.objects.create(empresa=empresa, nombre="Vacaciones", afecta_sueldo=False, requiere_soporte=False)
+    # 23:30 en Ecuador del 31/01 = 04:30 UTC del 01/02: cuenta para enero
+    solicitud = SolicitudAusencia.objects.create(
+        empresa=empresa, empleado=empleado, tipo_ausencia=tipo, fecha_inicio=date(2026, 2, 5), dias_habiles=1,
+        motivo="x", estado=1, flujo_actual=1, creada_el=datetime.combine(date(2026, 1, 31), time(23, 30), GYE),
+    )
+
+    kpi = KPI.objects.create(empresa=empresa, codigo="K", nombre="K", descripcion="", unidad=1, origen_datos=1)
+    for pct in (95, 80, 50):
+        ResultadoKPI.objects.create(
+            empresa=empresa, empleado=empleado, kpi=kpi, periodo="2026-02", valor=pct, cumplimiento_pct=pct,
+            clasificacion=1, calculado_el=datetime.combine(date(2026, 2, 10), time(12, 0), GYE), fuente="x",
+        )
+
+    procesar_resumenes()
+
+    enero, febrero = resumen_por_mes(date(2026, 1, 1), empresa_id=empresa.id)
+    assert (enero["mes"], enero["jornadas"], enero["minutos_tardanza"], enero["solicitudes"]) == (
+        date(2026, 1, 1), 1, 10, 1,
+    )
+    assert (febrero["jornadas"], febrero["jornadas_con_tardanza"], febrero["minutos_tardanza"]) == (2, 1, 20)
+    assert (febrero["kpi_ok"], febrero["kpi_medio"], febrero["kpi_critico"]) == (1, 1, 1)
+
+    # rango que empieza a mitad de enero: el mes parcial sale de los diarios
+    total = resumen_por_empresa(date(2026, 1, 31))[empresa.id]
+    assert total["jornadas"] == 2 and total["solicitudes"] == 1
+
+    solicitud.delete()
+    JornadaCalculada.objects.filter(fecha=date(2026, 1, 30)).delete()
+    procesar_resumenes()
+
+    assert not ResumenDiarioEmpresa.objects.filter(empresa=empresa, fecha__lt=date(2026, 2, 1)).exists()
+    assert not ResumenMensualEmpresa.objects.filter(empresa=empresa, mes=date(2026, 1, 1)).exists()
+    assert ResumenMensualEmpresa.objects.get(empresa=empresa, mes=date(2026, 2, 1)).jornadas == 2
+
+
+@pytest.mark.django_db
+def test_dashboard_cacheado_se_invalida_al_escribir(django_assert_num_queries, empresa_con_empleado):
+    """
+    La segunda llamada sale de la caché sin tocar la BD; una escritura de
+    la empresa (nueva jornada) invalida y la siguiente se reconstruye.
+    """
+    cache.clear()
+    empresa, empleado = empresa_con_empleado("0999999999105")
+    vista = SuperAdminOverviewPlotlyAPIView.as_view(permission_classes=[])
+
+    def pedir():
+        return vista(APIRequestFactory().get("/x/", {"days": 30, "question": "kpi"})).data
+
+    primera = pedir()
+    assert set(primera["figures"]) == {"kpi_global", "kpi_by_company_stacked"}
+
+    with django_assert_num_queries(0):
+        assert pedir() == primera
+
+    now = timezone.now()
+    JornadaCalculada.objects.create(
+        empresa=empresa, empleado=empleado, fecha=timezone.localdate(now, GYE), hora_primera_entrada=now,
+        hora_ultimo_salida=now, minutos_trabajados=480, minutos_tardanza=15, minutos_extra=0, estado=1,
+    )
+    procesar_resumenes()
+
+    assert pedir()["kpis"]["tardanza_promedio"] == 15.0
+
+
+@pytest.mark.django_db
+def test_tramos_kpi_en_una_sola_consulta(django_assert_num_queries, empresa_con_empleado):
+    empresa, empleado = empresa_con_empleado("0999999999106")
+    kpi = KPI.objects.create(empresa=empresa, codigo="K", nombre="K", descripcion="", unidad=1, origen_datos=1)
+    for pct in (100, 90, 89.99, 70, 69.99, 0):
+        ResultadoKPI.objects.create(
+            empresa=empresa, empleado=empleado, kpi=kpi, periodo="2026-02", valor=pct, cumplimiento_pct=pct,
+            clasificacion=1, calculado_el=timezone.now(), fuente="x",
+        )
+
+    with django_assert_num_queries(1):
+        global_ = contar_tramos(ResultadoKPI.objects.all())
+    with django_assert_num_queries(1):
+        por_empresa = contar_tramos_por(ResultadoKPI.objects.all())
+
+    assert global_ == {"total": 6, "ok": 2, "medio": 2, "critico": 2}
+    assert por_empresa == {empresa.id: global_}
@@ -0,0 +1,88 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.asistencia.models import EventoAsistencia, JornadaCalculada
+from apps.core import retencion
+from apps.core.models import PoliticaRetencion
+from apps.core.retencion import EVENTOS, JORNADAS, LOGS, aplicar_retencion, leer_archivo, politicas
+
+GYE = ZoneInfo("America/Guayaquil")
+
+
+def _evento(empleado, dia, **extra):
+    return EventoAsistencia.objects.create(
+        empresa=empleado.empresa, empleado=empleado, tipo=1, fuente=1,
+        registrado_el=datetime.combine(dia, time(8, 0), GYE), **extra,
+    )
+
+
+@pytest.mark.django_db
+def test_retencion_archiva_en_columnar_y_borra_por_lotes(tmp_path, monkeypatch, empresa_con_empleado):
+    """
+    Los eventos anteriores al corte (inicio de mes - N meses) se archivan en
+    .npz por lotes y se borran; los recientes y los de otra empresa quedan.
+    Las políticas inactivas no se aplican y se puede cortar por max_lotes.
+    """
+    empresa, ana = empresa_con_empleado("0999999995001")
+    otra, luis = empresa_con_empleado("0999999995002")
+    PoliticaRetencion.objects.create(empresa=empresa, entidad=EVENTOS, meses_retencion=13)
+    PoliticaRetencion.objects.create(empresa=empresa, entidad=JORNADAS, meses_retencion=1, activo=False)
+    PoliticaRetencion.objects.create(empresa=otra, entidad=EVENTOS, meses_retencion=0)
+
+    viejos = [
+        _evento(ana, date(2025, 8, 4), gps_lat=Decimal("-3.993311"), observaciones="ok"),
+        _evento(ana, date(2025, 8, 5)),
+        _evento(ana, date(2025, 9, 30)),
+    ]
+    reciente = _evento(ana, date(2025, 10, 1))  # corte con hoy=2026-11-18: 2025-10-01
+    ajeno = _evento(luis, date(2020, 1, 1))
+    JornadaCalculada.objects.create(
+        empresa=empresa, empleado=ana, fecha=date(2020, 1, 1), hora_primera_entrada=reciente.registrado_el,
+        hora_ultimo_salida=reciente.registrado_el, minutos_trabajados=1, minutos_tardanza=0, minutos_extra=0, estado=1,
+    )
+
+    monkeypatch.setattr(retencion, "MESES_DEFECTO", {})
+    assert [(e, ent) for e, ent, _, _ in politicas()] == [(empresa.id, EVENTOS)]
+
+    hoy = date(2026, 11, 18)
+    (r,) = aplicar_retencion(empresa_id=empresa.id, lote=2, max_lotes=1, hoy=hoy, directorio=tmp_path, filas_por_segundo=0)
+    assert (r["eliminadas"], r["lotes"]) == (2, 1)
+    (r,) = aplicar_retencion(empresa_id=empresa.id, lote=2, hoy=hoy, directorio=tmp_path, filas_por_segundo=0)
+    assert (r["eliminadas"], r["lotes"]) == (1, 1)
+
+    assert set(EventoAsistencia.objects.values_list("id", flat=True)) == {reciente.id, ajeno.id}
+    assert JornadaCalculada.objects.count() == 1
+
+    carpeta = tmp_path / str(empresa.id) / "eventos_asistencia"
+    assert len(list(carpeta.glob("*.npz"))) == 2
+    primero = leer_archivo(carpeta / f"eventoasistencia_{viejos[0].id}_{viejos[1].id}.npz")
+    assert primero["id"] == [viejos[0].id, viejos[1].id]
+    assert primero["gps_lat"] == ["-3.993311", None]
+    assert primero["observaciones"] == ["ok", None]
+    assert primero["registrado_el"][0] == datetime(2025, 8, 4, 13, 0)  # UTC
+    assert primero["dentro_geocerca"] == [False, False]
+
+
+@pytest.mark.django_db
+def test_comando_aplicar_retencion_usa_los_meses_por_defecto(tmp_path, monkeypatch, empresa_con_empleado):
+    """
+    Sin PoliticaRetencion se usa RETENCION_MESES_DEFECTO; con --dry-run no
+    se borra nada.
+    """
+    empresa, ana = empresa_con_empleado("0999999995003")
+    _evento(ana, date(2001, 1, 1))
+    _evento(ana, timezone.localdate())
+    monkeypatch.setattr(retencion, "MESES_DEFECTO", {EVENTOS: 13, LOGS: 0})
+    monkeypatch.setattr(retencion, "RETENCION_DIR", tmp_path)
+
+    call_command("aplicar_retencion", "--dry-run", empresa_id=empresa.id)
+    assert EventoAsistencia.objects.count() == 2
+
+    call_command("aplicar_retencion", empresa_id=empresa.id, filas_por_segundo=0)
+    assert EventoAsistencia.objects.count() == 1
+    assert EventoAsistencia.objects.get().registrado_el.year == timezone.localdate().year
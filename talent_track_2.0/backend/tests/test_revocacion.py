@@ -0,0 +1,167 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.accounts import blacklist, hashing, revocacion
+from apps.accounts.hashing import PoolHash
+from apps.accounts.models import AuthUser, RevocacionBorrado
+from apps.accounts.revocacion import EpocasRevocacion
+from apps.auditoria import registro
+from apps.auditoria.registro import BufferAuditoria
+from apps.usuarios.authentication import JWTContextoAuthentication
+from apps.usuarios.models import Rol, Usuario, UsuarioRol
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _epocas_limpias(monkeypatch, tmp_path):
+    # épocas por proceso: cada test arranca sin las del anterior
+    monkeypatch.setattr(revocacion, "_epocas", EpocasRevocacion(ttl=60))
+    monkeypatch.setattr(hashing, "_pool", PoolHash(workers=2, cola=4))
+    # el PATCH de toggle-estado se audita: buffer sin hilo, dentro del test
+    monkeypatch.setattr(registro, "_buffer", BufferAuditoria(hilo=False, spool_dir=tmp_path))
+
+
+@pytest.fixture
+def empleado(empresa_con_empleado):
+    empresa, emp = empresa_con_empleado("0999999996001")
+    usuario = Usuario.objects.create(empresa=empresa, empleado=emp, email="eva@x.com", hash_password="x", estado=1)
+    UsuarioRol.objects.create(usuario=usuario, rol=Rol.objects.create(empresa=empresa, nombre="empleado"))
+    AuthUser.objects.create_user(email="eva@x.com", password="clave-123", usuario=usuario)
+    return usuario
+
+
+def _login(email="eva@x.com"):
+    r = APIClient().post("/api/auth/login/", {"email": email, "password": "clave-123"}, format="json")
+    assert r.status_code == 200, r.data
+    return r.data
+
+
+def _me(access):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    return client.get("/api/auth/me/")
+
+
+def test_autenticar_no_consulta_la_bd(empleado, django_assert_num_queries):
+    """
+    Con las épocas ya cargadas, autenticar el JWT no hace consultas:
+    ni AuthUser ni las tablas de blacklist.
+    """
+    access = _login()["access"]
+    auth = AuthUser.objects.get(email="eva@x.com")
+    revocacion.get_epocas().recargar()
+    request = Request(APIRequestFactory().get("/x/", HTTP_AUTHORIZATION=f"Bearer {access}"))
+
+    with django_assert_num_queries(0):
+        user, token = JWTContextoAuthentication().authenticate(request)
+        assert user.is_authenticated and user.pk == auth.pk
+        assert request._request.contexto.usuario_id == empleado.id
+
+    # el AuthUser real se carga solo si la vista lo usa
+    assert user.email == "eva@x.com"
+
+
+def test_bloquear_revoca_access_y_refresh(empleado):
+    """
+    Bloquear con UsuarioEmpresaToggleEstadoAPIView rechaza al instante el
+    access token vigente y el refresh; al reactivar, un login nuevo vale.
+    """
+    tokens = _login()
+    assert _me(tokens["access"]).status_code == 200
+
+    admin = APIClient()
+    admin.force_authenticate(user=AuthUser(email="admin@x.com"))
+    r = admin.patch(f"/api/usuarios-empresa/{empleado.id}/toggle-estado/")
+    assert r.data["estado"] == 2
+
+    r = _me(tokens["access"])
+    assert r.status_code == 401
+    assert r.data["detail"].code == "token_revocado"
+    r = APIClient().post("/api/auth/refresh/", {"refresh": tokens["refresh"]}, format="json")
+    assert r.status_code == 401
+
+    admin.patch(f"/api/usuarios-empresa/{empleado.id}/toggle-estado/")
+    # la época redondea al segundo siguiente: se corre para no esperar en el test
+    AuthUser.objects.filter(email="eva@x.com").update(
+        tokens_validos_desde=timezone.now() - timedelta(seconds=5)
+    )
+    revocacion.get_epocas().recargar()
+    assert _me(_login()["access"]).status_code == 200
+
+
+def test_otro_proceso_ve_la_revocacion_al_vencer_el_ttl(empleado):
+    """
+    Las épocas se releen (una consulta) al vencer el TTL: es el retraso
+    máximo del bloqueo en los workers que no lo hicieron.
+    """
+    auth = AuthUser.objects.get(email="eva@x.com")
+    otro = EpocasRevocacion(ttl=0)
+    assert otro.epoca(auth.id) is None
+
+    epoca = revocacion.revocar(auth.id)
+    assert otro.epoca(auth.id) == int(epoca.timestamp())
+
+    # los borrados no tienen fila de AuthUser: su época va a RevocacionBorrado
+    # y también la ve un proceso que no hizo el borrado
+    auth_id = auth.id
+    auth.delete()
+    epoca = RevocacionBorrado.objects.get(auth_user_id=auth_id).tokens_validos_desde
+    assert EpocasRevocacion(ttl=0).epoca(auth_id) == int(epoca.timestamp())
+
+
+def test_compactar_blacklist_borra_solo_vencidos(empleado):
+    """
+    compactar_blacklist borra por lotes los refresh vencidos y su fila de
+    lista negra; los vigentes (y su blacklist) se quedan.
+    """
+    auth = AuthUser.objects.get(email="eva@x.com")
+    ahora = timezone.now()
+    tokens = [
+        OutstandingToken.objects.create(user=auth, jti=f"j{i}", token="t", created_at=ahora - timedelta(days=9),
+                                        expires_at=ahora - timedelta(days=2) if i < 5 else ahora + timedelta(days=2))
+        for i in range(7)
+    ]
+    for t in tokens[::2]:
+        BlacklistedToken.objects.create(token=t)
+
+    r = blacklist.compactar(lote=2)
+
+    assert r == {"outstanding": 5, "blacklisted": 3, "lotes": 3}
+    assert sorted(OutstandingToken.objects.values_list("jti", flat=True)) == ["j5", "j6"]
+    assert list(BlacklistedToken.objects.values_list("token__jti", flat=True)) == ["j6"]
+
+
+def test_quitar_rol_o_mover_de_empresa_revoca_los_tokens(empleado, empresa_con_empleado):
+    """
+    Los roles y la empresa van en el token y el refresh los copia: quitar
+    un UsuarioRol revoca access y refresh; mover al Usuario de empresa
+    también. Editar otros campos no.
+    """
+    tokens = _login()
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    assert client.get("/api/empleado/asistencia/hoy/").status_code == 200
+
+    empleado.phone = "0999"
+    empleado.save()
+    assert client.get("/api/empleado/asistencia/hoy/").status_code == 200
+
+    UsuarioRol.objects.filter(usuario=empleado).delete()
+
+    assert client.get("/api/empleado/asistencia/hoy/").status_code == 401
+    r = APIClient().post("/api/auth/refresh/", {"refresh": tokens["refresh"]}, format="json")
+    assert r.status_code == 401
+
+    auth = AuthUser.objects.get(email="eva@x.com")
+    AuthUser.objects.filter(id=auth.id).update(tokens_validos_desde=None)
+    revocacion.get_epocas().olvidar()
+    otra, _ = empresa_con_empleado("0999999996002")
+    empleado.empresa = otra
+    empleado.save()
+    assert revocacion.get_epocas().epoca(auth.id) is not None
@@ -0,0 +1,201 @@
+import threading
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.auditoria import registro
+from apps.auditoria.registro import BufferAuditoria
+from apps.ausencias import saldos
+from apps.ausencias.models import MovimientoSaldo, SaldoVacaciones, SolicitudAusencia, TipoAusencia
+from apps.empleados.models import Empleado
+from apps.notificaciones.models import NotificacionSaliente
+from apps.usuarios.models import Usuario
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def _aislar(monkeypatch, tmp_path):
+    monkeypatch.setattr(registro, "_buffer", BufferAuditoria(hilo=False, spool_dir=tmp_path))
+
+
+def _tipo(empresa, nombre="Vacaciones"):
+    return TipoAusencia.objects.get_or_create(
+        empresa=empresa, nombre=nombre, defaults={"afecta_sueldo": False, "requiere_soporte": False},
+    )[0]
+
+
+def _solicitud(empleado, dias, estado=1, inicio=date(2026, 3, 2), tipo="Vacaciones"):
+    return SolicitudAusencia.objects.create(
+        empresa=empleado.empresa, empleado=empleado, tipo_ausencia=_tipo(empleado.empresa, tipo),
+        fecha_inicio=inicio, fecha_fin=inicio, dias_habiles=dias, motivo="x", estado=estado, flujo_actual=1,
+        creada_el=timezone.now(),
+    )
+
+
+def _saldo(empleado, asignados="15.00", periodo="2026"):
+    return SaldoVacaciones.objects.create(
+        empresa=empleado.empresa, empleado=empleado, periodo=periodo,
+        dias_asignados=Decimal(asignados), dias_tomados=Decimal("0"), dias_disponibles=Decimal(asignados),
+    )
+
+
+def _cliente(empleado, rol, usuario_id=1):
+    token = AccessToken()
+    token["user_id"] = "1"
+    for k, v in {"usuario_id": usuario_id, "empresa_id": empleado.empresa_id, "empleado_id": empleado.id,
+                 "rol": rol, "roles": [rol]}.items():
+        token[k] = v
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def _cuadra(saldo):
+    saldo.refresh_from_db()
+    neto = saldo.movimientos.aggregate(t=Sum("dias"))["t"] or Decimal("0")
+    assert saldo.dias_tomados == neto
+    assert saldo.dias_disponibles == saldo.dias_asignados - saldo.dias_tomados
+    return saldo
+
+
+def test_aprobar_descuenta_y_anular_devuelve(empresa_con_empleado):
+    """
+    Aprobar (manager) descuenta del saldo del año de fecha_inicio con un
+    movimiento; anular (RRHH) lo devuelve; otros tipos y periodos no tocan
+    el saldo; sin saldo suficiente la aprobación se rechaza entera. El aviso
+    de anulación solo menciona la devolución si hubo movimientos.
+    """
+    empresa, empleado = empresa_con_empleado("0999999999501")
+    jefe = Empleado.objects.create(
+        empresa=empresa, unidad=empleado.unidad, puesto=empleado.puesto, nombres="Jefe", apellidos="J",
+        email="jefe@x.com", fecha_nacimiento=date(1980, 1, 1), fecha_ingreso=date(2015, 1, 1), estado=1,
+    )
+    Empleado.objects.filter(id=empleado.id).update(manager=jefe)
+    saldo = _saldo(empleado, asignados="10.00")
+    _saldo(empleado, asignados="10.00", periodo="2025")
+    usuario = Usuario.objects.create(empresa=empresa, empleado=jefe, email="jefe@x.com", hash_password="x", estado=1)
+    manager, rrhh = _cliente(jefe, "manager", usuario.id), _cliente(jefe, "rrhh", usuario.id)
+
+    vacaciones = _solicitud(empleado, 4)
+    r = manager.patch(f"/api/manager/ausencias/solicitudes/{vacaciones.id}/decidir/", {"accion": 1}, format="json")
+    assert r.status_code == 200, r.data
+    assert _cuadra(saldo).dias_disponibles == Decimal("6.00")
+    assert NotificacionSaliente.objects.count() == 1
+
+    permiso = _solicitud(empleado, 2, tipo="Permiso médico")
+    r = rrhh.patch(f"/api/rrhh/ausencias/solicitudes/{permiso.id}/decidir/", {"accion": "aprobar"}, format="json")
+    assert r.status_code == 200, r.data
+    assert _cuadra(saldo).dias_tomados == Decimal("4.00")
+
+    grande = _solicitud(empleado, 7)
+    r = rrhh.patch(f"/api/rrhh/ausencias/solicitudes/{grande.id}/decidir/", {"accion": 1}, format="json")
+    assert r.status_code == 400
+    grande.refresh_from_db()
+    assert grande.estado == 1 and not grande.aprobacionausencia_set.exists()
+
+    r = rrhh.patch(f"/api/rrhh/ausencias/solicitudes/{vacaciones.id}/decidir/", {"accion": "anular"}, format="json")
+    assert r.status_code == 200, r.data
+    assert r.data["estado_label"] == "cancelado"
+    assert _cuadra(saldo).dias_tomados == Decimal("0.00")
+    assert list(saldo.movimientos.order_by("id").values_list("tipo", flat=True)) == [
+        MovimientoSaldo.TIPO_CONSUMO, MovimientoSaldo.TIPO_REVERSO,
+    ]
+    assert "devueltos a su saldo" in NotificacionSaliente.objects.latest("id").mensaje
+
+    r = rrhh.patch(f"/api/rrhh/ausencias/solicitudes/{permiso.id}/decidir/", {"accion": 3}, format="json")
+    assert r.status_code == 200, r.data
+    assert "devueltos" not in NotificacionSaliente.objects.latest("id").mensaje
+
+    # anular dos veces no devuelve dos veces
+    r = rrhh.patch(f"/api/rrhh/ausencias/solicitudes/{vacaciones.id}/decidir/", {"accion": 3}, format="json")
+    assert r.status_code == 400
+    assert SaldoVacaciones.objects.get(periodo="2025").dias_tomados == Decimal("0.00")
+
+
+def test_conciliar_con_una_consulta_agregada(django_assert_max_num_queries, empresa_con_empleado):
+    """
+    conciliar() recalcula todos los saldos desde las aprobadas (un agregado),
+    deja un ajuste por diferencia y la segunda pasada no cambia nada.
+    """
+    empresa, empleado = empresa_con_empleado("0999999999502")
+    _, otro = empresa_con_empleado("0999999999503")
+    saldo, otro_saldo = _saldo(empleado), _saldo(otro)
+    viejo = _saldo(empleado, periodo="2025")
+    _solicitud(empleado, 3, estado=2)
+    _solicitud(empleado, 2, estado=2)
+    _solicitud(empleado, 5, estado=1)
+    _solicitud(empleado, 1, estado=2, inicio=date(2025, 12, 1))
+    _solicitud(empleado, 4, estado=2, tipo="Permiso médico")
+    _solicitud(otro, 6, estado=2)
+    # deriva: el saldo de otro dice más de lo aprobado
+    SaldoVacaciones.objects.filter(id=otro_saldo.id).update(dias_tomados=9, dias_disponibles=6)
+
+    # select_for_update de saldos + agregado + un UPDATE por valor (5, 1, 6) + INSERT
+    # (+ SAVEPOINT/RELEASE: el atomic corre dentro de la transacción del test)
+    with django_assert_max_num_queries(8):
+        r = saldos.conciliar()
+    assert r == {"revisados": 3, "corregidos": 3}
+    assert _cuadra(saldo).dias_tomados == Decimal("5.00")
+    assert _cuadra(viejo).dias_tomados == Decimal("1.00")
+    otro_saldo.refresh_from_db()
+    assert (otro_saldo.dias_tomados, otro_saldo.dias_disponibles) == (Decimal("6.00"), Decimal("9.00"))
+    assert otro_saldo.movimientos.get().dias == Decimal("-3.00")
+
+    assert saldos.conciliar(empresa_id=empresa.id) == {"revisados": 2, "corregidos": 0}
+
+
+def test_crear_saldo_descuenta_aprobadas_previas(empresa_con_empleado):
+    """
+    Un saldo creado por RRHH después de aprobar vacaciones del periodo nace
+    con esas aprobaciones descontadas.
+    """
+    _, empleado = empresa_con_empleado("0999999999504")
+    _solicitud(empleado, 3, estado=2)
+
+    r = _cliente(empleado, "rrhh").post("/api/rrhh/vacaciones/saldos/", {
+        "empleado_id": empleado.id, "periodo": "2026", "dias_asignados": "15.00",
+    }, format="json")
+    assert r.status_code == 201, r.data
+    assert (r.data["dias_tomados"], r.data["dias_disponibles"]) == ("3.00", "12.00")
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="Bloqueo de filas real solo en PostgreSQL.")
+@pytest.mark.django_db(transaction=True)
+def test_aprobaciones_concurrentes_no_sobregiran(empresa_con_empleado):
+    """
+    Dos aprobaciones simultáneas que juntas superan el saldo: el bloqueo de
+    la fila serializa y solo una descuenta.
+    """
+    _, empleado = empresa_con_empleado("0999999999505")
+    saldo = _saldo(empleado, asignados="5.00")
+    ids = [_solicitud(empleado, 4).id for _ in range(2)]
+    barrera = threading.Barrier(2)
+    resultados = []
+
+    def aprobar(solicitud_id):
+        try:
+            sol = SolicitudAusencia.objects.select_related("tipo_ausencia").get(id=solicitud_id)
+            barrera.wait()
+            with transaction.atomic():
+                saldos.registrar_consumo(sol)
+            resultados.append("ok")
+        except saldos.SaldoInsuficiente:
+            resultados.append("insuficiente")
+        finally:
+            connection.close()
+
+    hilos = [threading.Thread(target=aprobar, args=(i,)) for i in ids]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    assert sorted(resultados) == ["insuficiente", "ok"]
+    assert _cuadra(saldo).dias_disponibles == Decimal("1.00")
@@ -0,0 +1,113 @@
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from django.utils import timezone
+
+from apps.integraciones import webhooks
+from apps.integraciones.models import EntregaWebhook, Webhook
+from apps.integraciones.webhooks import EVENTO_NOTIFICACION, emitir, entregar_pendientes, verificar_firma
+from apps.notificaciones.outbox import encolar, procesar_outbox
+
+
+class _Stub(BaseHTTPRequestHandler):
+    """
+    Servidor HTTP local: responde con los status de `respuestas` (en orden)
+    y guarda cada petición con el puerto del cliente (para ver reuso).
+    """
+    protocol_version = "HTTP/1.1"
+    respuestas = []
+    recibidas = []
+
+    def do_POST(self):
+        cuerpo = self.rfile.read(int(self.headers["Content-Length"]))
+        self.recibidas.append((self.client_address[1], dict(self.headers), cuerpo))
+        status = self.respuestas.pop(0) if self.respuestas else 200
+        salida = b"ok" if status < 300 else b"caido"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(salida)))
+        self.end_headers()
+        self.wfile.write(salida)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    _Stub.respuestas, _Stub.recibidas = [], []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    hilo = threading.Thread(target=server.serve_forever, daemon=True)
+    hilo.start()
+    yield _Stub, f"http://127.0.0.1:{server.server_address[1]}/hook"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db
+def test_entrega_firmada_reintenta_con_backoff_y_reusa_conexion(stub, monkeypatch, empresa_con_empleado):
+    """
+    La primera entrega recibe 500: queda pendiente con backoff. Vencido el
+    plazo se reenvía y el 200 la marca entregada. Las peticiones van firmadas
+    con el secreto y usan una sola conexión keep-alive al mismo host.
+    """
+    servidor, url = stub
+    empresa, _ = empresa_con_empleado("0999999999701")
+    webhook = Webhook.objects.create(
+        empresa=empresa, evento=EVENTO_NOTIFICACION, url=url, secreto="s3cr3t", activo=True, reintentos_max=3,
+    )
+    Webhook.objects.create(empresa=empresa, evento=EVENTO_NOTIFICACION, url=url, secreto="x", activo=False, reintentos_max=3)
+
+    servidor.respuestas = [500]
+    for i in range(3):
+        assert len(emitir(empresa.id, EVENTO_NOTIFICACION, {"n": i})) == 1
+
+    # concurrencia 1 por webhook: las 3 viajan en serie por la misma conexión
+    monkeypatch.setattr(webhooks, "CONCURRENCIA_POR_WEBHOOK", 1)
+    assert entregar_pendientes() == {"entregadas": 2, "reintentos": 1, "fallidas": 0}
+
+    assert len({puerto for puerto, _, _ in servidor.recibidas}) == 1
+    _, headers, cuerpo = servidor.recibidas[0]
+    assert verificar_firma("s3cr3t", headers["X-TalentTrack-Timestamp"], cuerpo, headers["X-TalentTrack-Signature"])
+    assert json.loads(cuerpo)["evento"] == "notificacion"
+
+    fallida = EntregaWebhook.objects.get(ultimo_status=500)
+    assert fallida.estado == EntregaWebhook.PENDIENTE and fallida.intentos == 1
+    assert fallida.proximo_intento_el > timezone.now()
+    # no vencida: no se reenvía
+    assert entregar_pendientes() == {"entregadas": 0, "reintentos": 0, "fallidas": 0}
+
+    EntregaWebhook.objects.filter(id=fallida.id).update(proximo_intento_el=timezone.now() - timedelta(seconds=1))
+    assert entregar_pendientes()["entregadas"] == 1
+
+    assert set(EntregaWebhook.objects.values_list("estado", flat=True)) == {EntregaWebhook.ENTREGADA}
+    assert EntregaWebhook.objects.get(id=fallida.id).intentos == 2
+    webhook.refresh_from_db()
+    assert webhook.ultimo_envio_el is not None
+
+
+@pytest.mark.django_db
+def test_error_4xx_no_reintenta_y_outbox_emite_por_canal_webhook(
+    stub, django_capture_on_commit_callbacks, empresa_con_empleado
+):
+    """
+    Un 404 falla sin reintentar. Una notificación del outbox por canal 4
+    genera una entrega con los empleados notificados.
+    """
+    servidor, url = stub
+    empresa, empleado = empresa_con_empleado("0999999999702")
+    Webhook.objects.create(empresa=empresa, evento=EVENTO_NOTIFICACION, url=url, secreto="k", activo=True, reintentos_max=5)
+
+    encolar(empresa.id, "Aprobacion Solicitud", "ok", empleado_ids=[empleado.id], canal=4)
+    with django_capture_on_commit_callbacks(execute=True):
+        procesar_outbox()
+
+    entrega = EntregaWebhook.objects.get()
+    assert entrega.payload["empleado_ids"] == [empleado.id]
+
+    servidor.respuestas = [404]
+    assert entregar_pendientes() == {"entregadas": 0, "reintentos": 0, "fallidas": 1}
+    entrega.refresh_from_db()
+    assert (entrega.estado, entrega.ultimo_status, entrega.ultimo_error) == (EntregaWebhook.FALLIDA, 404, "caido")
@@ -11,6 +11,27 @@ const TIPO = {
   4: "Pausa OUT",
 };
 
+// Ubicación del navegador para la geocerca de la empresa (ReglaAsistencia).
+// Si no hay permiso o el navegador no responde se marca sin GPS y el
+// backend decide (solo rechaza si la empresa exige geocerca).
+function obtenerUbicacion() {
+  return new Promise((resolve) => {
+    if (!navigator.geolocation) {
+      resolve(null);
+      return;
+    }
+    navigator.geolocation.getCurrentPosition(
+      (pos) => resolve({
+        // el backend acepta hasta 6 decimales
+        gps_lat: Number(pos.coords.latitude.toFixed(6)),
+        gps_lng: Number(pos.coords.longitude.toFixed(6)),
+      }),
+      () => resolve(null),
+      { enableHighAccuracy: true, timeout: 10000, maximumAge: 60000 }
+    );
+  });
+}
+
 async function safeJson(res) {
   const text = await res.text();
   try {
@@ -63,9 +84,11 @@ export default function AsistenciaDiaria() {
   const registrar = async (tipo) => {
     setErr("");
     try {
+      const ubicacion = await obtenerUbicacion();
       const payload = {
         tipo,
         observaciones: obs?.trim() ? obs.trim() : null,
+        ...(ubicacion || {}),
       };
 
       const res = await apiFetch("/api/empleado/asistencia/registrar/", {